@@ -9,11 +9,114 @@ load_dotenv()
 # Supabase 設定
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# マイグレーション等で Postgres に直接つなぐときの接続文字列
+DATABASE_URL = os.getenv("DATABASE_URL")
+# アプリが使うDB
+# "supabase": SUPABASE_URL / SUPABASE_KEY の Supabase（既定）
+# "memory": プロセス内のインメモリDB（app/memory_db.py）。認証情報なしで動かすとき・ベンチマーク用
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "supabase")
+# memory の初期データ（{"テーブル名": [行, ...]} の JSON ファイル）と、1回の呼び出しにかける秒数
+MEMORY_DB_SEED = os.getenv("MEMORY_DB_SEED")
+MEMORY_DB_LATENCY = float(os.getenv("MEMORY_DB_LATENCY", "0"))
 
 # Google API 設定
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 SEARCH_ENGINE_ID = os.getenv("SEARCH_ENGINE_ID")
+# Google API 呼び出しのタイムアウト（秒）・同時接続数・リトライ回数
+GOOGLE_API_TIMEOUT = float(os.getenv("GOOGLE_API_TIMEOUT", "5.0"))
+GOOGLE_API_MAX_CONNECTIONS = int(os.getenv("GOOGLE_API_MAX_CONNECTIONS", "20"))
+GOOGLE_API_MAX_RETRIES = int(os.getenv("GOOGLE_API_MAX_RETRIES", "2"))
+GOOGLE_API_RETRY_BACKOFF = float(os.getenv("GOOGLE_API_RETRY_BACKOFF", "0.2"))
+# Google API 結果キャッシュ（有効期間・件数）。SEARCH_CACHE_PATH を指定すると SQLite に永続化する
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(60 * 60 * 24)))
+PLACES_CACHE_TTL = float(os.getenv("PLACES_CACHE_TTL", str(60 * 60 * 24 * 7)))
+SEARCH_CACHE_MAXSIZE = int(os.getenv("SEARCH_CACHE_MAXSIZE", "2000"))
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH")
 
 # API 設定
 API_PREFIX = "/api"
-API_VERSION = "v1"
\ No newline at end of file
+API_VERSION = "v1"
+# 一覧APIの1ページあたりの件数（デフォルト・サーバー側の上限）
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+# エクスポートで1回のクエリで取得する件数
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+# 一括API（/bulk）で1リクエストに含められる操作数
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))
+
+# リマインダー設定
+# 生成関数（メール確認・締切など）1つあたりのタイムアウト秒数
+REMINDER_GENERATOR_TIMEOUT = float(os.getenv("REMINDER_GENERATOR_TIMEOUT", "3.0"))
+# リマインドの計算方法
+# "python": 選考状況・イベントを取得してアプリ側で判定（既定）
+# "sql": DB関数 get_user_reminders（docs/migrations/002）で1回で計算
+# "incremental": ユーザーごとの状態を保持し、書き込みの通知で差分だけ反映（app/services/reminder_state.py）
+# sql / incremental が失敗した場合は python にフォールバックする
+REMINDER_ENGINE = os.getenv("REMINDER_ENGINE", "python")
+# incremental で保持する状態の最大ユーザー数と、読み込み直すまでの秒数（通知の取りこぼし対策）
+REMINDER_STATE_MAXSIZE = int(os.getenv("REMINDER_STATE_MAXSIZE", "1000"))
+REMINDER_STATE_TTL = float(os.getenv("REMINDER_STATE_TTL", str(60 * 60)))
+
+# トレース設定
+# TRACING_ENABLED: DB呼び出しごとのトレースと Server-Timing ヘッダー（app/tracing.py）
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# この時間（ミリ秒）以上かかった DB 呼び出しを slow_query としてログに出す（0 で無効）
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+
+# 分析（/api/analytics）設定
+# "python": 必要な列・期間の行だけ取得してアプリ側で数える（既定）
+# "sql": DB関数 get_user_analytics（docs/migrations/004）で GROUP BY した件数だけ受け取る
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "python")
+# 集計結果のキャッシュの有効期間（秒）と最大ユーザー数
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "30"))
+ANALYTICS_CACHE_MAXSIZE = int(os.getenv("ANALYTICS_CACHE_MAXSIZE", "1000"))
+
+# 企業検索（/api/companies/search）設定
+# インデックスを DB から読み込み直す間隔（秒）。書き込み系APIからの変更はその場で反映する
+COMPANY_INDEX_TTL = float(os.getenv("COMPANY_INDEX_TTL", "600"))
+# 1回で返す件数（デフォルト・上限）
+COMPANY_SEARCH_DEFAULT_LIMIT = int(os.getenv("COMPANY_SEARCH_DEFAULT_LIMIT", "10"))
+COMPANY_SEARCH_MAX_LIMIT = int(os.getenv("COMPANY_SEARCH_MAX_LIMIT", "50"))
+
+# 参照データ（/api/reference）設定
+# 業界一覧を DB から読み込み直す間隔（秒）。読み込み中は古いスナップショットを返す
+REFERENCE_DATA_TTL = float(os.getenv("REFERENCE_DATA_TTL", "600"))
+# ブラウザがキャッシュをそのまま使ってよい秒数（Cache-Control の max-age。過ぎたら ETag で確かめる）
+REFERENCE_MAX_AGE = int(os.getenv("REFERENCE_MAX_AGE", "60"))
+
+# カレンダー（/api/calendar）設定
+# 日付の区切りに使うタイムゾーン（リクエストの tz で変えられる）
+CALENDAR_TIMEZONE = os.getenv("CALENDAR_TIMEZONE", "Asia/Tokyo")
+# (ユーザー, 月) ごとのキャッシュの有効期間（秒）と最大件数
+CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "300"))
+CALENDAR_CACHE_MAXSIZE = int(os.getenv("CALENDAR_CACHE_MAXSIZE", "5000"))
+# 複数日にまたがるイベントを日ごとに展開する最大日数
+CALENDAR_MAX_EVENT_DAYS = int(os.getenv("CALENDAR_MAX_EVENT_DAYS", "31"))
+# 前後の期間をまとめて返す数の上限（prefetch）
+CALENDAR_MAX_PREFETCH = int(os.getenv("CALENDAR_MAX_PREFETCH", "2"))
+
+# ICS フィード（/api/events/feed.ics）設定
+# カレンダーアプリに伝える再取得の間隔（分。REFRESH-INTERVAL / X-PUBLISHED-TTL）
+ICS_REFRESH_INTERVAL = int(os.getenv("ICS_REFRESH_INTERVAL", "60"))
+# 変更ログ（event_changes）を残す日数。これより古い同期トークン・updated_since は 410（全件を取り直す）
+ICS_CHANGE_RETENTION_DAYS = int(os.getenv("ICS_CHANGE_RETENTION_DAYS", "30"))
+# 直近この秒数の変更は、遅れてコミットされる変更を取りこぼさないよう次の同期でも返し直す
+ICS_SYNC_SETTLE_SECONDS = float(os.getenv("ICS_SYNC_SETTLE_SECONDS", "5"))
+
+# キャッシュ設定
+# CACHE_BACKEND: "memory"（プロセス内）または "redis"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL")
+# リマインドキャッシュの有効期間（秒）と最大ユーザー数
+REMINDER_CACHE_TTL = float(os.getenv("REMINDER_CACHE_TTL", "60"))
+REMINDER_CACHE_MAXSIZE = int(os.getenv("REMINDER_CACHE_MAXSIZE", "1000"))
+
+# メール・バッチ設定
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+MAIL_FROM = os.getenv("MAIL_FROM", "noreply@example.com")
+APP_URL = os.getenv("NEXT_PUBLIC_APP_URL", "http://localhost:3000")
+# バッチで一度に処理するユーザー数とメール送信の並列数
+REMINDER_BATCH_CHUNK_SIZE = int(os.getenv("REMINDER_BATCH_CHUNK_SIZE", "500"))
+MAIL_CONCURRENCY = int(os.getenv("MAIL_CONCURRENCY", "20"))
+# POST /api/reminders/batch（フロントエンドの /api/cron/reminders から呼ぶ）の Bearer トークン。未設定なら実行できない
+CRON_SECRET = os.getenv("CRON_SECRET")
@@ -1,16 +1,73 @@
 """
 Supabase（データベース）への接続設定とクライアント初期化
+
+async def のルートからイベントループを止めずにDBへアクセスできるよう、
+非同期クライアント（AsyncClient）をアプリ起動時に1つだけ作成して使い回す。
+内部のhttpxコネクションプールはリクエスト間で共有される。
 """
-from supabase import create_client, Client
-from .config import SUPABASE_URL, SUPABASE_KEY
+from typing import Optional
+from supabase import acreate_client, AsyncClient
+from postgrest.exceptions import APIError
+from .config import DATABASE_BACKEND, SUPABASE_URL, SUPABASE_KEY
+from .memory_db import create_memory_client
+from .metrics import instrument_client
+
+# PostgreSQL のエラーコード（事前の存在確認をせずに書き込み、制約違反で判定する）
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+# アプリ全体で共有する非同期クライアント（startupで初期化）
+supabase: Optional[AsyncClient] = None
+
 
 # Supabaseクライアントの初期化
-def get_supabase_client() -> Client:
+async def get_supabase_client() -> AsyncClient:
     # URLとキーがあるか確認
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("Supabaseの認証情報が設定されていません")
     # supabaseをアプリ全体で使えるように返す
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    return await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+async def init_database() -> Optional[AsyncClient]:
+    """
+    アプリ起動時に呼び出し、共有クライアントを作成する
+    認証情報がない場合は None のまま（DATABASE_BACKEND=memory ならインメモリDBを使う）
+    table() / rpc() の呼び出しはメトリクス用のラッパー経由で計測される（app/metrics.py）
+    """
+    global supabase
+    if supabase is None and DATABASE_BACKEND == "memory":
+        supabase = instrument_client(create_memory_client())
+        print("⚠️ DATABASE_BACKEND=memory: using the in-memory database (data is lost on restart)")
+    elif supabase is None and SUPABASE_URL and SUPABASE_KEY:
+        supabase = instrument_client(await get_supabase_client())
+    return supabase
+
+
+async def close_database() -> None:
+    """
+    アプリ終了時に呼び出し、コネクションプールを閉じる
+    """
+    global supabase
+    if supabase is not None:
+        # インメモリDBには閉じるコネクションがない
+        postgrest = getattr(supabase, "postgrest", None)
+        if postgrest is not None:
+            await postgrest.aclose()
+        supabase = None
+
+
+def get_db() -> Optional[AsyncClient]:
+    """
+    FastAPIの依存性注入用
+    使い方: db = Depends(get_db)
+    テストやベンチマークでは app.dependency_overrides[get_db] で差し替えられる
+    """
+    return supabase
+
 
-# Supabaseクライアントを取得
-supabase = get_supabase_client() if SUPABASE_URL and SUPABASE_KEY else None
+def is_db_error(e: Exception, code: str) -> bool:
+    """
+    PostgREST のエラーが指定した PostgreSQL エラーコードか判定する
+    """
+    return isinstance(e, APIError) and e.code == code
@@ -3,16 +3,30 @@ FastAPIアプリケーションのメインエントリーポイント
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from .database import init_database, close_database
+from .metrics import MetricsMiddleware, render_metrics
+from .tracing import TracingMiddleware
+from .services.cache import cache_stats
+from .services.google_api import init_http_client, close_http_client
+from .services.change_feed import start_realtime, stop_realtime, watched_tables
+from .config import DATABASE_BACKEND, TRACING_ENABLED
 
 # エンドポイントのインポート
 from .routers import reminders  # リマインダー機能
 from .routers import reflections  # 振り返りログ機能
+from .routers import export  # データエクスポート
+from .routers import analytics  # 分析・統計
+from .routers import company_search  # 企業検索
+from .routers import reference  # 参照データ（業界・企業カタログ）
+from .routers import calendar  # カレンダー（月・週）
+from .routers import event_feed  # イベントの ICS フィード
+from .routers import companies  # 企業管理
+from .routers import events  # イベント/カレンダー管理
+from .routers import tasks  # Todoリスト管理
+from .routers import es_entries  # ES管理
 # from .routers import (
 #     search, # 検索機能
-#     companies, # 企業管理
-#     events, # イベント/カレンダー管理
-#     tasks, # Todoリスト管理
-#     es_entries # ES管理
 # )
 # # すべてのAPIが /api プレフィックスを持つように設定
 # from .config import API_PREFIX
@@ -33,6 +47,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# DB呼び出しのトレース（Server-Timing ヘッダー）。TRACING_ENABLED=true のときだけ
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# ルートごとのレイテンシ・DB往復回数などのメトリクス（GET /metrics）
+app.add_middleware(MetricsMiddleware)
+
 # Health check
 @app.get("/")
 def read_root():
@@ -41,19 +62,45 @@ def read_root():
         "version": "1.0.0"
     }
 
+# キャッシュのヒット/ミス数
+@app.get("/cache/stats")
+def read_cache_stats():
+    return cache_stats()
+
+# Prometheus のスクレイプ用
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_event():
-    from .database import supabase
+    # Google API 用の共有HTTPクライアント
+    await init_http_client()
     try:
+        supabase = await init_database()
         if supabase:
             # Simple check
-            response = supabase.table("users").select("*", count="exact").limit(1).execute()
+            response = await supabase.table("users").select("*", count="exact").limit(1).execute()
             print("✅ Supabase Client connection successful")
+            # インメモリDBは Realtime がないので、ルーターからの通知だけで差分更新する
+            if DATABASE_BACKEND != "memory":
+                # 企業検索・カレンダー・リマインドのキャッシュ用（フロントエンドからの直接の書き込みもここで届く）
+                try:
+                    await start_realtime(supabase)
+                    print(f"✅ Subscribed to changes via Realtime: {', '.join(watched_tables())}")
+                except Exception as e:
+                    print(f"⚠️ Realtime subscription failed (caches are refreshed only when their TTL expires): {e}")
         else:
             print("⚠️ Supabase client not initialized (missing env vars?)")
     except Exception as e:
         print(f"❌ Supabase Client connection failed: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_client()
+    await stop_realtime()
+    await close_database()
+
 
 # APIエンドポイントをappに組み込む
 # たいが担当
@@ -61,16 +108,30 @@ async def startup_event():
 app.include_router(reminders.router)
 # 振り返りログ機能
 app.include_router(reflections.router)
+# データエクスポート
+app.include_router(export.router)
+# 分析・統計
+app.include_router(analytics.router)
+# 企業検索（企業管理の /api/companies/{company_id} より先に登録する）
+app.include_router(company_search.router)
+# 参照データ（業界・企業カタログ）
+app.include_router(reference.router)
+# カレンダー（月・週）
+app.include_router(calendar.router)
+# イベントの ICS フィード（イベント管理の /api/events/{event_id} より先に登録する）
+app.include_router(event_feed.router)
 
-# # はやと担当
-# # 企業管理、イベント/カレンダー、ES管理
-# app.include_router(companies.router)
-# app.include_router(events.router)
-# app.include_router(es_entries.router)
+# はやと担当
+# 企業管理、イベント/カレンダー、ES管理
+# フロントエンドは Supabase に直接書き込むが、一括API（/bulk）などはこちらを使う
+# （直接の書き込みは change_feed の Realtime でキャッシュに反映される）
+app.include_router(companies.router)
+app.include_router(events.router)
+app.include_router(es_entries.router)
 
-# # はると・はやと担当
-# # Todoリスト
-# app.include_router(tasks.router)
+# はると・はやと担当
+# Todoリスト
+app.include_router(tasks.router)
 
 # # 共通機能
 # app.include_router(search.router)
@@ -0,0 +1,499 @@
+"""
+インメモリのデータベース（Supabase クライアントの代替）
+
+PostgRESTクエリビルダーのうちアプリが使う部分だけを模倣し、
+1回の execute() ごとに指定したレイテンシを発生させる。
+DATABASE_BACKEND=memory でアプリのDBとして使える（認証情報・ネットワーク不要。
+MEMORY_DB_SEED に JSON ファイルを指定すると初期データとして読み込む）ほか、
+ベンチマークや scripts/check_reminder_parity.py でも使う。
+blocking=True にすると旧来の同期クライアントと同じく
+time.sleep でイベントループを止める（select・書き込み・rpc のすべて）。
+
+埋め込み（"*, companies!inner(*, events!inner(*))" のような select）と
+"companies.events.type" のような埋め込み先へのフィルタにも対応する。
+or_("a.gt.1,and(a.eq.1,id.gt.x)") 形式の条件と複数列の order（NULL の位置を含む）も扱う。
+insert では一部の外部キー・ユニーク制約を確認し、違反すると実DBと同じコードの APIError を投げる。
+rpc() は FUNCTIONS に登録したDB関数だけを模倣する。
+書き込み後のトリガーは TRIGGERS に登録したものだけを模倣する（events / userevents の変更ログ）。
+select / insert / upsert / update / delete の count= を指定すると、limit をかける前の件数を
+レスポンスの count に入れる（planned / estimated も exact と同じ値）。
+eq フィルタは (テーブル, 列) ごとの dict インデックスで引くので、
+実DBでインデックスが効いている状態に近いコストになる。
+"""
+import asyncio
+import fnmatch
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from .config import MEMORY_DB_LATENCY, MEMORY_DB_SEED
+
+# (親テーブル, 埋め込み名): (親の列, 子テーブル, 子の列, 多対一か)
+RELATIONSHIPS = {
+    ("usercompanyselections", "companies"): ("company_id", "companies", "id", True),
+    ("events", "companies"): ("company_id", "companies", "id", True),
+    ("tasks", "companies"): ("company_id", "companies", "id", True),
+    ("es_entries", "companies"): ("company_id", "companies", "id", True),
+    ("reflections", "events"): ("event_id", "events", "id", True),
+    ("companies", "events"): ("id", "events", "company_id", False),
+    ("companies", "usercompanyselections"): ("id", "usercompanyselections", "company_id", False),
+    ("events", "userevents"): ("id", "userevents", "event_id", False),
+    ("events", "reflections"): ("id", "reflections", "event_id", False),
+}
+
+# insert 時に確認する制約（docs/schema.sql のうちアプリが制約違反に頼っているもの）
+FOREIGN_KEYS = {
+    ("reflections", "event_id"): "events",
+}
+UNIQUE_COLUMNS = {
+    "reflections": ["event_id"],
+    "notifications": ["idempotency_key"],
+}
+# insert 時に値がなければ入れる列（docs/schema.sql の DEFAULT。None は CURRENT_TIMESTAMP）
+COLUMN_DEFAULTS = {
+    "users": {"created_at": None},
+    "usercompanyselections": {"created_at": None},
+    "reflections": {"created_at": None},
+    "es_entries": {"created_at": None},
+    "notifications": {"is_read": False, "created_at": None},
+    "tasks": {"is_completed": False, "created_at": None, "updated_at": None},
+}
+
+
+def _toggle_task_completion(client: "MemoryClient", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = [
+        row for row in client.lookup("tasks", "id", params["p_task_id"])
+        if str(row.get("user_id")) == str(params["p_user_id"])
+    ]
+    for row in rows:
+        row["is_completed"] = not row.get("is_completed")
+    return [dict(row) for row in rows]
+
+
+# rpc() で呼べるDB関数
+FUNCTIONS = {
+    "toggle_task_completion": _toggle_task_completion,
+}
+
+
+def _record_event_change(client: "MemoryClient", table: str, op: str, rows: List[Dict[str, Any]]) -> None:
+    """
+    docs/migrations/005_event_changes.sql の record_event_change()（参加登録の付け替えは扱わない）
+    """
+    changes = client.tables.setdefault("event_changes", [])
+    seq = max((change["seq"] for change in changes), default=0)
+    now = datetime.now(timezone.utc).isoformat()
+    for row in rows:
+        if table == "userevents":
+            pairs = [(row.get("user_id"), row.get("event_id"))]
+        else:
+            pairs = [(link.get("user_id"), row.get("id")) for link in client.lookup("userevents", "event_id", row.get("id"))]
+        for user_id, event_id in pairs:
+            seq += 1
+            changes.append({
+                "seq": seq, "user_id": user_id, "event_id": event_id,
+                "deleted": op == "delete", "changed_at": now,
+            })
+
+
+# 書き込み後に呼ぶトリガー（テーブル -> 関数(client, テーブル, "insert" / "update" / "delete", 対象の行)）
+TRIGGERS = {
+    "events": _record_event_change,
+    "userevents": _record_event_change,
+}
+
+
+def split_top_level(text: str) -> List[str]:
+    """
+    括弧とダブルクォートの外にあるカンマで分割する
+    """
+    depth, token, quoted = 0, "", False
+    tokens = []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            tokens.append(token.strip())
+            token = ""
+        else:
+            token += ch
+    if token.strip():
+        tokens.append(token.strip())
+    return tokens
+
+
+def parse_or(text: str) -> Tuple[str, List[Any]]:
+    """
+    PostgREST の or / and 条件を ("or" | "and", [条件...]) の木に分解する
+    葉は (列, 演算子, 値)
+    """
+    conditions = []
+    for token in split_top_level(text):
+        if token.startswith(("and(", "or(")):
+            kind, body = token.split("(", 1)
+            conditions.append((kind, parse_or(body[:-1])[1]))
+        else:
+            column, op, value = token.split(".", 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+            conditions.append((column, op, value))
+    return "or", conditions
+
+
+def parse_select(columns: str) -> Dict[str, Any]:
+    """
+    select文字列を {"columns": [...], "embeds": [(名前, inner, 子spec), ...]} に分解する
+    """
+    spec = {"columns": [], "embeds": []}
+    for token in split_top_level(columns):
+        if "(" in token:
+            head, body = token.split("(", 1)
+            name, _, hint = head.partition("!")
+            spec["embeds"].append((name.strip(), hint == "inner", parse_select(body[:-1])))
+        else:
+            spec["columns"].append(token)
+    return spec
+
+
+class MemoryResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class MemoryQuery:
+    def __init__(self, client: "MemoryClient", table: str):
+        self.client = client
+        self.table = table
+        self.spec = parse_select("*")
+        self.filters: List[Tuple[Tuple[str, ...], str, Any]] = []
+        self.order_by: List[Tuple[str, bool, Optional[bool]]] = []
+        self.or_filters: List[Tuple[str, List[Any]]] = []
+        self.limit_count = None
+        self.mutation = None
+        self.count_method: Optional[str] = None
+        self.head = False
+
+    # --- クエリビルダー ---
+    def select(self, *columns, count=None, head=None):
+        self.spec = parse_select(",".join(columns) or "*")
+        self.count_method = count
+        self.head = bool(head)
+        return self
+
+    def insert(self, rows, count=None, **kwargs):
+        self.mutation = ("insert", rows if isinstance(rows, list) else [rows], "", False)
+        self.count_method = count
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False, count=None, **kwargs):
+        self.mutation = ("insert", rows if isinstance(rows, list) else [rows], on_conflict, ignore_duplicates)
+        self.count_method = count
+        return self
+
+    def update(self, values, count=None, **kwargs):
+        self.mutation = ("update", values)
+        self.count_method = count
+        return self
+
+    def delete(self, count=None, **kwargs):
+        self.mutation = ("delete",)
+        self.count_method = count
+        return self
+
+    def _add(self, column: str, op: str, value: Any):
+        self.filters.append((tuple(column.split(".")), op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", str(value))
+
+    def in_(self, column, values):
+        return self._add(column, "in", {str(v) for v in values})
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def like(self, column, pattern):
+        return self._add(column, "like", pattern.replace("%", "*"))
+
+    def is_(self, column, value):
+        return self._add(column, "is", value)
+
+    def or_(self, filters: str):
+        self.or_filters.append(parse_or(filters))
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None):
+        self.order_by.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    # --- 評価 ---
+    @staticmethod
+    def _match(actual: Any, op: str, value: Any) -> bool:
+        if op == "eq":
+            return str(actual) == value
+        if op == "in":
+            return str(actual) in value
+        if op == "is":
+            return actual is None if value == "null" else actual == value
+        if actual is None:
+            return False
+        if op == "like":
+            return fnmatch.fnmatchcase(str(actual), value)
+        if op == "gt":
+            return actual > value
+        if op == "gte":
+            return actual >= value
+        if op == "lt":
+            return actual < value
+        if op == "lte":
+            return actual <= value
+        raise ValueError(op)
+
+    def _match_tree(self, row: Dict[str, Any], tree) -> bool:
+        kind, conditions = tree
+        results = (
+            self._match_tree(row, c) if len(c) == 2
+            else self._match(row.get(c[0]), c[1], c[2])
+            for c in conditions
+        )
+        return all(results) if kind == "and" else any(results)
+
+    def _filters_at(self, path: Tuple[str, ...]):
+        return [(f[0][-1], f[1], f[2]) for f in self.filters if f[0][:-1] == path]
+
+    def _project(self, table: str, row: Dict[str, Any], spec, path: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        1行を select の形に整形する。inner 埋め込みが空なら None を返す
+        """
+        if "*" in spec["columns"]:
+            out = dict(row)
+        else:
+            out = {c: row.get(c) for c in spec["columns"]}
+
+        for name, inner, child_spec in spec["embeds"]:
+            parent_col, child_table, child_col, to_one = RELATIONSHIPS[(table, name)]
+            child_path = path + (name,)
+            child_filters = self._filters_at(child_path)
+            children = []
+            for child in self.client.lookup(child_table, child_col, row.get(parent_col)):
+                if not all(self._match(child.get(c), op, v) for c, op, v in child_filters):
+                    continue
+                projected = self._project(child_table, child, child_spec, child_path)
+                if projected is not None:
+                    children.append(projected)
+            if inner and not children:
+                return None
+            out[name] = (children[0] if children else None) if to_one else children
+        return out
+
+    def _check_constraints(self, row: Dict[str, Any], unique: Dict[str, set]) -> None:
+        for (table, column), ref_table in FOREIGN_KEYS.items():
+            value = row.get(column)
+            if table == self.table and value is not None and not self.client.lookup(ref_table, "id", value):
+                raise APIError({"code": "23503", "message": f"insert or update on table \"{table}\" violates foreign key constraint"})
+        for column, values in unique.items():
+            value = row.get(column)
+            if value is not None and str(value) in values:
+                raise APIError({"code": "23505", "message": f"duplicate key value violates unique constraint on {column}"})
+
+    def _defaults(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            column: now if value is None else value
+            for column, value in COLUMN_DEFAULTS.get(self.table, {}).items()
+        }
+
+    def _insert(self, rows, on_conflict: str, ignore_duplicates: bool) -> List[Dict[str, Any]]:
+        """
+        insert / upsert。on_conflict の列が一致する行があれば、
+        ignore_duplicates なら無視し、そうでなければ渡された列だけ更新する
+        """
+        table = self.client.tables.setdefault(self.table, [])
+        by_conflict = {str(r.get(on_conflict)): r for r in table} if on_conflict else {}
+        unique = {
+            column: {str(r.get(column)) for r in table if r.get(column) is not None}
+            for column in UNIQUE_COLUMNS.get(self.table, []) if column != on_conflict
+        }
+        inserted = []
+        for row in rows:
+            current = by_conflict.get(str(row.get(on_conflict))) if on_conflict else None
+            if current is not None:
+                if not ignore_duplicates:
+                    current.update(row)
+                    inserted.append(dict(current))
+                continue
+            self._check_constraints(row, unique)
+            row = {"id": str(uuid.uuid4()), **self._defaults(), **row}
+            table.append(row)
+            if on_conflict:
+                by_conflict[str(row.get(on_conflict))] = row
+            for column, values in unique.items():
+                if row.get(column) is not None:
+                    values.add(str(row[column]))
+            inserted.append(dict(row))
+        self.client._indexes.clear()
+        self._fire_trigger("insert", inserted)
+        return inserted
+
+    def _fire_trigger(self, op: str, rows: List[Dict[str, Any]]) -> None:
+        trigger = TRIGGERS.get(self.table)
+        if trigger and rows:
+            trigger(self.client, self.table, op, rows)
+            self.client._indexes.clear()
+
+    async def execute(self) -> MemoryResponse:
+        self.client.round_trips += 1
+        if self.mutation and self.mutation[0] == "insert":
+            rows = self._insert(*self.mutation[1:])
+            await self.client.wait(self.client.latency)
+            return MemoryResponse(rows, len(rows) if self.count_method else None)
+        root_filters = self._filters_at(())
+
+        # eq / in フィルタがあればインデックスで候補を絞る
+        candidates = None
+        for column, op, value in root_filters:
+            if op == "eq":
+                candidates = self.client.lookup(self.table, column, value)
+                break
+            if op == "in":
+                candidates = [row for v in value for row in self.client.lookup(self.table, column, v)]
+                break
+        if candidates is None:
+            candidates = self.client.tables.get(self.table, [])
+
+        matched = [
+            row for row in candidates
+            if all(self._match(row.get(c), op, v) for c, op, v in root_filters)
+            and all(self._match_tree(row, tree) for tree in self.or_filters)
+        ]
+
+        # 後ろの列から安定ソートする（NULL は Postgres と同じく昇順なら末尾、降順なら先頭がデフォルト）
+        for column, desc, nullsfirst in reversed(self.order_by):
+            values = [row for row in matched if row.get(column) is not None]
+            nulls = [row for row in matched if row.get(column) is None]
+            values.sort(key=lambda row: row[column], reverse=desc)
+            matched = nulls + values if (desc if nullsfirst is None else nullsfirst) else values + nulls
+
+        rows = []
+        changed = []
+        for row in matched:
+            if self.mutation:
+                changed.append(row)
+            if self.mutation and self.mutation[0] == "update":
+                row.update(self.mutation[1])
+            # 埋め込みの整形は limit に達するまでの行だけ行う（件数が要るときは inner 埋め込みの判定のため全行）
+            projected = self._project(self.table, row, self.spec, ())
+            if projected is not None:
+                rows.append(projected)
+                if (not self.mutation and not self.count_method
+                        and self.limit_count is not None and len(rows) >= self.limit_count):
+                    break
+
+        if self.mutation and self.mutation[0] == "delete" and changed:
+            # 1行ずつ list.remove すると行数×テーブルの大きさになるので、まとめて1回で作り直す
+            # （id 列のない表もあるので行オブジェクトの id() で判定する。リスト自体は差し替えない）
+            deleted = {id(row) for row in changed}
+            table = self.client.tables[self.table]
+            table[:] = [row for row in table if id(row) not in deleted]
+        if self.mutation:
+            self.client._indexes.clear()
+            self._fire_trigger(self.mutation[0], changed)
+
+        count = len(rows) if self.count_method else None
+        if not self.mutation and self.limit_count is not None:
+            rows = rows[:self.limit_count]
+        if self.head:
+            rows = []
+
+        # 往復1回分のレイテンシ + 返却行数に比例する転送コスト
+        await self.client.wait(self.client.latency + self.client.row_latency * len(rows))
+        self.client.rows_returned += len(rows)
+        return MemoryResponse(rows, count)
+
+
+class MemoryClient:
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 latency: float = 0.01, row_latency: float = 0.0, blocking: bool = False):
+        self.tables = tables or {}
+        self.latency = latency
+        self.row_latency = row_latency
+        self.blocking = blocking
+        self.round_trips = 0
+        self.rows_returned = 0
+        self._indexes: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]] = {}
+
+    def lookup(self, table: str, column: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        (テーブル, 列) の dict インデックスから一致する行を返す（初回に構築）
+        """
+        key = (table, column)
+        if key not in self._indexes:
+            index: Dict[str, List[Dict[str, Any]]] = {}
+            for row in self.tables.get(table, []):
+                index.setdefault(str(row.get(column)), []).append(row)
+            self._indexes[key] = index
+        return self._indexes[key].get(str(value), [])
+
+    async def wait(self, delay: float) -> None:
+        """
+        往復1回分待つ（blocking なら time.sleep でイベントループごと止める）
+        """
+        if self.blocking:
+            time.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> "MemoryRPC":
+        return MemoryRPC(self, name, params or {})
+
+
+class MemoryRPC:
+    def __init__(self, client: MemoryClient, name: str, params: Dict[str, Any]):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    async def execute(self) -> MemoryResponse:
+        self.client.round_trips += 1
+        rows = FUNCTIONS[self.name](self.client, self.params)
+        self.client._indexes.clear()
+        await self.client.wait(self.client.latency)
+        return MemoryResponse(rows)
+
+
+def create_memory_client(seed_path: Optional[str] = MEMORY_DB_SEED, latency: float = MEMORY_DB_LATENCY) -> MemoryClient:
+    """
+    DATABASE_BACKEND=memory のときのクライアントを作る
+    seed_path の JSON（{"テーブル名": [行, ...]}）があれば初期データとして読み込む
+    """
+    tables: Dict[str, List[Dict[str, Any]]] = {}
+    if seed_path:
+        with open(seed_path, encoding="utf-8") as f:
+            tables = json.load(f)
+    return MemoryClient(tables, latency=latency)
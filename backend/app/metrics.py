@@ -0,0 +1,350 @@
+"""
+Prometheus 形式のメトリクス
+
+- HTTP: ルート（パスのテンプレート）ごとのリクエスト数・レイテンシのヒストグラム・処理中の数
+- DB: テーブル・操作ごとの PostgREST 呼び出し回数と時間、1リクエストあたりの往復回数
+  （往復回数のヒストグラムで N+1 の回帰が見える）
+- 外部API: Google API のホスト・ステータスごとの呼び出し回数とレイテンシ
+- キャッシュ: /cache/stats と同じ値
+
+GET /metrics でテキスト形式（text/plain; version=0.0.4）を返す。
+値はプロセス内で集計するので、複数ワーカーで動かす場合はワーカーごとにスクレイプする。
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .services.cache import cache_stats
+from .tracing import record_query
+
+# レイテンシ用のバケット（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 1リクエストあたりのDB往復回数のバケット
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+_metrics: List["Metric"] = []
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """
+    ラベルの値の組ごとに値を持つメトリクスの共通部分
+    """
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        _metrics.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            # [バケットごとの件数, 合計, 件数]
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# --- HTTP ---
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed", ["method"]
+)
+HTTP_DB_ROUND_TRIPS = Histogram(
+    "http_request_db_round_trips", "Database round trips per HTTP request", ["method", "route"],
+    buckets=ROUND_TRIP_BUCKETS
+)
+HTTP_DB_DURATION = Histogram(
+    "http_request_db_seconds", "Total time spent in database calls per HTTP request", ["method", "route"]
+)
+
+# --- DB ---
+DB_REQUESTS = Counter(
+    "db_requests_total", "PostgREST calls by table and operation", ["table", "operation", "outcome"]
+)
+DB_DURATION = Histogram(
+    "db_request_duration_seconds", "PostgREST call latency by table and operation", ["table", "operation"]
+)
+
+# --- 外部API ---
+EXTERNAL_REQUESTS = Counter(
+    "external_api_requests_total", "External API attempts by host and status", ["service", "status"]
+)
+EXTERNAL_DURATION = Histogram(
+    "external_api_request_duration_seconds", "External API attempt latency by host", ["service"]
+)
+
+# --- リマインド ---
+REMINDER_GENERATOR_TIMEOUTS = Counter(
+    "reminder_generator_timeouts_total", "Reminder generators that hit REMINDER_GENERATOR_TIMEOUT", ["generator"]
+)
+REMINDER_ENGINE_FALLBACKS = Counter(
+    "reminder_engine_fallbacks_total", "Reminder reads that fell back to the python engine", ["engine"]
+)
+
+# --- 分析 ---
+ANALYTICS_ENGINE_FALLBACKS = Counter(
+    "analytics_engine_fallbacks_total", "Analytics reads that fell back to the python engine", ["engine"]
+)
+
+
+# --- リクエスト単位のDB集計 ---
+class RequestStats:
+    """
+    1リクエスト内のDB呼び出しの集計（ContextVar 経由で DB のラッパーから加算する）
+    """
+
+    def __init__(self):
+        self.db_round_trips = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_db_call(table: str, operation: str, seconds: float, error: bool = False) -> None:
+    DB_REQUESTS.inc(table=table, operation=operation, outcome="error" if error else "ok")
+    DB_DURATION.observe(seconds, table=table, operation=operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_round_trips += 1
+        stats.db_seconds += seconds
+
+
+# --- DB クライアントのラッパー ---
+# 返ってきた builder の種類を決めるメソッド（それ以外のメソッドは直前の操作を引き継ぐ）
+_OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+
+
+class InstrumentedQuery:
+    """
+    PostgREST の builder を包み、execute() の回数と時間を記録する（トレース・遅いクエリのログにも渡す）
+    フィルタなどのメソッドは元の builder に委譲し、返ってきた builder も包み直す
+    """
+
+    def __init__(self, query, table: str, operation: str):
+        self._query = query
+        self._table = table
+        self._operation = operation
+
+    def _wrap(self, result, operation: str):
+        if hasattr(result, "execute"):
+            return InstrumentedQuery(result, self._table, operation)
+        return result
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._query, name)
+        operation = name if name in _OPERATIONS else self._operation
+        if not callable(attr):
+            # not_ のようなプロパティも builder を返す
+            return self._wrap(attr, operation)
+
+        def call(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs), operation)
+        return call
+
+    async def execute(self):
+        started = time.perf_counter()
+        error = False
+        response = None
+        try:
+            response = await self._query.execute()
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            record_db_call(self._table, self._operation, elapsed, error)
+            record_query(self._table, self._operation, self._query, response, elapsed, error)
+
+
+class InstrumentedClient:
+    """
+    Supabase クライアントを包み、table() / rpc() の呼び出しを計測する
+    それ以外（postgrest.aclose() や channel() など）はそのまま委譲する
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(name), name, "select")
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(name, params or {}, **kwargs), f"rpc:{name}", "rpc")
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def instrument_client(client):
+    """
+    DB クライアントを計測用のラッパーで包む（None ならそのまま）
+    """
+    if client is None or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
+
+
+# --- 外部API ---
+def record_external_call(service: str, status: str, seconds: float) -> None:
+    EXTERNAL_REQUESTS.inc(service=service, status=status)
+    EXTERNAL_DURATION.observe(seconds, service=service)
+
+
+# --- ミドルウェア ---
+class MetricsMiddleware:
+    """
+    リクエストごとのレイテンシ・ステータス・DB往復回数を記録する ASGI ミドルウェア
+
+    ラベルの route は一致したルートのパスのテンプレート（/api/events/{event_id} など）。
+    どのルートにも一致しないリクエストは "unmatched" にまとめる（ラベルの種類が増えすぎないように）
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        HTTP_IN_FLIGHT.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(method=method)
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_DB_ROUND_TRIPS.observe(stats.db_round_trips, method=method, route=route)
+            HTTP_DB_DURATION.observe(stats.db_seconds, method=method, route=route)
+
+
+# --- 出力 ---
+_CACHE_FIELDS = [
+    ("hits", "counter", "Cache hits"),
+    ("misses", "counter", "Cache misses"),
+    ("invalidations", "counter", "Cache entries invalidated"),
+    ("evictions", "counter", "Cache entries evicted"),
+    ("size", "gauge", "Current number of cache entries"),
+]
+
+
+def _render_cache_stats() -> List[str]:
+    stats = cache_stats()
+    lines = []
+    for field, kind, help in _CACHE_FIELDS:
+        suffix = "_total" if kind == "counter" else ""
+        name = f"cache_{field}{suffix}"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for cache_name, values in sorted(stats.items()):
+            lines.append(f'{name}{{cache="{_escape(cache_name)}"}} {_format_value(values.get(field, 0))}')
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    全メトリクスを Prometheus のテキスト形式で返す
+    """
+    lines: List[str] = []
+    for metric in _metrics:
+        lines += metric.render()
+    lines += _render_cache_stats()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+import enum
+
+class BulkOperation(str, enum.Enum):
+    create = 'create'
+    update = 'update'
+    delete = 'delete'
+
+# 一括APIの1件分の操作
+# create: data に作成する内容 / update: id と変更する列だけの data / delete: id のみ
+# 選考状況の一括API（/api/companies/selections/bulk）では id に企業IDを指定する
+class BulkItem(BaseModel):
+    op: BulkOperation
+    id: Optional[UUID] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+class BulkRequest(BaseModel):
+    items: List[BulkItem]
+
+# 1件ごとの結果（index はリクエストの items の位置。data は作成・更新後または削除した行）
+class BulkItemResult(BaseModel):
+    index: int
+    op: BulkOperation
+    id: Optional[UUID] = None
+    status: int
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    results: List[BulkItemResult]
+    succeeded: int
+    failed: int
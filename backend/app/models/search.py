@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# Google Custom Search の検索結果
+class SearchResult(BaseModel):
+    title: str
+    link: str
+    snippet: str
+
+# Google Places の周辺施設
+class Place(BaseModel):
+    name: str
+    address: str
+    rating: Optional[float] = None
+    user_ratings_total: Optional[int] = None
+    place_id: str
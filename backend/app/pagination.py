@@ -0,0 +1,142 @@
+"""
+一覧APIのキーセット（カーソル）ページネーション
+
+並び順の列 + id の組で「前のページの最後の行より後ろ」を条件にして取得する。
+OFFSET と違いページが深くなっても読み飛ばす行が増えない。
+カーソルは最後の行の並び順の値を base64 にした不透明な文字列で、
+クライアントはレスポンスの next_cursor をそのまま次のリクエストに渡す。
+
+NULL を含む列（tasks.due_date など）は NULL を常に末尾に並べる。
+"""
+import base64
+import json
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from .config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class Keyset:
+    """
+    並び順の定義
+
+    Args:
+        column: 主の並び順の列（例: "start_time"）
+        desc: 降順にするか
+        nullable: column が NULL を取りうるか
+    """
+
+    def __init__(self, column: str, desc: bool = False, nullable: bool = False):
+        self.column = column
+        self.desc = desc
+        self.nullable = nullable
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    if not isinstance(values, list) or len(values) != 2:
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    return values
+
+
+def page_size(limit: Optional[int]) -> int:
+    """
+    クライアント指定の件数をサーバー側の上限に収める
+    """
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _quote(value: Any) -> str:
+    # 日時の ":" や "+" を含む値は PostgREST の or 条件内でダブルクォートが必要
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _after_filter(keyset: Keyset, value: Any, last_id: Any) -> str:
+    """
+    (column, id) が前ページ最後の (value, last_id) より後ろになる PostgREST の or 条件
+    """
+    op = "lt" if keyset.desc else "gt"
+    column = keyset.column
+    if value is None:
+        # NULL は末尾に並ぶので、NULL の中で id が後ろのものだけ
+        return f"and({column}.is.null,id.{op}.{_quote(last_id)})"
+    conditions = [
+        f"{column}.{op}.{_quote(value)}",
+        f"and({column}.eq.{_quote(value)},id.{op}.{_quote(last_id)})",
+    ]
+    if keyset.nullable:
+        conditions.append(f"{column}.is.null")
+    return ",".join(conditions)
+
+
+def apply_keyset(query, keyset: Keyset, cursor: Optional[str], limit: int):
+    """
+    クエリにカーソル条件・並び順・件数（次ページ有無の判定用に +1）を付ける
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = query.or_(_after_filter(keyset, value, last_id))
+    return query.order(
+        keyset.column, desc=keyset.desc, nullsfirst=False
+    ).order(
+        "id", desc=keyset.desc
+    ).limit(limit + 1)
+
+
+def split_page(rows: List[Dict[str, Any]], keyset: Keyset, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    limit + 1 件取得した結果をページ本体と next_cursor に分ける
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last.get(keyset.column), last["id"]])
+
+
+async def fetch_page(query, keyset: Keyset, cursor: Optional[str], limit: Optional[int]) -> Dict[str, Any]:
+    """
+    キーセットで1ページ取得して {"items": [...], "next_cursor": ...} を返す
+    """
+    limit = page_size(limit)
+    response = await apply_keyset(query, keyset, cursor, limit).execute()
+    items, next_cursor = split_page(response.data or [], keyset, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def fetch_all(build_query: Callable[[], Any], keyset: Keyset, chunk_size: int) -> List[Dict[str, Any]]:
+    """
+    条件に一致する行をキーセットで chunk_size 件ずつ、短いページが返るまで取得する
+    （PostgREST の max_rows で結果が黙って切り詰められないよう、chunk_size は max_rows 未満にする）
+
+    Args:
+        build_query: フィルタまで付けたクエリを毎回新しく作る関数（クエリビルダーは使い回せない）
+    """
+    rows: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        response = await apply_keyset(build_query(), keyset, cursor, chunk_size).execute()
+        page, cursor = split_page(response.data or [], keyset, chunk_size)
+        rows.extend(page)
+        if not cursor:
+            return rows
@@ -0,0 +1,35 @@
+"""
+分析（集計）API ルート
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, Any
+from uuid import UUID
+from ..services.analytics import AnalyticsService
+from ..database import get_db
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+@router.get("")
+async def get_analytics(
+    user_id: UUID = Query(..., description="ユーザーID"),
+    db=Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    分析ページ用の集計を取得（日付は UTC）
+
+    Returns:
+        {
+            "today": "2025-05-01",
+            "total_companies": 12,
+            "status_counts": {"Interested": 3, "Entry": 2, "ES_Submit": 4, "Interview": 2, "Offer": 1, "Rejected": 0},
+            "activity": [{"date": "2025-04-25", "events": 1, "es": 0}, ...],  // 直近7日
+            "progress": [{"date": "2025-04-02", "count": 0}, ...]             // 直近30日の企業追加数
+        }
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="データベースに接続されていません")
+
+    try:
+        return await AnalyticsService(db).get_summary(user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"分析データの取得に失敗しました: {str(e)}")
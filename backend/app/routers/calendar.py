@@ -0,0 +1,67 @@
+"""
+カレンダー（月・週）API ルート
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, Any
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ..config import CALENDAR_MAX_PREFETCH, CALENDAR_TIMEZONE
+from ..services.calendar import CalendarService, PERIODS
+from ..database import get_db
+
+router = APIRouter(prefix="/api/calendar", tags=["calendar"])
+
+
+async def _get_view(view: str, key: str, user_id: UUID, prefetch: int, tz: str, db) -> Dict[str, Any]:
+    if not db:
+        raise HTTPException(status_code=503, detail="データベースに接続されていません")
+
+    parse, _ = PERIODS[view]
+    try:
+        parse(key)
+        zone = ZoneInfo(tz)
+    except (ValueError, ZoneInfoNotFoundError):
+        raise HTTPException(status_code=400, detail=f"期間またはタイムゾーンが不正です: {key}, {tz}")
+
+    try:
+        return await CalendarService(db, zone).get_view(user_id, view, key, prefetch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"カレンダーの取得に失敗しました: {str(e)}")
+
+
+@router.get("/month/{month}")
+async def get_month(
+    month: str,
+    user_id: UUID = Query(..., description="ユーザーID"),
+    prefetch: int = Query(1, ge=0, le=CALENDAR_MAX_PREFETCH, description="前後何か月分を adjacent に含めるか"),
+    tz: str = Query(CALENDAR_TIMEZONE, description="日付の区切りに使うタイムゾーン"),
+    db=Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    月（YYYY-MM）のイベントを日ごとにまとめて取得
+
+    Returns:
+        {
+            "view": "month", "key": "2025-05", "start": "2025-05-01", "end": "2025-05-31",
+            "timezone": "Asia/Tokyo",
+            "events": [{"id": "...", "title": "一次面接", "type": "Interview",
+                        "start_time": "...", "end_time": "...", "company": "株式会社〇〇"}, ...],
+            "days": {"2025-05-08": [0], "2025-05-20": [1, 2], ...},  // 日付 -> events の添字
+            "adjacent": {"2025-04": {...}, "2025-06": {...}}          // prefetch 分（同じ形、timezone・adjacent なし）
+        }
+    """
+    return await _get_view("month", month, user_id, prefetch, tz, db)
+
+
+@router.get("/week/{week}")
+async def get_week(
+    week: str,
+    user_id: UUID = Query(..., description="ユーザーID"),
+    prefetch: int = Query(1, ge=0, le=CALENDAR_MAX_PREFETCH, description="前後何週分を adjacent に含めるか"),
+    tz: str = Query(CALENDAR_TIMEZONE, description="日付の区切りに使うタイムゾーン"),
+    db=Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    ISO週（YYYY-Www。月曜始まり）のイベントを日ごとにまとめて取得（形は月と同じ）
+    """
+    return await _get_view("week", week, user_id, prefetch, tz, db)
@@ -5,51 +5,120 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from uuid import UUID
-from ..models.models import Company, CompanyCreate
-from ..database import supabase
+from ..models.models import Company, CompanyCreate, UserCompanySelectionCreate
+from ..database import get_db
+from ..models.bulk import BulkRequest, BulkResponse
+from ..services.bulk import run_bulk, check_bulk_size
+from ..pagination import Page, Keyset, fetch_page
+from ..services.reminder_cache import invalidate_user
+from ..services.change_feed import notify_change, notify_bulk
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
-@router.get("/", response_model=List[Company])
-async def get_companies(user_id: str = "test-user"):
+# 選考状況の一括APIのレスポンスに含めない列
+SELECTION_SECRET_FIELDS = ("encrypted_password",)
+
+# 一覧は企業名順（companies には作成日時がないため）
+COMPANY_KEYSET = Keyset("name")
+
+@router.get("/", response_model=Page[Company])
+async def get_companies(
+    user_id: str = "test-user",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db=Depends(get_db)
+):
     """
-    ユーザーの全企業を取得
+    ユーザーの企業を企業名順に1ページ分取得
+    続きは next_cursor を cursor に指定して取得する
     """
-    if not supabase:
-        return []
+    if not db:
+        return {"items": [], "next_cursor": None}
 
     try:
-        response = supabase.table("companies").select("*").eq("user_id", user_id).execute()
-        return response.data
+        query = db.table("companies").select("*").eq("user_id", user_id)
+        return await fetch_page(query, COMPANY_KEYSET, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/", response_model=Company)
-async def create_company(company: CompanyCreate, user_id: str = "test-user"):
+async def create_company(company: CompanyCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     新しい企業を作成
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = company.dict()
         data["user_id"] = user_id
-        response = supabase.table("companies").insert(data).execute()
+        response = await db.table("companies").insert(data).execute()
+        for row in response.data or []:
+            await notify_change(db, "companies", "INSERT", row)
+        await invalidate_user(user_id)
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_companies(request: BulkRequest, user_id: str = "test-user", db=Depends(get_db)):
+    """
+    企業を一括で作成・更新・削除
+    操作の種類（と更新内容）ごとにまとめて実行し、1件ごとの結果を返す
+    """
+    if not db:
+        raise HTTPException(status_code=500, detail="Database not connected")
+
+    error = check_bulk_size(request.items)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        response = await run_bulk(db, "companies", CompanyCreate, user_id, request.items)
+        await notify_bulk(db, "companies", response)
+        await invalidate_user(user_id)
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/selections/bulk", response_model=BulkResponse)
+async def bulk_selections(request: BulkRequest, user_id: str = "test-user", db=Depends(get_db)):
+    """
+    選考状況（usercompanyselections）を一括で登録・更新・削除
+    id には企業IDを指定する（ステータス・志望度の変更は内容ごとに update ... in_("company_id", ids) 1回）
+    """
+    if not db:
+        raise HTTPException(status_code=500, detail="Database not connected")
+
+    error = check_bulk_size(request.items)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        response = await run_bulk(
+            db, "usercompanyselections", UserCompanySelectionCreate, user_id, request.items, key="company_id"
+        )
+        await notify_bulk(db, "usercompanyselections", response)
+        await invalidate_user(user_id)
+        for result in response["results"]:
+            for field in SELECTION_SECRET_FIELDS:
+                (result.data or {}).pop(field, None)
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{company_id}", response_model=Company)
-async def get_company(company_id: UUID, user_id: str = "test-user"):
+async def get_company(company_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     特定の企業を取得
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        response = supabase.table("companies").select("*").eq("id", company_id).eq("user_id", user_id).execute()
+        response = await db.table("companies").select("*").eq("id", company_id).eq("user_id", user_id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Company not found")
         return response.data[0]
@@ -57,16 +126,19 @@ async def get_company(company_id: UUID, user_id: str = "test-user"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{company_id}", response_model=Company)
-async def update_company(company_id: UUID, company: CompanyCreate, user_id: str = "test-user"):
+async def update_company(company_id: UUID, company: CompanyCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     企業情報を更新
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = company.dict(exclude_unset=True)
-        response = supabase.table("companies").update(data).eq("id", company_id).eq("user_id", user_id).execute()
+        response = await db.table("companies").update(data).eq("id", company_id).eq("user_id", user_id).execute()
+        for row in response.data or []:
+            await notify_change(db, "companies", "UPDATE", row)
+        await invalidate_user(user_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Company not found")
         return response.data[0]
@@ -74,15 +146,18 @@ async def update_company(company_id: UUID, company: CompanyCreate, user_id: str
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{company_id}")
-async def delete_company(company_id: UUID, user_id: str = "test-user"):
+async def delete_company(company_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     企業を削除
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        response = supabase.table("companies").delete().eq("id", company_id).eq("user_id", user_id).execute()
+        response = await db.table("companies").delete().eq("id", company_id).eq("user_id", user_id).execute()
+        for row in response.data or []:
+            await notify_change(db, "companies", "DELETE", old_record=row)
+        await invalidate_user(user_id)
         return {"message": "Company deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
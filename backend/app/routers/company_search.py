@@ -0,0 +1,41 @@
+"""
+企業検索 API ルート
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+from ..config import COMPANY_SEARCH_DEFAULT_LIMIT, COMPANY_SEARCH_MAX_LIMIT
+from ..services.company_index import company_index
+from ..database import get_db
+
+router = APIRouter(prefix="/api/companies", tags=["companies"])
+
+@router.get("/search")
+async def search_companies(
+    q: str = Query("", max_length=100, description="企業名・業界名（空なら企業名順）"),
+    industry: Optional[str] = Query(None, description="業界IDで絞り込み"),
+    exclude: List[UUID] = Query([], description="除外する企業ID（登録済みの企業など）"),
+    limit: int = Query(COMPANY_SEARCH_DEFAULT_LIMIT, ge=1, le=COMPANY_SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db=Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    企業カタログを検索し、順位の高い順に limit 件を返す
+    （完全一致 > 前方一致 > 部分一致 > 業界名に一致 > あいまい一致。かな・カナ、全角・半角は区別しない）
+
+    Returns:
+        {
+            "items": [{"id": "...", "name": "株式会社トヨタ", "url": null, "industry": 3, "match": "prefix", "score": 0.5}, ...],
+            "has_more": true
+        }
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="データベースに接続されていません")
+
+    try:
+        catalog = await company_index.get(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"企業の検索に失敗しました: {str(e)}")
+
+    items, has_more = catalog.search(q, limit, offset, industry, [str(company_id) for company_id in exclude])
+    return {"items": items, "has_more": has_more}
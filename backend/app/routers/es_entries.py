@@ -2,44 +2,56 @@
 ES（エントリーシート）管理 API ルート
 担当: はやと
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
 from uuid import UUID
 from ..models.models import ESEntry, ESEntryCreate
-from ..database import supabase
+from ..database import get_db
+from ..pagination import Page, Keyset, fetch_page
 
 router = APIRouter(prefix="/api/es-entries", tags=["es_entries"])
 
-@router.get("/company/{company_id}", response_model=List[ESEntry])
-async def get_es_entries_by_company(company_id: UUID, user_id: str = "test-user"):
+ES_ENTRY_KEYSET = Keyset("created_at")
+
+@router.get("/company/{company_id}", response_model=Page[ESEntry])
+async def get_es_entries_by_company(
+    company_id: UUID,
+    user_id: str = "test-user",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db=Depends(get_db)
+):
     """
-    企業の全ESエントリーを取得
+    企業のESエントリーを作成日時順に1ページ分取得
+    続きは next_cursor を cursor に指定して取得する
     """
-    if not supabase:
-        return []
+    if not db:
+        return {"items": [], "next_cursor": None}
 
     try:
-        response = supabase.table("es_entries").select("*").eq("company_id", company_id).execute()
-        return response.data
+        query = db.table("es_entries").select("*").eq("company_id", company_id)
+        return await fetch_page(query, ES_ENTRY_KEYSET, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/", response_model=ESEntry)
-async def create_es_entry(es_entry: ESEntryCreate, user_id: str = "test-user"):
+async def create_es_entry(es_entry: ESEntryCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     新しいESエントリーを作成
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         # 企業がユーザーに属していることを確認
-        company = supabase.table("companies").select("id").eq("id", es_entry.company_id).eq("user_id", user_id).execute()
+        company = await db.table("companies").select("id").eq("id", es_entry.company_id).eq("user_id", user_id).execute()
         if not company.data:
             raise HTTPException(status_code=403, detail="Company not found or access denied")
 
         data = es_entry.dict()
-        response = supabase.table("es_entries").insert(data).execute()
+        response = await db.table("es_entries").insert(data).execute()
         return response.data[0]
     except HTTPException:
         raise
@@ -47,21 +59,21 @@ async def create_es_entry(es_entry: ESEntryCreate, user_id: str = "test-user"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{entry_id}", response_model=ESEntry)
-async def update_es_entry(entry_id: UUID, es_entry: ESEntryCreate, user_id: str = "test-user"):
+async def update_es_entry(entry_id: UUID, es_entry: ESEntryCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     ESエントリーを更新
+    所有者の条件付きで1文で更新し、更新された行がなければ 404
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        # 企業を通じて所有権を確認
-        existing = supabase.table("es_entries").select("*, companies!inner(user_id)").eq("id", entry_id).execute()
-        if not existing.data or existing.data[0]["companies"]["user_id"] != user_id:
-            raise HTTPException(status_code=404, detail="ES entry not found or access denied")
-
         data = es_entry.dict(exclude_unset=True)
-        response = supabase.table("es_entries").update(data).eq("id", entry_id).execute()
+        # 所有者は変更させない
+        data.pop("user_id", None)
+        response = await db.table("es_entries").update(data).eq("id", entry_id).eq("user_id", user_id).execute()
+        if not response.data:
+            raise HTTPException(status_code=404, detail="ES entry not found or access denied")
         return response.data[0]
     except HTTPException:
         raise
@@ -69,20 +81,18 @@ async def update_es_entry(entry_id: UUID, es_entry: ESEntryCreate, user_id: str
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{entry_id}")
-async def delete_es_entry(entry_id: UUID, user_id: str = "test-user"):
+async def delete_es_entry(entry_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     ESエントリーを削除
+    所有者の条件付きで1文で削除し、削除された行がなければ 404
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        # 企業を通じて所有権を確認
-        existing = supabase.table("es_entries").select("*, companies!inner(user_id)").eq("id", entry_id).execute()
-        if not existing.data or existing.data[0]["companies"]["user_id"] != user_id:
+        response = await db.table("es_entries").delete().eq("id", entry_id).eq("user_id", user_id).execute()
+        if not response.data:
             raise HTTPException(status_code=404, detail="ES entry not found or access denied")
-
-        response = supabase.table("es_entries").delete().eq("id", entry_id).execute()
         return {"message": "ES entry deleted successfully"}
     except HTTPException:
         raise
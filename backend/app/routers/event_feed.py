@@ -0,0 +1,71 @@
+"""
+イベントの ICS フィード API ルート（カレンダーアプリからの購読・差分同期）
+"""
+from datetime import date, datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from ..database import get_db
+from ..services.event_feed import EventFeed, SyncTokenExpired
+from ..services.export import gzip_stream, guard_stream
+from ..services.reference_data import etag_matches
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+@router.get("/feed.ics")
+async def get_event_feed(
+    request: Request,
+    user_id: UUID = Query(..., description="ユーザーID"),
+    sync_token: Optional[str] = Query(None, description="前回のレスポンスの X-Sync-Token（それ以降の変更だけを返す）"),
+    updated_since: Optional[datetime] = Query(None, description="この日時以降の変更だけを返す"),
+    db=Depends(get_db)
+) -> Response:
+    """
+    参加登録したイベントを iCalendar（VEVENT）で返す
+
+    - 何も指定しなければ全件（カレンダーアプリの URL 購読用。If-None-Match が ETag と一致すれば 304）
+    - sync_token / updated_since を指定すると、それ以降に変わったイベントと、
+      消えたイベント（STATUS:CANCELLED）だけを返す
+    - 次回に使う同期トークンは X-Sync-Token ヘッダー（と X-SYNC-TOKEN プロパティ）で返す
+    - 同期トークンが古すぎて差分を出せないときは 410（全件を取り直す）
+    """
+    if sync_token and updated_since:
+        raise HTTPException(status_code=400, detail="sync_token と updated_since はどちらか一方を指定してください")
+    if not db:
+        raise HTTPException(status_code=503, detail="データベースに接続されていません")
+
+    feed = EventFeed(db)
+    now = datetime.now(timezone.utc)
+    headers = {
+        "Content-Disposition": f'inline; filename="events_{date.today().isoformat()}.ics"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    try:
+        if not sync_token and updated_since is None:
+            etag = await feed.etag(user_id, now)
+            if etag:
+                headers["ETag"] = etag
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return Response(status_code=304, headers=headers)
+        token, changes = await feed.prepare(user_id, sync_token, updated_since, now)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SyncTokenExpired:
+        raise HTTPException(status_code=410, detail="同期トークンが古すぎます。sync_token なしで全件を取得し直してください")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"イベントフィードの取得に失敗しました: {str(e)}")
+
+    headers["X-Sync-Token"] = token
+    body = feed.stream_full(user_id, token, now) if changes is None else feed.stream_changes(user_id, changes, token, now)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(guard_stream(body, "events.ics"), media_type=MEDIA_TYPE, headers=headers)
@@ -2,30 +2,41 @@
 イベント/カレンダー管理 API ルート
 担当: はやと
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 from ..models.models import Event, EventCreate
-from ..database import supabase
+from ..database import get_db
+from ..models.bulk import BulkRequest, BulkResponse
+from ..services.bulk import run_bulk, check_bulk_size
+from ..pagination import Page, Keyset, fetch_page
+from ..services.reminder_cache import invalidate_user
+from ..services.change_feed import notify_change, notify_bulk
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 
-@router.get("/", response_model=List[Event])
+EVENT_KEYSET = Keyset("start_time")
+
+@router.get("/", response_model=Page[Event])
 async def get_events(
     user_id: str = "test-user",
     company_id: Optional[UUID] = None,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db=Depends(get_db)
 ):
     """
-    オプションのフィルタ付きでイベントを取得
+    オプションのフィルタ付きでイベントを開始日時順に1ページ分取得
+    続きは next_cursor を cursor に指定して取得する
     """
-    if not supabase:
-        return []
+    if not db:
+        return {"items": [], "next_cursor": None}
 
     try:
-        query = supabase.table("events").select("*, companies(name)").eq("user_id", user_id)
+        query = db.table("events").select("*, companies(name)").eq("user_id", user_id)
 
         if company_id:
             query = query.eq("company_id", company_id)
@@ -34,37 +45,61 @@ async def get_events(
         if end_date:
             query = query.lte("start_time", end_date)
 
-        response = query.order("start_time").execute()
-        return response.data
+        return await fetch_page(query, EVENT_KEYSET, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/", response_model=Event)
-async def create_event(event: EventCreate, user_id: str = "test-user"):
+async def create_event(event: EventCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     新しいイベントを作成
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = event.dict()
         data["user_id"] = user_id
-        response = supabase.table("events").insert(data).execute()
+        response = await db.table("events").insert(data).execute()
+        await notify_change(db, "events", "INSERT", response.data[0])
+        await invalidate_user(user_id)
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_events(request: BulkRequest, user_id: str = "test-user", db=Depends(get_db)):
+    """
+    イベントを一括で作成・更新・削除
+    操作の種類（と更新内容）ごとにまとめて実行し、1件ごとの結果を返す
+    """
+    if not db:
+        raise HTTPException(status_code=500, detail="Database not connected")
+
+    error = check_bulk_size(request.items)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        response = await run_bulk(db, "events", EventCreate, user_id, request.items)
+        await notify_bulk(db, "events", response)
+        await invalidate_user(user_id)
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{event_id}", response_model=Event)
-async def get_event(event_id: UUID, user_id: str = "test-user"):
+async def get_event(event_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     特定のイベントを取得
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        response = supabase.table("events").select("*, companies(name)").eq("id", event_id).eq("user_id", user_id).execute()
+        response = await db.table("events").select("*, companies(name)").eq("id", event_id).eq("user_id", user_id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Event not found")
         return response.data[0]
@@ -72,16 +107,19 @@ async def get_event(event_id: UUID, user_id: str = "test-user"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{event_id}", response_model=Event)
-async def update_event(event_id: UUID, event: EventCreate, user_id: str = "test-user"):
+async def update_event(event_id: UUID, event: EventCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     イベントを更新
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = event.dict(exclude_unset=True)
-        response = supabase.table("events").update(data).eq("id", event_id).eq("user_id", user_id).execute()
+        response = await db.table("events").update(data).eq("id", event_id).eq("user_id", user_id).execute()
+        for row in response.data or []:
+            await notify_change(db, "events", "UPDATE", row)
+        await invalidate_user(user_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Event not found")
         return response.data[0]
@@ -89,15 +127,18 @@ async def update_event(event_id: UUID, event: EventCreate, user_id: str = "test-
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{event_id}")
-async def delete_event(event_id: UUID, user_id: str = "test-user"):
+async def delete_event(event_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     イベントを削除
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        response = supabase.table("events").delete().eq("id", event_id).eq("user_id", user_id).execute()
+        response = await db.table("events").delete().eq("id", event_id).eq("user_id", user_id).execute()
+        for row in response.data or []:
+            await notify_change(db, "events", "DELETE", old_record=row)
+        await invalidate_user(user_id)
         return {"message": "Event deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
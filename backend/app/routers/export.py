@@ -0,0 +1,78 @@
+"""
+データエクスポート API ルート
+"""
+from datetime import date, datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..database import get_db
+from ..services.export import (
+    DATASETS,
+    iter_rows,
+    prefetch,
+    stream_csv,
+    stream_ndjson,
+    gzip_stream,
+    guard_stream,
+)
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    request: Request,
+    user_id: UUID = Query(..., description="ユーザーID"),
+    format: str = Query("csv", description="csv または ndjson"),
+    status: Optional[str] = Query(None, description="ステータスで絞り込み（all で全件）"),
+    start_date: Optional[datetime] = Query(None, alias="startDate", description="この日時以降（ISO8601。日付のみなら0時）"),
+    end_date: Optional[datetime] = Query(None, alias="endDate", description="この日時以前（ISO8601。日付のみなら0時）"),
+    db=Depends(get_db)
+) -> StreamingResponse:
+    """
+    企業・イベント・タスク・ES・振り返りをCSVまたはNDJSONでエクスポート
+
+    - dataset: companies / events / tasks / es_entries / reflections
+    - DBからはチャンクごとに取得してそのまま送信するため、件数によらずメモリ使用量は一定
+    - Accept-Encoding に gzip を含む場合は gzip 圧縮して返す
+    - 最初のチャンクは送信前に取得する（不正な条件やDBのエラーは 4xx / 500 で返す。以降のエラーは接続を打ち切る）
+    """
+    target = DATASETS.get(dataset)
+    if not target:
+        raise HTTPException(status_code=404, detail=f"Unknown export target: {dataset}")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format は csv または ndjson を指定してください")
+    if not db:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    # タイムゾーンのない日時は DB と同じく UTC として比べる
+    if start_date and end_date and _as_utc(start_date) > _as_utc(end_date):
+        raise HTTPException(status_code=400, detail="startDate は endDate 以前を指定してください")
+
+    try:
+        chunks = await prefetch(iter_rows(db, target, user_id, status=status, start_date=start_date, end_date=end_date))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    body = stream_csv(chunks, target) if format == "csv" else stream_ndjson(chunks)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}_{date.today().isoformat()}.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(guard_stream(body, dataset), media_type=MEDIA_TYPES[format], headers=headers)
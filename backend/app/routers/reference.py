@@ -0,0 +1,54 @@
+"""
+参照データ（業界一覧・企業カタログ）API ルート
+"""
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from ..config import REFERENCE_MAX_AGE
+from ..services.reference_data import (
+    ReferenceDataset, companies_reference, etag_matches, industries_reference
+)
+from ..database import get_db
+
+router = APIRouter(prefix="/api/reference", tags=["reference"])
+
+# 共有データなので public。max-age を過ぎたら ETag で確かめる（確かめている間は古いものを使ってよい）
+CACHE_CONTROL = f"public, max-age={REFERENCE_MAX_AGE}, stale-while-revalidate={REFERENCE_MAX_AGE * 10}"
+
+
+async def _respond(dataset: ReferenceDataset, request: Request, db) -> Response:
+    if not db:
+        raise HTTPException(status_code=503, detail="データベースに接続されていません")
+
+    try:
+        snapshot = await dataset.get(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"参照データの取得に失敗しました: {str(e)}")
+
+    headers = {"ETag": snapshot.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        dataset.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/industries")
+async def get_industries(request: Request, db=Depends(get_db)) -> Response:
+    """
+    業界一覧（業界名順）
+
+    Returns:
+        {"industries": [{"id": 1, "industries": "IT・通信"}, ...]}
+        If-None-Match が ETag と一致すれば 304（本文なし）
+    """
+    return await _respond(industries_reference, request, db)
+
+
+@router.get("/companies")
+async def get_company_catalog(request: Request, db=Depends(get_db)) -> Response:
+    """
+    企業カタログ全件（正規化した企業名順）。絞り込み・入力補完には /api/companies/search を使う
+
+    Returns:
+        {"companies": [{"id": "...", "name": "株式会社トヨタ", "url": null, "industry": 3}, ...]}
+        If-None-Match が ETag と一致すれば 304（本文なし）
+    """
+    return await _respond(companies_reference, request, db)
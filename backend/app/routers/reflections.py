@@ -1,15 +1,19 @@
 """
 振り返りログ API ルート
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel
-from ..database import supabase
+from ..database import get_db, is_db_error, FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION
+from ..pagination import Keyset, fetch_page
 
 router = APIRouter(prefix="/api/reflections", tags=["reflections"])
 
+# ユーザー指定の一覧は新しい順
+REFLECTION_KEYSET = Keyset("created_at", desc=True)
+
 
 # リクエストモデル
 class ReflectionCreateRequest(BaseModel):
@@ -24,12 +28,14 @@ class ReflectionCreateRequest(BaseModel):
 async def get_reflections(
     user_id: Optional[UUID] = Query(None, description="ユーザーID"),
     event_id: Optional[UUID] = Query(None, description="イベントID"),
-    limit: int = Query(50, description="取得件数上限")
+    limit: int = Query(50, description="取得件数上限（サーバー側の上限あり）"),
+    cursor: Optional[str] = Query(None, description="前のレスポンスの next_cursor"),
+    db=Depends(get_db)
 ) -> Dict[str, Any]:
     """
     振り返りを取得
 
-    - user_id指定時: そのユーザーの全振り返り
+    - user_id指定時: そのユーザーの振り返りを新しい順に1ページ分（続きは next_cursor で取得）
     - event_id指定時: そのイベントの振り返り（1件のみ）
     - どちらも指定なし: エラー
     """
@@ -37,61 +43,59 @@ async def get_reflections(
         raise HTTPException(status_code=400, detail="user_id または event_id を指定してください")
 
     try:
-        query = supabase.table("reflections").select(
+        query = db.table("reflections").select(
             "*, events(id, title, type, start_time, end_time, company_id, companies(name))"
         )
 
         if event_id:
             # イベント指定の場合
-            response = query.eq("event_id", str(event_id)).execute()
+            response = await query.eq("event_id", str(event_id)).execute()
 
             if not response.data:
                 return {
                     "reflections": [],
-                    "total_count": 0
+                    "total_count": 0,
+                    "next_cursor": None
                 }
 
             return {
                 "reflections": response.data,
-                "total_count": len(response.data)
+                "total_count": len(response.data),
+                "next_cursor": None
             }
 
         if user_id:
-            # ユーザー指定の場合、eventsテーブル経由でフィルタリング
-            # まずユーザーのイベントIDを取得
-            user_events = supabase.table("userevents").select("event_id").eq(
-                "user_id", str(user_id)
-            ).execute()
-
-            if not user_events.data:
-                return {
-                    "reflections": [],
-                    "total_count": 0
-                }
+            # ユーザー指定の場合、events -> userevents の内部結合でユーザーのイベントに絞る
+            # （イベントIDの一覧を取得して in_ で渡すと往復が2回になり、URLも件数に比例して伸びるため）
+            user_query = db.table("reflections").select(
+                "*, events!inner(id, title, type, start_time, end_time, company_id, companies(name), userevents!inner())"
+            ).eq("events.userevents.user_id", str(user_id))
 
-            event_ids = [ue["event_id"] for ue in user_events.data]
+            page = await fetch_page(user_query, REFLECTION_KEYSET, cursor, limit)
 
-            # そのイベントIDに紐づく振り返りを取得
-            response = query.in_("event_id", event_ids).order(
-                "created_at", desc=True
-            ).limit(limit).execute()
+            # 絞り込み用の userevents はレスポンスに含めない
+            for reflection in page["items"]:
+                reflection["events"].pop("userevents", None)
 
             return {
-                "reflections": response.data,
-                "total_count": len(response.data)
+                "reflections": page["items"],
+                "total_count": len(page["items"]),
+                "next_cursor": page["next_cursor"]
             }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"振り返りの取得に失敗しました: {str(e)}")
 
 
 @router.get("/{reflection_id}")
-async def get_reflection(reflection_id: UUID) -> Dict[str, Any]:
+async def get_reflection(reflection_id: UUID, db=Depends(get_db)) -> Dict[str, Any]:
     """
     特定の振り返りを取得
     """
     try:
-        response = supabase.table("reflections").select(
+        response = await db.table("reflections").select(
             "*, events(id, title, type, start_time, end_time, company_id, companies(name))"
         ).eq("id", str(reflection_id)).execute()
 
@@ -107,31 +111,14 @@ async def get_reflection(reflection_id: UUID) -> Dict[str, Any]:
 
 
 @router.post("")
-async def create_reflection(reflection: ReflectionCreateRequest) -> Dict[str, Any]:
+async def create_reflection(reflection: ReflectionCreateRequest, db=Depends(get_db)) -> Dict[str, Any]:
     """
     振り返りを作成
+
+    イベントの存在と1対1制約は事前に確認せず、insert の制約違反で判定する
+    （外部キー違反 -> 404、event_id のユニーク制約違反 -> 400）
     """
     try:
-        # イベントの存在確認
-        event_check = supabase.table("events").select("id").eq(
-            "id", str(reflection.event_id)
-        ).execute()
-
-        if not event_check.data:
-            raise HTTPException(status_code=404, detail="イベントが見つかりません")
-
-        # 既に振り返りが存在するか確認（1対1制約）
-        existing = supabase.table("reflections").select("id").eq(
-            "event_id", str(reflection.event_id)
-        ).execute()
-
-        if existing.data:
-            raise HTTPException(
-                status_code=400,
-                detail="このイベントには既に振り返りが存在します"
-            )
-
-        # 振り返り作成
         data = {
             "event_id": str(reflection.event_id),
             "content": reflection.content,
@@ -140,7 +127,7 @@ async def create_reflection(reflection: ReflectionCreateRequest) -> Dict[str, An
             "self_score": reflection.self_score
         }
 
-        response = supabase.table("reflections").insert(data).execute()
+        response = await db.table("reflections").insert(data).execute()
 
         if not response.data:
             raise HTTPException(status_code=500, detail="振り返りの作成に失敗しました")
@@ -153,26 +140,26 @@ async def create_reflection(reflection: ReflectionCreateRequest) -> Dict[str, An
     except HTTPException:
         raise
     except Exception as e:
+        if is_db_error(e, FOREIGN_KEY_VIOLATION):
+            raise HTTPException(status_code=404, detail="イベントが見つかりません")
+        if is_db_error(e, UNIQUE_VIOLATION):
+            raise HTTPException(
+                status_code=400,
+                detail="このイベントには既に振り返りが存在します"
+            )
         raise HTTPException(status_code=500, detail=f"振り返りの作成に失敗しました: {str(e)}")
 
 
 @router.put("/{reflection_id}")
 async def update_reflection(
     reflection_id: UUID,
-    reflection: ReflectionCreateRequest
+    reflection: ReflectionCreateRequest,
+    db=Depends(get_db)
 ) -> Dict[str, Any]:
     """
-    振り返りを更新
+    振り返りを更新（更新された行が返らなければ存在しない）
     """
     try:
-        # 振り返りの存在確認
-        existing = supabase.table("reflections").select("id").eq(
-            "id", str(reflection_id)
-        ).execute()
-
-        if not existing.data:
-            raise HTTPException(status_code=404, detail="振り返りが見つかりません")
-
         # 更新データ
         data = {
             "content": reflection.content,
@@ -181,12 +168,12 @@ async def update_reflection(
             "self_score": reflection.self_score
         }
 
-        response = supabase.table("reflections").update(data).eq(
+        response = await db.table("reflections").update(data).eq(
             "id", str(reflection_id)
         ).execute()
 
         if not response.data:
-            raise HTTPException(status_code=500, detail="振り返りの更新に失敗しました")
+            raise HTTPException(status_code=404, detail="振り返りが見つかりません")
 
         return {
             "message": "振り返りを更新しました",
@@ -200,24 +187,18 @@ async def update_reflection(
 
 
 @router.delete("/{reflection_id}")
-async def delete_reflection(reflection_id: UUID) -> Dict[str, str]:
+async def delete_reflection(reflection_id: UUID, db=Depends(get_db)) -> Dict[str, str]:
     """
-    振り返りを削除
+    振り返りを削除（削除された行が返らなければ存在しない）
     """
     try:
-        # 振り返りの存在確認
-        existing = supabase.table("reflections").select("id").eq(
+        response = await db.table("reflections").delete().eq(
             "id", str(reflection_id)
         ).execute()
 
-        if not existing.data:
+        if not response.data:
             raise HTTPException(status_code=404, detail="振り返りが見つかりません")
 
-        # 削除
-        supabase.table("reflections").delete().eq(
-            "id", str(reflection_id)
-        ).execute()
-
         return {"message": "振り返りを削除しました"}
 
     except HTTPException:
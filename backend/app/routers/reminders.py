@@ -1,20 +1,27 @@
 """
 リマインダー API ルート
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Dict, Any
+import secrets
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from typing import Dict, Any, Optional
 from uuid import UUID
+from ..config import CRON_SECRET
+from ..services.reminder_batch import ReminderBatchJob
 from ..services.reminder_service import ReminderService
-from ..database import supabase
+from ..services.reminder_cache import get_or_compute, invalidate_user
+from ..services.reminder_state import reminder_states
+from ..database import get_db
 
 router = APIRouter(prefix="/api/reminders", tags=["reminders"])
 
 @router.get("")
 async def get_all_reminders(
-    user_id: UUID = Query(..., description="ユーザーID")
+    user_id: UUID = Query(..., description="ユーザーID"),
+    db=Depends(get_db)
 ) -> Dict[str, Any]:
     """
     ユーザーの全リマインドを取得（優先度順）
+    結果はユーザーごとにキャッシュされ、企業・イベント・タスクの更新時に破棄される
 
     Returns:
         {
@@ -30,27 +37,30 @@ async def get_all_reminders(
                     "created_at": "ISO8601形式の日時"
                 }
             ],
-            "total_count": 5
+            "total_count": 5,
+            "timed_out": []  // タイムアウトした生成関数名（例: ["deadline"]）
         }
     """
-    service = ReminderService(supabase)
-    return await service.get_all_reminders(user_id)
+    service = ReminderService(db)
+    return await get_or_compute(user_id, "all", lambda: service.get_all_reminders(user_id))
 
 @router.get("/email-check")
 async def get_email_check_reminders(
-    user_id: UUID = Query(..., description="ユーザーID")
+    user_id: UUID = Query(..., description="ユーザーID"),
+    db=Depends(get_db)
 ) -> Dict[str, Any]:
     """
     メール確認リマインドのみ取得
 
     ES提出済み/面接中で7日以上更新がない企業が対象
     """
-    service = ReminderService(supabase)
-    return await service.get_email_check_reminders(user_id)
+    service = ReminderService(db)
+    return await get_or_compute(user_id, "email_check", lambda: service.get_email_check_reminders(user_id))
 
 @router.get("/deadlines")
 async def get_deadline_reminders(
-    user_id: UUID = Query(..., description="ユーザーID")
+    user_id: UUID = Query(..., description="ユーザーID"),
+    db=Depends(get_db)
 ) -> Dict[str, Any]:
     """
     締切リマインドのみ取得（優先度順）
@@ -58,5 +68,43 @@ async def get_deadline_reminders(
     1-3日後の締切イベントが対象
     未応募の場合は「応募しましたか？」メッセージ付き
     """
-    service = ReminderService(supabase)
-    return await service.get_deadline_reminders(user_id)
\ No newline at end of file
+    service = ReminderService(db)
+    return await get_or_compute(user_id, "deadlines", lambda: service.get_deadline_reminders(user_id))
+
+@router.delete("/cache")
+async def invalidate_reminder_cache(
+    user_id: UUID = Query(..., description="ユーザーID")
+) -> Dict[str, Any]:
+    """
+    ユーザーのリマインドキャッシュを破棄する
+
+    バックエンドを経由しない書き込みは Realtime の通知で破棄されるので、通常は呼ぶ必要はない
+    （Realtime を使えない環境や、すぐに確実に反映したいとき用。REMINDER_ENGINE=incremental の保持状態も破棄する）
+    """
+    await invalidate_user(user_id)
+    reminder_states.drop(user_id)
+    return {"message": "Reminder cache invalidated"}
+
+@router.post("/batch")
+async def run_reminder_batch(
+    authorization: Optional[str] = Header(None),
+    db=Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    全ユーザー向けのリマインドバッチ（services/reminder_batch.py）を実行する
+
+    フロントエンドの /api/cron/reminders から Authorization: Bearer <CRON_SECRET> 付きで呼ばれる。
+    通知・メールは idempotency_key で重複しないので、同じ日に何度呼んでもよい
+    """
+    if not CRON_SECRET:
+        raise HTTPException(status_code=503, detail="CRON_SECRET is not configured")
+    if not secrets.compare_digest(authorization or "", f"Bearer {CRON_SECRET}"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not connected")
+
+    try:
+        stats = await ReminderBatchJob(db).run()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"stats": stats}
\ No newline at end of file
@@ -2,66 +2,100 @@
 Todo/タスク管理 API ルート
 担当: はると（フロント）/ はやと（バック）
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from uuid import UUID
 from ..models.models import Task, TaskCreate
-from ..database import supabase
+from ..database import get_db
+from ..models.bulk import BulkRequest, BulkResponse
+from ..services.bulk import run_bulk, check_bulk_size
+from ..pagination import Page, Keyset, fetch_page
+from ..services.reminder_cache import invalidate_user
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
-@router.get("/", response_model=List[Task])
+# 期限なしのタスクは末尾に並ぶ
+TASK_KEYSET = Keyset("due_date", nullable=True)
+
+@router.get("/", response_model=Page[Task])
 async def get_tasks(
     user_id: str = "test-user",
     company_id: Optional[UUID] = None,
-    is_completed: Optional[bool] = None
+    is_completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db=Depends(get_db)
 ):
     """
-    オプションのフィルタ付きでタスクを取得
+    オプションのフィルタ付きでタスクを期限順に1ページ分取得
+    続きは next_cursor を cursor に指定して取得する
     """
-    if not supabase:
-        return []
+    if not db:
+        return {"items": [], "next_cursor": None}
 
     try:
-        query = supabase.table("tasks").select("*, companies(name)").eq("user_id", user_id)
+        query = db.table("tasks").select("*, companies(name)").eq("user_id", user_id)
 
         if company_id is not None:
             query = query.eq("company_id", company_id)
         if is_completed is not None:
             query = query.eq("is_completed", is_completed)
 
-        response = query.order("due_date").execute()
-        return response.data
+        return await fetch_page(query, TASK_KEYSET, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/", response_model=Task)
-async def create_task(task: TaskCreate, user_id: str = "test-user"):
+async def create_task(task: TaskCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     新しいタスクを作成
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = task.dict()
         data["user_id"] = user_id
-        response = supabase.table("tasks").insert(data).execute()
+        response = await db.table("tasks").insert(data).execute()
+        await invalidate_user(user_id)
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_tasks(request: BulkRequest, user_id: str = "test-user", db=Depends(get_db)):
+    """
+    タスクを一括で作成・更新・削除
+    操作の種類（と更新内容）ごとにまとめて実行し、1件ごとの結果を返す
+    """
+    if not db:
+        raise HTTPException(status_code=500, detail="Database not connected")
+
+    error = check_bulk_size(request.items)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        response = await run_bulk(db, "tasks", TaskCreate, user_id, request.items)
+        await invalidate_user(user_id)
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/{task_id}", response_model=Task)
-async def update_task(task_id: UUID, task: TaskCreate, user_id: str = "test-user"):
+async def update_task(task_id: UUID, task: TaskCreate, user_id: str = "test-user", db=Depends(get_db)):
     """
     タスクを更新
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
         data = task.dict(exclude_unset=True)
-        response = supabase.table("tasks").update(data).eq("id", task_id).eq("user_id", user_id).execute()
+        response = await db.table("tasks").update(data).eq("id", task_id).eq("user_id", user_id).execute()
+        await invalidate_user(user_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Task not found")
         return response.data[0]
@@ -69,36 +103,39 @@ async def update_task(task_id: UUID, task: TaskCreate, user_id: str = "test-user
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: UUID, user_id: str = "test-user"):
+async def delete_task(task_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     タスクを削除
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        response = supabase.table("tasks").delete().eq("id", task_id).eq("user_id", user_id).execute()
+        response = await db.table("tasks").delete().eq("id", task_id).eq("user_id", user_id).execute()
+        await invalidate_user(user_id)
         return {"message": "Task deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{task_id}/complete")
-async def toggle_task_completion(task_id: UUID, user_id: str = "test-user"):
+async def toggle_task_completion(task_id: UUID, user_id: str = "test-user", db=Depends(get_db)):
     """
     タスクの完了状態を切り替え
+    DB関数 toggle_task_completion で is_completed = NOT is_completed を1文で実行する
+    （読み取ってから書き込むと、同時に押されたときに切り替えが打ち消し合わない）
     """
-    if not supabase:
+    if not db:
         raise HTTPException(status_code=500, detail="Database not connected")
 
     try:
-        # 現在の状態を取得
-        current = supabase.table("tasks").select("is_completed").eq("id", task_id).eq("user_id", user_id).execute()
-        if not current.data:
+        response = await db.rpc(
+            "toggle_task_completion", {"p_task_id": str(task_id), "p_user_id": user_id}
+        ).execute()
+        if not response.data:
             raise HTTPException(status_code=404, detail="Task not found")
-
-        # 状態を切り替え
-        new_status = not current.data[0]["is_completed"]
-        response = supabase.table("tasks").update({"is_completed": new_status}).eq("id", task_id).eq("user_id", user_id).execute()
+        await invalidate_user(user_id)
         return response.data[0]
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,140 @@
+"""
+分析ページ（frontend/app/analytics）用の集計
+
+ステータス別の企業数・直近7日の活動量（イベント・ES提出）・直近30日の企業追加数を返す。
+日付は UTC で区切る（フロントエンドの toISOString() と同じ）。
+
+ANALYTICS_ENGINE が "sql" なら DB関数 get_user_analytics（docs/migrations/004）で
+GROUP BY した件数だけを受け取り、"python" なら必要な列・期間の行だけ取得して日ごとの dict に数える。
+結果はユーザー・日付ごとに ANALYTICS_CACHE_TTL 秒キャッシュする。
+"""
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from ..config import ANALYTICS_CACHE_MAXSIZE, ANALYTICS_CACHE_TTL, ANALYTICS_ENGINE
+from ..metrics import ANALYTICS_ENGINE_FALLBACKS
+from .cache import create_cache
+
+STATUSES = ["Interested", "Entry", "ES_Submit", "Interview", "Offer", "Rejected"]
+# 活動量・進捗の日数（今日を含む）
+ACTIVITY_DAYS = 7
+PROGRESS_DAYS = 30
+
+analytics_cache = create_cache("analytics", maxsize=ANALYTICS_CACHE_MAXSIZE, ttl=ANALYTICS_CACHE_TTL)
+
+
+def _utc_day(value: str) -> str:
+    """
+    timestamptz の文字列を UTC の日付（YYYY-MM-DD）にする
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.date().isoformat()
+
+
+def _day_start(day: date) -> str:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).isoformat()
+
+
+class AnalyticsService:
+    def __init__(self, supabase_client, engine: str = ANALYTICS_ENGINE):
+        self.supabase = supabase_client
+        self.engine = engine
+
+    async def _fetch_counts_sql(self, user_id: UUID, today: date) -> Dict[str, Dict[str, int]]:
+        """
+        DB関数 get_user_analytics で件数だけを取得する
+        """
+        response = await self.supabase.rpc(
+            "get_user_analytics",
+            {"p_user_id": str(user_id), "p_today": today.isoformat()}
+        ).execute()
+        return response.data
+
+    async def _fetch_counts_python(self, user_id: UUID, today: date) -> Dict[str, Dict[str, int]]:
+        """
+        必要な列・期間の行だけを並列に取得し、ステータス・日付ごとに数える
+        """
+        user_id = str(user_id)
+        activity_start = _day_start(today - timedelta(days=ACTIVITY_DAYS - 1))
+        progress_start = today - timedelta(days=PROGRESS_DAYS - 1)
+        end = _day_start(today + timedelta(days=1))
+
+        selections, events, es_entries = await asyncio.gather(
+            self.supabase.table("usercompanyselections").select("status, created_at")
+            .eq("user_id", user_id).execute(),
+            self.supabase.table("events").select("start_time, userevents!inner(user_id)")
+            .eq("userevents.user_id", user_id)
+            .gte("start_time", activity_start).lt("start_time", end).execute(),
+            self.supabase.table("es_entries").select("submitted_at")
+            .eq("user_id", user_id)
+            .gte("submitted_at", (today - timedelta(days=ACTIVITY_DAYS - 1)).isoformat())
+            .lte("submitted_at", today.isoformat()).execute(),
+        )
+
+        # ステータス別は全件、企業の追加日は直近30日だけ数える
+        progress_days = {
+            (progress_start + timedelta(days=i)).isoformat() for i in range(PROGRESS_DAYS)
+        }
+        selection_days = (
+            _utc_day(row["created_at"]) for row in selections.data or [] if row.get("created_at")
+        )
+        return {
+            "status_counts": dict(Counter(row["status"] for row in selections.data or [])),
+            "events_by_day": dict(Counter(_utc_day(row["start_time"]) for row in events.data or [])),
+            "es_by_day": dict(Counter(str(row["submitted_at"])[:10] for row in es_entries.data or [])),
+            "selections_by_day": dict(Counter(day for day in selection_days if day in progress_days)),
+        }
+
+    @staticmethod
+    def _build_summary(counts: Dict[str, Dict[str, int]], today: date) -> Dict[str, Any]:
+        """
+        件数を分析ページのグラフの形にする（件数のない日・ステータスは0で埋める）
+        """
+        status_counts = counts.get("status_counts") or {}
+        events_by_day = counts.get("events_by_day") or {}
+        es_by_day = counts.get("es_by_day") or {}
+        selections_by_day = counts.get("selections_by_day") or {}
+
+        activity_days = [(today - timedelta(days=i)).isoformat() for i in range(ACTIVITY_DAYS - 1, -1, -1)]
+        progress_days = [(today - timedelta(days=i)).isoformat() for i in range(PROGRESS_DAYS - 1, -1, -1)]
+        return {
+            "today": today.isoformat(),
+            "total_companies": sum(status_counts.values()),
+            "status_counts": {status: status_counts.get(status, 0) for status in STATUSES},
+            "activity": [
+                {"date": day, "events": events_by_day.get(day, 0), "es": es_by_day.get(day, 0)}
+                for day in activity_days
+            ],
+            "progress": [{"date": day, "count": selections_by_day.get(day, 0)} for day in progress_days],
+        }
+
+    async def get_summary(self, user_id: UUID, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        ユーザーの分析データを取得
+
+        ANALYTICS_ENGINE が "sql" で失敗した場合（関数が未適用など）は Python 版で計算し直す
+        """
+        today = today or datetime.now(timezone.utc).date()
+        key = f"{user_id}:{today.isoformat()}"
+        cached = await analytics_cache.get(key)
+        if cached is not None:
+            return cached
+
+        counts = None
+        if self.engine == "sql" and self.supabase:
+            try:
+                counts = await self._fetch_counts_sql(user_id, today)
+            except Exception as e:
+                print(f"Error fetching analytics via sql engine, falling back to python: {e}")
+                ANALYTICS_ENGINE_FALLBACKS.inc(engine=self.engine)
+        if counts is None:
+            counts = await self._fetch_counts_python(user_id, today)
+
+        summary = self._build_summary(counts, today)
+        await analytics_cache.set(key, summary)
+        return summary
@@ -0,0 +1,203 @@
+"""
+企業・イベント・タスク・選考状況の一括作成・更新・削除
+
+1リクエストに含まれる操作をテーブルごとにまとめて実行する。
+- create: 全件を1回の複数行 insert
+- update: 変更内容が同じものをまとめて update ... in_(キー列, ids)（100社のステータス変更なら1回）
+- delete: 全件を1回の delete ... in_(キー列, ids)
+いずれも user_id で絞り込み、返ってきた行で1件ごとの成否（200 / 404）を判定する。
+キー列は通常 id。選考状況（usercompanyselections）は company_id で指定する（ユーザーと企業の組で1行）。
+
+upsert で更新をまとめない理由: 列が揃っていない行を upsert すると
+指定していない列が NULL で上書きされ、NOT NULL 列を省いた部分更新もできないため。
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from ..config import BULK_MAX_ITEMS
+from ..database import is_db_error, FOREIGN_KEY_VIOLATION
+from ..models.bulk import BulkItem, BulkItemResult, BulkOperation
+from .reminder_service import IN_FILTER_CHUNK_SIZE
+
+# クライアントから指定させない列（user_id はクエリで受け取ったものを使う）
+PROTECTED_FIELDS = {"id", "user_id"}
+
+
+def validate_fields(model: Type[BaseModel], data: Dict[str, Any], partial: bool,
+                    protected: Set[str] = PROTECTED_FIELDS) -> Dict[str, Any]:
+    """
+    data をモデルの各列の型で検証し、DBに送れる JSON 互換の値にする
+    partial=False（作成）のときは必須列がそろっているかも確認する
+
+    Raises:
+        ValueError: 未知の列・型の不一致・必須列の不足
+    """
+    fields = {name: field for name, field in model.model_fields.items() if name not in protected}
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    if not partial:
+        missing = [name for name, field in fields.items() if field.is_required() and name not in data]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    values = {}
+    for name, value in data.items():
+        adapter = TypeAdapter(fields[name].annotation)
+        try:
+            values[name] = adapter.dump_python(adapter.validate_python(value), mode="json")
+        except ValidationError as e:
+            raise ValueError(f"{name}: {e.errors()[0]['msg']}")
+
+    if not partial:
+        # 省略された任意列はモデルのデフォルト値で埋める（複数行 insert で列をそろえるため）
+        for name, field in fields.items():
+            if name not in values:
+                values[name] = TypeAdapter(field.annotation).dump_python(field.get_default(call_default_factory=True), mode="json")
+    return values
+
+
+def _error_status(e: Exception) -> int:
+    return 400 if is_db_error(e, FOREIGN_KEY_VIOLATION) else 500
+
+
+class BulkExecutor:
+    """
+    1テーブル分の一括操作
+
+    Args:
+        table: 対象テーブル
+        model: 作成・更新の入力を検証するモデル（CompanyCreate など）
+        key: 更新・削除で item.id と照合する列（作成時は返ってきた行のこの列を id として返す）
+    """
+
+    def __init__(self, db, table: str, model: Type[BaseModel], user_id: str, key: str = "id"):
+        self.db = db
+        self.table = table
+        self.model = model
+        self.user_id = user_id
+        self.key = key
+        self.results: Dict[int, BulkItemResult] = {}
+
+    def _set(self, index: int, item: BulkItem, status: int, id=None, data=None, error=None) -> None:
+        self.results[index] = BulkItemResult(
+            index=index, op=item.op, id=id or item.id, status=status, data=data, error=error
+        )
+
+    async def _create(self, creates: List[Tuple[int, BulkItem, Dict[str, Any]]]) -> None:
+        rows = [{**values, "user_id": self.user_id} for _, _, values in creates]
+        try:
+            response = await self.db.table(self.table).insert(rows).execute()
+        except Exception as e:
+            for index, item, _ in creates:
+                self._set(index, item, _error_status(e), error=str(e))
+            return
+        # 複数行 insert は渡した順に返る
+        for (index, item, _), row in zip(creates, response.data or []):
+            self._set(index, item, 200, id=row.get(self.key), data=row)
+
+    async def _apply(self, action, group: List[Tuple[int, BulkItem]]) -> None:
+        """
+        action（update / delete のクエリを返す関数）を in_ の上限ごとに実行し、
+        返ってきた行のキー列で1件ごとの結果を記録する（data は更新後・削除した行）
+        """
+        for i in range(0, len(group), IN_FILTER_CHUNK_SIZE):
+            chunk = group[i:i + IN_FILTER_CHUNK_SIZE]
+            ids = [str(item.id) for _, item in chunk]
+            try:
+                response = await action().in_(self.key, ids).eq("user_id", self.user_id).execute()
+            except Exception as e:
+                for index, item in chunk:
+                    self._set(index, item, _error_status(e), error=str(e))
+                continue
+            rows_by_id = {str(row[self.key]): row for row in response.data or []}
+            for index, item in chunk:
+                row = rows_by_id.get(str(item.id))
+                if row is None:
+                    self._set(index, item, 404, error="not found")
+                else:
+                    self._set(index, item, 200, data=row)
+
+    async def _update(self, values: Dict[str, Any], group: List[Tuple[int, BulkItem]]) -> None:
+        await self._apply(lambda: self.db.table(self.table).update(values), group)
+
+    async def _delete(self, group: List[Tuple[int, BulkItem]]) -> None:
+        await self._apply(lambda: self.db.table(self.table).delete(), group)
+
+    async def run(self, items: List[BulkItem]) -> List[BulkItemResult]:
+        """
+        入力を検証して操作の種類ごとにまとめ、まとめた単位を並列に実行する
+        """
+        creates: List[Tuple[int, BulkItem, Dict[str, Any]]] = []
+        updates: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, BulkItem]]]] = {}
+        deletes: List[Tuple[int, BulkItem]] = []
+        seen_ids = set()
+
+        for index, item in enumerate(items):
+            if item.op != BulkOperation.create:
+                if item.id is None:
+                    self._set(index, item, 422, error="id is required")
+                    continue
+                # 同じ行への複数の操作は実行順が決まらないので受け付けない
+                if item.id in seen_ids:
+                    self._set(index, item, 409, error="duplicate id in request")
+                    continue
+                seen_ids.add(item.id)
+
+            if item.op == BulkOperation.delete:
+                deletes.append((index, item))
+                continue
+            # キー列は更新させない（作成時は id 以外のキー列なら data で指定する）
+            protected = PROTECTED_FIELDS | {self.key} if item.op == BulkOperation.update else PROTECTED_FIELDS
+            try:
+                values = validate_fields(self.model, item.data, partial=item.op == BulkOperation.update, protected=protected)
+            except ValueError as e:
+                self._set(index, item, 422, error=str(e))
+                continue
+            if item.op == BulkOperation.create:
+                creates.append((index, item, values))
+            elif not values:
+                self._set(index, item, 422, error="no fields to update")
+            else:
+                key = json.dumps(values, sort_keys=True)
+                updates.setdefault(key, (values, []))[1].append((index, item))
+
+        tasks = []
+        if creates:
+            tasks.append(self._create(creates))
+        for values, group in updates.values():
+            tasks.append(self._update(values, group))
+        if deletes:
+            tasks.append(self._delete(deletes))
+        await asyncio.gather(*tasks)
+
+        return [self.results[index] for index in sorted(self.results)]
+
+
+def check_bulk_size(items: List[BulkItem]) -> Optional[str]:
+    """
+    件数が上限を超えていればエラーメッセージを返す
+    """
+    if not items:
+        return "items が空です"
+    if len(items) > BULK_MAX_ITEMS:
+        return f"一度に処理できるのは {BULK_MAX_ITEMS} 件までです"
+    return None
+
+
+async def run_bulk(db, table: str, model: Type[BaseModel], user_id: str, items: List[BulkItem],
+                   key: str = "id") -> Dict[str, Any]:
+    """
+    一括操作を実行して BulkResponse の形で返す
+    """
+    results = await BulkExecutor(db, table, model, user_id, key).run(items)
+    succeeded = sum(1 for result in results if result.status == 200)
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
@@ -0,0 +1,165 @@
+"""
+キャッシュの共通実装
+
+- TTLCache: プロセス内の LRU + TTL キャッシュ（デフォルト）
+- RedisCache: Redis 互換クライアント（get / set(ex=) / delete を持つもの）を使うキャッシュ
+  CACHE_BACKEND=redis のときに使われる。テストでは fakeredis 等に差し替えられる
+
+どちらも同じ async インターフェース（get / set / delete / clear / stats）を持ち、
+ヒット・ミス数などのカウンタをプロセス内で集計する。
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import CACHE_BACKEND, REDIS_URL
+
+# 作成したキャッシュの一覧（統計の出力用）
+_caches: Dict[str, "BaseCache"] = {}
+
+
+class BaseCache:
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _record(self, value: Any) -> Any:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def size(self) -> int:
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.__class__.__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "size": self.size(),
+            "ttl": self.ttl,
+        }
+
+
+class TTLCache(BaseCache):
+    """
+    プロセス内の LRU + TTL キャッシュ
+    maxsize を超えたら最も古く使われたものから捨てる
+    """
+
+    def __init__(self, name: str, maxsize: int = 1000, ttl: float = 60.0):
+        super().__init__(name, ttl)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get_nowait(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return self._record(None)
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return self._record(None)
+        self._data.move_to_end(key)
+        return self._record(value)
+
+    def set_nowait(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete_nowait(self, key: str) -> None:
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    async def get(self, key: str) -> Any:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_nowait(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.delete_nowait(key)
+
+    async def clear(self) -> None:
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisCache(BaseCache):
+    """
+    Redis 互換クライアントを使うキャッシュ（複数プロセスで共有できる）
+    値は JSON で保存する
+    """
+
+    def __init__(self, name: str, client, ttl: float = 60.0):
+        super().__init__(name, ttl)
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(self._key(key))
+        return self._record(json.loads(raw) if raw is not None else None)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.client.set(self._key(key), json.dumps(value, default=str), ex=int(ttl or self.ttl))
+
+    async def delete(self, key: str) -> None:
+        if await self.client.delete(self._key(key)):
+            self.invalidations += 1
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.name}:*"):
+            await self.client.delete(key)
+            self.invalidations += 1
+
+
+def create_cache(name: str, maxsize: int = 1000, ttl: float = 60.0) -> BaseCache:
+    """
+    設定（CACHE_BACKEND）に応じたキャッシュを作成して登録する
+    redis が使えない場合はプロセス内キャッシュにフォールバックする
+    """
+    cache: BaseCache
+    if CACHE_BACKEND == "redis" and REDIS_URL:
+        try:
+            import redis.asyncio as redis
+            cache = RedisCache(name, redis.from_url(REDIS_URL), ttl=ttl)
+        except ImportError:
+            print("⚠️ redis パッケージがないためプロセス内キャッシュを使用します")
+            cache = TTLCache(name, maxsize=maxsize, ttl=ttl)
+    else:
+        cache = TTLCache(name, maxsize=maxsize, ttl=ttl)
+    return register_cache(cache)
+
+
+def register_cache(cache: BaseCache) -> BaseCache:
+    """
+    キャッシュを統計出力の対象に登録する
+    """
+    _caches[cache.name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    登録済みの全キャッシュの統計を返す
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,336 @@
+"""
+カレンダー（GET /api/calendar/month/{YYYY-MM}・/api/calendar/week/{YYYY-Www}）
+
+月・ISO週ごとに、ユーザーが参加するイベントを日付（CALENDAR_TIMEZONE）ごとにまとめて返す。
+イベント本体は期間内で1回だけ返し、日付 -> イベントの添字の一覧で並べる。
+複数日にまたがるイベント（end_time が翌日以降）はかかっている日すべてに展開する
+（最大 CALENDAR_MAX_EVENT_DAYS 日）。
+
+(ユーザー, タイムゾーン, 月) ごとに CALENDAR_CACHE_TTL 秒キャッシュし、週はキャッシュした月から組み立てる。
+前後の期間（prefetch）もまとめて返し、キャッシュにない月は1回のクエリで取得する。
+
+イベント・参加登録（userevents）の変更の通知（change_feed。書き込み系APIのフック・Realtime）では、
+そのイベントに参加するユーザーの、変更前後のイベントがかかる月の世代を上げる。
+キャッシュのキーに世代を含めるので、古い世代のものは参照されなくなる（他のユーザーのキャッシュはそのまま使える）。
+- キャッシュに載せたイベントは (ユーザー, 月) ごとに覚えておき、削除・移動・参加取り消しではその月の世代を上げる
+- 新しくかかる月は、イベントの変更なら参加ユーザーを userevents から1回引き、
+  参加登録の変更ならイベントの日時を1回取得して決める
+覚えておくイベントと世代は、世代が上がった (ユーザー, 月) と CALENDAR_CACHE_TTL 秒キャッシュに載せていない分を捨てる。
+世代はプロセス内に持つ（CACHE_BACKEND=redis で複数プロセスの場合、他のプロセスの変更は TTL まで反映されない）。
+"""
+import asyncio
+import itertools
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from ..config import CALENDAR_CACHE_MAXSIZE, CALENDAR_CACHE_TTL, CALENDAR_MAX_EVENT_DAYS
+from . import change_feed
+from .cache import create_cache
+from .reminder_service import _parse_timestamp
+
+calendar_cache = create_cache("calendar", maxsize=CALENDAR_CACHE_MAXSIZE, ttl=CALENDAR_CACHE_TTL)
+
+# (ユーザーID, 月 YYYY-MM)
+UserMonth = Tuple[str, str]
+
+# (ユーザー, 月) -> (世代, 上げた時刻)。ない場合は 0。
+# 世代は全体の連番にする（捨てた後に上げ直しても、以前のキーと同じ値にならない）
+_generations: Dict[UserMonth, Tuple[int, float]] = {}
+_generation_seq = itertools.count(1)
+# (ユーザー, 月) -> (最後にキャッシュに載せた時刻, 載せたイベントID)
+_tracked_events: Dict[UserMonth, Tuple[float, Set[str]]] = {}
+# イベントID -> キャッシュに載せた (ユーザー, 月)（_tracked_events の逆引き）
+_event_user_months: Dict[str, Set[UserMonth]] = {}
+# どのタイムゾーンの月も含むよう、変更されたイベントの前後に取る余裕（UTC±14時間）
+_TZ_MARGIN = timedelta(hours=14)
+
+
+# --- 期間 ---
+def parse_month(key: str) -> Tuple[date, date]:
+    """
+    "YYYY-MM" -> (初日, 末日)
+    """
+    first = datetime.strptime(key, "%Y-%m").date()
+    next_first = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, next_first - timedelta(days=1)
+
+
+def parse_week(key: str) -> Tuple[date, date]:
+    """
+    ISO週 "YYYY-Www" -> (月曜, 日曜)
+    """
+    year, week = key.split("-W")
+    monday = date.fromisocalendar(int(year), int(week), 1)
+    return monday, monday + timedelta(days=6)
+
+
+def shift_month(key: str, n: int) -> str:
+    first, _ = parse_month(key)
+    index = first.year * 12 + first.month - 1 + n
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def shift_week(key: str, n: int) -> str:
+    monday, _ = parse_week(key)
+    year, week, _ = (monday + timedelta(weeks=n)).isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+PERIODS = {"month": (parse_month, shift_month), "week": (parse_week, shift_week)}
+
+
+def months_between(first: date, last: date) -> List[str]:
+    months = []
+    current = first.replace(day=1)
+    while current <= last:
+        months.append(current.strftime("%Y-%m"))
+        current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return months
+
+
+def _local_start(day: date, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc)
+
+
+def _to_utc(value: str) -> datetime:
+    parsed = _parse_timestamp(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _event_days(row: Dict[str, Any], tz: ZoneInfo) -> Tuple[date, date]:
+    """
+    イベントがかかる日（タイムゾーン上の開始日・終了日）
+    ちょうど0時に終わるイベントはその日には含めない
+    """
+    start = _to_utc(row["start_time"])
+    first = start.astimezone(tz).date()
+    end = _to_utc(row["end_time"]) if row.get("end_time") else None
+    if end is None or end <= start:
+        return first, first
+    last = (end - timedelta(microseconds=1)).astimezone(tz).date()
+    return first, min(last, first + timedelta(days=CALENDAR_MAX_EVENT_DAYS - 1))
+
+
+# --- 変更の反映 ---
+def _generation(key: UserMonth) -> int:
+    return _generations.get(key, (0, 0.0))[0]
+
+
+def _track_month(key: UserMonth, event_ids: Iterable[str]) -> None:
+    _, tracked = _tracked_events.get(key, (0.0, set()))
+    for event_id in event_ids:
+        tracked.add(event_id)
+        _event_user_months.setdefault(event_id, set()).add(key)
+    _tracked_events[key] = (monotonic(), tracked)
+
+
+def _untrack_month(key: UserMonth) -> None:
+    _, tracked = _tracked_events.pop(key, (0.0, set()))
+    for event_id in tracked:
+        keys = _event_user_months.get(event_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _event_user_months[event_id]
+
+
+def _prune_tracking() -> None:
+    """
+    CALENDAR_CACHE_TTL 秒キャッシュに載せていない (ユーザー, 月) は、キャッシュがすべて期限切れなので覚えておかない
+    世代も、上げてから CALENDAR_CACHE_TTL 秒たてば古い世代のキャッシュは残っていないので捨てる
+    """
+    expired_before = monotonic() - CALENDAR_CACHE_TTL
+    for key in [key for key, (at, _) in _tracked_events.items() if at < expired_before]:
+        _untrack_month(key)
+    for key in [key for key, (_, at) in _generations.items() if at < expired_before]:
+        del _generations[key]
+
+
+def _bump(keys: Iterable[UserMonth]) -> None:
+    for key in keys:
+        _generations[key] = (next(_generation_seq), monotonic())
+        # 古い世代のキャッシュはもう参照されないので、載せたイベントも覚えておかない
+        _untrack_month(key)
+
+
+def _row_months(row: Dict[str, Any]) -> Set[str]:
+    """
+    行の日時がかかる月（どのタイムゾーンでも含むよう前後に余裕を取る）。日時がなければ空
+    """
+    if not row.get("start_time"):
+        return set()
+    start = _to_utc(row["start_time"])
+    end = _to_utc(row["end_time"]) if row.get("end_time") else start
+    end = min(max(end, start), start + timedelta(days=CALENDAR_MAX_EVENT_DAYS))
+    return set(months_between((start - _TZ_MARGIN).date(), (end + _TZ_MARGIN).date()))
+
+
+async def _on_event_change(db, table, change, record=None, old_record=None) -> None:
+    rows = [row for row in (record, old_record) if row]
+    if table == "events":
+        # 載せていたキャッシュ（削除・移動前の月）と、参加ユーザーの変更前後の日時がかかる月
+        event_ids = {str(row["id"]) for row in rows if row.get("id") is not None}
+        keys = {key for event_id in event_ids for key in _event_user_months.get(event_id, ())}
+        months = set().union(*(_row_months(row) for row in rows))
+        if change != "DELETE" and event_ids and months:
+            response = await db.table("userevents").select("user_id").in_("event_id", list(event_ids)).execute()
+            keys |= {(str(row["user_id"]), month) for row in response.data or [] for month in months}
+        _bump(keys)
+        return
+
+    # 参加登録の変更: そのユーザーの、イベントがかかる月（キャッシュに載る・消える月）の世代を上げる
+    event_ids = {str(row["event_id"]) for row in rows if row.get("event_id")}
+    if not event_ids:
+        raise ValueError("userevents の通知に event_id がありません")
+    user_ids = {str(row["user_id"]) for row in rows if row.get("user_id")}
+    response = await db.table("events").select("id, start_time, end_time").in_("id", list(event_ids)).execute()
+    found = {str(row["id"]): row for row in response.data or []}
+    keys: Set[UserMonth] = set()
+    for event_id in event_ids:
+        # ユーザーが分からない通知では、そのイベントを載せたすべてのキャッシュ
+        keys |= {key for key in _event_user_months.get(event_id, ()) if not user_ids or key[0] in user_ids}
+        if event_id in found:
+            keys |= {(user_id, month) for user_id in user_ids for month in _row_months(found[event_id])}
+    _bump(keys)
+
+
+change_feed.subscribe("calendar cache", ["events", "userevents"], _on_event_change, calendar_cache.clear)
+
+
+class CalendarService:
+    def __init__(self, supabase_client, tz: ZoneInfo):
+        self.supabase = supabase_client
+        self.tz = tz
+
+    def _cache_key(self, user_id: str, month: str) -> str:
+        return f"{user_id}:{self.tz.key}:{month}:{_generation((user_id, month))}"
+
+    def _build_month(self, month: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        月に日がかかるイベントを日ごとにまとめる
+        """
+        first, last = parse_month(month)
+        events: List[Dict[str, Any]] = []
+        days: Dict[str, List[int]] = defaultdict(list)
+        for row in rows:
+            start_day, end_day = _event_days(row, self.tz)
+            if end_day < first or start_day > last:
+                continue
+            index = len(events)
+            company = row.get("companies") or {}
+            events.append({
+                "id": str(row["id"]),
+                "title": row["title"],
+                "type": row["type"],
+                "start_time": row["start_time"],
+                "end_time": row.get("end_time"),
+                "company": company.get("name"),
+            })
+            day = max(start_day, first)
+            while day <= min(end_day, last):
+                days[day.isoformat()].append(index)
+                day += timedelta(days=1)
+        return {
+            "view": "month",
+            "key": month,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "events": events,
+            "days": dict(sorted(days.items())),
+        }
+
+    async def _fetch_months(self, user_id: str, months: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数の月をまとめて1回のクエリで取得する
+        （前の月から続いているイベントのため、開始日時は CALENDAR_MAX_EVENT_DAYS 日前から取る）
+        """
+        first = parse_month(min(months))[0]
+        last = parse_month(max(months))[1]
+        response = await self.supabase.table("events") \
+            .select("id, title, type, start_time, end_time, companies(name), userevents!inner(user_id)") \
+            .eq("userevents.user_id", user_id) \
+            .gte("start_time", (_local_start(first, self.tz) - timedelta(days=CALENDAR_MAX_EVENT_DAYS)).isoformat()) \
+            .lt("start_time", _local_start(last + timedelta(days=1), self.tz).isoformat()) \
+            .order("start_time").order("id") \
+            .execute()
+        rows = response.data or []
+        return {month: self._build_month(month, rows) for month in months}
+
+    async def get_months(self, user_id: str, months: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        月ごとのデータを返す（キャッシュにない月だけを取得する）
+        """
+        months = sorted(set(months))
+        keys = {month: self._cache_key(user_id, month) for month in months}
+        cached = await asyncio.gather(*(calendar_cache.get(keys[month]) for month in months))
+        result = {month: value for month, value in zip(months, cached) if value is not None}
+
+        missing = [month for month in months if month not in result]
+        if missing:
+            _prune_tracking()
+            fetched = await self._fetch_months(user_id, missing)
+            for month, bucket in fetched.items():
+                # 取得中にイベントが変更された月は、古い内容を新しい世代のキーで保存しないよう保存しない
+                if keys[month] == self._cache_key(user_id, month):
+                    await calendar_cache.set(keys[month], bucket)
+                _track_month((user_id, month), [event["id"] for event in bucket["events"]])
+            result.update(fetched)
+        return result
+
+    @staticmethod
+    def _build_week(week: str, months: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        週にかかる月のデータから週の分を取り出す
+        """
+        first, last = parse_week(week)
+        events: List[Dict[str, Any]] = []
+        indexes: Dict[str, int] = {}
+        days: Dict[str, List[int]] = {}
+        for month in months_between(first, last):
+            bucket = months[month]
+            for day, event_indexes in bucket["days"].items():
+                if not first.isoformat() <= day <= last.isoformat():
+                    continue
+                days[day] = []
+                for index in event_indexes:
+                    event = bucket["events"][index]
+                    if event["id"] not in indexes:
+                        indexes[event["id"]] = len(events)
+                        events.append(event)
+                    days[day].append(indexes[event["id"]])
+        return {
+            "view": "week",
+            "key": week,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "events": events,
+            "days": days,
+        }
+
+    async def get_view(self, user_id, view: str, key: str, prefetch: int = 0) -> Dict[str, Any]:
+        """
+        月・週のデータと、前後 prefetch 期間分のデータ（adjacent）を返す
+        """
+        user_id = str(user_id)
+        parse, shift = PERIODS[view]
+        periods = [shift(key, n) for n in range(-prefetch, prefetch + 1)]
+        spans = {period: parse(period) for period in periods}
+        months = await self.get_months(
+            user_id, {month for first, last in spans.values() for month in months_between(first, last)}
+        )
+
+        def build(period: str) -> Dict[str, Any]:
+            return months[period] if view == "month" else self._build_week(period, months)
+
+        # キャッシュの値をそのまま変更しないよう、外側の dict は作り直す
+        key = shift(key, 0)
+        return {
+            **build(key),
+            "timezone": self.tz.key,
+            "adjacent": {period: build(period) for period in periods if period != key},
+        }
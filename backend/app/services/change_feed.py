@@ -0,0 +1,106 @@
+"""
+テーブルの変更の通知
+
+書き込み系APIのフック（notify_change）と Supabase Realtime の両方の変更を、
+テーブルごとに登録したハンドラ（各キャッシュ）へ配る。
+キャッシュ側は subscribe() で自分が見るテーブルとハンドラを登録するだけで、他のキャッシュには依存しない。
+
+フロントエンドが Supabase に直接書き込む変更は Realtime でしか届かないので、
+DBが Supabase のときは起動時に start_realtime() で、登録されたテーブルをすべて購読する
+（対象テーブルの公開設定は docs/migrations/003_reminder_realtime.sql・006_change_feed_realtime.sql）。
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..models.bulk import BulkOperation
+
+# (db, テーブル, "INSERT" / "UPDATE" / "DELETE", 変更後の行, 変更前の行)
+ChangeHandler = Callable[[Any, str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], Awaitable[None]]
+# 反映に失敗したときに呼ぶ（キャッシュをすべて破棄するなど）
+ErrorHandler = Callable[[], Awaitable[None]]
+
+# テーブル -> (名前, ハンドラ, 失敗時)
+_handlers: Dict[str, List[Tuple[str, ChangeHandler, Optional[ErrorHandler]]]] = {}
+
+
+def subscribe(name: str, tables, handler: ChangeHandler, on_error: Optional[ErrorHandler] = None) -> None:
+    """
+    tables の変更を handler に届ける（モジュールの読み込み時に呼ぶ）
+    """
+    for table in tables:
+        _handlers.setdefault(table, []).append((name, handler, on_error))
+
+
+def watched_tables() -> List[str]:
+    return sorted(_handlers)
+
+
+async def notify_change(
+    db,
+    table: str,
+    change: str,
+    record: Optional[Dict[str, Any]] = None,
+    old_record: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    書き込み系APIから呼ぶフック（Realtime の通知もここを通る）
+    ハンドラごとに反映し、失敗したものは on_error で破棄する（次の読み出しで読み込み直す）
+    """
+    for name, handler, on_error in _handlers.get(table, ()):
+        try:
+            await handler(db, table, change, record, old_record)
+        except Exception as e:
+            print(f"Error applying {table} {change} to {name}: {e}")
+            if on_error is not None:
+                await on_error()
+
+
+async def notify_bulk(db, table: str, response: Dict[str, Any]) -> None:
+    """
+    一括API（run_bulk）の成功した操作を1件ずつ反映する
+    """
+    for result in response["results"]:
+        if result.status != 200:
+            continue
+        if result.op == BulkOperation.delete:
+            await notify_change(db, table, "DELETE", old_record=result.data or {"id": str(result.id)})
+        else:
+            change = "INSERT" if result.op == BulkOperation.create else "UPDATE"
+            await notify_change(db, table, change, result.data)
+
+
+# --- Supabase Realtime ---
+_realtime_client = None
+_realtime_channel = None
+_realtime_tasks: Set[asyncio.Task] = set()
+
+
+async def start_realtime(client) -> None:
+    """
+    登録されたテーブルの変更を Realtime で購読する
+    """
+    global _realtime_client, _realtime_channel
+
+    def on_change(payload: Dict[str, Any]) -> None:
+        data = payload["data"]
+        # コールバックは同期関数なので、反映はタスクとして実行する
+        task = asyncio.get_running_loop().create_task(notify_change(
+            client, data["table"], data["type"], data.get("record"), data.get("old_record")
+        ))
+        _realtime_tasks.add(task)
+        task.add_done_callback(_realtime_tasks.discard)
+
+    channel = client.channel("change-feed")
+    for table in watched_tables():
+        channel.on_postgres_changes("*", callback=on_change, table=table, schema="public")
+    await channel.subscribe()
+    _realtime_client = client
+    _realtime_channel = channel
+
+
+async def stop_realtime() -> None:
+    global _realtime_client, _realtime_channel
+    if _realtime_channel is not None:
+        await _realtime_client.remove_channel(_realtime_channel)
+        _realtime_client = None
+        _realtime_channel = None
@@ -0,0 +1,394 @@
+"""
+企業カタログの検索インデックス（GET /api/companies/search）
+
+企業選択フォームは companies を全件取得してブラウザで絞り込んでいた。
+ここではプロセス内に
+- 正規化した企業名の昇順配列（前方一致は bisect で範囲を引く）
+- 正規化した企業名の1文字・2文字（bigram） -> 企業ID の転置インデックス（部分一致・あいまい一致）
+- 業界 -> 企業ID（業界での絞り込み・業界名での検索）
+を持ち、順位の高い上位K件だけを返す。
+
+正規化は NFKC（全角英数・半角カナをそろえる）→ 小文字 → カタカナをひらがなに →
+「株式会社」「(株)」などの法人格と空白・記号を除く。漢字は分かち書きせず文字の bigram で引く
+（読みの辞書は持たないので「とよた」で「豊田」は引けない）。
+
+順位: 完全一致 > 前方一致 > 部分一致 > 業界名に一致 > あいまい一致（bigram の Dice 係数）。
+同じ順位の中では類似度の高い順・正規化した名前の順。
+
+companies の変更の通知（change_feed。書き込み系APIのフック・Realtime）で1件ずつ反映し、
+取りこぼしに備えて COMPANY_INDEX_TTL ごとに読み込み直す（読み込み中は古いインデックスで応答する）。
+"""
+import asyncio
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config import COMPANY_INDEX_TTL, EXPORT_CHUNK_SIZE
+from . import change_feed
+from .cache import BaseCache, register_cache
+
+# 正規化で取り除く法人格（NFKC の後なので「㈱」「（株）」は「(株)」になっている）
+LEGAL_FORMS = (
+    "株式会社", "有限会社", "合同会社", "合資会社", "合名会社",
+    "(株)", "(有)", "(同)", "(資)", "(名)",
+)
+# あいまい一致として返す最低の類似度（Dice 係数）
+FUZZY_MIN_SIMILARITY = 0.4
+
+# 順位（大きいほど上）
+EXACT, PREFIX, SUBSTRING, INDUSTRY, FUZZY = 4, 3, 2, 1, 0
+MATCH_TYPES = {EXACT: "exact", PREFIX: "prefix", SUBSTRING: "substring", INDUSTRY: "industry", FUZZY: "fuzzy"}
+
+# カタカナ（ァ-ヶ） -> ひらがな
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)}
+# 空白・記号・アンダースコア
+_NON_WORD = re.compile(r"[\W_]+")
+# 前方一致の範囲の上端
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    検索用に企業名・検索語を正規化する
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower().translate(_KATAKANA_TO_HIRAGANA)
+    for form in LEGAL_FORMS:
+        text = text.replace(form, "")
+    # 文字（かな・漢字・長音記号を含む）と数字だけを残す
+    return _NON_WORD.sub("", text)
+
+
+def _grams(key: str) -> Set[str]:
+    """
+    あいまい一致に使う n-gram（2文字以上なら bigram、1文字ならその文字）
+    """
+    if len(key) < 2:
+        return {key} if key else set()
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def _industry_of(row: Dict[str, Any]) -> Optional[str]:
+    # スキーマ上は industry_id、フロントエンド・モデルは industry
+    value = row.get("industry", row.get("industry_id"))
+    return None if value is None else str(value)
+
+
+class CompanyCatalog:
+    """
+    1回の読み込み分のインデックス（読み込み直すときは新しく作って差し替える）
+    """
+
+    def __init__(self, industry_names: Dict[str, str]):
+        # 業界ID -> 正規化した業界名
+        self.industry_names = {industry_id: normalize(name) for industry_id, name in industry_names.items()}
+        # 企業ID -> 返す列・正規化した名前など
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # (正規化した名前, 企業ID) の昇順
+        self.keys: List[Tuple[str, str]] = []
+        # 企業ID -> 同じ順位の中での並び順（短い名前 = 検索語に近いものが先）
+        self.order: Dict[str, Tuple[int, str, str]] = {}
+        # 1文字・bigram -> 企業ID
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        # 業界ID -> 企業ID
+        self.by_industry: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load(self, rows: Iterable[Dict[str, Any]], sort: bool = True) -> None:
+        """
+        まとめて追加する（名前順の配列は1件ずつ挿入せず、最後に1回だけ並べ替える）
+        分けて読み込むときは最後の1回以外は sort=False にする
+        """
+        for row in rows:
+            self.upsert(row, keep_sorted=False)
+        if sort:
+            self.keys.sort()
+
+    def upsert(self, row: Dict[str, Any], keep_sorted: bool = True) -> None:
+        company_id = str(row["id"])
+        previous = self.entries.get(company_id)
+        if previous is not None:
+            # 一部の列だけの通知でも残りの列は保持する
+            row = {**previous["row"], **row}
+            self.remove(company_id)
+        if not row.get("name"):
+            return
+
+        key = normalize(row["name"])
+        grams = _grams(key)
+        industry = _industry_of(row)
+        self.entries[company_id] = {
+            "key": key,
+            "grams": len(grams),
+            "industry": industry,
+            "row": {
+                "id": company_id,
+                "name": row["name"],
+                "url": row.get("url"),
+                "industry": row.get("industry", row.get("industry_id")),
+            },
+        }
+        self.order[company_id] = (len(key), key, company_id)
+        if keep_sorted:
+            insort(self.keys, (key, company_id))
+        else:
+            self.keys.append((key, company_id))
+        for gram in grams.union(key):
+            self.postings[gram].add(company_id)
+        if industry is not None:
+            self.by_industry[industry].add(company_id)
+
+    def remove(self, company_id: str) -> None:
+        entry = self.entries.pop(str(company_id), None)
+        if entry is None:
+            return
+        key = entry["key"]
+        del self.order[company_id]
+        index = bisect_left(self.keys, (key, company_id))
+        if index < len(self.keys) and self.keys[index] == (key, company_id):
+            del self.keys[index]
+        for gram in _grams(key).union(key):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(company_id)
+                if not ids:
+                    del self.postings[gram]
+        if entry["industry"] is not None:
+            self.by_industry[entry["industry"]].discard(company_id)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        返す列だけの全企業（正規化した名前順）
+        """
+        return [self.entries[company_id]["row"] for _, company_id in self.keys]
+
+    def apply(self, change: str, record: Optional[Dict[str, Any]], old_record: Optional[Dict[str, Any]]) -> None:
+        if change == "DELETE":
+            row = old_record or record
+            if row and row.get("id"):
+                self.remove(str(row["id"]))
+        elif record and record.get("id"):
+            self.upsert(record)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        industry: Optional[str] = None,
+        exclude: Iterable[str] = ()
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        上位 offset + limit 件のうち後ろの limit 件を返す（と、続きがあるか）
+        検索語が空なら名前順に並べる
+
+        順位の高いものから調べ、offset + limit + 1 件埋まった時点で残りの順位は調べない
+        （よくある前方一致の入力では名前順の配列の先頭数件を見るだけで終わる）
+        """
+        exclude = {str(company_id) for company_id in exclude}
+        wanted = offset + limit + 1
+        q = normalize(query)
+        ranked: List[Tuple[str, int, float]] = []
+        seen: Set[str] = set()
+
+        def add(company_id: str, rank: int, similarity: float) -> bool:
+            if company_id in seen or company_id in exclude:
+                return False
+            if industry is not None and self.entries[company_id]["industry"] != industry:
+                return False
+            seen.add(company_id)
+            ranked.append((company_id, rank, similarity))
+            return len(ranked) >= wanted
+
+        def add_in_order(candidates: Iterable[str], rank: int, similarity) -> bool:
+            # 並び順（名前の短い順）に取り出す。全件は並べ替えず、必要な分だけヒープから取る
+            heap = list(map(self.order.__getitem__, candidates))
+            heapq.heapify(heap)
+            while heap:
+                _, key, company_id = heapq.heappop(heap)
+                score = similarity(key)
+                if score is not None and add(company_id, rank, score):
+                    return True
+            return False
+
+        # 完全一致・前方一致は名前順の範囲をそのまま使う
+        start = bisect_left(self.keys, (q,))
+        end = bisect_left(self.keys, (q + _MAX_CHAR,)) if q else len(self.keys)
+        for index in range(start, end):
+            key, company_id = self.keys[index]
+            if add(company_id, EXACT if key == q else PREFIX, len(q) / len(key) if key else 1.0):
+                break
+
+        if q and len(ranked) < wanted:
+            query_grams = _grams(q)
+            postings = sorted((self.postings.get(gram, set()) for gram in query_grams), key=len)
+
+            # 部分一致: 検索語の bigram をすべて含む企業（集合の積）のうち、実際に続けて含むもの
+            candidates = postings[0].intersection(*postings[1:])
+            done = add_in_order(candidates, SUBSTRING, lambda key: len(q) / len(key) if q in key else None)
+
+            # 業界名に検索語を含む業界の企業
+            if not done:
+                in_industries = [
+                    self.by_industry.get(industry_id, set())
+                    for industry_id, name in self.industry_names.items() if q in name
+                ]
+                done = add_in_order(set().union(*in_industries), INDUSTRY, lambda key: 0.0)
+
+            # あいまい一致: 共通の bigram の数から Dice 係数を出し、高い順
+            if not done:
+                hits: Counter = Counter()
+                for ids in postings:
+                    hits.update(ids)
+                scored = []
+                for company_id, count in hits.items():
+                    if company_id in seen:
+                        continue
+                    similarity = 2 * count / (len(query_grams) + self.entries[company_id]["grams"])
+                    if similarity >= FUZZY_MIN_SIMILARITY:
+                        scored.append((-similarity, self.order[company_id], company_id))
+                heapq.heapify(scored)
+                while scored:
+                    similarity, _, company_id = heapq.heappop(scored)
+                    if add(company_id, FUZZY, -similarity):
+                        break
+
+        page = ranked[offset:offset + limit]
+        items = [
+            {
+                **self.entries[company_id]["row"],
+                "match": MATCH_TYPES[rank] if q else None,
+                "score": round(similarity, 3) if q else None,
+            }
+            for company_id, rank, similarity in page
+        ]
+        return items, len(ranked) > offset + limit
+
+
+class CompanyIndex(BaseCache):
+    """
+    CompanyCatalog を保持し、期限が来たら裏で読み込み直す
+
+    hits: 読み込み済みのインデックスで応答した回数 / misses: DBから読み込んだ回数
+    """
+
+    def __init__(self, name: str, ttl: float):
+        super().__init__(name, ttl)
+        self.updates = 0
+        # 読み込み・変更の反映のたびに増える版（参照データのスナップショットの作り直しの判定に使う）
+        self.version = 0
+        self.loaded_at = 0.0
+        self.load_seconds = 0.0
+        self._catalog: Optional[CompanyCatalog] = None
+        self._loading: Optional[asyncio.Task] = None
+        # 読み込み中に届いた変更（読み込み終わったインデックスに適用し直す）
+        self._pending: Optional[List[Tuple[str, Any, Any]]] = None
+
+    async def _fetch_industry_names(self, db) -> Dict[str, str]:
+        try:
+            response = await db.table("industries").select("id, industries").execute()
+        except Exception as e:
+            print(f"Error fetching industries for company index: {e}")
+            return {}
+        return {str(row["id"]): row["industries"] for row in response.data or [] if row.get("industries")}
+
+    async def _load(self, db) -> None:
+        """
+        companies を id 順に EXPORT_CHUNK_SIZE 件ずつ読み込んでインデックスを作り直す
+        """
+        started = time.perf_counter()
+        self._pending = []
+        try:
+            catalog = CompanyCatalog(await self._fetch_industry_names(db))
+            last_id = None
+            while True:
+                query = db.table("companies").select("*").order("id").limit(EXPORT_CHUNK_SIZE)
+                if last_id is not None:
+                    query = query.gt("id", last_id)
+                rows = (await query.execute()).data or []
+                # 1回の読み込みの間だけイベントループを止める（全件まとめて作ると数秒止まる）
+                catalog.load(rows, sort=False)
+                if len(rows) < EXPORT_CHUNK_SIZE:
+                    break
+                last_id = rows[-1]["id"]
+            catalog.load([])
+            for change in self._pending:
+                catalog.apply(*change)
+        finally:
+            self._pending = None
+
+        self._catalog = catalog
+        self.version += 1
+        self.misses += 1
+        self.loaded_at = time.monotonic()
+        self.load_seconds = time.perf_counter() - started
+        print(f"✅ Company index loaded: {len(catalog)} companies in {self.load_seconds * 1000:.0f}ms")
+
+    def _start_load(self, db) -> asyncio.Task:
+        # 同時に来た読み込みは1回にまとめる
+        if self._loading is None:
+            self._loading = asyncio.get_running_loop().create_task(self._load(db))
+            self._loading.add_done_callback(self._load_done)
+        return self._loading
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        self._loading = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error loading company index: {task.exception()}")
+
+    async def get(self, db) -> CompanyCatalog:
+        """
+        インデックスを返す。未読み込みなら読み込みを待ち、期限切れなら裏で読み込み直す
+        """
+        if self._catalog is None:
+            await asyncio.shield(self._start_load(db))
+        elif time.monotonic() - self.loaded_at >= self.ttl:
+            self._start_load(db)
+        self.hits += 1
+        return self._catalog
+
+    def apply_change(self, change: str, record: Optional[Dict[str, Any]] = None,
+                     old_record: Optional[Dict[str, Any]] = None) -> None:
+        """
+        companies の書き込みを反映する（未読み込みなら何もしない。次の読み込みで読まれる）
+        """
+        if self._pending is not None:
+            self._pending.append((change, record, old_record))
+        if self._catalog is not None:
+            self._catalog.apply(change, record, old_record)
+            self.updates += 1
+            self.version += 1
+
+    async def clear(self) -> None:
+        if self._catalog is not None:
+            self.invalidations += len(self._catalog)
+        self._catalog = None
+
+    def size(self) -> int:
+        return len(self._catalog) if self._catalog is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "updates": self.updates,
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self._catalog is not None else None,
+        })
+        return stats
+
+
+company_index = register_cache(CompanyIndex("company_index", ttl=COMPANY_INDEX_TTL))
+
+
+async def _on_company_change(db, table, change, record=None, old_record=None) -> None:
+    company_index.apply_change(change, record, old_record)
+
+
+change_feed.subscribe("company index", ["companies"], _on_company_change, company_index.clear)
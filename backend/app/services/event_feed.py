@@ -0,0 +1,324 @@
+"""
+イベントの ICS フィード（GET /api/events/feed.ics）
+
+全件: ユーザーが参加登録したイベントを export と同じく EXPORT_CHUNK_SIZE 件ずつ取得し、
+VEVENT にして逐次送る（件数によらずメモリ使用量は一定）。
+差分: sync_token（前回のレスポンスの X-Sync-Token）または updated_since を指定すると、
+変更ログ event_changes（docs/migrations/005_event_changes.sql）から、それ以降に変わったイベントと
+消えたイベント（STATUS:CANCELLED の VEVENT。UID だけ）だけを返す。
+
+同期トークンは「この seq までの変更は反映済み」という位置と発行時刻を base64 にした不透明な文字列。
+seq はコミット順ではないので、トークンは changed_at が ICS_SYNC_SETTLE_SECONDS 秒より前の変更までしか進めない
+（直近の変更は次回も返る。クライアントでは同じ UID で上書きされるだけなので、重複しても結果は変わらない）。
+ICS_CHANGE_RETENTION_DAYS 日より前のトークン・updated_since は変更ログが消えている可能性があるので 410 にする。
+
+企業名の変更は変更ログに載らないので、差分・ETag には反映されない（次の全件取得で反映される）。
+
+変更ログの古い行の削除（backend ディレクトリで。cron などで1日1回）:
+    python -m app.services.event_feed --prune
+"""
+import argparse
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from ..config import (
+    CALENDAR_TIMEZONE, EXPORT_CHUNK_SIZE, ICS_CHANGE_RETENTION_DAYS,
+    ICS_REFRESH_INTERVAL, ICS_SYNC_SETTLE_SECONDS,
+)
+from ..pagination import encode_cursor
+from .calendar import _to_utc
+from .export import DATASETS, EVENT_TYPE_LABELS, iter_rows
+from .reminder_service import IN_FILTER_CHUNK_SIZE
+
+PRODID = "-//dai-job//Events//JA"
+UID_DOMAIN = "dai-job"
+
+# userevents.status -> VEVENT の STATUS
+EVENT_STATUSES = {
+    "Entry": "TENTATIVE",
+    "Joined": "CONFIRMED",
+    "Canceled": "CANCELLED",
+}
+
+
+class SyncTokenExpired(Exception):
+    """
+    同期トークン・updated_since が変更ログの保持期間より古い（全件を取り直す必要がある）
+    """
+
+
+# --- iCalendar（RFC 5545）の組み立て ---
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """
+    75オクテットを超える行を折り返す（マルチバイト文字の途中では切らない）
+    """
+    if len(line.encode("utf-8")) <= 75:
+        return line
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for char in line:
+        length = len(char.encode("utf-8"))
+        if size + length > limit:
+            parts.append(current)
+            current, size, limit = "", 0, 74  # 続きの行は先頭の空白1オクテットの分だけ短い
+        current += char
+        size += length
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _format_time(value: Any) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return _to_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _lines(*lines: Optional[str]) -> str:
+    return "".join(_fold(line) + "\r\n" for line in lines if line is not None)
+
+
+def calendar_header(sync_token: str) -> str:
+    return _lines(
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:就活イベント",
+        f"X-WR-TIMEZONE:{CALENDAR_TIMEZONE}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{ICS_REFRESH_INTERVAL}M",
+        f"X-PUBLISHED-TTL:PT{ICS_REFRESH_INTERVAL}M",
+        f"X-SYNC-TOKEN:{sync_token}",
+    )
+
+
+CALENDAR_FOOTER = _lines("END:VCALENDAR")
+
+
+def vevent(row: Dict[str, Any], dtstamp: str) -> str:
+    """
+    イベントの行（companies(name), userevents(status) の埋め込み付き）を VEVENT にする
+    """
+    company = (row.get("companies") or {}).get("name")
+    summary = f"{company} {row['title']}" if company else row["title"]
+    links = row.get("userevents") or [{}]
+    status = EVENT_STATUSES.get(links[0].get("status"))
+    return _lines(
+        "BEGIN:VEVENT",
+        f"UID:{row['id']}@{UID_DOMAIN}",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART:{_format_time(row['start_time'])}",
+        f"DTEND:{_format_time(row['end_time'])}" if row.get("end_time") else None,
+        f"SUMMARY:{_escape(summary)}",
+        f"LOCATION:{_escape(row['location'])}" if row.get("location") else None,
+        f"DESCRIPTION:{_escape(row['description'])}" if row.get("description") else None,
+        f"CATEGORIES:{_escape(EVENT_TYPE_LABELS.get(row.get('type'), row.get('type') or ''))}",
+        f"STATUS:{status}" if status else None,
+        "END:VEVENT",
+    )
+
+
+def cancelled_vevent(event_id: str, dtstamp: str) -> str:
+    """
+    消えたイベントの墓石（METHOD:PUBLISH なので DTSTART は省略できる）
+    """
+    return _lines(
+        "BEGIN:VEVENT",
+        f"UID:{event_id}@{UID_DOMAIN}",
+        f"DTSTAMP:{dtstamp}",
+        "STATUS:CANCELLED",
+        "END:VEVENT",
+    )
+
+
+# --- 同期トークン ---
+def encode_sync_token(seq: int, issued_at: datetime) -> str:
+    return encode_cursor([seq, int(issued_at.timestamp())])
+
+
+def decode_sync_token(token: str) -> Tuple[int, datetime]:
+    """
+    (seq, 発行時刻) を返す。形式が不正なら ValueError
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        seq, issued = json.loads(raw)
+        return int(seq), datetime.fromtimestamp(int(issued), tz=timezone.utc)
+    except (TypeError, ValueError):
+        raise ValueError(f"sync_token が不正です: {token}")
+
+
+class EventFeed:
+    def __init__(self, supabase_client):
+        self.supabase = supabase_client
+        self.dataset = DATASETS["events"]
+
+    @staticmethod
+    def _settle_cutoff(now: datetime) -> datetime:
+        return now - timedelta(seconds=ICS_SYNC_SETTLE_SECONDS)
+
+    async def settled_position(self, now: datetime) -> int:
+        """
+        changed_at が ICS_SYNC_SETTLE_SECONDS 秒より前の変更のうち最後の seq（同期トークンの位置）
+        """
+        response = await self.supabase.table("event_changes").select("seq") \
+            .lt("changed_at", self._settle_cutoff(now).isoformat()) \
+            .order("seq", desc=True).limit(1).execute()
+        return response.data[0]["seq"] if response.data else 0
+
+    async def etag(self, user_id: UUID, now: datetime) -> Optional[str]:
+        """
+        全件フィードの ETag（ユーザーの最後の変更の seq）
+        直近の変更があるときは、seq の小さい変更が遅れてコミットされうるので付けない
+        """
+        response = await self.supabase.table("event_changes").select("seq, changed_at") \
+            .eq("user_id", str(user_id)).order("seq", desc=True).limit(1).execute()
+        if not response.data:
+            return '"0"'
+        last = response.data[0]
+        if _to_utc(last["changed_at"]) >= self._settle_cutoff(now):
+            return None
+        return f'"{last["seq"]}"'
+
+    async def changes(
+        self,
+        user_id: UUID,
+        after_seq: Optional[int] = None,
+        since: Optional[datetime] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Dict[str, bool]:
+        """
+        after_seq より後（または since 以降）の変更をイベントごとの最後の状態にまとめる
+
+        Returns:
+            イベントID -> 消えたか（最後に変更された順）
+        """
+        latest: Dict[str, bool] = {}
+        last_seq = after_seq
+        while True:
+            query = self.supabase.table("event_changes").select("seq, event_id, deleted").eq("user_id", str(user_id))
+            if since is not None:
+                query = query.gte("changed_at", since.isoformat())
+            if last_seq is not None:
+                query = query.gt("seq", last_seq)
+            response = await query.order("seq").limit(chunk_size).execute()
+            rows = response.data or []
+            for row in rows:
+                event_id = str(row["event_id"])
+                latest.pop(event_id, None)
+                latest[event_id] = bool(row["deleted"])
+            if len(rows) < chunk_size:
+                return latest
+            last_seq = rows[-1]["seq"]
+
+    async def _fetch_events(self, user_id: UUID, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        response = await self.supabase.table(self.dataset.table).select(self.dataset.select) \
+            .eq(self.dataset.user_column, str(user_id)) \
+            .in_("id", event_ids) \
+            .execute()
+        return {str(row["id"]): row for row in response.data or []}
+
+    async def stream_full(self, user_id: UUID, sync_token: str, now: datetime) -> AsyncIterator[bytes]:
+        """
+        参加登録したすべてのイベントをチャンクごとに返す
+        """
+        dtstamp = _format_time(now)
+        yield calendar_header(sync_token).encode("utf-8")
+        async for rows in iter_rows(self.supabase, self.dataset, user_id):
+            yield "".join(vevent(row, dtstamp) for row in rows).encode("utf-8")
+        yield CALENDAR_FOOTER.encode("utf-8")
+
+    async def stream_changes(
+        self, user_id: UUID, changes: Dict[str, bool], sync_token: str, now: datetime
+    ) -> AsyncIterator[bytes]:
+        """
+        変更されたイベントは最新の内容、消えたイベント（参加登録が消えたものを含む）は墓石で返す
+        """
+        dtstamp = _format_time(now)
+        yield calendar_header(sync_token).encode("utf-8")
+        event_ids = list(changes)
+        for i in range(0, len(event_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = event_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            alive = [event_id for event_id in chunk if not changes[event_id]]
+            rows = await self._fetch_events(user_id, alive) if alive else {}
+            yield "".join(
+                vevent(rows[event_id], dtstamp) if event_id in rows else cancelled_vevent(event_id, dtstamp)
+                for event_id in chunk
+            ).encode("utf-8")
+        yield CALENDAR_FOOTER.encode("utf-8")
+
+    async def prepare(
+        self,
+        user_id: UUID,
+        sync_token: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+        now: Optional[datetime] = None
+    ) -> Tuple[str, Optional[Dict[str, bool]]]:
+        """
+        新しい同期トークンと、差分のときは変更の一覧を返す（全件のときは None）
+
+        Raises:
+            ValueError: sync_token の形式が不正
+            SyncTokenExpired: 変更ログの保持期間より古い
+        """
+        now = now or datetime.now(timezone.utc)
+        oldest = now - timedelta(days=ICS_CHANGE_RETENTION_DAYS)
+        after_seq = None
+        if sync_token:
+            after_seq, issued_at = decode_sync_token(sync_token)
+            if issued_at < oldest:
+                raise SyncTokenExpired()
+        if updated_since is not None:
+            if updated_since.tzinfo is None:
+                updated_since = updated_since.replace(tzinfo=timezone.utc)
+            if updated_since < oldest:
+                raise SyncTokenExpired()
+
+        # 変更を読む前に位置を決める（読んでいる間の変更は次回に返る）
+        position = await self.settled_position(now)
+        token = encode_sync_token(max(position, after_seq or 0), now)
+        if after_seq is None and updated_since is None:
+            return token, None
+        return token, await self.changes(user_id, after_seq=after_seq, since=updated_since)
+
+
+async def prune_changes(supabase_client, now: Optional[datetime] = None) -> int:
+    """
+    ICS_CHANGE_RETENTION_DAYS 日より前の変更ログを消し、消した件数を返す
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=ICS_CHANGE_RETENTION_DAYS)).isoformat()
+    response = await supabase_client.table("event_changes").delete(count="exact").lt("changed_at", cutoff).execute()
+    return response.count or 0
+
+
+async def main():
+    from ..database import init_database, close_database
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prune", action="store_true", help="保持期間より古い変更ログを消す")
+    args = parser.parse_args()
+    if not args.prune:
+        parser.print_help()
+        return
+
+    supabase = await init_database()
+    try:
+        print(f"✅ Pruned {await prune_changes(supabase)} event changes older than {ICS_CHANGE_RETENTION_DAYS} days")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
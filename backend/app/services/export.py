@@ -0,0 +1,271 @@
+"""
+データエクスポート（CSV / NDJSON）のストリーミング生成
+
+frontend の /api/export/companies は全行をメモリに載せてから CSV を組み立てていた。
+ここではキーセットで EXPORT_CHUNK_SIZE 件ずつ取得し、チャンクごとに文字列化して yield するので、
+件数が増えても保持するのは常に1チャンク分だけになる。
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from ..config import EXPORT_CHUNK_SIZE
+from ..pagination import Keyset, apply_keyset, split_page
+
+JST = timezone(timedelta(hours=9))
+
+T = TypeVar("T")
+
+STATUS_LABELS = {
+    "Interested": "気になる",
+    "Entry": "エントリー",
+    "ES_Submit": "ES提出済",
+    "Interview": "面接選考中",
+    "Offer": "内定",
+    "Rejected": "お見送り",
+}
+
+EVENT_TYPE_LABELS = {
+    "Interview": "面接",
+    "Deadline": "締切",
+    "Seminar": "説明会",
+    "Other": "その他",
+}
+
+
+def format_datetime(value: Optional[str]) -> str:
+    """
+    ISO8601 の日時を日本時間の "YYYY/MM/DD HH:MM" にする
+    """
+    if not value:
+        return ""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(JST).strftime("%Y/%m/%d %H:%M")
+    except ValueError:
+        return value
+
+
+def _company_name(row: Dict[str, Any]) -> str:
+    return (row.get("companies") or {}).get("name", "")
+
+
+def _event_title(row: Dict[str, Any]) -> str:
+    return (row.get("events") or {}).get("title", "")
+
+
+class ExportDataset:
+    """
+    エクスポート対象の定義
+
+    Args:
+        table: 取得するテーブル
+        select: select 句（埋め込みを含む）
+        user_column: ユーザーで絞り込む列（埋め込み先なら "userevents.user_id" のように書く）
+        keyset: 並び順（チャンク取得のカーソルにも使う）
+        date_column: start_date / end_date で絞り込む列
+        status_column: status で絞り込む列（なければ None）
+        columns: CSV の (見出し, 値を取り出す関数) の一覧
+    """
+
+    def __init__(
+        self,
+        table: str,
+        select: str,
+        user_column: str,
+        keyset: Keyset,
+        date_column: str,
+        status_column: Optional[str],
+        columns: List[Tuple[str, Callable[[Dict[str, Any]], Any]]]
+    ):
+        self.table = table
+        self.select = select
+        self.user_column = user_column
+        self.keyset = keyset
+        self.date_column = date_column
+        self.status_column = status_column
+        self.columns = columns
+
+
+DATASETS: Dict[str, ExportDataset] = {
+    "companies": ExportDataset(
+        table="usercompanyselections",
+        # ログインIDやパスワードなどマイページの認証情報は出力しない
+        select="id, company_id, status, motivation_level, created_at, updated_at, companies!inner(*)",
+        user_column="user_id",
+        keyset=Keyset("created_at", desc=True),
+        date_column="created_at",
+        status_column="status",
+        columns=[
+            ("企業名", _company_name),
+            ("URL", lambda row: (row.get("companies") or {}).get("url") or ""),
+            ("ステータス", lambda row: STATUS_LABELS.get(row.get("status"), row.get("status"))),
+            ("志望度", lambda row: row.get("motivation_level") or ""),
+            ("登録日時", lambda row: format_datetime(row.get("created_at"))),
+        ],
+    ),
+    "events": ExportDataset(
+        table="events",
+        select="*, companies(name), userevents!inner(status)",
+        user_column="userevents.user_id",
+        keyset=Keyset("start_time"),
+        date_column="start_time",
+        status_column="userevents.status",
+        columns=[
+            ("タイトル", lambda row: row.get("title", "")),
+            ("種類", lambda row: EVENT_TYPE_LABELS.get(row.get("type"), row.get("type"))),
+            ("企業名", _company_name),
+            ("開始日時", lambda row: format_datetime(row.get("start_time"))),
+            ("終了日時", lambda row: format_datetime(row.get("end_time"))),
+            ("場所", lambda row: row.get("location") or ""),
+        ],
+    ),
+    "tasks": ExportDataset(
+        table="tasks",
+        select="*, companies(name)",
+        user_column="user_id",
+        keyset=Keyset("created_at"),
+        date_column="created_at",
+        status_column=None,
+        columns=[
+            ("タイトル", lambda row: row.get("title", "")),
+            ("企業名", _company_name),
+            ("期限", lambda row: format_datetime(row.get("due_date"))),
+            ("完了", lambda row: "済" if row.get("is_completed") else "未"),
+            ("登録日時", lambda row: format_datetime(row.get("created_at"))),
+        ],
+    ),
+    "es_entries": ExportDataset(
+        table="es_entries",
+        select="*, companies(name)",
+        user_column="user_id",
+        keyset=Keyset("created_at"),
+        date_column="created_at",
+        status_column="status",
+        columns=[
+            ("企業名", _company_name),
+            ("ステータス", lambda row: row.get("status") or ""),
+            ("提出日", lambda row: row.get("submitted_at") or ""),
+            ("内容", lambda row: row.get("content") or ""),
+            ("登録日時", lambda row: format_datetime(row.get("created_at"))),
+        ],
+    ),
+    "reflections": ExportDataset(
+        table="reflections",
+        select="*, events!inner(title, start_time, companies(name), userevents!inner())",
+        user_column="events.userevents.user_id",
+        keyset=Keyset("created_at", desc=True),
+        date_column="created_at",
+        status_column=None,
+        columns=[
+            ("イベント", _event_title),
+            ("企業名", lambda row: ((row.get("events") or {}).get("companies") or {}).get("name", "")),
+            ("良かった点", lambda row: row.get("good_points") or ""),
+            ("改善点", lambda row: row.get("bad_points") or ""),
+            ("自己評価", lambda row: row.get("self_score") or ""),
+            ("内容", lambda row: row.get("content") or ""),
+            ("登録日時", lambda row: format_datetime(row.get("created_at"))),
+        ],
+    ),
+}
+
+
+async def iter_rows(
+    db,
+    dataset: ExportDataset,
+    user_id: UUID,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    フィルタに一致する行をキーセットで chunk_size 件ずつ取得して返す
+    """
+    cursor = None
+    while True:
+        query = db.table(dataset.table).select(dataset.select).eq(dataset.user_column, str(user_id))
+        if status and status != "all" and dataset.status_column:
+            query = query.eq(dataset.status_column, status)
+        if start_date:
+            query = query.gte(dataset.date_column, start_date.isoformat())
+        if end_date:
+            query = query.lte(dataset.date_column, end_date.isoformat())
+
+        response = await apply_keyset(query, dataset.keyset, cursor, chunk_size).execute()
+        rows, cursor = split_page(response.data or [], dataset.keyset, chunk_size)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+
+async def prefetch(chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    最初のチャンクを取得してから、それを先頭に戻したイテレータを返す
+    最初のクエリのエラーはここで投げるので、送信を始める前に 4xx / 5xx にできる
+    """
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def chained() -> AsyncIterator[T]:
+        if first is not None:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return chained()
+
+
+def _csv_text(rows: List[List[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_csv(chunks: AsyncIterator[List[Dict[str, Any]]], dataset: ExportDataset) -> AsyncIterator[bytes]:
+    """
+    CSV を1チャンクずつ返す（Excel 向けに先頭に BOM を付ける）
+    """
+    header = [name for name, _ in dataset.columns]
+    yield ("\ufeff" + _csv_text([header])).encode("utf-8")
+    async for rows in chunks:
+        yield _csv_text([[get(row) for _, get in dataset.columns] for row in rows]).encode("utf-8")
+
+
+async def stream_ndjson(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    1行1 JSON オブジェクトで返す（DBの行をそのまま出力する）
+    """
+    async for rows in chunks:
+        yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows).encode("utf-8")
+
+
+async def gzip_stream(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    ストリームを gzip で逐次圧縮する
+    """
+    compressor = zlib.compressobj(wbits=31)
+    async for data in body:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def guard_stream(body: AsyncIterator[bytes], name: str) -> AsyncIterator[bytes]:
+    """
+    送信開始後はステータスを変えられないので、途中のエラーはログに残して接続ごと打ち切る
+    （クライアントには不完全なダウンロードとして見える）
+    """
+    try:
+        async for data in body:
+            yield data
+    except Exception as e:
+        print(f"Error streaming {name} export: {e}")
+        raise
@@ -1,18 +1,142 @@
 """
 Google API 統合サービス
+
+httpx.AsyncClient はアプリ起動時に1つだけ作成して使い回す（HTTP/2・コネクションプール）。
+呼び出しごとに TCP+TLS の接続を張り直さないので、2回目以降のレイテンシが小さくなる。
+一時的なエラー（接続失敗・429・5xx）は指数バックオフでリトライする。
+
+検索結果は正規化したクエリ（近隣検索は丸めた緯度経度と半径）をキーにキャッシュし、
+同じキーの同時呼び出しは上流への1回の呼び出しにまとめる（lookup_cache.py）。
 """
+import asyncio
+import random
+import re
+import time
+import unicodedata
 import httpx
-from typing import List, Optional
-from ..config import GOOGLE_API_KEY, SEARCH_ENGINE_ID
+from typing import Any, Dict, List, Optional
+from ..config import (
+    GOOGLE_API_KEY,
+    SEARCH_ENGINE_ID,
+    GOOGLE_API_TIMEOUT,
+    GOOGLE_API_MAX_CONNECTIONS,
+    GOOGLE_API_MAX_RETRIES,
+    GOOGLE_API_RETRY_BACKOFF,
+    SEARCH_CACHE_TTL,
+    PLACES_CACHE_TTL,
+    SEARCH_CACHE_MAXSIZE,
+    SEARCH_CACHE_PATH,
+)
+from ..metrics import record_external_call
 from ..models.search import SearchResult, Place
+from .lookup_cache import SQLiteStore, create_lookup_cache
 
-async def search_company_info(query: str) -> List[SearchResult]:
+# リトライ対象のステータスコード
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# アプリ全体で共有するHTTPクライアント（startupで作成、shutdownで破棄）
+_http_client: Optional[httpx.AsyncClient] = None
+
+# 近隣検索のキャッシュキーに使う緯度経度の小数桁数（4桁 ≒ 11m）
+PLACES_COORD_PRECISION = 4
+
+_cache_store = SQLiteStore(SEARCH_CACHE_PATH) if SEARCH_CACHE_PATH else None
+search_cache = create_lookup_cache(
+    "google_search", maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL, store=_cache_store
+)
+places_cache = create_lookup_cache(
+    "google_places", maxsize=SEARCH_CACHE_MAXSIZE, ttl=PLACES_CACHE_TTL, store=_cache_store
+)
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
     """
-    Google Custom Search APIを使用して企業情報を検索
+    Google API 用の httpx クライアントを作成する
+    transport を渡すとモック（httpx.MockTransport）に差し替えられる
     """
-    if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
-        return []
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(GOOGLE_API_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=GOOGLE_API_MAX_CONNECTIONS,
+            max_keepalive_connections=GOOGLE_API_MAX_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+        transport=transport,
+    )
+
+
+async def init_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    アプリ起動時に呼び出し、共有クライアントを作成する
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client(transport)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    アプリ終了時に呼び出し、コネクションプールを閉じる
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    共有クライアントを返す（スクリプト等で startup を経ずに呼ばれた場合はここで作成）
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def _request_with_retry(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    共有クライアントでリクエストを送り、一時的なエラーは指数バックオフでリトライする
+    """
+    client = get_http_client()
+    service = httpx.URL(url).host
+    for attempt in range(GOOGLE_API_MAX_RETRIES + 1):
+        last_attempt = attempt == GOOGLE_API_MAX_RETRIES
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            # リトライを含め、1回の送信ごとにステータスとレイテンシを記録する
+            record_external_call(service, str(response.status_code), time.perf_counter() - started)
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                response.raise_for_status()
+                return response
+        except httpx.TransportError as e:
+            record_external_call(service, type(e).__name__, time.perf_counter() - started)
+            if last_attempt:
+                raise
+        # 0.2s, 0.4s, 0.8s ... にジッターを加えて待つ
+        delay = GOOGLE_API_RETRY_BACKOFF * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+    raise RuntimeError("unreachable")
+
+
+def normalize_query(query: str) -> str:
+    """
+    検索クエリのキャッシュキー（全角・半角、大文字・小文字、空白の違いを吸収する）
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
 
+def places_cache_key(lat: float, lng: float, radius: int) -> str:
+    """
+    近隣検索のキャッシュキー（緯度経度を丸めて近い地点を同じキーにする）
+    """
+    return f"{lat:.{PLACES_COORD_PRECISION}f},{lng:.{PLACES_COORD_PRECISION}f}:{radius}"
+
+
+async def _fetch_search_results(query: str) -> List[Dict[str, Any]]:
     url = "https://www.googleapis.com/customsearch/v1"
     params = {
         "key": GOOGLE_API_KEY,
@@ -20,27 +144,71 @@ async def search_company_info(query: str) -> List[SearchResult]:
         "q": query,
         "num": 5
     }
+    response = await _request_with_retry("GET", url, params=params)
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
+    data = response.json()
+    return [
+        {
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "snippet": item.get("snippet", "")
+        }
+        for item in data.get("items", [])[:5]
+    ]
 
-            data = response.json()
-            results = []
 
-            for item in data.get("items", [])[:5]:
-                results.append(SearchResult(
-                    title=item.get("title", ""),
-                    link=item.get("link", ""),
-                    snippet=item.get("snippet", "")
-                ))
+async def _fetch_nearby_places(lat: float, lng: float, radius: int) -> List[Dict[str, Any]]:
+    url = "https://places.googleapis.com/v1/places:searchNearby"
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLE_API_KEY,
+        "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.id"
+    }
+
+    data = {
+        "locationRestriction": {
+            "circle": {
+                "center": {"latitude": lat, "longitude": lng},
+                "radius": radius
+            }
+        },
+        "includedTypes": ["cafe", "coffee_shop"]
+    }
+    response = await _request_with_retry("POST", url, json=data, headers=headers)
 
-            return results
+    places_data = response.json()
+    return [
+        {
+            "name": place.get("displayName", {}).get("text", ""),
+            "address": place.get("formattedAddress", ""),
+            "rating": place.get("rating"),
+            "user_ratings_total": place.get("userRatingCount"),
+            "place_id": place.get("id", "")
+        }
+        for place in places_data.get("places", [])
+    ]
+
+
+async def search_company_info(query: str) -> List[SearchResult]:
+    """
+    Google Custom Search APIを使用して企業情報を検索
+    """
+    if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
+        return []
+
+    key = normalize_query(query)
+    if not key:
+        return []
+
+    # エラーはキャッシュしない（次回の呼び出しで再取得する）
+    try:
+        items = await search_cache.get_or_fetch(key, lambda: _fetch_search_results(key))
+        return [SearchResult(**item) for item in items]
     except Exception as e:
         print(f"Google Search API Error: {e}")
         return []
 
+
 async def search_nearby_places(location: str, radius: int = 500) -> List[Place]:
     """
     Google Places APIを使用して近くの場所を検索
@@ -55,41 +223,14 @@ async def search_nearby_places(location: str, radius: int = 500) -> List[Place]:
     except:
         return []
 
-    url = "https://places.googleapis.com/v1/places:searchNearby"
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": GOOGLE_API_KEY,
-        "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.id"
-    }
-
-    data = {
-        "locationRestriction": {
-            "circle": {
-                "center": {"latitude": lat, "longitude": lng},
-                "radius": radius
-            }
-        },
-        "includedTypes": ["cafe", "coffee_shop"]
-    }
+    # 丸めた座標で検索し、同じキーのリクエストが同じ結果になるようにする
+    lat = round(lat, PLACES_COORD_PRECISION)
+    lng = round(lng, PLACES_COORD_PRECISION)
+    key = places_cache_key(lat, lng, radius)
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-
-            places_data = response.json()
-            places = []
-
-            for place in places_data.get("places", []):
-                places.append(Place(
-                    name=place.get("displayName", {}).get("text", ""),
-                    address=place.get("formattedAddress", ""),
-                    rating=place.get("rating"),
-                    user_ratings_total=place.get("userRatingCount"),
-                    place_id=place.get("id", "")
-                ))
-
-            return places
+        items = await places_cache.get_or_fetch(key, lambda: _fetch_nearby_places(lat, lng, radius))
+        return [Place(**item) for item in items]
     except Exception as e:
         print(f"Google Places API Error: {e}")
-        return []
\ No newline at end of file
+        return []
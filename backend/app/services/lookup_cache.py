@@ -0,0 +1,144 @@
+"""
+外部APIの結果キャッシュ
+
+メモリ上の TTL + LRU → SQLite（任意・再起動後も残る）→ 上流API の順に引く。
+同じキーに対する同時呼び出しは1回の上流呼び出しにまとめる（single-flight）。
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .cache import BaseCache, TTLCache, register_cache
+
+
+class SQLiteStore:
+    """
+    キャッシュの永続化先（1ファイルを複数の名前空間で共有する）
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookup_cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.commit()
+
+    def _get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM lookup_cache WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def _set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookup_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+            )
+            self._conn.commit()
+
+    async def get(self, namespace: str, key: str) -> Any:
+        return await asyncio.to_thread(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        await asyncio.to_thread(self._set, namespace, key, value, ttl)
+
+
+class CachedLookup(BaseCache):
+    """
+    外部API呼び出しを包むキャッシュ
+    値は JSON に変換できるもの（dict / list）にすること
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, store: Optional[SQLiteStore] = None):
+        super().__init__(name, ttl)
+        self.memory = TTLCache(name, maxsize=maxsize, ttl=ttl)
+        self.store = store
+        self.disk_hits = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        キャッシュにあれば返し、なければ fetch() を1回だけ呼んで保存する
+        fetch() が例外を投げた場合はキャッシュせず、待っていた呼び出し全員に例外を伝える
+        取得中の呼び出しが中断（クライアントの切断など）された場合は、待っていた呼び出しが取得し直す
+        """
+        value = self.memory.get_nowait(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        # 同じキーを取得中の呼び出しがあれば、その結果を待つ
+        while key in self._inflight:
+            inflight = self._inflight[key]
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 中断されたのが自分なら伝える。取得中の呼び出しの中断なら、自分が取得し直す
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                continue
+            self.hits += 1
+            self.coalesced += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self.store.get(self.name, key) if self.store else None
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                value = await fetch()
+                if self.store:
+                    await self.store.set(self.name, key, value, self.ttl)
+            self.memory.set_nowait(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # 待っている呼び出しがいない場合に "exception was never retrieved" を出さない
+            future.exception()
+            raise
+        except asyncio.CancelledError:
+            # 中断は待っている呼び出しに伝えない（future を取り消し、取得し直させる）
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def size(self) -> int:
+        return self.memory.size()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "evictions": self.memory.evictions,
+        })
+        return stats
+
+
+def create_lookup_cache(name: str, maxsize: int, ttl: float, store: Optional[SQLiteStore] = None) -> CachedLookup:
+    """
+    外部API用キャッシュを作成して統計出力に登録する
+    """
+    return register_cache(CachedLookup(name, maxsize=maxsize, ttl=ttl, store=store))
@@ -0,0 +1,50 @@
+"""
+メール送信サービス（SendGrid Web API）
+フロントエンドの utils/mail.ts と同じ環境変数を使う
+"""
+from typing import Optional
+
+import httpx
+
+from ..config import SENDGRID_API_KEY, MAIL_FROM
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+async def send_email(
+    client: httpx.AsyncClient,
+    to: str,
+    subject: str,
+    text: str,
+    idempotency_key: Optional[str] = None
+) -> bool:
+    """
+    メールを1通送信する
+
+    Args:
+        client: 送信に使う httpx クライアント（呼び出し側で使い回す）
+        idempotency_key: SendGrid の custom_args に載せる重複送信防止キー
+
+    Returns:
+        bool: 送信できたら True（APIキー未設定でスキップした場合は False）
+    """
+    if not SENDGRID_API_KEY:
+        print("SENDGRID_API_KEY is not set. Email skipped.")
+        return False
+
+    payload = {
+        "personalizations": [{"to": [{"email": to}]}],
+        "from": {"email": MAIL_FROM},
+        "subject": subject,
+        "content": [{"type": "text/plain", "value": text}],
+    }
+    if idempotency_key:
+        payload["custom_args"] = {"idempotency_key": idempotency_key}
+
+    response = await client.post(
+        SENDGRID_URL,
+        json=payload,
+        headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"}
+    )
+    response.raise_for_status()
+    return True
@@ -0,0 +1,145 @@
+"""
+参照データ（業界一覧・企業カタログ）のスナップショット（GET /api/reference/*）
+
+業界・企業カタログはほとんど変わらないが、フロントエンドは開くたびに Supabase から全件取得していた。
+ここでは種類ごとに、返す JSON をバイト列で1回だけ作り、その SHA-256 を強い ETag にして保持する。
+If-None-Match が一致すれば本文を返さず 304 にする（どちらの場合も DB には問い合わせない）。
+
+- 業界: REFERENCE_DATA_TTL ごとに裏で読み込み直す（読み込み中は古いスナップショットを返す）。
+  内容が同じなら ETag も変わらないので、クライアントは 304 のまま
+- 企業: 企業検索のインデックス（company_index）から作る。インデックスの版が変わったとき
+  （書き込みの反映・読み込み直し）だけ JSON を作り直す
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from ..config import COMPANY_INDEX_TTL, REFERENCE_DATA_TTL
+from .cache import BaseCache, register_cache
+from .company_index import company_index
+
+
+class Snapshot(NamedTuple):
+    etag: str
+    body: bytes
+    count: int
+    # 作成元の版（企業は company_index.version。業界は None）
+    source_version: Any
+
+
+def make_snapshot(key: str, rows: List[Dict[str, Any]], source_version: Any = None) -> Snapshot:
+    body = json.dumps({key: rows}, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return Snapshot(etag, body, len(rows), source_version)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match に etag が含まれるか（If-None-Match は弱い比較。RFC 9110 13.1.2）
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ReferenceDataset(BaseCache):
+    """
+    1種類の参照データのスナップショットを保持し、期限が来たら裏で作り直す
+
+    hits: スナップショットをそのまま使った回数 / misses: 作り直した回数 / not_modified: 304 を返した回数
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        ttl: float,
+        fetch: Callable[[Any], Awaitable[List[Dict[str, Any]]]],
+        source_version: Optional[Callable[[], Any]] = None
+    ):
+        super().__init__(name, ttl)
+        self.key = key
+        self.not_modified = 0
+        self.loaded_at = 0.0
+        self._fetch = fetch
+        self._source_version = source_version
+        self._snapshot: Optional[Snapshot] = None
+        self._loading: Optional[asyncio.Task] = None
+
+    async def _load(self, db) -> None:
+        rows = await self._fetch(db)
+        # 取得した直後（await を挟まずに）版を読むので、rows と版は食い違わない
+        version = self._source_version() if self._source_version else None
+        self._snapshot = make_snapshot(self.key, rows, version)
+        self.misses += 1
+        self.loaded_at = time.monotonic()
+
+    def _start_load(self, db) -> asyncio.Task:
+        # 同時に来た読み込みは1回にまとめる
+        if self._loading is None:
+            self._loading = asyncio.get_running_loop().create_task(self._load(db))
+            self._loading.add_done_callback(self._load_done)
+        return self._loading
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        self._loading = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error loading reference data {self.name}: {task.exception()}")
+
+    def _is_outdated(self, snapshot: Snapshot) -> bool:
+        return self._source_version is not None and self._source_version() != snapshot.source_version
+
+    async def get(self, db) -> Snapshot:
+        """
+        スナップショットを返す。未作成・作成元が変わった場合は作り直しを待ち、期限切れなら裏で作り直す
+        """
+        snapshot = self._snapshot
+        if snapshot is None or self._is_outdated(snapshot):
+            await asyncio.shield(self._start_load(db))
+        elif time.monotonic() - self.loaded_at >= self.ttl:
+            self._start_load(db)
+        self.hits += 1
+        return self._snapshot
+
+    async def clear(self) -> None:
+        if self._snapshot is not None:
+            self.invalidations += 1
+        self._snapshot = None
+
+    def size(self) -> int:
+        return self._snapshot.count if self._snapshot is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "not_modified": self.not_modified,
+            "bytes": len(self._snapshot.body) if self._snapshot is not None else 0,
+            "etag": self._snapshot.etag if self._snapshot is not None else None,
+        })
+        return stats
+
+
+async def _fetch_industries(db) -> List[Dict[str, Any]]:
+    response = await db.table("industries").select("id, industries").order("industries").execute()
+    return response.data or []
+
+
+async def _fetch_companies(db) -> List[Dict[str, Any]]:
+    catalog = await company_index.get(db)
+    return catalog.rows()
+
+
+industries_reference = register_cache(
+    ReferenceDataset("reference_industries", "industries", REFERENCE_DATA_TTL, _fetch_industries)
+)
+# インデックスが読み込み直されると版が変わるので、こちらの期限はインデックスに合わせる
+companies_reference = register_cache(
+    ReferenceDataset(
+        "reference_companies", "companies", COMPANY_INDEX_TTL, _fetch_companies,
+        source_version=lambda: company_index.version
+    )
+)
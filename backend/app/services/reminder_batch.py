@@ -0,0 +1,220 @@
+"""
+全ユーザー向けリマインドのバッチ処理
+
+frontend の /api/cron/reminders はユーザー・イベントごとに逐次で
+メール送信と notifications への insert を行っていた。
+このバッチは ReminderService.generate_for_users() でユーザーをチャンク単位にまとめて計算し、
+通知はチャンクごとに一括 insert、メールは並列数を制限したワーカーで送信する。
+
+通知には「実行日:種類:ユーザー:対象」の idempotency_key を付け、
+insert は重複を無視、メールは emailed_at が未設定のものだけ送るため、
+途中で失敗しても同じ日のうちなら何度でも安全に再実行できる。
+
+実行方法（backend ディレクトリで）:
+    python -m app.services.reminder_batch
+cron からは frontend の /api/cron/reminders → POST /api/reminders/batch（CRON_SECRET）で起動する。
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from ..config import APP_URL, EXPORT_CHUNK_SIZE, REMINDER_BATCH_CHUNK_SIZE, MAIL_CONCURRENCY
+from ..pagination import Keyset, fetch_all
+from .mail import send_email
+from .reminder_service import ReminderService, ReminderType, IN_FILTER_CHUNK_SIZE
+
+NOTIFICATION_TITLES = {
+    ReminderType.EMAIL_CHECK: "メール確認リマインド",
+    ReminderType.DEADLINE_NOT_APPLIED: "応募締切リマインド",
+    ReminderType.DEADLINE_APPLIED: "応募締切リマインド",
+}
+
+# 送信済みとして emailed_at をまとめて更新する件数
+SENT_FLUSH_SIZE = 100
+
+# 未送信の通知は (user_id, id) の順にページングする
+PENDING_KEYSET = Keyset("user_id")
+
+
+def build_idempotency_key(run_date: str, user_id: str, reminder: Dict[str, Any]) -> str:
+    """
+    同じ日に同じユーザー・同じ対象へ同じ種類の通知が重複しないためのキー
+    """
+    target = reminder.get("event_id") or reminder["company_id"]
+    return f"{run_date}:{reminder['type']}:{user_id}:{target}"
+
+
+class ReminderBatchJob:
+    def __init__(
+        self,
+        supabase_client,
+        chunk_size: int = REMINDER_BATCH_CHUNK_SIZE,
+        mail_concurrency: int = MAIL_CONCURRENCY,
+        send: Callable = send_email
+    ):
+        self.supabase = supabase_client
+        self.service = ReminderService(supabase_client)
+        self.chunk_size = chunk_size
+        self.mail_concurrency = mail_concurrency
+        self.send = send
+        self._sent_ids: List[str] = []
+
+    async def _iter_user_chunks(self):
+        """
+        users を id のキーセットでチャンクごとに取得する
+        """
+        last_id = None
+        while True:
+            query = self.supabase.table("users").select("id, email, name").order("id").limit(self.chunk_size)
+            if last_id:
+                query = query.gt("id", last_id)
+            response = await query.execute()
+            users = response.data or []
+            if not users:
+                return
+            yield users
+            if len(users) < self.chunk_size:
+                return
+            last_id = users[-1]["id"]
+
+    async def _process_chunk(
+        self,
+        users: List[Dict[str, Any]],
+        now: datetime,
+        queue: asyncio.Queue,
+        stats: Dict[str, int]
+    ) -> None:
+        """
+        1チャンク分のユーザーのリマインドを計算し、通知を一括 insert してメールをキューに積む
+        """
+        run_date = now.date().isoformat()
+        users_by_id = {str(u["id"]): u for u in users}
+        reminders_by_user = await self.service.generate_for_users(list(users_by_id), now)
+
+        rows = []
+        for user_id, reminders in reminders_by_user.items():
+            for reminder in reminders:
+                rows.append({
+                    "user_id": user_id,
+                    "title": NOTIFICATION_TITLES[reminder["type"]],
+                    "content": reminder["message"],
+                    "link": f"/companies/{reminder['company_id']}",
+                    "idempotency_key": build_idempotency_key(run_date, user_id, reminder),
+                })
+        stats["users"] += len(users)
+        stats["reminders"] += len(rows)
+
+        # 通知を一括 insert（既に同じキーがあるものは無視される）
+        if rows:
+            response = await self.supabase.table("notifications").upsert(
+                rows, on_conflict="idempotency_key", ignore_duplicates=True
+            ).execute()
+            stats["notifications_inserted"] += len(response.data or [])
+
+        # 今日の分でまだメールを送っていない通知（前回の失敗分を含む）を取得
+        # チャンクの全ユーザー分は max_rows を超えうるので EXPORT_CHUNK_SIZE 件ずつページングする
+        user_ids = list(users_by_id)
+        for i in range(0, len(user_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = user_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            pending = await fetch_all(lambda: self.supabase.table("notifications").select(
+                "id, user_id, title, content, link, idempotency_key"
+            ).in_(
+                "user_id", chunk
+            ).like(
+                "idempotency_key", f"{run_date}:%"
+            ).is_(
+                "emailed_at", "null"
+            ), PENDING_KEYSET, EXPORT_CHUNK_SIZE)
+            for notification in pending:
+                user = users_by_id.get(str(notification["user_id"]))
+                if user and user.get("email"):
+                    await queue.put((notification, user))
+
+    async def _mail_worker(self, queue: asyncio.Queue, http: httpx.AsyncClient, stats: Dict[str, int]) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            notification, user = item
+            try:
+                sent = await self.send(
+                    http,
+                    user["email"],
+                    f"【就活管理】{notification['title']}",
+                    f"{user.get('name') or '就活生'}さん\n\n{notification['content']}\n\n詳細: {APP_URL}{notification['link']}",
+                    idempotency_key=notification["idempotency_key"]
+                )
+            except Exception as e:
+                print(f"Error sending reminder email ({notification['idempotency_key']}): {e}")
+                stats["emails_failed"] += 1
+                continue
+            if sent:
+                stats["emails_sent"] += 1
+                self._sent_ids.append(notification["id"])
+                if len(self._sent_ids) >= SENT_FLUSH_SIZE:
+                    await self._flush_sent()
+
+    async def _flush_sent(self) -> None:
+        """
+        送信済みの通知に emailed_at をまとめて記録する
+        """
+        sent_ids, self._sent_ids = self._sent_ids, []
+        emailed_at = datetime.now(timezone.utc).isoformat()
+        for i in range(0, len(sent_ids), IN_FILTER_CHUNK_SIZE):
+            await self.supabase.table("notifications").update(
+                {"emailed_at": emailed_at}
+            ).in_(
+                "id", sent_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            ).execute()
+
+    async def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        全ユーザーのリマインドを生成して通知・メールを送る
+
+        Returns:
+            Dict[str, int]: 処理件数の集計
+        """
+        now = now or datetime.now(timezone.utc)
+        stats = {
+            "users": 0,
+            "reminders": 0,
+            "notifications_inserted": 0,
+            "emails_sent": 0,
+            "emails_failed": 0,
+        }
+        if not self.supabase:
+            return stats
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.mail_concurrency * 4)
+        async with httpx.AsyncClient(timeout=10.0) as http:
+            workers = [
+                asyncio.create_task(self._mail_worker(queue, http, stats))
+                for _ in range(self.mail_concurrency)
+            ]
+            try:
+                async for users in self._iter_user_chunks():
+                    await self._process_chunk(users, now, queue, stats)
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+                await self._flush_sent()
+
+        return stats
+
+
+async def main():
+    from ..database import init_database, close_database
+
+    supabase = await init_database()
+    try:
+        stats = await ReminderBatchJob(supabase).run()
+        print(f"✅ Reminder batch finished: {stats}")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
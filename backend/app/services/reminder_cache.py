@@ -0,0 +1,102 @@
+"""
+ユーザーごとのリマインドキャッシュ
+
+/api/reminders 系のレスポンスをユーザー単位でキャッシュし、
+企業・イベント・タスクへの書き込み時に invalidate_user() で破棄する。
+リマインドの元になる選考状況・イベント・企業の変更の通知（change_feed。フロントエンドからの
+直接の書き込みは Realtime で届く）でも、影響するユーザーの分を破棄する。
+
+計算中に破棄されたユーザーの結果は（書き込み前のデータから計算したものかもしれないので）保存しない。
+計算中かどうかはプロセス内で見る（CACHE_BACKEND=redis で他のプロセスが破棄した分は TTL まで残りうる）。
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from ..config import REMINDER_CACHE_MAXSIZE, REMINDER_CACHE_TTL
+from . import change_feed
+from .cache import create_cache
+
+# キャッシュするレスポンスの種類（エンドポイントごと）
+REMINDER_KINDS = ("all", "email_check", "deadlines")
+
+reminder_cache = create_cache("reminders", maxsize=REMINDER_CACHE_MAXSIZE, ttl=REMINDER_CACHE_TTL)
+
+# 計算中のユーザー -> [計算中の数, 世代]。計算中に invalidate_user() されると世代が上がる
+_computing: Dict[str, List[int]] = {}
+
+
+async def get_or_compute(
+    user_id: UUID,
+    kind: str,
+    compute: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    キャッシュがあればそれを返し、なければ compute() で計算して保存する
+    タイムアウトした生成関数がある（部分的な）結果と、計算中にユーザーのキャッシュが破棄された結果はキャッシュしない
+    """
+    key = f"{user_id}:{kind}"
+    cached = await reminder_cache.get(key)
+    if cached is not None:
+        return cached
+
+    entry = _computing.setdefault(str(user_id), [0, 0])
+    entry[0] += 1
+    generation = entry[1]
+    try:
+        result = await compute()
+    finally:
+        entry[0] -= 1
+        if not entry[0]:
+            del _computing[str(user_id)]
+    if not result.get("timed_out") and entry[1] == generation:
+        await reminder_cache.set(key, result)
+    return result
+
+
+async def invalidate_user(user_id) -> None:
+    """
+    ユーザーのリマインドキャッシュを破棄する（書き込み系APIから呼ぶ）
+    """
+    entry = _computing.get(str(user_id))
+    if entry is not None:
+        entry[1] += 1
+    for kind in REMINDER_KINDS:
+        await reminder_cache.delete(f"{user_id}:{kind}")
+
+
+async def _on_change(
+    db,
+    table: str,
+    change: str,
+    record: Optional[Dict[str, Any]] = None,
+    old_record: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    選考状況はそのユーザー、イベント・企業はその企業を選考中のユーザーのキャッシュを破棄する
+    """
+    rows = [row for row in (record, old_record) if row]
+    if table == "usercompanyselections":
+        user_ids = {row["user_id"] for row in rows if row.get("user_id")}
+        if not user_ids:
+            raise ValueError("usercompanyselections の通知に user_id がありません")
+    else:
+        column = "id" if table == "companies" else "company_id"
+        company_ids = list({str(row[column]) for row in rows if row.get(column)})
+        if not company_ids:
+            return
+        response = await db.table("usercompanyselections").select("user_id").in_("company_id", company_ids).execute()
+        user_ids = {row["user_id"] for row in response.data or []}
+    for user_id in user_ids:
+        await invalidate_user(user_id)
+
+
+async def _clear() -> None:
+    """
+    通知を反映できなかったときにすべて破棄する（計算中の結果も保存させない）
+    """
+    for entry in _computing.values():
+        entry[1] += 1
+    await reminder_cache.clear()
+
+
+change_feed.subscribe("reminder cache", ["usercompanyselections", "events", "companies"], _on_change, _clear)
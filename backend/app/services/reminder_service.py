@@ -1,10 +1,15 @@
 """
 リマインダーのビジネスロジック
 """
-from typing import List, Dict, Any
+import asyncio
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 from enum import Enum
+from ..config import EXPORT_CHUNK_SIZE, REMINDER_GENERATOR_TIMEOUT, REMINDER_ENGINE
+from ..metrics import REMINDER_ENGINE_FALLBACKS, REMINDER_GENERATOR_TIMEOUTS
+from ..pagination import Keyset, fetch_all
 
 class ReminderType(str, Enum):
     """リマインドタイプ"""
@@ -18,17 +23,48 @@ class ReminderPriority(str, Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+# in_ フィルタ1回あたりに渡すIDの最大数（URL長の上限対策）
+IN_FILTER_CHUNK_SIZE = 200
+
+# バッチ処理で全件をページングして取得するときの並び順
+SELECTION_KEYSET = Keyset("id")
+EVENT_KEYSET = Keyset("start_time")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
 class ReminderService:
-    def __init__(self, supabase_client):
+    # リマインド生成関数の一覧（名前 -> メソッド名）
+    # 新しい種類のリマインドはここに追加すれば get_all_reminders で並列実行される
+    GENERATORS = {
+        "email_check": "_generate_email_check_reminders",
+        "deadline": "_generate_deadline_reminders",
+    }
+
+    def __init__(
+        self,
+        supabase_client,
+        generator_timeout: float = REMINDER_GENERATOR_TIMEOUT,
+        engine: str = REMINDER_ENGINE
+    ):
         self.supabase = supabase_client
-
-    async def _generate_email_check_reminders(self, user_id: UUID) -> List[Dict[str, Any]]:
+        self.generator_timeout = generator_timeout
+        self.engine = engine
+
+    async def _generate_email_check_reminders(
+        self,
+        user_id: UUID,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """
         メール確認リマインドを生成
         ES提出済み/面接中で7日以上更新がない企業が対象
 
         Args:
             user_id (UUID): ユーザーID
+            now (datetime): 判定の基準時刻（省略時は現在時刻）
 
         Returns:
             List[Dict[str, Any]]: メール確認リマインダーのリスト
@@ -50,6 +86,7 @@ class ReminderService:
             - 7日以上更新がない企業が対象
             - ステータスが "ES_Submit" または "Interview" の企業のみ
             - 今後7日以内にイベントがある企業は除外される
+            - クエリは選考状況・イベントの2回のみ（企業数に依存しない）
             - エラー発生時は空リストを返す
         """
         if not self.supabase:
@@ -57,11 +94,13 @@ class ReminderService:
 
         reminders = []
         try:
+            now = now or datetime.now(timezone.utc)
             # 7日前の日時を計算
-            seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+            seven_days_ago = now - timedelta(days=7)
+            seven_days_later = now + timedelta(days=7)
 
             # UserCompanySelectionsから結果待ち状態の企業を取得
-            response = self.supabase.table("usercompanyselections").select(
+            response = await self.supabase.table("usercompanyselections").select(
                 "*, companies(*)"
             ).eq(
                 "user_id", str(user_id)
@@ -71,58 +110,48 @@ class ReminderService:
                 "updated_at", seven_days_ago.isoformat()
             ).execute()
 
-            if response.data:
-                for selection in response.data:
-                    if not selection.get("companies"):
-                        continue
-
-                    company = selection["companies"]
-                    company_id = selection["company_id"]
-
-                    # 今後7日以内にイベントがある企業は除外
-                    seven_days_later = datetime.now(timezone.utc) + timedelta(days=7)
-                    events_response = self.supabase.table("events").select(
-                        "id"
-                    ).eq(
-                        "company_id", company_id
-                    ).gte(
-                        "start_time", datetime.now(timezone.utc).isoformat()
-                    ).lt(
-                        "start_time", seven_days_later.isoformat()
-                    ).limit(1).execute()
-
-                    if events_response.data:
-                        continue  # 近日中にイベントがある場合はリマインド不要
-
-                    # 最終更新からの経過日数を計算
-                    updated_at = datetime.fromisoformat(
-                        selection["updated_at"].replace("Z", "+00:00")
-                    )
-                    days_passed = (datetime.now(timezone.utc) - updated_at).days
-
-                    reminders.append({
-                        "id": str(uuid4()),
-                        "type": ReminderType.EMAIL_CHECK,
-                        "company_id": company_id,
-                        "company_name": company["name"],
-                        "message": f"{company['name']}からメールが届いていませんか？最終更新から{days_passed}日経過しています",
-                        "priority": ReminderPriority.LOW,
-                        "days_passed": days_passed,
-                        "created_at": datetime.now(timezone.utc).isoformat()
-                    })
+            selections = [s for s in (response.data or []) if s.get("companies")]
+            if not selections:
+                return reminders
+
+            # 今後7日以内にイベントがある企業を、企業IDのチャンクごとに1回のクエリでまとめて取得
+            company_ids = list({s["company_id"] for s in selections})
+            busy_company_ids = set()
+            for i in range(0, len(company_ids), IN_FILTER_CHUNK_SIZE):
+                events_response = await self.supabase.table("events").select(
+                    "company_id"
+                ).in_(
+                    "company_id", company_ids[i:i + IN_FILTER_CHUNK_SIZE]
+                ).gte(
+                    "start_time", now.isoformat()
+                ).lt(
+                    "start_time", seven_days_later.isoformat()
+                ).execute()
+                busy_company_ids.update(e["company_id"] for e in (events_response.data or []))
+
+            for selection in selections:
+                # 近日中にイベントがある場合はリマインド不要
+                if selection["company_id"] in busy_company_ids:
+                    continue
+                reminders.append(self._build_email_check_reminder(selection, now))
 
         except Exception as e:
             print(f"Error generating email check reminders: {e}")
 
         return reminders
 
-    async def _generate_deadline_reminders(self, user_id: UUID) -> List[Dict[str, Any]]:
+    async def _generate_deadline_reminders(
+        self,
+        user_id: UUID,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """
         締切リマインドを生成
         1-3日後の締切イベントが対象
 
         Args:
             user_id (UUID): ユーザーID
+            now (datetime): 判定の基準時刻（省略時は現在時刻）
 
         Returns:
             List[Dict[str, Any]]: 締切リマインダーのリスト
@@ -135,6 +164,7 @@ class ReminderService:
                         "message": str,  # "○○社の締切まであと2日です。応募しましたか？" など
                         "priority": str,  # "high" または "medium"
                         "days_remaining": int,  # 締切までの残り日数
+                        "event_id": str,  # 締切イベントID (UUID)
                         "deadline": str,  # 締切日時 (ISO8601形式)
                         "created_at": str  # リマインダー作成日時 (ISO8601形式)
                     },
@@ -149,6 +179,8 @@ class ReminderService:
             - 応募済みの場合:
                 - メッセージ: "締切まであと○日です"
                 - 優先度: MEDIUM
+            - ユーザーの選考状況から締切イベントを埋め込みで引く1回のクエリのみ
+              （他ユーザーのデータ量に依存しない）
             - 残り時間の表現:
                 - 0日: "○時間"
                 - 1日+時間あり: "1日と○時間"
@@ -160,103 +192,233 @@ class ReminderService:
 
         reminders = []
         try:
-            now = datetime.now(timezone.utc)
+            now = now or datetime.now(timezone.utc)
             one_day_later = now + timedelta(days=1)
             three_days_later = now + timedelta(days=3)
 
-            # 1-3日後の締切イベントを取得
-            events_response = self.supabase.table("events").select(
-                "*, companies(*)"
+            # ユーザーの選考状況を起点に、その企業の1-3日後の締切イベントだけを
+            # 1回のクエリで取得する（他ユーザーのイベントはDB側で除外される）
+            response = await self.supabase.table("usercompanyselections").select(
+                "company_id, status, companies!inner(*, events!inner(*))"
             ).eq(
-                "type", "Deadline"
+                "user_id", str(user_id)
+            ).eq(
+                "companies.events.type", "Deadline"
             ).gte(
-                "start_time", one_day_later.isoformat()
+                "companies.events.start_time", one_day_later.isoformat()
             ).lte(
-                "start_time", three_days_later.isoformat()
+                "companies.events.start_time", three_days_later.isoformat()
             ).execute()
 
-            if events_response.data:
-                for event in events_response.data:
-                    if not event.get("companies"):
-                        continue
-
-                    company = event["companies"]
-                    company_id = event["company_id"]
-
-                    # その企業の選考ステータスを取得
-                    selection_response = self.supabase.table("usercompanyselections").select(
-                        "status"
-                    ).eq(
-                        "user_id", str(user_id)
-                    ).eq(
-                        "company_id", company_id
-                    ).execute()
-
-                    # 選考状況が見つからない場合はスキップ
-                    if not selection_response.data:
-                        continue
-
-                    # 締切までの残り日数を計算
-                    deadline = datetime.fromisoformat(
-                        event["start_time"].replace("Z", "+00:00")
+            for selection in response.data or []:
+                company = dict(selection["companies"])
+                events = company.pop("events", None) or []
+                for event in events:
+                    event = {**event, "companies": company}
+                    reminders.append(
+                        self._build_deadline_reminder(event, selection.get("status"), now)
                     )
-                    time_remaining = deadline - now
-                    days_remaining = time_remaining.days
-                    hours_remaining = time_remaining.seconds // 3600
-
-                    # 残り日数に応じた表現
-                    if days_remaining == 0:
-                        time_str = f"{hours_remaining}時間"
-                    elif days_remaining == 1 and hours_remaining > 0:
-                        time_str = f"1日と{hours_remaining}時間"
-                    else:
-                        time_str = f"{days_remaining}日"
-
-                    # ステータスに応じてメッセージと優先度を設定
-                    if selection_response.data[0].get("status") == "Interested":
-                        # 未応募の場合
-                        message = f"{company['name']}の締切まであと{time_str}です。応募しましたか？"
-                        reminder_type = ReminderType.DEADLINE_NOT_APPLIED
-                        priority = ReminderPriority.HIGH if days_remaining <= 1 else ReminderPriority.MEDIUM
-                    else:
-                        # 応募済みの場合
-                        message = f"{company['name']}の締切まであと{time_str}です"
-                        reminder_type = ReminderType.DEADLINE_APPLIED
-                        priority = ReminderPriority.MEDIUM
-
-                    reminders.append({
-                        "id": str(uuid4()),
-                        "type": reminder_type,
-                        "company_id": company_id,
-                        "company_name": company["name"],
-                        "message": message,
-                        "priority": priority,
-                        "days_remaining": days_remaining,
-                        "deadline": deadline.isoformat(),
-                        "created_at": datetime.now(timezone.utc).isoformat()
-                    })
 
         except Exception as e:
             print(f"Error generating deadline reminders: {e}")
 
         return reminders
 
-    async def get_all_reminders(self, user_id: UUID) -> Dict[str, Any]:
+    @staticmethod
+    def _build_email_check_reminder(selection: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """
-        ユーザーの全リマインドを取得
-        優先度順にソートして返す
+        選考状況1件からメール確認リマインドを組み立てる
         """
-        reminders = []
+        company = selection["companies"]
+
+        # 最終更新からの経過日数を計算
+        updated_at = datetime.fromisoformat(
+            selection["updated_at"].replace("Z", "+00:00")
+        )
+        days_passed = (now - updated_at).days
+
+        return {
+            "id": str(uuid4()),
+            "type": ReminderType.EMAIL_CHECK,
+            "company_id": selection["company_id"],
+            "company_name": company["name"],
+            "message": f"{company['name']}からメールが届いていませんか？最終更新から{days_passed}日経過しています",
+            "priority": ReminderPriority.LOW,
+            "days_passed": days_passed,
+            "created_at": now.isoformat()
+        }
+
+    @staticmethod
+    def _build_deadline_reminder(event: Dict[str, Any], status: str, now: datetime) -> Dict[str, Any]:
+        """
+        締切イベント1件と選考ステータスから締切リマインドを組み立てる
+        """
+        company = event["companies"]
+
+        # 締切までの残り日数を計算
+        deadline = datetime.fromisoformat(
+            event["start_time"].replace("Z", "+00:00")
+        )
+        time_remaining = deadline - now
+        days_remaining = time_remaining.days
+        hours_remaining = time_remaining.seconds // 3600
+
+        # 残り日数に応じた表現
+        if days_remaining == 0:
+            time_str = f"{hours_remaining}時間"
+        elif days_remaining == 1 and hours_remaining > 0:
+            time_str = f"1日と{hours_remaining}時間"
+        else:
+            time_str = f"{days_remaining}日"
+
+        # ステータスに応じてメッセージと優先度を設定
+        if status == "Interested":
+            # 未応募の場合
+            message = f"{company['name']}の締切まであと{time_str}です。応募しましたか？"
+            reminder_type = ReminderType.DEADLINE_NOT_APPLIED
+            priority = ReminderPriority.HIGH if days_remaining <= 1 else ReminderPriority.MEDIUM
+        else:
+            # 応募済みの場合
+            message = f"{company['name']}の締切まであと{time_str}です"
+            reminder_type = ReminderType.DEADLINE_APPLIED
+            priority = ReminderPriority.MEDIUM
+
+        return {
+            "id": str(uuid4()),
+            "type": reminder_type,
+            "company_id": event["company_id"],
+            "company_name": company["name"],
+            "message": message,
+            "priority": priority,
+            "days_remaining": days_remaining,
+            "event_id": event.get("id"),
+            "deadline": deadline.isoformat(),
+            "created_at": now.isoformat()
+        }
+
+    async def generate_for_users(
+        self,
+        user_ids: Sequence[str],
+        now: Optional[datetime] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        複数ユーザーのリマインドをまとめて生成する（バッチ処理用）
+
+        選考状況をユーザーIDのチャンクごとに、今後7日間のイベントを企業IDのチャンクごとに取得し、
+        メモリ上で企業IDをキーに突き合わせる。ユーザーごとのクエリは発行しない。
+        どちらも EXPORT_CHUNK_SIZE 件ずつページングする（PostgREST の max_rows で切り詰められないように）。
+        判定条件は _generate_email_check_reminders / _generate_deadline_reminders と同じ
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: ユーザーID -> 優先度順のリマインダー（最大50件）
+        """
+        now = now or datetime.now(timezone.utc)
+        reminders_by_user: Dict[str, List[Dict[str, Any]]] = {str(u): [] for u in user_ids}
+        if not self.supabase or not user_ids:
+            return reminders_by_user
+
+        user_id_list = list(reminders_by_user)
+        selections = []
+        for i in range(0, len(user_id_list), IN_FILTER_CHUNK_SIZE):
+            chunk = user_id_list[i:i + IN_FILTER_CHUNK_SIZE]
+            rows = await fetch_all(lambda: self.supabase.table("usercompanyselections").select(
+                "id, user_id, company_id, status, updated_at, companies(*)"
+            ).in_(
+                "user_id", chunk
+            ), SELECTION_KEYSET, EXPORT_CHUNK_SIZE)
+            selections.extend(s for s in rows if s.get("companies"))
+
+        # 今後7日間のイベントを企業ごとにまとめる
+        company_ids = list({s["company_id"] for s in selections})
+        events_by_company: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for i in range(0, len(company_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = company_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            events = await fetch_all(lambda: self.supabase.table("events").select(
+                "id, company_id, title, type, start_time"
+            ).in_(
+                "company_id", chunk
+            ).gte(
+                "start_time", now.isoformat()
+            ).lt(
+                "start_time", (now + timedelta(days=7)).isoformat()
+            ), EVENT_KEYSET, EXPORT_CHUNK_SIZE)
+            for event in events:
+                events_by_company[event["company_id"]].append(event)
+
+        seven_days_ago = now - timedelta(days=7)
+        one_day_later = now + timedelta(days=1)
+        three_days_later = now + timedelta(days=3)
+
+        for selection in selections:
+            user_reminders = reminders_by_user[selection["user_id"]]
+            company_events = events_by_company.get(selection["company_id"], [])
+
+            # メール確認: 結果待ちで7日以上更新がなく、今後7日以内にイベントがない
+            if (
+                selection.get("status") in ("ES_Submit", "Interview")
+                and selection.get("updated_at")
+                and _parse_timestamp(selection["updated_at"]) < seven_days_ago
+                and not company_events
+            ):
+                user_reminders.append(self._build_email_check_reminder(selection, now))
+
+            # 締切: 1-3日後の締切イベント
+            for event in company_events:
+                if event["type"] != "Deadline":
+                    continue
+                if not one_day_later <= _parse_timestamp(event["start_time"]) <= three_days_later:
+                    continue
+                event = {**event, "companies": selection["companies"]}
+                user_reminders.append(
+                    self._build_deadline_reminder(event, selection.get("status"), now)
+                )
+
+        for user_reminders in reminders_by_user.values():
+            self._sort_by_priority(user_reminders)
+            del user_reminders[50:]
+
+        return reminders_by_user
+
+    async def _run_generators(
+        self,
+        user_id: UUID,
+        names: Optional[Sequence[str]] = None,
+        now: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        リマインド生成関数を並列に実行する
+
+        生成関数ごとにタイムアウトを設け、時間切れになったものは空として扱う
+        （他の生成関数の結果はそのまま返す）
+
+        Returns:
+            (リマインダーのリスト, タイムアウトした生成関数名のリスト)
+        """
+        names = list(names or self.GENERATORS)
+        timed_out: List[str] = []
 
-        # メール確認リマインドを生成
-        email_reminders = await self._generate_email_check_reminders(user_id)
-        reminders.extend(email_reminders)
+        async def run(name: str) -> List[Dict[str, Any]]:
+            generator = getattr(self, self.GENERATORS[name])
+            try:
+                return await asyncio.wait_for(generator(user_id, now), timeout=self.generator_timeout)
+            except asyncio.TimeoutError:
+                print(f"Reminder generator timed out: {name} ({self.generator_timeout}s)")
+                REMINDER_GENERATOR_TIMEOUTS.inc(generator=name)
+                timed_out.append(name)
+                return []
 
-        # 締切リマインドを生成
-        deadline_reminders = await self._generate_deadline_reminders(user_id)
-        reminders.extend(deadline_reminders)
+        results = await asyncio.gather(*(run(name) for name in names))
 
-        # 優先度でソート（HIGH > MEDIUM > LOW）
+        reminders = []
+        for result in results:
+            reminders.extend(result)
+        return reminders, sorted(timed_out)
+
+    @staticmethod
+    def _sort_by_priority(reminders: List[Dict[str, Any]]) -> None:
+        """
+        優先度でソート（HIGH > MEDIUM > LOW、同じ優先度なら締切が近い順）
+        """
         priority_order = {
             ReminderPriority.HIGH: 0,
             ReminderPriority.MEDIUM: 1,
@@ -264,40 +426,112 @@ class ReminderService:
         }
         reminders.sort(key=lambda x: (priority_order[x["priority"]], x.get("days_remaining", 999)))
 
+    async def _fetch_reminders_sql(self, user_id: UUID, now: datetime) -> List[Dict[str, Any]]:
+        """
+        DB関数 get_user_reminders で絞り込み・優先度順の並べ替え・50件の上限までを1回で行う
+        （docs/migrations/002_get_user_reminders.sql）
+        """
+        response = await self.supabase.rpc(
+            "get_user_reminders",
+            {"p_user_id": str(user_id), "p_now": now.isoformat()}
+        ).execute()
+        return [self._build_rpc_reminder(row, now) for row in response.data or []]
+
+    async def _fetch_reminders_incremental(self, user_id: UUID, now: datetime) -> List[Dict[str, Any]]:
+        """
+        保持しているユーザーごとの状態から読み出す（初回・期限切れのときだけDBから読み込む）
+        """
+        # reminder_state がこのモジュールの組み立て関数を使うため、ここで import する
+        from .reminder_state import reminder_states
+        state = await reminder_states.get(self.supabase, user_id, now)
+        return state.reminders(now)
+
+    @staticmethod
+    def _build_rpc_reminder(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """
+        get_user_reminders の1行を _build_email_check_reminder / _build_deadline_reminder と同じ形にする
+        """
+        reminder = {
+            "id": str(uuid4()),
+            "type": ReminderType(row["type"]),
+            "company_id": row["company_id"],
+            "company_name": row["company_name"],
+            "message": row["message"],
+            "priority": ReminderPriority(row["priority"]),
+        }
+        if reminder["type"] == ReminderType.EMAIL_CHECK:
+            reminder["days_passed"] = row["days_passed"]
+        else:
+            reminder["days_remaining"] = row["days_remaining"]
+            reminder["event_id"] = row["event_id"]
+            reminder["deadline"] = _parse_timestamp(row["deadline"]).isoformat()
+        reminder["created_at"] = now.isoformat()
+        return reminder
+
+    async def get_all_reminders(self, user_id: UUID, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        ユーザーの全リマインドを取得
+        優先度順にソートして返す
+
+        REMINDER_ENGINE が "sql" なら DB関数 get_user_reminders で、"incremental" なら
+        保持しているユーザーごとの状態から計算し、失敗した場合（関数が未適用など）は Python 版で計算し直す。
+        Python 版では各生成関数が並列に実行され、タイムアウトしたものは timed_out に名前が入る
+        """
+        now = now or datetime.now(timezone.utc)
+
+        engines = {
+            "sql": self._fetch_reminders_sql,
+            "incremental": self._fetch_reminders_incremental,
+        }
+        fetch = engines.get(self.engine)
+        if fetch and self.supabase:
+            try:
+                reminders = await fetch(user_id, now)
+                return {
+                    "reminders": reminders,
+                    "total_count": len(reminders),
+                    "timed_out": []
+                }
+            except Exception as e:
+                print(f"Error fetching reminders via {self.engine} engine, falling back to python: {e}")
+                REMINDER_ENGINE_FALLBACKS.inc(engine=self.engine)
+
+        reminders, timed_out = await self._run_generators(user_id, now=now)
+
+        self._sort_by_priority(reminders)
+
         # 最大50件まで
         reminders = reminders[:50]
 
         return {
             "reminders": reminders,
-            "total_count": len(reminders)
+            "total_count": len(reminders),
+            "timed_out": timed_out
         }
 
     async def get_email_check_reminders(self, user_id: UUID) -> Dict[str, Any]:
         """
         メール確認リマインドのみ取得
         """
-        reminders = await self._generate_email_check_reminders(user_id)
+        reminders, timed_out = await self._run_generators(user_id, ["email_check"])
 
         return {
             "reminders": reminders,
-            "total_count": len(reminders)
+            "total_count": len(reminders),
+            "timed_out": timed_out
         }
 
     async def get_deadline_reminders(self, user_id: UUID) -> Dict[str, Any]:
         """
         締切リマインドのみ取得
         """
-        reminders = await self._generate_deadline_reminders(user_id)
+        reminders, timed_out = await self._run_generators(user_id, ["deadline"])
 
         # 優先度でソート
-        priority_order = {
-            ReminderPriority.HIGH: 0,
-            ReminderPriority.MEDIUM: 1,
-            ReminderPriority.LOW: 2
-        }
-        reminders.sort(key=lambda x: (priority_order[x["priority"]], x.get("days_remaining", 999)))
+        self._sort_by_priority(reminders)
 
         return {
             "reminders": reminders,
-            "total_count": len(reminders)
-        }
\ No newline at end of file
+            "total_count": len(reminders),
+            "timed_out": timed_out
+        }
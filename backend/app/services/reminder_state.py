@@ -0,0 +1,499 @@
+"""
+リマインドの差分更新（REMINDER_ENGINE=incremental）
+
+Python 版の ReminderService は呼ばれるたびにユーザーの選考状況とイベントを取得し直す。
+ここではユーザーごとに
+- 選考状況（企業ID -> status / updated_at / 企業）
+- それらの企業の今後のイベント
+を1回だけ読み込んで保持し、書き込みの通知（change_feed。ルーターのフック・Supabase Realtime）で差分を反映する。
+
+リマインドの条件は時間の経過でも切り替わる（7日以上更新なし・今後7日以内の予定・1-3日後の締切）。
+行ごとに次に条件が切り替わる時刻をタイマー（heapq）に積み、読み出し時に時刻を過ぎたものだけ判定し直す。
+読み出しは「期限の来たタイマー数 + リマインド数」に比例し、選考状況・イベントの総数には依存しない。
+
+状態はプロセス内に保持する。通知を取りこぼしても古い状態が残り続けないよう、
+REMINDER_STATE_TTL ごとに読み込み直す。
+読み込み中に届いた変更は取っておき、読み込み終わった状態に適用し直す。
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..config import EXPORT_CHUNK_SIZE, REMINDER_STATE_MAXSIZE, REMINDER_STATE_TTL
+from ..pagination import fetch_all
+from . import change_feed
+from .cache import BaseCache, register_cache
+from .reminder_service import (
+    EVENT_KEYSET, IN_FILTER_CHUNK_SIZE, SELECTION_KEYSET, ReminderService, _parse_timestamp
+)
+
+# メール確認の対象になるステータス（結果待ち）
+WAITING_STATUSES = ("ES_Submit", "Interview")
+
+# 変更を反映するテーブル
+WATCHED_TABLES = ("usercompanyselections", "events", "companies")
+
+# 「x より後」になる最初の時刻（日時の分解能はマイクロ秒）
+_EPSILON = timedelta(microseconds=1)
+
+
+def _email_check_boundaries(updated_at: datetime) -> List[datetime]:
+    # updated_at < now - 7日 になる時刻
+    return [updated_at + timedelta(days=7) + _EPSILON]
+
+
+def _event_boundaries(start: datetime) -> List[datetime]:
+    return [
+        start - timedelta(days=7) + _EPSILON,  # 今後7日以内の予定になる
+        start - timedelta(days=3),             # 1-3日後の締切になる
+        start - timedelta(days=1) + _EPSILON,  # 1日を切り、締切リマインドの対象から外れる
+        start + _EPSILON,                      # 開始を過ぎ、今後の予定でなくなる
+    ]
+
+
+class UserReminderState:
+    """
+    1ユーザー分の選考状況・イベントと、それから判定したリマインド対象の集合
+    """
+
+    def __init__(self, user_id: str, now: datetime):
+        self.user_id = user_id
+        self.now = now
+        self.loaded_at = time.monotonic()
+        # 企業ID -> 選考状況（companies を埋め込んだ行）
+        self.selections: Dict[str, Dict[str, Any]] = {}
+        # イベントID -> イベント（選考中の企業のもののみ）
+        self.events: Dict[str, Dict[str, Any]] = {}
+        # 判定済みの集合
+        self.stale: Set[str] = set()  # 結果待ちで7日以上更新がない企業
+        self.busy: Dict[str, Set[str]] = defaultdict(set)  # 企業ID -> 今後7日以内のイベントID
+        self.deadlines: Set[str] = set()  # 1-3日後の締切イベントID
+        # (時刻, 連番, 種類, キー)。キーごとに最新の時刻だけを有効とし、古いものは取り出したときに捨てる
+        self._timers: List[Tuple[datetime, int, str, str]] = []
+        self._scheduled: Dict[Tuple[str, str], datetime] = {}
+        self._seq = itertools.count()
+
+    # --- 判定 ---
+    def _schedule(self, kind: str, key: str, boundaries: List[datetime]) -> None:
+        upcoming = [at for at in boundaries if at > self.now]
+        if not upcoming:
+            self._scheduled.pop((kind, key), None)
+            return
+        at = min(upcoming)
+        self._scheduled[(kind, key)] = at
+        heapq.heappush(self._timers, (at, next(self._seq), kind, key))
+
+    def _refresh_selection(self, company_id: str) -> None:
+        self.stale.discard(company_id)
+        selection = self.selections.get(company_id)
+        if not selection or selection.get("status") not in WAITING_STATUSES or not selection.get("updated_at"):
+            self._scheduled.pop(("selection", company_id), None)
+            return
+        updated_at = _parse_timestamp(selection["updated_at"])
+        if updated_at < self.now - timedelta(days=7):
+            self.stale.add(company_id)
+        self._schedule("selection", company_id, _email_check_boundaries(updated_at))
+
+    def _unmark_event(self, event_id: str) -> None:
+        event = self.events.get(event_id)
+        self.deadlines.discard(event_id)
+        company_busy = self.busy.get(event["company_id"]) if event else None
+        if company_busy is not None:
+            company_busy.discard(event_id)
+            if not company_busy:
+                del self.busy[event["company_id"]]
+
+    def _refresh_event(self, event_id: str) -> None:
+        self._unmark_event(event_id)
+        event = self.events.get(event_id)
+        if event is None:
+            self._scheduled.pop(("event", event_id), None)
+            return
+
+        start = _parse_timestamp(event["start_time"])
+        if start < self.now:
+            # 過ぎたイベントはどの条件にも戻らないので捨てる
+            self.remove_event(event_id)
+            return
+        if start < self.now + timedelta(days=7):
+            self.busy[event["company_id"]].add(event_id)
+        if event.get("type") == "Deadline" and self.now + timedelta(days=1) <= start <= self.now + timedelta(days=3):
+            self.deadlines.add(event_id)
+        self._schedule("event", event_id, _event_boundaries(start))
+
+    def _refresh_all(self) -> None:
+        self._timers.clear()
+        self._scheduled.clear()
+        for company_id in list(self.selections):
+            self._refresh_selection(company_id)
+        for event_id in list(self.events):
+            self._refresh_event(event_id)
+
+    def advance(self, now: datetime) -> None:
+        """
+        now までに期限の来たタイマーの行だけ判定し直す
+        """
+        if now < self.now:
+            # 時刻が戻った場合（別の基準時刻での呼び出し）は全件判定し直す
+            self.now = now
+            self._refresh_all()
+            return
+        self.now = now
+        while self._timers and self._timers[0][0] <= now:
+            at, _, kind, key = heapq.heappop(self._timers)
+            if self._scheduled.get((kind, key)) != at:
+                continue
+            del self._scheduled[(kind, key)]
+            if kind == "selection":
+                self._refresh_selection(key)
+            else:
+                self._refresh_event(key)
+
+    # --- 差分の反映 ---
+    def set_selection(self, row: Dict[str, Any]) -> None:
+        company_id = str(row["company_id"])
+        current = self.selections.get(company_id) or {}
+        self.selections[company_id] = {**current, **row, "company_id": company_id}
+        self._refresh_selection(company_id)
+
+    def remove_selection(self, company_id: str) -> None:
+        self.selections.pop(company_id, None)
+        self._refresh_selection(company_id)
+        for event_id in [e for e, event in self.events.items() if event["company_id"] == company_id]:
+            self.remove_event(event_id)
+
+    def set_company(self, row: Dict[str, Any]) -> None:
+        selection = self.selections.get(str(row["id"]))
+        if selection is not None:
+            selection["companies"] = {**(selection.get("companies") or {}), **row}
+
+    def set_event(self, row: Dict[str, Any]) -> None:
+        event_id = str(row["id"])
+        company_id = str(row.get("company_id"))
+        if company_id not in self.selections:
+            # 選考中でない企業へ移動したイベント
+            self.remove_event(event_id)
+            return
+        current = self.events.get(event_id)
+        if current is not None and current["company_id"] != company_id:
+            self.remove_event(event_id)
+            current = None
+        self.events[event_id] = {**(current or {}), **row, "id": event_id, "company_id": company_id}
+        self._refresh_event(event_id)
+
+    def remove_event(self, event_id: str) -> None:
+        self._unmark_event(event_id)
+        self.events.pop(event_id, None)
+        self._scheduled.pop(("event", event_id), None)
+
+    # --- 読み出し ---
+    def reminders(self, now: datetime) -> List[Dict[str, Any]]:
+        """
+        now 時点のリマインドを優先度順に最大50件返す（Python 版と同じ形）
+        """
+        self.advance(now)
+        reminders = []
+        for company_id in self.stale:
+            if company_id not in self.busy:
+                reminders.append(ReminderService._build_email_check_reminder(self.selections[company_id], now))
+        for event_id in self.deadlines:
+            event = self.events[event_id]
+            selection = self.selections[event["company_id"]]
+            reminders.append(ReminderService._build_deadline_reminder(
+                {**event, "companies": selection["companies"]}, selection.get("status"), now
+            ))
+        ReminderService._sort_by_priority(reminders)
+        return reminders[:50]
+
+
+class ReminderStateStore(BaseCache):
+    """
+    ユーザーごとの UserReminderState を保持する（LRU + 読み込みからの有効期間）
+
+    hits: 保持している状態をそのまま使った回数 / misses: DBから読み込んだ回数
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        super().__init__(name, ttl)
+        self.maxsize = maxsize
+        self.updates = 0
+        self._states: "OrderedDict[str, UserReminderState]" = OrderedDict()
+        # 企業ID -> その企業を選考中として保持しているユーザー（イベントの変更の通知先）
+        self._users_by_company: Dict[str, Set[str]] = defaultdict(set)
+        # イベントID -> (企業ID, 開始日時)。別の企業へ移動・削除されたイベントの通知先を引くため
+        self._event_company: Dict[str, Tuple[str, datetime]] = {}
+        # (開始日時, イベントID)。開始を過ぎたイベントを _event_company から消すため
+        self._event_expiry: List[Tuple[datetime, str]] = []
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 読み込み中のユーザー -> その間に届いた変更 (テーブル, 種類, 変更後, 変更前)
+        self._pending: Dict[str, List[Tuple[str, str, Any, Any]]] = {}
+
+    async def get(self, db, user_id, now: datetime) -> UserReminderState:
+        """
+        ユーザーの状態を返す。なければ（期限切れなら）読み込む
+        同じユーザーの読み込みが重なった場合は1回にまとめる
+        """
+        user_id = str(user_id)
+        state = self._states.get(user_id)
+        if state is not None and time.monotonic() - state.loaded_at < self.ttl:
+            self.hits += 1
+            self._states.move_to_end(user_id)
+            return state
+
+        while user_id in self._inflight:
+            inflight = self._inflight[user_id]
+            self.hits += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 読み込み中の呼び出しが中断された場合は、自分で読み込み直す（自分が中断されたなら伝える）
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.hits -= 1
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        self._pending[user_id] = []
+        try:
+            state = await self._load(db, user_id, now)
+            self._put(state)
+            # 以降の変更は状態に直接届くので、取っておいた分だけを適用し直す
+            for table, change, record, old_record in self._pending.pop(user_id):
+                await self._apply(db, table, change, record, old_record, only=user_id)
+            future.set_result(state)
+            return state
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except asyncio.CancelledError:
+            # 呼び出し元の切断などで中断された場合、待っている呼び出しには例外を伝えず読み込み直させる
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[user_id]
+            self._pending.pop(user_id, None)
+
+    async def _load(self, db, user_id: str, now: datetime) -> UserReminderState:
+        """
+        選考状況と、その企業の今後のイベントを企業IDのチャンクごとに取得する
+        どちらも EXPORT_CHUNK_SIZE 件ずつページングする（max_rows で切り詰められると判定が狂うため）
+        """
+        state = UserReminderState(user_id, now)
+        selections = await fetch_all(lambda: db.table("usercompanyselections").select(
+            "id, user_id, company_id, status, updated_at, companies(*)"
+        ).eq("user_id", user_id), SELECTION_KEYSET, EXPORT_CHUNK_SIZE)
+        for selection in selections:
+            if selection.get("companies"):
+                state.set_selection(selection)
+
+        company_ids = list(state.selections)
+        for i in range(0, len(company_ids), IN_FILTER_CHUNK_SIZE):
+            for event in await self._fetch_events(db, company_ids[i:i + IN_FILTER_CHUNK_SIZE], now):
+                state.set_event(event)
+        return state
+
+    @staticmethod
+    async def _fetch_events(db, company_ids: List[str], now: datetime) -> List[Dict[str, Any]]:
+        return await fetch_all(lambda: db.table("events").select(
+            "id, company_id, type, start_time"
+        ).in_(
+            "company_id", company_ids
+        ).gte(
+            "start_time", now.isoformat()
+        ), EVENT_KEYSET, EXPORT_CHUNK_SIZE)
+
+    def _put(self, state: UserReminderState) -> None:
+        self.drop(state.user_id, count=False)
+        self._states[state.user_id] = state
+        self._index(state)
+        while len(self._states) > self.maxsize:
+            _, evicted = self._states.popitem(last=False)
+            self._unindex(evicted)
+            self.evictions += 1
+
+    def _track_event(self, event: Dict[str, Any]) -> None:
+        start = _parse_timestamp(event["start_time"])
+        self._event_company[str(event["id"])] = (str(event["company_id"]), start)
+        heapq.heappush(self._event_expiry, (start, str(event["id"])))
+
+    def _prune_events(self, now: datetime) -> None:
+        while self._event_expiry and self._event_expiry[0][0] < now:
+            start, event_id = heapq.heappop(self._event_expiry)
+            tracked = self._event_company.get(event_id)
+            # 開始日時が変わったイベントは新しい方の期限で消す
+            if tracked is not None and tracked[1] == start:
+                del self._event_company[event_id]
+
+    def _index(self, state: UserReminderState) -> None:
+        for company_id in state.selections:
+            self._users_by_company[company_id].add(state.user_id)
+        for event in state.events.values():
+            self._track_event(event)
+
+    def _unindex(self, state: UserReminderState) -> None:
+        for company_id in state.selections:
+            users = self._users_by_company.get(company_id)
+            if users is not None:
+                users.discard(state.user_id)
+                if not users:
+                    del self._users_by_company[company_id]
+        # どのユーザーも見ていない企業のイベントは追跡しない
+        for event_id, event in state.events.items():
+            if event["company_id"] not in self._users_by_company:
+                self._event_company.pop(event_id, None)
+
+    def drop(self, user_id, count: bool = True) -> None:
+        """
+        ユーザーの状態を破棄する（次の読み出しで読み込み直す）
+        """
+        state = self._states.pop(str(user_id), None)
+        if state is not None:
+            self._unindex(state)
+            if count:
+                self.invalidations += 1
+
+    async def clear(self) -> None:
+        self.invalidations += len(self._states)
+        self._states.clear()
+        self._users_by_company.clear()
+        self._event_company.clear()
+        self._event_expiry.clear()
+
+    async def apply_change(
+        self,
+        db,
+        table: str,
+        change: str,
+        record: Optional[Dict[str, Any]] = None,
+        old_record: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        1行の変更を保持中の状態に反映する
+
+        Args:
+            table: "usercompanyselections" / "events" / "companies"
+            change: "INSERT" / "UPDATE" / "DELETE"（Realtime の type と同じ）
+            record: 変更後の行（DELETE では None）
+            old_record: 変更前の行（DELETE では少なくとも id）
+        """
+        for pending in self._pending.values():
+            pending.append((table, change, record, old_record))
+        if not self._states:
+            return
+        self.updates += 1
+        await self._apply(db, table, change, record, old_record)
+
+    async def _apply(self, db, table, change, record, old_record, only: Optional[str] = None) -> None:
+        """
+        only を指定したときはそのユーザーの状態にだけ反映する（読み込み中に届いた変更の適用し直し）
+        """
+        if only is not None and only not in self._states:
+            return
+        self._prune_events(datetime.now(timezone.utc))
+        if table == "usercompanyselections":
+            await self._apply_selection(db, change, record, old_record, only)
+        elif table == "events":
+            self._apply_event(change, record, old_record, only)
+        elif table == "companies" and change != "DELETE" and record:
+            for user_id in list(self._users_by_company.get(str(record["id"]), ())):
+                if only is None or user_id == only:
+                    self._states[user_id].set_company(record)
+
+    async def _apply_selection(self, db, change, record, old_record, only: Optional[str] = None) -> None:
+        row = record or old_record or {}
+        user_id = str(row.get("user_id"))
+        state = self._states.get(user_id) if only is None or user_id == only else None
+        if state is None:
+            if change == "DELETE" and not row.get("user_id"):
+                # 主キーしか届かない DELETE ではユーザーが分からないので、id で探す
+                candidates = self._states.values() if only is None else [self._states[only]]
+                for candidate in list(candidates):
+                    for company_id, selection in list(candidate.selections.items()):
+                        if str(selection.get("id")) == str(row.get("id")):
+                            self._remove_selection(candidate, company_id)
+            return
+
+        old_company_id = None
+        for company_id, selection in state.selections.items():
+            if str(selection.get("id")) == str(row.get("id")):
+                old_company_id = company_id
+                break
+        if change == "DELETE" or (old_company_id and old_company_id != str(row.get("company_id"))):
+            if old_company_id:
+                self._remove_selection(state, old_company_id)
+        if change == "DELETE":
+            return
+
+        company_id = str(record["company_id"])
+        if company_id in state.selections:
+            state.set_selection(record)
+            return
+
+        # 新しく選考中になった企業は、企業とその今後のイベントだけ取得して追加する
+        selection = dict(record)
+        if not selection.get("companies"):
+            response = await db.table("companies").select("*").eq("id", company_id).execute()
+            if not response.data:
+                return
+            selection["companies"] = response.data[0]
+        state.set_selection(selection)
+        self._users_by_company[company_id].add(state.user_id)
+        for event in await self._fetch_events(db, [company_id], state.now):
+            state.set_event(event)
+            self._track_event(event)
+
+    def _remove_selection(self, state: UserReminderState, company_id: str) -> None:
+        state.remove_selection(company_id)
+        users = self._users_by_company.get(company_id)
+        if users is not None:
+            users.discard(state.user_id)
+            if not users:
+                del self._users_by_company[company_id]
+
+    def _apply_event(self, change, record, old_record, only: Optional[str] = None) -> None:
+        event_id = str((record or old_record or {}).get("id"))
+        tracked = self._event_company.get(event_id)
+        old_company_id = tracked[0] if tracked else None
+        new_company_id = str(record.get("company_id")) if record and change != "DELETE" else None
+
+        user_ids = set(self._users_by_company.get(old_company_id, ())) if old_company_id else set()
+        if new_company_id:
+            user_ids |= self._users_by_company.get(new_company_id, set())
+        if only is not None:
+            user_ids &= {only}
+
+        for user_id in user_ids:
+            if new_company_id:
+                self._states[user_id].set_event(record)
+            else:
+                self._states[user_id].remove_event(event_id)
+
+        if new_company_id and new_company_id in self._users_by_company:
+            self._track_event(record)
+        else:
+            self._event_company.pop(event_id, None)
+
+    def size(self) -> int:
+        return len(self._states)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "updates": self.updates,
+            "tracked_companies": len(self._users_by_company),
+            "tracked_events": len(self._event_company),
+        })
+        return stats
+
+
+reminder_states = register_cache(
+    ReminderStateStore("reminder_state", maxsize=REMINDER_STATE_MAXSIZE, ttl=REMINDER_STATE_TTL)
+)
+
+change_feed.subscribe("reminder state", WATCHED_TABLES, reminder_states.apply_change, reminder_states.clear)
@@ -0,0 +1,229 @@
+"""
+DB呼び出しのトレース（オプトイン）と遅いクエリのログ
+
+- TRACING_ENABLED=true のとき、リクエストごとに PostgREST 呼び出し（テーブル・操作・フィルタの要約・
+  行数・時間）を記録し、レスポンスに Server-Timing ヘッダーを付ける（ブラウザの開発者ツールで見える）
+- opentelemetry がインストールされていれば、同じ内容を OpenTelemetry のスパンとしても出す
+  （TracerProvider の設定はデプロイ側で行う。未設定なら何も送られない）
+- SLOW_QUERY_THRESHOLD_MS 以上かかった呼び出しは TRACING_ENABLED に関係なく
+  1行の JSON（"event": "slow_query"）を logging の WARNING で出力する（ロガー名は app.tracing）
+
+フィルタの要約には列名と演算子だけを入れ、値（ユーザーIDや検索語など）は入れない。
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from .config import SLOW_QUERY_THRESHOLD_MS, TRACING_ENABLED
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+_tracer = otel_trace.get_tracer("job-hunting-backend") if (otel_trace and TRACING_ENABLED) else None
+
+# Server-Timing に個別に載せるクエリの最大数（多すぎるとヘッダーが大きくなる）
+MAX_SERVER_TIMING_ENTRIES = 20
+
+# or=(a.eq.1,b.is.null) の中から「列.演算子」だけを取り出す
+_OR_CONDITION = re.compile(
+    r"([\w\->]+)\.(?:not\.)?(eq|neq|gt|gte|lt|lte|like|ilike|is|in|cs|cd|ov|fts|plfts|phfts|wfts)\."
+)
+
+
+class QuerySpan:
+    """
+    1回の PostgREST 呼び出しの記録
+    """
+
+    __slots__ = ("table", "operation", "filters", "rows", "duration_ms", "error")
+
+    def __init__(self, table: str, operation: str, filters: str, rows: Optional[int], duration_ms: float, error: bool):
+        self.table = table
+        self.operation = operation
+        self.filters = filters
+        self.rows = rows
+        self.duration_ms = duration_ms
+        self.error = error
+
+    def describe(self) -> str:
+        rows = "error" if self.error else f"{self.rows} rows"
+        return f"{self.operation} {self.table} ({rows})"
+
+
+class RequestTrace:
+    """
+    1リクエスト内のDB呼び出しの一覧（ContextVar 経由で DB のラッパーから追加する）
+    """
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.spans: List[QuerySpan] = []
+
+    @property
+    def route(self) -> Optional[str]:
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def server_timing(self) -> str:
+        entries = []
+        db_total = sum(span.duration_ms for span in self.spans)
+        entries.append(f'db;dur={db_total:.1f};desc="{len(self.spans)} queries"')
+        for i, span in enumerate(self.spans[:MAX_SERVER_TIMING_ENTRIES]):
+            entries.append(f'q{i + 1};dur={span.duration_ms:.1f};desc="{_quote(span.describe())}"')
+        entries.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _summarize_params(params) -> str:
+    parts = []
+    for key, value in params.multi_items():
+        if key == "select":
+            continue
+        if key in ("order", "limit", "offset", "on_conflict"):
+            parts.append(f"{key}={value}")
+        elif key in ("or", "and"):
+            conditions = ",".join(f"{column}.{op}" for column, op in _OR_CONDITION.findall(value))
+            parts.append(f"{key}({conditions})")
+        else:
+            op = value.split(".", 1)[0]
+            if op == "not":
+                op = "not." + value.split(".", 2)[1]
+            if op.endswith("in"):
+                op = f"{op}({value.count(',') + 1})"
+            parts.append(f"{key}={op}")
+    return " ".join(parts)
+
+
+def _summarize_fake(query) -> str:
+    # インメモリDB（app/memory_db.py）の MemoryQuery はフィルタを (列のパス, 演算子, 値) で持つ
+    parts = []
+    for path, op, value in query.filters:
+        if op == "in":
+            op = f"in({len(value)})"
+        parts.append(f"{'.'.join(path)}={op}")
+    parts += ["or(...)" for _ in getattr(query, "or_filters", [])]
+    for column, desc, _ in getattr(query, "order_by", []):
+        parts.append(f"order={column}.{'desc' if desc else 'asc'}")
+    if getattr(query, "limit_count", None) is not None:
+        parts.append(f"limit={query.limit_count}")
+    return " ".join(parts)
+
+
+def summarize_filters(query) -> str:
+    """
+    builder のフィルタ・並び順・件数を値抜きの短い文字列にする
+    （例: "user_id=eq status=in(3) order=start_time.asc limit=50"）
+    """
+    try:
+        request = getattr(query, "request", None)
+        if request is not None and hasattr(request, "params"):
+            return _summarize_params(request.params)
+        if hasattr(query, "filters"):
+            return _summarize_fake(query)
+    except Exception:
+        pass
+    return ""
+
+
+def _row_count(response: Any) -> Optional[int]:
+    data = getattr(response, "data", None)
+    if data is None:
+        return None if response is None else 0
+    return len(data) if isinstance(data, list) else 1
+
+
+def _emit_otel_span(span: QuerySpan, end_ns: int) -> None:
+    start_ns = end_ns - int(span.duration_ms * 1_000_000)
+    otel_span = _tracer.start_span(
+        f"{span.operation} {span.table}",
+        kind=otel_trace.SpanKind.CLIENT,
+        start_time=start_ns,
+        attributes={
+            "db.system": "postgresql",
+            "db.operation": span.operation,
+            "db.sql.table": span.table,
+            "db.postgrest.filters": span.filters,
+            "db.response.rows": -1 if span.rows is None else span.rows,
+        },
+    )
+    if span.error:
+        otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+    otel_span.end(end_time=end_ns)
+
+
+def record_query(table: str, operation: str, query, response: Any, seconds: float, error: bool = False) -> None:
+    """
+    DB のラッパー（metrics.InstrumentedQuery）から execute() のたびに呼ばれる
+    """
+    duration_ms = seconds * 1000
+    slow = SLOW_QUERY_THRESHOLD_MS > 0 and duration_ms >= SLOW_QUERY_THRESHOLD_MS
+    if not TRACING_ENABLED and not slow:
+        return
+
+    span = QuerySpan(table, operation, summarize_filters(query), _row_count(response), duration_ms, error)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.spans.append(span)
+    if _tracer is not None:
+        _emit_otel_span(span, time.time_ns())
+    if slow:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "table": span.table,
+            "operation": span.operation,
+            "filters": span.filters,
+            "rows": span.rows,
+            "duration_ms": round(span.duration_ms, 1),
+            "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+            "error": span.error,
+            "route": trace.route if trace is not None else None,
+        }, ensure_ascii=False))
+
+
+class TracingMiddleware:
+    """
+    リクエストごとにトレースを用意し、レスポンスヘッダーに Server-Timing を付ける ASGI ミドルウェア
+
+    ヘッダーはレスポンスの開始時点で組み立てるので、ストリーミングのレスポンス（エクスポートなど）では
+    ヘッダー送信後に行ったクエリは含まれない
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("utf-8")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
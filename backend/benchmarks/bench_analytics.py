@@ -0,0 +1,116 @@
+"""
+分析API（/api/analytics）と、分析ページが行っていた集計の比較
+
+旧: frontend/app/analytics/page.tsx と同じく選考状況・イベント・ESの行を4回に分けて取得し、
+    日ごとに filter(startsWith(date)) で数える（日数 × 行数）
+新: GET /api/analytics（必要な列・期間だけ取得して dict で数え、結果をキャッシュ）
+
+同じデータで結果が一致するかを確かめ、転送量・DB往復回数・取得行数・時間を出力する。
+SQL 版（get_user_analytics）との一致は scripts/check_analytics_parity.py で確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_analytics
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import analytics
+from app.services.analytics import STATUSES, analytics_cache
+from .datasets import generate_dataset
+
+
+async def legacy_page(db: MemoryClient, user_id: str, today):
+    """
+    page.tsx の取得・集計をそのまま移したもの（転送したJSONのバイト数も返す）
+    """
+    last7 = [(today - timedelta(days=6 - i)).isoformat() for i in range(7)]
+    last30 = [(today - timedelta(days=29 - i)).isoformat() for i in range(30)]
+
+    selections = (await db.table("usercompanyselections").select("status, created_at")
+                  .eq("user_id", user_id).execute()).data
+    week_events = (await db.table("events").select("start_time, userevents!inner(user_id)")
+                   .eq("userevents.user_id", user_id).gte("start_time", last7[0]).execute()).data
+    week_es = (await db.table("es_entries").select("submitted_at")
+               .eq("user_id", user_id).gte("submitted_at", last7[0]).execute()).data
+    all_selections = (await db.table("usercompanyselections").select("created_at")
+                      .eq("user_id", user_id).gte("created_at", last30[0]).execute()).data
+    transferred = sum(len(json.dumps(rows, ensure_ascii=False).encode()) for rows in
+                      (selections, week_events, week_es, all_selections))
+
+    status_counts = {status: 0 for status in STATUSES}
+    for s in selections:
+        if s["status"] in status_counts:
+            status_counts[s["status"]] += 1
+    activity = [
+        {
+            "date": day,
+            "events": len([e for e in week_events if e["start_time"].startswith(day)]),
+            "es": len([e for e in week_es if (e["submitted_at"] or "").startswith(day)]),
+        }
+        for day in last7
+    ]
+    progress = [
+        {"date": day, "count": len([s for s in all_selections if s["created_at"].startswith(day)])}
+        for day in last30
+    ]
+    return {
+        "total_companies": len(selections),
+        "status_counts": status_counts,
+        "activity": activity,
+        "progress": progress,
+    }, transferred
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    today = datetime.now(timezone.utc).date()
+    app = FastAPI()
+    app.include_router(analytics.router)
+
+    print(f"{'events/tasks':>12} | {'method':<16} | {'db trips':>8} | {'rows':>6} | {'payload':>9} | {'time':>8}")
+    mismatches = 0
+    for size in (1_000, 10_000, 100_000):
+        # 1人あたりの企業・イベントが多い状態（上位ユーザー）も見るため、ユーザー数は固定
+        tables, user_ids = generate_dataset(size, users=args.users, companies_per_user=min(300, size // 20))
+        db = MemoryClient(tables, latency=args.latency)
+        app.dependency_overrides[get_db] = lambda: db
+        user_id = user_ids[0]
+
+        db.round_trips = db.rows_returned = 0
+        started = time.perf_counter()
+        expected, transferred = await legacy_page(db, user_id, today)
+        rows = [("legacy page.tsx", db.round_trips, db.rows_returned, transferred, time.perf_counter() - started)]
+
+        await analytics_cache.clear()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for label in ("/api/analytics", "  (cached)"):
+                db.round_trips = db.rows_returned = 0
+                started = time.perf_counter()
+                response = await client.get("/api/analytics", params={"user_id": user_id})
+                rows.append((label, db.round_trips, db.rows_returned, len(response.content), time.perf_counter() - started))
+
+        actual = response.json()
+        if any(actual[key] != expected[key] for key in expected):
+            mismatches += 1
+            print(f"❌ size {size}: expected {expected} got {actual}")
+        for label, trips, fetched, payload, elapsed in rows:
+            print(f"{size:>12} | {label:<16} | {trips:>8} | {fetched:>6} | {payload / 1024:>7.1f}KB | {elapsed * 1000:>6.1f}ms")
+
+    print("\n❌ results differ" if mismatches else "\n✅ /api/analytics matches the page's own aggregation")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
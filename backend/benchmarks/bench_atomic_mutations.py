@@ -0,0 +1,143 @@
+"""
+存在確認してから書き込む旧実装と、条件付きの1文で書き込む現行実装の比較
+
+- 1操作あたりのDB往復回数
+- 同じ操作を同時に投げたときの結果
+  - 振り返りの作成: 同じイベントへの同時作成で 1件だけ成功し、残りが 400 になるか
+  - タスク完了の切り替え: 偶数回の同時切り替えで元の状態に戻るか（読んでから書くと打ち消し合わない）
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_atomic_mutations
+"""
+import argparse
+import asyncio
+from collections import Counter
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import es_entries, reflections, tasks
+
+USER_ID = str(uuid4())
+
+
+def build_tables():
+    event = {"id": str(uuid4()), "title": "一次面接", "type": "Interview", "start_time": "2025-06-01T10:00:00+00:00"}
+    task = {"id": str(uuid4()), "user_id": USER_ID, "title": "ES提出", "is_completed": False}
+    company = {"id": str(uuid4()), "name": "株式会社サンプル", "user_id": USER_ID}
+    entry = {
+        "id": str(uuid4()),
+        "company_id": company["id"],
+        "user_id": USER_ID,
+        "content": "下書き",
+        "created_at": "2025-05-01T00:00:00+00:00",
+        "updated_at": "2025-05-01T00:00:00+00:00",
+    }
+    return {
+        "events": [event],
+        "tasks": [task],
+        "companies": [company],
+        "es_entries": [entry],
+        "reflections": [],
+    }
+
+
+async def legacy_create_reflection(db, event_id: str) -> int:
+    event = await db.table("events").select("id").eq("id", event_id).execute()
+    if not event.data:
+        return 404
+    existing = await db.table("reflections").select("id").eq("event_id", event_id).execute()
+    if existing.data:
+        return 400
+    try:
+        await db.table("reflections").insert({"event_id": event_id, "content": "良かった"}).execute()
+    except Exception:
+        return 500
+    return 200
+
+
+async def legacy_toggle(db, task_id: str) -> None:
+    current = await db.table("tasks").select("is_completed").eq("id", task_id).eq("user_id", USER_ID).execute()
+    new_status = not current.data[0]["is_completed"]
+    await db.table("tasks").update({"is_completed": new_status}).eq("id", task_id).eq("user_id", USER_ID).execute()
+
+
+def count_trips(db, before: int, operations: int) -> float:
+    return (db.round_trips - before) / operations
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.01, help="DB往復1回あたりの秒数")
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    for module in (reflections, tasks, es_entries):
+        app.include_router(module.router)
+    transport = httpx.ASGITransport(app=app)
+
+    # --- 同時作成 ---
+    legacy_db = MemoryClient(build_tables(), latency=args.latency)
+    event_id = legacy_db.tables["events"][0]["id"]
+    legacy = Counter(await asyncio.gather(
+        *(legacy_create_reflection(legacy_db, event_id) for _ in range(args.concurrency))
+    ))
+
+    db = MemoryClient(build_tables(), latency=args.latency)
+    app.dependency_overrides[get_db] = lambda: db
+    event_id = db.tables["events"][0]["id"]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/reflections", json={"event_id": event_id, "content": "良かった"})
+            for _ in range(args.concurrency)
+        ))
+        current = Counter(r.status_code for r in responses)
+        missing = await client.post("/api/reflections", json={"event_id": str(uuid4())})
+
+    print(f"{args.concurrency} concurrent creates for one event")
+    print(f"  legacy : {dict(legacy)}")
+    print(f"  atomic : {dict(current)}  (unknown event -> {missing.status_code})")
+
+    # --- 同時切り替え（偶数回なら元に戻るはず） ---
+    toggles = args.concurrency if args.concurrency % 2 == 0 else args.concurrency + 1
+    task_id = legacy_db.tables["tasks"][0]["id"]
+    before = legacy_db.round_trips
+    await asyncio.gather(*(legacy_toggle(legacy_db, task_id) for _ in range(toggles)))
+    legacy_trips = count_trips(legacy_db, before, toggles)
+    legacy_state = legacy_db.tables["tasks"][0]["is_completed"]
+
+    task_id = db.tables["tasks"][0]["id"]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before = db.round_trips
+        await asyncio.gather(*(
+            client.put(f"/api/tasks/{task_id}/complete", params={"user_id": USER_ID}) for _ in range(toggles)
+        ))
+        atomic_trips = count_trips(db, before, toggles)
+        other_user = await client.put(f"/api/tasks/{task_id}/complete", params={"user_id": str(uuid4())})
+    atomic_state = db.tables["tasks"][0]["is_completed"]
+
+    print(f"{toggles} concurrent toggles starting from False (expected False)")
+    print(f"  legacy : {legacy_state}  ({legacy_trips:.0f} round trips each)")
+    print(f"  atomic : {atomic_state}  ({atomic_trips:.0f} round trip each, other user -> {other_user.status_code})")
+
+    # --- ESエントリーの更新・削除 ---
+    entry = db.tables["es_entries"][0]
+    body = {"company_id": entry["company_id"], "user_id": USER_ID, "content": "完成版", "status": "Completed"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before = db.round_trips
+        updated = await client.put(f"/api/es-entries/{entry['id']}", params={"user_id": USER_ID}, json=body)
+        forbidden = await client.put(f"/api/es-entries/{entry['id']}", params={"user_id": str(uuid4())}, json=body)
+        deleted = await client.delete(f"/api/es-entries/{entry['id']}", params={"user_id": USER_ID})
+        gone = await client.delete(f"/api/es-entries/{entry['id']}", params={"user_id": USER_ID})
+    print(f"ES entry update/other user/delete/delete again: "
+          f"{updated.status_code}/{forbidden.status_code}/{deleted.status_code}/{gone.status_code} "
+          f"in {db.round_trips - before} round trips")
+    app.dependency_overrides.pop(get_db, None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+"""
+一括API（/api/tasks/bulk など）のベンチマーク
+
+100件のタスクを完了にする操作を
+- 1件ずつ PUT /api/tasks/{id}
+- POST /api/tasks/bulk 1回
+で比較し、DB往復回数と所要時間を出力する。
+100社の選考ステータスの変更も、企業ごとの update と POST /api/companies/selections/bulk 1回で比較する。
+あわせて作成・内容の異なる更新・削除・存在しないID・不正な入力を混ぜたときの
+1件ごとの結果を確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_bulk
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import companies, tasks, events
+
+USER_ID = str(uuid4())
+
+
+def build_tables(size: int):
+    now = "2025-05-01T00:00:00+00:00"
+    return {
+        "tasks": [
+            {
+                "id": str(uuid4()),
+                "user_id": USER_ID,
+                "title": f"タスク{i}",
+                "due_date": None,
+                "is_completed": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(size)
+        ],
+        "events": [],
+        "companies": [],
+        "usercompanyselections": [],
+    }
+
+
+def build_selections(size: int):
+    tables = build_tables(0)
+    now = "2025-05-01T00:00:00+00:00"
+    for i in range(size):
+        company_id = str(uuid4())
+        tables["companies"].append({"id": company_id, "name": f"企業{i}", "user_id": USER_ID})
+        tables["usercompanyselections"].append({
+            "id": str(uuid4()),
+            "user_id": USER_ID,
+            "company_id": company_id,
+            "status": "Entry",
+            "motivation_level": 3,
+            "encrypted_password": "secret",
+            "created_at": now,
+            "updated_at": now,
+        })
+    return tables
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01, help="DB往復1回あたりの秒数")
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(companies.router)
+    app.include_router(tasks.router)
+    app.include_router(events.router)
+    transport = httpx.ASGITransport(app=app)
+
+    # --- 1件ずつ更新 ---
+    db = MemoryClient(build_tables(args.size), latency=args.latency)
+    app.dependency_overrides[get_db] = lambda: db
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for task in list(db.tables["tasks"]):
+            body = {"title": task["title"], "user_id": USER_ID, "is_completed": True}
+            response = await client.put(f"/api/tasks/{task['id']}", params={"user_id": USER_ID}, json=body)
+            response.raise_for_status()
+        one_by_one = (time.perf_counter() - started, db.round_trips)
+
+    # --- 一括更新 ---
+    db = MemoryClient(build_tables(args.size), latency=args.latency)
+    app.dependency_overrides[get_db] = lambda: db
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        items = [{"op": "update", "id": task["id"], "data": {"is_completed": True}} for task in db.tables["tasks"]]
+        started = time.perf_counter()
+        response = await client.post("/api/tasks/bulk", params={"user_id": USER_ID}, json={"items": items})
+        response.raise_for_status()
+        bulk = (time.perf_counter() - started, db.round_trips)
+        completed = sum(1 for task in db.tables["tasks"] if task["is_completed"])
+
+    print(f"mark {args.size} tasks completed")
+    print(f"  one by one : {one_by_one[0] * 1000:>7.1f}ms, {one_by_one[1]} round trips")
+    print(f"  bulk       : {bulk[0] * 1000:>7.1f}ms, {bulk[1]} round trips ({completed} completed)")
+
+    # --- 種類の混在 ---
+    db.round_trips = 0
+    existing = db.tables["tasks"]
+    items = [
+        {"op": "create", "data": {"title": "新規タスク1"}},
+        {"op": "create", "data": {"title": "新規タスク2", "due_date": "2025-06-01T00:00:00+09:00"}},
+        {"op": "update", "id": existing[0]["id"], "data": {"title": "名前変更"}},
+        {"op": "update", "id": existing[1]["id"], "data": {"is_completed": False}},
+        {"op": "update", "id": existing[2]["id"], "data": {"is_completed": False}},
+        {"op": "delete", "id": existing[3]["id"]},
+        {"op": "delete", "id": str(uuid4())},
+        {"op": "update", "id": existing[4]["id"], "data": {"priority": 1}},
+        {"op": "create", "data": {"description": "タイトルなし"}},
+        {"op": "delete", "id": existing[0]["id"]},
+    ]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/tasks/bulk", params={"user_id": USER_ID}, json={"items": items})
+        body = response.json()
+        too_many = await client.post(
+            "/api/events/bulk", params={"user_id": USER_ID},
+            json={"items": [{"op": "delete", "id": str(uuid4())}] * 10000}
+        )
+    print(f"mixed batch of {len(items)}: {db.round_trips} round trips, "
+          f"succeeded {body['succeeded']}, failed {body['failed']}")
+    for result in body["results"]:
+        print(f"  [{result['index']}] {result['op']:<6} -> {result['status']} {result['error'] or ''}")
+    print(f"10000 items -> {too_many.status_code}")
+
+    # --- 100社の選考ステータス変更 ---
+    db = MemoryClient(build_selections(args.size), latency=args.latency)
+    app.dependency_overrides[get_db] = lambda: db
+    company_ids = [row["company_id"] for row in db.tables["usercompanyselections"]]
+    started = time.perf_counter()
+    for company_id in company_ids:
+        # フロントエンドの選考状況フォームと同じく企業ごとに1回ずつ更新する
+        await db.table("usercompanyselections").update({"status": "ES_Submit"}).eq(
+            "user_id", USER_ID).eq("company_id", company_id).execute()
+    one_by_one = (time.perf_counter() - started, db.round_trips)
+
+    db = MemoryClient(build_selections(args.size), latency=args.latency)
+    app.dependency_overrides[get_db] = lambda: db
+    company_ids = [row["company_id"] for row in db.tables["usercompanyselections"]]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        items = [{"op": "update", "id": company_id, "data": {"status": "ES_Submit"}} for company_id in company_ids]
+        started = time.perf_counter()
+        response = await client.post("/api/companies/selections/bulk", params={"user_id": USER_ID}, json={"items": items})
+        response.raise_for_status()
+        bulk = (time.perf_counter() - started, db.round_trips)
+        changed = sum(1 for row in db.tables["usercompanyselections"] if row["status"] == "ES_Submit")
+        leaked = any("encrypted_password" in (result["data"] or {}) for result in response.json()["results"])
+
+        # 志望度の変更・削除・選考中でない企業・企業IDの変更を混ぜる
+        db.round_trips = 0
+        items = [
+            {"op": "update", "id": company_ids[0], "data": {"motivation_level": 5}},
+            {"op": "update", "id": company_ids[1], "data": {"motivation_level": 5}},
+            {"op": "delete", "id": company_ids[2]},
+            {"op": "delete", "id": company_ids[3]},
+            {"op": "update", "id": str(uuid4()), "data": {"status": "Interview"}},
+            {"op": "update", "id": company_ids[4], "data": {"company_id": str(uuid4())}},
+        ]
+        mixed = (await client.post("/api/companies/selections/bulk", params={"user_id": USER_ID}, json={"items": items})).json()
+    print(f"\nchange the status of {args.size} companies")
+    print(f"  one by one : {one_by_one[0] * 1000:>7.1f}ms, {one_by_one[1]} round trips")
+    print(f"  bulk       : {bulk[0] * 1000:>7.1f}ms, {bulk[1]} round trips ({changed} changed, secrets returned: {leaked})")
+    print(f"mixed selections batch of {len(items)}: {db.round_trips} round trips, "
+          f"{len(db.tables['usercompanyselections'])} selections left")
+    for result in mixed["results"]:
+        print(f"  [{result['index']}] {result['op']:<6} -> {result['status']} {result['error'] or ''}")
+    app.dependency_overrides.pop(get_db, None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,268 @@
+"""
+カレンダー（/api/calendar/month・/api/calendar/week）と、月ごとにイベントを取り直す方法の比較
+
+旧: frontend/app/calendar/page.tsx と同じく、表示する月のイベントを毎回取得する（月を移動するたびに1往復）
+新: GET /api/calendar/month/{YYYY-MM}?prefetch=1（前後の月も返し、月ごとにキャッシュ）
+
+1. 前月・翌月へ移動を繰り返したときの DB往復回数・時間・転送量
+2. 日ごとのまとめ方が、イベントを1件ずつ日付（Asia/Tokyo）に振り分けた結果と一致するか
+   （月をまたぐ複数日のイベント・0時ちょうどに終わるイベントを含む）
+3. イベントの追加・移動・削除・参加登録の変更（notify_change）で、かかる月のキャッシュだけが作り直されるか
+   （覚えておくイベントの月が、期限の切れた月の分だけ捨てられるか）
+4. 週（ISO週）が月の境目をまたいでも、月のキャッシュから組み立てられるか
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_calendar
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import calendar
+from app.services import calendar as calendar_service
+from app.services.calendar import calendar_cache, parse_month, shift_month
+from app.services.change_feed import notify_change
+from .datasets import generate_dataset
+
+TZ = ZoneInfo("Asia/Tokyo")
+
+
+async def legacy_month(db: MemoryClient, user_id: str, month: str) -> int:
+    """
+    page.tsx と同じ1か月分の取得（JSON のバイト数を返す）
+    """
+    first, last = parse_month(month)
+    start = datetime.combine(first, datetime.min.time(), tzinfo=TZ).astimezone(timezone.utc)
+    end = datetime.combine(last, datetime.max.time(), tzinfo=TZ).astimezone(timezone.utc)
+    rows = (await db.table("events").select("*, companies(name), userevents!inner(user_id)")
+            .eq("userevents.user_id", user_id)
+            .gte("start_time", start.isoformat()).lte("start_time", end.isoformat())
+            .order("start_time").execute()).data
+    return len(json.dumps(rows, ensure_ascii=False).encode())
+
+
+def expected_days(tables, user_id: str, month: str):
+    """
+    イベントを1件ずつ、かかる日（Asia/Tokyo）に振り分ける
+    """
+    first, last = parse_month(month)
+    joined = {row["event_id"] for row in tables["userevents"] if row["user_id"] == user_id}
+    days = defaultdict(set)
+    for event in tables["events"]:
+        if event["id"] not in joined:
+            continue
+        start = datetime.fromisoformat(event["start_time"])
+        end = datetime.fromisoformat(event["end_time"]) if event.get("end_time") else start
+        day = start.astimezone(TZ).date()
+        while True:
+            if first <= day <= last:
+                days[day.isoformat()].add(event["id"])
+            day += timedelta(days=1)
+            if datetime.combine(day, datetime.min.time(), tzinfo=TZ) >= end:
+                break
+    return {day: ids for day, ids in days.items()}
+
+
+def actual_days(payload):
+    return {day: {payload["events"][i]["id"] for i in indexes} for day, indexes in payload["days"].items()}
+
+
+def _utc(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat()
+
+
+async def add_event(db: MemoryClient, user_id: str, start: datetime, end: datetime, title: str):
+    event = {
+        "id": str(uuid.uuid4()), "user_id": user_id, "company_id": None, "title": title, "type": "Other",
+        "start_time": _utc(start), "end_time": _utc(end), "location": None, "description": None,
+    }
+    await db.table("events").insert(event).execute()
+    await db.table("userevents").insert({"event_id": event["id"], "user_id": user_id, "status": "Joined"}).execute()
+    return event
+
+
+class CalendarClient:
+    """
+    MonthlyCalendar.tsx と同じ取り方: 受け取った月（adjacent を含む）を覚えておき、
+    表示する月がなければ prefetch=1 で取得、あれば足りない隣の月だけ prefetch=0 で取得する
+    """
+
+    def __init__(self, client: httpx.AsyncClient, user_id: str):
+        self.client = client
+        self.user_id = user_id
+        self.months = {}
+        self.bytes = 0
+
+    async def _get(self, month: str, prefetch: int):
+        response = await self.client.get(f"/api/calendar/month/{month}",
+                                         params={"user_id": self.user_id, "prefetch": prefetch})
+        response.raise_for_status()
+        self.bytes += len(response.content)
+        payload = response.json()
+        self.months[payload["key"]] = payload
+        self.months.update(payload["adjacent"])
+
+    async def show(self, month: str) -> bool:
+        """
+        月を表示する。取得を待たずに表示できたら True
+        """
+        ready = month in self.months
+        if not ready:
+            await self._get(month, prefetch=1)
+        for neighbor in (shift_month(month, -1), shift_month(month, 1)):
+            if neighbor not in self.months:
+                await self._get(neighbor, prefetch=0)
+        return ready
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    tables, user_ids = generate_dataset(args.size, users=20)
+    db = MemoryClient(tables, latency=args.latency)
+    user_id = user_ids[0]
+    this_month = datetime.now(TZ).strftime("%Y-%m")
+    # 月をまたぐ複数日のイベントと、0時ちょうどに終わるイベント
+    month_end = datetime.combine(parse_month(this_month)[1], datetime.min.time(), tzinfo=TZ)
+    await add_event(db, user_id, month_end - timedelta(days=1, hours=-10), month_end + timedelta(days=2, hours=12), "合宿インターン")
+    await add_event(db, user_id, month_end + timedelta(hours=18), month_end + timedelta(days=1), "0時に終わる説明会")
+
+    app = FastAPI()
+    app.include_router(calendar.router)
+    app.dependency_overrides[get_db] = lambda: db
+    await calendar_cache.clear()
+    failures = 0
+
+    # 今月 -> 6か月先 -> 今月 -> 6か月前 と1か月ずつ移動する
+    route = [shift_month(this_month, n) for n in list(range(0, 7)) + list(range(5, -7, -1))]
+    print(f"navigation: {len(route)} months ({route[0]} .. {max(route)} .. {min(route)})")
+    print(f"{'method':<28} | {'db trips':>8} | {'payload':>9} | {'time':>8} | shown without waiting")
+
+    db.round_trips = 0
+    started = time.perf_counter()
+    size = 0
+    for month in route:
+        size += await legacy_month(db, user_id, month)
+    print(f"{'legacy month query':<28} | {db.round_trips:>8} | {size / 1024:>7.1f}KB | "
+          f"{(time.perf_counter() - started) * 1000:>6.1f}ms | 0/{len(route)}")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def get(view, key, prefetch=1):
+            response = await client.get(f"/api/calendar/{view}/{key}", params={"user_id": user_id, "prefetch": prefetch})
+            response.raise_for_status()
+            return response
+
+        for label in ("/api/calendar (cold cache)", "  (another tab, warm)"):
+            browser = CalendarClient(client, user_id)
+            db.round_trips = 0
+            started = time.perf_counter()
+            shown = [await browser.show(month) for month in route]
+            print(f"{label:<28} | {db.round_trips:>8} | {browser.bytes / 1024:>7.1f}KB | "
+                  f"{(time.perf_counter() - started) * 1000:>6.1f}ms | {sum(shown)}/{len(route)}")
+
+        # 日ごとのまとめ方
+        print()
+        for month in (shift_month(this_month, -1), this_month, shift_month(this_month, 1)):
+            payload = (await get("month", month, prefetch=0)).json()
+            ok = actual_days(payload) == expected_days(db.tables, user_id, month)
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {month}: {len(payload['events'])} events in {len(payload['days'])} days match per-event bucketing")
+
+        # 変更の反映（書き込みと同じく notify_change を通す）
+        next_month = shift_month(this_month, 1)
+        after_next = shift_month(this_month, 2)
+        await get("month", next_month, prefetch=1)
+        other = await client.get(f"/api/calendar/month/{next_month}", params={"user_id": user_ids[1], "prefetch": 0})
+        other.raise_for_status()
+        start = datetime.combine(parse_month(next_month)[0] + timedelta(days=9), datetime.min.time(), tzinfo=TZ) + timedelta(hours=10)
+        event = await add_event(db, user_id, start, start + timedelta(hours=1), "追加した面接")
+        await notify_change(db, "events", "INSERT", event)
+        db.round_trips = 0
+        inserted = (await get("month", next_month, prefetch=0)).json()
+        ok = event["id"] in {e["id"] for e in inserted["events"]} and db.round_trips == 1
+        untouched_trips = db.round_trips
+        await get("month", after_next, prefetch=0)
+        ok = ok and db.round_trips == untouched_trips  # 関係ない月はキャッシュのまま
+        # 参加していない他のユーザーの同じ月もキャッシュのまま
+        again = await client.get(f"/api/calendar/month/{next_month}", params={"user_id": user_ids[1], "prefetch": 0})
+        ok = ok and db.round_trips == untouched_trips and again.json() == other.json()
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} insert refreshes only {next_month} of the participating user")
+
+        # 移動: Realtime と同じく変更前の行は id だけ（キャッシュに載せたときに覚えた月で作り直す）
+        await get("month", after_next, prefetch=0)
+        moved = start + timedelta(days=31)
+        response = await db.table("events").update({"start_time": _utc(moved), "end_time": _utc(moved + timedelta(hours=1))}) \
+            .eq("id", event["id"]).execute()
+        await notify_change(db, "events", "UPDATE", response.data[0], {"id": event["id"]})
+        old_month = (await get("month", next_month, prefetch=0)).json()
+        new_month = (await get("month", after_next, prefetch=0)).json()
+        ok = (event["id"] not in {e["id"] for e in old_month["events"]}
+              and event["id"] in {e["id"] for e in new_month["events"]})
+        # 削除: 日時を持たない通知でも、載っている月が作り直される
+        await db.table("events").delete().eq("id", event["id"]).execute()
+        await notify_change(db, "events", "DELETE", old_record={"id": event["id"]})
+        deleted = (await get("month", after_next, prefetch=0)).json()
+        ok = ok and event["id"] not in {e["id"] for e in deleted["events"]}
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} moving / deleting with id-only old records refreshes the cached months")
+
+        # 参加登録だけの変更（フロントエンドから userevents に直接書き込んだものは Realtime でこの形で届く）
+        shared = await add_event(db, user_ids[1], start, start + timedelta(hours=2), "他のユーザーが登録した説明会")
+        await get("month", next_month, prefetch=0)
+        link = {"event_id": shared["id"], "user_id": user_id, "status": "Joined"}
+        await db.table("userevents").insert(link).execute()
+        await notify_change(db, "userevents", "INSERT", link)
+        joined = (await get("month", next_month, prefetch=0)).json()
+        await db.table("userevents").delete().eq("event_id", shared["id"]).eq("user_id", user_id).execute()
+        await notify_change(db, "userevents", "DELETE", old_record=link)
+        left = (await get("month", next_month, prefetch=0)).json()
+        ok = (shared["id"] in {e["id"] for e in joined["events"]}
+              and shared["id"] not in {e["id"] for e in left["events"]})
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} joining / leaving an event (userevents only) refreshes the month")
+
+        # 覚えておくイベントの月と世代は、キャッシュの期限が切れた分を捨てる
+        tracked = len(calendar_service._event_user_months)
+        generations = len(calendar_service._generations)
+        ttl = calendar_service.CALENDAR_CACHE_TTL
+        calendar_service.CALENDAR_CACHE_TTL = 0
+        await get("month", shift_month(this_month, 12), prefetch=0)
+        calendar_service.CALENDAR_CACHE_TTL = ttl
+        ok = (set(calendar_service._tracked_events) <= {(user_id, shift_month(this_month, 12))}
+              and len(calendar_service._event_user_months) < tracked
+              and generations > 0 and not calendar_service._generations)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} tracked events and generations drop with expired months "
+              f"({tracked} -> {len(calendar_service._event_user_months)} events, {generations} -> 0 generations)")
+
+        # 月の境目をまたぐ週
+        week_start = parse_month(next_month)[0]
+        year, week, _ = week_start.isocalendar()
+        payload = (await get("week", f"{year}-W{week:02d}", prefetch=1)).json()
+        expected = {}
+        for month in {payload["start"][:7], payload["end"][:7]}:
+            expected.update(expected_days(db.tables, user_id, month))
+        expected = {day: ids for day, ids in expected.items() if payload["start"] <= day <= payload["end"]}
+        ok = actual_days(payload) == expected and len(payload["adjacent"]) == 2
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} week {payload['key']} ({payload['start']} .. {payload['end']}) matches its months")
+
+    print("\n❌ some checks failed" if failures else "\n✅ calendar checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+"""
+企業検索（/api/companies/search）のインデックスと、企業選択フォームの全件取得・絞り込みの比較
+
+旧: /api/companies/list で companies を全件取得し、ブラウザで name.toLowerCase().includes(q)
+新: プロセス内の CompanyIndex（前方一致の配列 + bigram の転置インデックス）で上位K件
+
+企業数ごとにインデックスの作成時間と1回の検索の時間（p50 / p95）・転送量を出力し、
+インメモリDB から読み込んだインデックスで、かな・カナ・半角カナ・法人格・表記ゆれの検索と
+書き込みの反映（追加・名前変更・削除）を確かめる。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_company_search
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import company_search
+from app.services.company_index import CompanyCatalog, company_index
+from app.services.change_feed import notify_change
+
+KANA = list("アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン")
+KANJI = list("東西南北日本山川田中大小高新光明和平安富士三井住友野村")
+SUFFIXES = ["自動車", "製作所", "商事", "銀行", "証券", "電機", "ホールディングス", "システムズ", "エージェント", "運輸",
+            "不動産", "建設", "化学", "食品", "薬品", "電力", "ガス", "鉄道", "航空", "保険", "出版", "放送", "工業", "物産"]
+LEGAL_FORMS = ["株式会社{}", "{}株式会社", "{}", "(株){}"]
+INDUSTRIES = [{"id": 1, "industries": "メーカー"}, {"id": 2, "industries": "金融"}, {"id": 3, "industries": "IT・通信"}]
+QUERIES = ["と", "とよ", "トヨタ", "ｿﾆｰ", "あい", "東", "自動車", "ほーるでぃんぐす", "とよだ自動車", "存在しない会社"]
+
+# (検索語, 上位に含まれるべき企業名, 期待する一致の種類)
+CASES = [
+    ("とよた自動車", "トヨタ自動車株式会社", "exact"),
+    ("ﾄﾖﾀ", "トヨタ自動車株式会社", "prefix"),
+    ("株式会社ソニー", "ソニー銀行株式会社", "prefix"),
+    ("ＳＯＮＹ", "SONY Interactive", "prefix"),
+    ("自動車", "トヨタ自動車株式会社", "substring"),
+    ("とよだ自動車", "トヨタ自動車株式会社", "fuzzy"),
+    ("金融", "ソニー銀行株式会社", "industry"),
+]
+# 業界名で検索したときに返るべき業界
+CASE_INDUSTRIES = {"金融": 2}
+
+
+def make_companies(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    companies = [
+        {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": name, "url": None, "industry": industry}
+        for name, industry in [("トヨタ自動車株式会社", 1), ("ソニー銀行株式会社", 2), ("SONY Interactive", 3)]
+    ]
+    while len(companies) < size:
+        # カナ・漢字の語 + 業種っぽい語（企業名は一意なので番号を付ける）
+        word = "".join(rng.choices(KANA if rng.random() < 0.6 else KANJI, k=rng.randint(2, 4)))
+        base = word + (rng.choice(SUFFIXES) if rng.random() < 0.7 else "") + str(len(companies))
+        companies.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": rng.choice(LEGAL_FORMS).format(base),
+            "url": f"https://example.com/{len(companies)}",
+            "address": "東京都千代田区丸の内1-1-1",
+            "industry": rng.choice(INDUSTRIES)["id"],
+        })
+    return companies
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def timed(function, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    return result, samples
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    industry_names = {str(row["id"]): row["industries"] for row in INDUSTRIES}
+    print(f"{'companies':>9} | {'method':<18} | {'p50':>9} | {'p95':>9} | {'payload':>9} | {'build':>7}")
+    for size in (1_000, 10_000, 100_000):
+        companies = make_companies(size)
+
+        # 旧: 全件（フォームが使う列）を転送してブラウザで部分一致
+        listed = [{key: c.get(key) for key in ("id", "name", "url", "address", "industry")} for c in companies]
+        full_payload = len(json.dumps({"companies": listed}, ensure_ascii=False).encode())
+        linear = []
+        for q in QUERIES:
+            _, samples = timed(lambda: [c for c in listed if q.lower() in c["name"].lower()], max(1, args.repeat // 10))
+            linear += samples
+
+        started = time.perf_counter()
+        catalog = CompanyCatalog(industry_names)
+        catalog.load(companies)
+        build = time.perf_counter() - started
+        indexed, payloads = [], []
+        for q in QUERIES:
+            (items, has_more), samples = timed(lambda: catalog.search(q, args.limit), args.repeat)
+            indexed += samples
+            payloads.append(len(json.dumps({"items": items, "has_more": has_more}, ensure_ascii=False).encode()))
+
+        print(f"{size:>9} | {'list + includes()':<18} | {percentile(linear, 0.5) * 1000:>7.3f}ms | "
+              f"{percentile(linear, 0.95) * 1000:>7.3f}ms | {full_payload / 1024:>7.1f}KB | {'':>7}")
+        print(f"{size:>9} | {'index top-' + str(args.limit):<18} | {percentile(indexed, 0.5) * 1000:>7.3f}ms | "
+              f"{percentile(indexed, 0.95) * 1000:>7.3f}ms | {statistics.mean(payloads) / 1024:>7.1f}KB | "
+              f"{build * 1000:>5.0f}ms")
+
+    # ここからは API 経由（インメモリDB から読み込んだインデックス）
+    db = MemoryClient({"companies": make_companies(10_000), "industries": INDUSTRIES}, latency=0)
+    app = FastAPI()
+    app.include_router(company_search.router)
+    app.dependency_overrides[get_db] = lambda: db
+    await company_index.clear()
+    failures = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def search(q, **params):
+            response = await client.get("/api/companies/search", params={"q": q, "limit": args.limit, **params})
+            return response.json()
+
+        # 表記ゆれ・順位
+        print()
+        for q, name, match in CASES:
+            items = (await search(q))["items"]
+            if q in CASE_INDUSTRIES:
+                # 業界名での一致は同じ業界の企業が名前順に並ぶので、順位と業界だけ確かめる
+                ok = items and all(i["match"] == match and i["industry"] == CASE_INDUSTRIES[q] for i in items)
+                found = items[0] if items else None
+            else:
+                found = next((item for item in items if item["name"] == name), None)
+                ok = found is not None and found["match"] == match
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {q!r:<22} -> {name} ({found['match'] if found else 'not found'}, expected {match})")
+
+        # 絞り込み・除外・ページ送り
+        first = await search("自動車", limit=5)
+        second = await search("自動車", limit=5, offset=5)
+        excluded = await search("自動車", limit=5, exclude=[first["items"][0]["id"]])
+        in_industry = await search("", limit=20, industry="2")
+        first_ids = {i["id"] for i in first["items"]}
+        ok = (first["has_more"] and not first_ids & {i["id"] for i in second["items"]}
+              and first["items"][0]["id"] not in {i["id"] for i in excluded["items"]}
+              and all(i["industry"] == 2 for i in in_industry["items"]))
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} offset / exclude / industry filter")
+
+        # 書き込みの反映（ルーターのフック・Realtime と同じ notify_change を通す）
+        new_id = str(uuid.uuid4())
+        await notify_change(db, "companies", "INSERT", {"id": new_id, "name": "ゆうちょ銀行株式会社", "industry": 2})
+        added = (await search("ゆうちょ"))["items"]
+        await notify_change(db, "companies", "UPDATE", {"id": new_id, "name": "かんぽ生命保険"})
+        renamed = (await search("ゆうちょ"))["items"], (await search("カンポ"))["items"]
+        await notify_change(db, "companies", "DELETE", old_record={"id": new_id})
+        removed = (await search("かんぽ"))["items"]
+        ok = ([i["id"] for i in added] == [new_id] and renamed[0] == [] and [i["id"] for i in renamed[1]] == [new_id]
+              and renamed[1][0]["industry"] == 2 and removed == [])
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} insert / rename / delete are reflected without reloading")
+
+    print("\n❌ some checks failed" if failures else "\n✅ company search index checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+同時リクエスト数に対するスループットのベンチマーク
+
+DBの往復1回あたり一定のレイテンシを持つ代替クライアントを注入し、
+並列度を上げたときに req/s が伸びるか（非同期クライアント）、
+横ばいのままか（イベントループを止める同期クライアント）を比較する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_concurrency
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import httpx
+
+from app.main import app
+from app.database import get_db
+from app.memory_db import MemoryClient
+
+
+async def run_load(client_factory, concurrency: int, total: int) -> float:
+    """
+    total 件のリクエストを concurrency 並列で投げ、req/s を返す
+    """
+    db = client_factory()
+    app.dependency_overrides[get_db] = lambda: db
+    event_id = str(uuid4())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request():
+            async with semaphore:
+                response = await client.get("/api/reflections", params={"event_id": event_id})
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    app.dependency_overrides.pop(get_db, None)
+    return total / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02, help="DB往復1回あたりの秒数")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"DB latency: {args.latency * 1000:.0f}ms / requests: {args.requests}")
+    print(f"{'concurrency':>11} | {'sync (blocking)':>16} | {'async':>10}")
+    for concurrency in (1, 10, 50):
+        blocking = await run_load(
+            lambda: MemoryClient(latency=args.latency, blocking=True), concurrency, args.requests
+        )
+        non_blocking = await run_load(
+            lambda: MemoryClient(latency=args.latency), concurrency, args.requests
+        )
+        print(f"{concurrency:>11} | {blocking:>12.1f} r/s | {non_blocking:>6.1f} r/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+締切リマインド生成が他ユーザーのデータ量に依存しないことを確認するベンチマーク
+
+対象ユーザーのデータは固定したまま、同じ期間に締切を持つ他ユーザーを増やしていき、
+全ユーザーの締切イベントを走査する旧クエリ形状と、
+ユーザーの選考状況から埋め込みで引く現行の実装を比較する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_deadline_scaling
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.memory_db import MemoryClient
+from app.services.reminder_service import ReminderService
+
+COMPANIES_PER_USER = 20
+
+
+def build_tables(user_ids):
+    """
+    各ユーザーに COMPANIES_PER_USER 社ぶんの選考状況と2日後の締切イベントを作る
+    """
+    now = datetime.now(timezone.utc)
+    tables = {"companies": [], "usercompanyselections": [], "events": []}
+    for user_id in user_ids:
+        for i in range(COMPANIES_PER_USER):
+            company = {"id": str(uuid4()), "name": f"企業{i}"}
+            tables["companies"].append(company)
+            tables["usercompanyselections"].append({
+                "id": str(uuid4()),
+                "user_id": user_id,
+                "company_id": company["id"],
+                "status": "Interested",
+                "updated_at": now.isoformat(),
+            })
+            tables["events"].append({
+                "id": str(uuid4()),
+                "company_id": company["id"],
+                "title": "ES締切",
+                "type": "Deadline",
+                "start_time": (now + timedelta(days=2)).isoformat(),
+            })
+    return tables
+
+
+async def global_scan_deadlines(db, user_id: str):
+    """
+    ユーザーで絞らずに期間内の全締切イベントを取得してから選考状況と突き合わせる旧クエリ形状
+    """
+    now = datetime.now(timezone.utc)
+    events = await db.table("events").select("*, companies(*)").eq("type", "Deadline").gte(
+        "start_time", (now + timedelta(days=1)).isoformat()
+    ).lte("start_time", (now + timedelta(days=3)).isoformat()).execute()
+    company_ids = list({e["company_id"] for e in events.data})
+    selections = await db.table("usercompanyselections").select("company_id, status").eq(
+        "user_id", user_id
+    ).in_("company_id", company_ids).execute()
+    statuses = {s["company_id"] for s in selections.data}
+    return [e for e in events.data if e["company_id"] in statuses]
+
+
+async def measure(func, db, user_id: str, repeat: int = 5):
+    db.rows_returned = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = await func(db, user_id)
+    elapsed = (time.perf_counter() - started) / repeat
+    return elapsed, db.rows_returned // repeat, len(result)
+
+
+async def main():
+    user_id = str(uuid4())
+    service_call = lambda db, uid: ReminderService(db)._generate_deadline_reminders(uid)
+
+    print(f"{'other users':>11} | {'global scan':>22} | {'user scoped':>22}")
+    for other_users in (0, 100, 1000, 5000):
+        tables = build_tables([user_id] + [str(uuid4()) for _ in range(other_users)])
+        # 往復5ms + 1行あたり0.05msの転送コスト
+        db = MemoryClient(tables, latency=0.005, row_latency=0.00005)
+
+        old = await measure(global_scan_deadlines, db, user_id)
+        new = await measure(service_call, db, user_id)
+        assert old[2] == new[2] == COMPANIES_PER_USER
+        print(
+            f"{other_users:>11} | {old[0] * 1000:>7.1f}ms {old[1]:>7} rows | "
+            f"{new[0] * 1000:>7.1f}ms {new[1]:>7} rows"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+"""
+イベントの ICS フィード（/api/events/feed.ics）の全件取得・差分同期の比較
+
+旧: カレンダーアプリ側で毎回すべてのイベントを取り直す（sync_token なしの全件フィード）
+新: 前回の X-Sync-Token を渡し、変わったイベントと消えたイベント（墓石）だけを受け取る
+
+1. 全件・差分（変更なし / 数件の変更）・304（If-None-Match）ごとの DB往復回数・転送量・時間
+2. 追加・更新・参加取り消し・参加登録の削除・イベントの削除を差分で反映したクライアントの状態が、
+   取り直した全件フィードと一致するか（updated_since でも同じ）
+3. 直近（ICS_SYNC_SETTLE_SECONDS 秒以内）の変更は次の差分でも返し直されるか
+4. 不正なトークンは 400、保持期間より古いトークンは 410 になるか
+5. どの行も 75 オクテット以内に折り返されているか
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_event_feed
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import event_feed as event_feed_router
+from app.services import event_feed
+from .datasets import generate_dataset
+
+
+def parse_events(body: str):
+    """
+    VEVENT を UID -> (折り返しを戻した行のうち DTSTAMP 以外) にする
+    """
+    lines = body.replace("\r\n ", "").split("\r\n")
+    events, current = {}, None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            current = []
+        elif line == "END:VEVENT":
+            uid = next(item for item in current if item.startswith("UID:"))[4:]
+            events[uid] = tuple(item for item in current if not item.startswith("DTSTAMP:"))
+            current = None
+        elif current is not None:
+            current.append(line)
+    return events
+
+
+class FeedClient:
+    """
+    カレンダーアプリの代わり: 全件を1回取得し、以降は同期トークンで差分だけを反映する
+    """
+
+    def __init__(self, client: httpx.AsyncClient, user_id: str):
+        self.client = client
+        self.user_id = user_id
+        self.events = {}
+        self.token = None
+        self.bytes = 0
+
+    async def sync(self, **params):
+        if self.token and not params:
+            params = {"sync_token": self.token}
+        response = await self.client.get("/api/events/feed.ics", params={"user_id": self.user_id, **params})
+        response.raise_for_status()
+        self.bytes += len(response.content)
+        self.token = response.headers["x-sync-token"]
+        changed = parse_events(response.text)
+        for uid, lines in changed.items():
+            if "STATUS:CANCELLED" in lines and len(lines) <= 2:
+                self.events.pop(uid, None)
+            else:
+                self.events[uid] = lines
+        return response, changed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    tables, user_ids = generate_dataset(args.size, users=20)
+    db = MemoryClient(tables, latency=args.latency)
+    user_id = user_ids[0]
+    app = FastAPI()
+    app.include_router(event_feed_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    failures = 0
+
+    def check(ok, message):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {message}")
+
+    async def add_event(title, hours, status="Joined"):
+        start = datetime.now(timezone.utc) + timedelta(hours=hours)
+        event = (await db.table("events").insert({
+            "id": str(uuid.uuid4()), "user_id": user_id, "company_id": None, "title": title, "type": "Interview",
+            "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat(),
+            "location": "本社 会議室A", "description": "持ち物: 筆記用具, 学生証\n服装自由",
+        }).execute()).data[0]
+        await db.table("userevents").insert({"event_id": event["id"], "user_id": user_id, "status": status}).execute()
+        return event
+
+    print(f"{'request':<36} | {'status':>6} | {'db trips':>8} | {'body':>9} | {'time':>8} | events")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def fetch(label, headers=None, **params):
+            db.round_trips = 0
+            started = time.perf_counter()
+            response = await client.get("/api/events/feed.ics", params={"user_id": user_id, **params}, headers=headers or {})
+            elapsed = time.perf_counter() - started
+            print(f"{label:<36} | {response.status_code:>6} | {db.round_trips:>8} | {len(response.content) / 1024:>7.1f}KB | "
+                  f"{elapsed * 1000:>6.1f}ms | {len(parse_events(response.text))}")
+            return response
+
+        # 直近の変更も確定したものとして扱う（3 で別に確かめる）
+        event_feed.ICS_SYNC_SETTLE_SECONDS = 0
+        full = await fetch("full feed")
+        token = full.headers["x-sync-token"]
+        await fetch("full feed (If-None-Match)", headers={"If-None-Match": full.headers["etag"]})
+        await fetch("sync_token, no changes", sync_token=token)
+
+        app_client = FeedClient(client, user_id)
+        await app_client.sync()
+        since = datetime.now(timezone.utc)
+        first_events = dict(app_client.events)
+
+        # 変更: 追加・更新・参加取り消し・参加登録の削除・イベントの削除（別ユーザーのイベントも変える）
+        added = await add_event("一次面接", 30)
+        canceled = await add_event("説明会", 50)
+        mine = [row["event_id"] for row in db.tables["userevents"] if row["user_id"] == user_id][:3]
+        await db.table("events").update({"title": "最終面接（日程変更）"}).eq("id", mine[0]).execute()
+        await db.table("userevents").update({"status": "Canceled"}).eq("event_id", canceled["id"]).execute()
+        await db.table("userevents").delete().eq("event_id", mine[1]).eq("user_id", user_id).execute()
+        await db.table("userevents").delete().eq("event_id", mine[2]).execute()
+        await db.table("events").delete().eq("id", mine[2]).execute()
+        other = next(row["event_id"] for row in db.tables["userevents"] if row["user_id"] != user_id)
+        await db.table("events").update({"title": "他のユーザーのイベント"}).eq("id", other).execute()
+
+        changed = await fetch("sync_token, 5 events changed", sync_token=token)
+        ok = changed.status_code == 200 and len(parse_events(changed.text)) == 5
+        check(ok, "the delta contains only this user's 5 changed events")
+
+        # 差分を反映した状態 = 取り直した全件
+        await app_client.sync()
+        fresh = parse_events((await client.get("/api/events/feed.ics", params={"user_id": user_id})).text)
+        check(app_client.events == fresh and fresh != first_events,
+              f"client state after the delta matches a fresh full feed ({len(fresh)} events)")
+        uid = f"{canceled['id']}@{event_feed.UID_DOMAIN}"
+        check("STATUS:CANCELLED" in fresh.get(uid, ()), "a canceled registration stays in the feed as STATUS:CANCELLED")
+        check(not any(f"{event_id}@" in key for key in fresh for event_id in mine[1:]),
+              "removed registrations and deleted events are gone")
+
+        since_client = FeedClient(client, user_id)
+        since_client.events = dict(first_events)
+        since_client.token = "unused"
+        await since_client.sync(updated_since=since.isoformat())
+        check(since_client.events == fresh, "updated_since gives the same result as sync_token")
+
+        # 直近の変更は次の差分でも返し直される
+        event_feed.ICS_SYNC_SETTLE_SECONDS = 60
+        recent = await add_event("直近に追加した面接", 70)
+        uid = f"{recent['id']}@{event_feed.UID_DOMAIN}"
+        first_poll = (await app_client.sync())[1]
+        second_poll = (await app_client.sync())[1]
+        no_etag = "etag" not in (await client.get("/api/events/feed.ics", params={"user_id": user_id})).headers
+        check(uid in first_poll and uid in second_poll and no_etag,
+              "changes inside the settle window are re-sent and the full feed has no ETag")
+        event_feed.ICS_SYNC_SETTLE_SECONDS = 0
+
+        # 不正・期限切れのトークン
+        bad = await client.get("/api/events/feed.ics", params={"user_id": user_id, "sync_token": "not-a-token"})
+        old = event_feed.encode_sync_token(1, datetime.now(timezone.utc) - timedelta(days=event_feed.ICS_CHANGE_RETENTION_DAYS + 1))
+        expired = await client.get("/api/events/feed.ics", params={"user_id": user_id, "sync_token": old})
+        check(bad.status_code == 400 and expired.status_code == 410, "bad token is 400, expired token is 410")
+
+        lines = full.content.split(b"\r\n")
+        check(max(len(line) for line in lines) <= 75 and full.content.endswith(b"END:VCALENDAR\r\n"),
+              "every line is folded to 75 octets")
+
+        pruned = await event_feed.prune_changes(db, now=datetime.now(timezone.utc) + timedelta(days=event_feed.ICS_CHANGE_RETENTION_DAYS + 1))
+        check(pruned > 0 and not db.tables["event_changes"], f"--prune removes old change log rows ({pruned})")
+
+    print("\n❌ some checks failed" if failures else "\n✅ event feed checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
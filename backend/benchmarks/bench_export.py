@@ -0,0 +1,122 @@
+"""
+エクスポートのメモリ使用量のベンチマーク
+
+frontend の旧実装と同じく全行を取得してから CSV を組み立てる方式と、
+/api/export のストリーミング方式で、Python 側のピークメモリ（tracemalloc）を比較する。
+あわせて gzip 応答が展開でき、CSV の行数が件数と一致することを確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_export
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+
+from app.main import app
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.services.export import DATASETS, STATUS_LABELS, format_datetime, iter_rows, stream_csv
+
+USER_ID = str(uuid4())
+
+
+def build_tables(size: int):
+    base = datetime(2025, 4, 1, tzinfo=timezone.utc)
+    companies, selections = [], []
+    statuses = list(STATUS_LABELS)
+    for i in range(size):
+        company = {"id": str(uuid4()), "name": f"株式会社サンプル{i}", "url": f"https://example.com/{i}"}
+        companies.append(company)
+        selections.append({
+            "id": str(uuid4()),
+            "company_id": company["id"],
+            "user_id": USER_ID,
+            "status": statuses[i % len(statuses)],
+            "motivation_level": i % 5 + 1,
+            "encrypted_password": "secret",
+            "created_at": (base + timedelta(minutes=i)).isoformat(),
+        })
+    return {"companies": companies, "usercompanyselections": selections}
+
+
+async def buffered_export(db) -> bytes:
+    """
+    旧実装: 全件を1回で取得し、文字列を join してから返す
+    """
+    response = await db.table("usercompanyselections").select("*, companies!inner(*)").eq(
+        "user_id", USER_ID
+    ).order("created_at", desc=True).execute()
+    rows = [",".join(name for name, _ in DATASETS["companies"].columns)]
+    for selection in response.data:
+        company = selection["companies"]
+        rows.append(",".join([
+            f'"{company["name"]}"',
+            f'"{company["url"]}"',
+            f'"{STATUS_LABELS[selection["status"]]}"',
+            str(selection["motivation_level"]),
+            f'"{format_datetime(selection["created_at"])}"',
+        ]))
+    return ("\ufeff" + "\n".join(rows)).encode("utf-8")
+
+
+async def streaming_export(db) -> int:
+    """
+    /api/export/companies と同じストリームを生成しながら捨てていき、バイト数を返す
+    （httpx の ASGITransport は応答全体をバッファするので、ここではサーバー側の生成部分だけを測る）
+    """
+    dataset = DATASETS["companies"]
+    sent = 0
+    async for chunk in stream_csv(iter_rows(db, dataset, USER_ID), dataset):
+        sent += len(chunk)
+    return sent
+
+
+async def measure(coro):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000")
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    print(f"{'rows':>7} | {'buffered peak':>13} | {'streaming peak':>14} | {'streaming time':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        db = MemoryClient(build_tables(size), latency=0)
+        _, _, buffered_peak = await measure(buffered_export(db))
+        _, elapsed, streaming_peak = await measure(streaming_export(db))
+        print(f"{size:>7} | {buffered_peak / 2**20:>11.1f}MB | {streaming_peak / 2**20:>12.1f}MB | {elapsed:>12.2f}s")
+
+    # gzip 応答の確認（最後のサイズのデータで）
+    app.dependency_overrides[get_db] = lambda: db
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(
+            "/api/export/companies",
+            params={"user_id": USER_ID, "status": "Offer"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        text = response.content.decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(text)))
+        offers = sum(1 for s in db.tables["usercompanyselections"] if s["status"] == "Offer")
+        print(f"gzip: {response.headers.get('content-encoding')}, {len(rows) - 1} rows (expected {offers}), "
+              f"secret leaked: {'secret' in text}")
+    app.dependency_overrides.pop(get_db, None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
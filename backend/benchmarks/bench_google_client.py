@@ -0,0 +1,105 @@
+"""
+Google API 呼び出しの1回あたりレイテンシのベンチマーク
+
+Google APIを模倣するトランスポートで、
+呼び出しごとに AsyncClient を作って閉じる旧実装と、共有クライアントを使う現行実装を比較する。
+トランスポートは「接続」ごとに最初の1回だけ TCP+TLS ハンドシェイク相当の待ち時間を入れ、
+以降のリクエストはリクエスト往復分の待ち時間だけにする。
+
+あわせて 503 を返した後に成功するケースでリトライが効くことを確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_google_client
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.services import google_api
+
+SEARCH_BODY = {"items": [{"title": "株式会社サンプル", "link": "https://example.com", "snippet": "..."}]}
+
+
+class SimulatedNetworkTransport(httpx.AsyncBaseTransport):
+    """
+    接続の確立コストとリクエスト往復を待ち時間で模倣するトランスポート
+    fail_first 回までは 503 を返す
+    """
+
+    def __init__(self, handshake: float, rtt: float, fail_first: int = 0):
+        self.handshake = handshake
+        self.rtt = rtt
+        self.fail_first = fail_first
+        self.connected = False
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if not self.connected:
+            await asyncio.sleep(self.handshake)
+            self.connected = True
+        await asyncio.sleep(self.rtt)
+        if self.calls <= self.fail_first:
+            return httpx.Response(503)
+        return httpx.Response(200, json=SEARCH_BODY)
+
+    async def aclose(self) -> None:
+        self.connected = False
+
+
+async def per_call_client(handshake: float, rtt: float) -> None:
+    """
+    旧実装と同じく呼び出しごとにクライアント（接続）を作る
+    """
+    async with httpx.AsyncClient(transport=SimulatedNetworkTransport(handshake, rtt)) as client:
+        response = await client.get("https://www.googleapis.com/customsearch/v1", params={"q": "サンプル"})
+        response.raise_for_status()
+        response.json()
+
+
+async def measure(func, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--handshake-ms", type=float, default=60.0, help="TCP+TLS の確立にかかる時間")
+    parser.add_argument("--rtt-ms", type=float, default=30.0, help="リクエスト1往復の時間")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    handshake, rtt = args.handshake_ms / 1000, args.rtt_ms / 1000
+
+    google_api.GOOGLE_API_KEY = "bench"
+    google_api.SEARCH_ENGINE_ID = "bench"
+
+    before = await measure(lambda: per_call_client(handshake, rtt), args.repeat)
+
+    await google_api.close_http_client()
+    await google_api.init_http_client(SimulatedNetworkTransport(handshake, rtt))
+    # 結果キャッシュを通さずにクライアント部分だけを測る
+    after = await measure(lambda: google_api._fetch_search_results("サンプル"), args.repeat)
+
+    print(f"{'':>16} | {'p50':>8} | {'p95':>8}")
+    print(f"{'per-call client':>16} | {before[0]:>6.1f}ms | {before[1]:>6.1f}ms")
+    print(f"{'shared client':>16} | {after[0]:>6.1f}ms | {after[1]:>6.1f}ms")
+
+    # GOOGLE_API_MAX_RETRIES 回 503 を返した後に成功するか
+    await google_api.close_http_client()
+    flaky = SimulatedNetworkTransport(0, 0, fail_first=google_api.GOOGLE_API_MAX_RETRIES)
+    await google_api.init_http_client(flaky)
+    results = await google_api.search_company_info("リトライ確認")
+    print(f"retry: {flaky.calls} calls, {len(results)} results")
+    await google_api.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+リマインドの差分更新（REMINDER_ENGINE=incremental）の計測と一致確認
+
+1. 読み出しのコスト: 選考中の企業数・イベント数を増やしたときの1回あたりのDB往復・取得行数・時間
+   （python は毎回取得し直し、incremental は初回の読み込み後はDBに行かない）
+2. 一致確認: 時刻を進めながら選考状況・イベントの追加・変更・削除を繰り返し、
+   毎回 python 版と incremental 版の結果を比べる（リマインダーIDと同順位の並びは除く）
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_incremental_reminders
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.memory_db import MemoryClient
+from app.services.reminder_service import ReminderService
+from app.services.change_feed import notify_change
+from app.services.reminder_state import reminder_states
+from scripts.check_reminder_parity import diff
+
+STATUSES = ["Interested", "Entry", "ES_Submit", "Interview", "Offer", "Rejected"]
+EVENT_TYPES = ["Interview", "Deadline", "Seminar", "Other"]
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat()
+
+
+def _event(rng: random.Random, company_id: str, now: datetime) -> dict:
+    return {
+        "id": str(uuid4()),
+        "company_id": company_id,
+        "title": "イベント",
+        "type": rng.choice(EVENT_TYPES),
+        "start_time": _iso(now + timedelta(seconds=rng.randint(-5 * 86400, 20 * 86400))),
+    }
+
+
+def build_tables(rng: random.Random, user_ids, company_count: int, events_per_company: int, now: datetime):
+    """
+    ユーザーごとに全企業を選考中にし、企業ごとに前後数日〜3週間先のイベントを散らす
+    """
+    companies = [{"id": str(uuid4()), "name": f"企業{i}"} for i in range(company_count)]
+    selections = [
+        {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "company_id": company["id"],
+            "status": rng.choice(STATUSES),
+            "updated_at": _iso(now - timedelta(seconds=rng.randint(0, 14 * 86400))),
+        }
+        for user_id in user_ids
+        for company in companies
+    ]
+    events = [_event(rng, company["id"], now) for company in companies for _ in range(events_per_company)]
+    return {"companies": companies, "usercompanyselections": selections, "events": events}
+
+
+async def measure_reads(company_count: int, events_per_company: int, reads: int):
+    rng = random.Random(0)
+    user_id = str(uuid4())
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    db = MemoryClient(build_tables(rng, [user_id], company_count, events_per_company, now), latency=0.005)
+
+    results = {}
+    for engine in ("python", "incremental"):
+        await reminder_states.clear()
+        db.round_trips = db.rows_returned = 0
+        service = ReminderService(db, engine=engine)
+        await service.get_all_reminders(user_id, now)  # incremental はここで読み込む
+        loaded = (db.round_trips, db.rows_returned)
+        db.round_trips = db.rows_returned = 0
+        started = time.perf_counter()
+        for i in range(reads):
+            await service.get_all_reminders(user_id, now + timedelta(minutes=i))
+        elapsed = (time.perf_counter() - started) / reads
+        results[engine] = (loaded, db.round_trips / reads, db.rows_returned / reads, elapsed)
+    return results
+
+
+class Simulation:
+    """
+    fake のテーブルを書き換えつつ、同じ変更を Realtime と同じ形（record / old_record）で通知する
+    """
+
+    def __init__(self, rng: random.Random, db: MemoryClient, user_ids, now: datetime):
+        self.rng = rng
+        self.db = db
+        self.user_ids = user_ids
+        self.now = now
+
+    def _rows(self, table: str):
+        return self.db.tables[table]
+
+    async def _notify(self, table, change, record=None, old_record=None):
+        self.db._indexes.clear()
+        await notify_change(self.db, table, change, record, old_record)
+
+    async def step(self) -> str:
+        rng = self.rng
+        companies = self._rows("companies")
+        events = self._rows("events")
+        selections = self._rows("usercompanyselections")
+        action = rng.choice([
+            "event_insert", "event_move", "event_reassign", "event_delete",
+            "selection_update", "selection_insert", "selection_delete", "company_rename",
+        ])
+
+        if action == "event_insert":
+            event = _event(rng, rng.choice(companies)["id"], self.now)
+            events.append(event)
+            await self._notify("events", "INSERT", dict(event))
+        elif action in ("event_move", "event_reassign") and events:
+            event = rng.choice(events)
+            old = dict(event)
+            if action == "event_move":
+                event["start_time"] = _iso(self.now + timedelta(seconds=rng.randint(-86400, 10 * 86400)))
+            else:
+                event["company_id"] = rng.choice(companies)["id"]
+            await self._notify("events", "UPDATE", dict(event), old)
+        elif action == "event_delete" and events:
+            event = events.pop(rng.randrange(len(events)))
+            await self._notify("events", "DELETE", None, dict(event))
+        elif action == "selection_update" and selections:
+            selection = rng.choice(selections)
+            old = dict(selection)
+            selection["status"] = rng.choice(STATUSES)
+            selection["updated_at"] = _iso(self.now - timedelta(seconds=rng.randint(0, 14 * 86400)))
+            await self._notify("usercompanyselections", "UPDATE", dict(selection), old)
+        elif action == "selection_insert":
+            user_id = rng.choice(self.user_ids)
+            taken = {s["company_id"] for s in selections if s["user_id"] == user_id}
+            free = [c for c in companies if c["id"] not in taken]
+            if free:
+                selection = {
+                    "id": str(uuid4()),
+                    "user_id": user_id,
+                    "company_id": rng.choice(free)["id"],
+                    "status": rng.choice(STATUSES),
+                    "updated_at": _iso(self.now - timedelta(seconds=rng.randint(0, 14 * 86400))),
+                }
+                selections.append(selection)
+                await self._notify("usercompanyselections", "INSERT", dict(selection))
+        elif action == "selection_delete" and selections:
+            selection = selections.pop(rng.randrange(len(selections)))
+            await self._notify("usercompanyselections", "DELETE", None, dict(selection))
+        elif action == "company_rename":
+            company = rng.choice(companies)
+            company["name"] = f"{company['name']}*"
+            await self._notify("companies", "UPDATE", dict(company))
+        return action
+
+
+async def check_parity(steps: int, users: int, company_count: int, events_per_company: int, seed: int):
+    rng = random.Random(seed)
+    user_ids = [str(uuid4()) for _ in range(users)]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    db = MemoryClient(build_tables(rng, user_ids, company_count, events_per_company, now), latency=0)
+    python_service = ReminderService(db, engine="python")
+    incremental_service = ReminderService(db, engine="incremental")
+    simulation = Simulation(rng, db, user_ids, now)
+
+    await reminder_states.clear()
+    failures = []
+    compared = 0
+    for step in range(steps):
+        # 数分〜半日進める（タイマーでしきい値をまたぐ）
+        simulation.now = now = now + timedelta(seconds=rng.randint(60, 12 * 3600))
+        action = await simulation.step()
+        for user_id in user_ids:
+            expected = await python_service.get_all_reminders(user_id, now)
+            actual = await incremental_service.get_all_reminders(user_id, now)
+            compared += len(expected["reminders"])
+            problem = diff(expected["reminders"], actual["reminders"])
+            if problem:
+                failures.append(f"step {step} ({action}) user {user_id[:8]}: {problem}")
+    return compared, failures, reminder_states.stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("1. 1回の読み出しあたりのコスト（latency 5ms / 往復）")
+    print(f"{'companies':>9} | {'events':>6} | {'engine':>11} | {'load':>14} | {'trips/read':>10} | {'rows/read':>9} | {'per read':>9}")
+    for company_count, events_per_company in ((20, 5), (100, 10), (500, 10)):
+        results = await measure_reads(company_count, events_per_company, args.reads)
+        for engine, (loaded, trips, rows, elapsed) in results.items():
+            load = f"{loaded[0]} trips/{loaded[1]} rows"
+            print(
+                f"{company_count:>9} | {company_count * events_per_company:>6} | {engine:>11} | {load:>14} | "
+                f"{trips:>10.1f} | {rows:>9.0f} | {elapsed * 1000:>7.2f}ms"
+            )
+
+    print(f"\n2. 変更・時間経過を {args.steps} 回繰り返したときの python 版との一致")
+    compared, failures, stats = await check_parity(args.steps, users=3, company_count=30, events_per_company=4, seed=args.seed)
+    print(f"reminders compared: {compared}, state: {stats}")
+    for failure in failures[:10]:
+        print(failure)
+    print("❌ mismatches: %d" % len(failures) if failures else "✅ incremental matches python at every step")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
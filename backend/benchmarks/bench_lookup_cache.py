@@ -0,0 +1,86 @@
+"""
+Google API 結果キャッシュのベンチマーク
+
+同じ企業名・同じ座標への検索が繰り返される負荷を模倣し、
+上流（模倣トランスポート）への呼び出し回数とレイテンシ、キャッシュのヒット率を出力する。
+同じキーの同時呼び出しが1回の上流呼び出しにまとまること、
+SQLite に永続化した結果がプロセス内キャッシュを消した後（再起動相当）も使えることも確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_lookup_cache
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services import google_api
+from app.services.lookup_cache import SQLiteStore
+from benchmarks.bench_google_client import SimulatedNetworkTransport
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    await coro
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--companies", type=int, default=100, help="検索される企業名の種類")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=200.0, help="上流API 1回あたりの時間")
+    args = parser.parse_args()
+
+    google_api.GOOGLE_API_KEY = "bench"
+    google_api.SEARCH_ENGINE_ID = "bench"
+    transport = SimulatedNetworkTransport(0, args.rtt_ms / 1000)
+    await google_api.init_http_client(transport)
+
+    # 表記ゆれ（全角・大文字・空白）を含むクエリ
+    random.seed(0)
+    names = [f"Sample Corp {i}" for i in range(args.companies)]
+    variants = [lambda n: n, lambda n: n.upper(), lambda n: f"  {n}  ", lambda n: n.replace("Sample", "Ｓａｍｐｌｅ")]
+    queries = [random.choice(variants)(random.choice(names)) for _ in range(args.requests)]
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(query):
+        async with semaphore:
+            return await timed(google_api.search_company_info(query))
+
+    started = time.perf_counter()
+    samples = sorted(await asyncio.gather(*(one(q) for q in queries)))
+    elapsed = time.perf_counter() - started
+
+    stats = google_api.search_cache.stats()
+    print(f"requests: {args.requests}, distinct companies: {args.companies}")
+    print(f"upstream calls: {transport.calls}")
+    print(f"p50 {statistics.median(samples):.1f}ms, p95 {samples[int(len(samples) * 0.95)]:.1f}ms, {args.requests / elapsed:.0f} req/s")
+    print(f"hit_ratio: {stats['hit_ratio']}, coalesced: {stats['coalesced']}")
+
+    # 同じキーの同時呼び出し
+    before = transport.calls
+    await asyncio.gather(*(google_api.search_nearby_places("35.681236,139.767125") for _ in range(100)))
+    print(f"100 concurrent identical places lookups -> {transport.calls - before} upstream call(s)")
+
+    # SQLite 永続化: プロセス内キャッシュを消しても上流を呼ばない
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = google_api.search_cache
+        cache.store = SQLiteStore(os.path.join(tmp, "lookup_cache.db"))
+        await google_api.search_company_info("永続化確認")
+        await cache.memory.clear()
+        before = transport.calls
+        await google_api.search_company_info("永続化確認")
+        print(f"after memory clear: {transport.calls - before} upstream call(s), disk_hits: {cache.stats()['disk_hits']}")
+        cache.store = None
+
+    await google_api.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
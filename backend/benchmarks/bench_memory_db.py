@@ -0,0 +1,122 @@
+"""
+インメモリDB（DATABASE_BACKEND=memory）の動作確認
+
+1. DATABASE_BACKEND=memory と MEMORY_DB_SEED（datasets.py の合成データ）でアプリを起動し、
+   startup のDB接続確認（count="exact"）が通ることを確かめる
+2. 主要なAPIを1回ずつ呼び、ステータスと1リクエストあたりのDB往復回数を表示する
+   （回帰すると往復回数が増えるので、変更前後で比べられる）
+3. count= の値を Python で数えた件数と比べる（limit・inner 埋め込み・head・update / delete）
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_memory_db
+"""
+import os
+import tempfile
+
+_seed_file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8")
+os.environ["DATABASE_BACKEND"] = "memory"
+os.environ["MEMORY_DB_SEED"] = _seed_file.name
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import database
+from app.main import app, shutdown_event, startup_event
+from app.memory_db import MemoryClient
+from app.routers import events, tasks
+from .datasets import generate_dataset
+
+
+async def check_counts(db: MemoryClient, tables, user_id: str):
+    """
+    (説明, 期待する count, 実際の count, 返った行数, 期待する行数) の一覧
+    """
+    checks = []
+    user_tasks = [t for t in tables["tasks"] if t["user_id"] == user_id]
+    response = await db.table("tasks").select("*", count="exact").eq("user_id", user_id).limit(5).execute()
+    checks.append(("tasks eq + limit 5", len(user_tasks), response.count, len(response.data), min(5, len(user_tasks))))
+
+    done = [t for t in user_tasks if t["is_completed"]]
+    response = await db.table("tasks").select("id", count="exact", head=True) \
+        .eq("user_id", user_id).eq("is_completed", True).execute()
+    checks.append(("tasks head=True", len(done), response.count, len(response.data), 0))
+
+    # events!inner(userevents!inner()) でユーザーに絞った振り返り（inner で落ちる行は数えない）
+    user_events = {e["event_id"] for e in tables["userevents"] if e["user_id"] == user_id}
+    expected = sum(1 for r in tables["reflections"] if r["event_id"] in user_events)
+    response = await db.table("reflections").select("*, events!inner(id, userevents!inner())", count="exact") \
+        .eq("events.userevents.user_id", user_id).order("created_at", desc=True).limit(3).execute()
+    checks.append(("reflections inner join + limit 3", expected, response.count, len(response.data), min(3, expected)))
+
+    response = await db.table("tasks").update({"is_completed": False}, count="exact").eq("user_id", user_id).execute()
+    checks.append(("tasks update", len(user_tasks), response.count, len(response.data), len(user_tasks)))
+
+    response = await db.table("tasks").delete(count="exact").eq("user_id", user_id).execute()
+    checks.append(("tasks delete", len(user_tasks), response.count, len(response.data), len(user_tasks)))
+    remaining = await db.table("tasks").select("id", count="exact").eq("user_id", user_id).execute()
+    checks.append(("tasks after delete", 0, remaining.count, len(remaining.data), 0))
+    return checks
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    tables, user_ids = generate_dataset(args.size, users=20)
+    json.dump(tables, _seed_file, ensure_ascii=False)
+    _seed_file.close()
+
+    # main.py では未登録のルーターも載せる
+    app.include_router(events.router)
+    app.include_router(tasks.router)
+
+    print("1. startup")
+    await startup_event()
+    db = database.get_db()
+    memory: MemoryClient = db._client
+    memory.latency = args.latency
+    print(f"   backend: {type(memory).__name__}, tables: { {name: len(rows) for name, rows in memory.tables.items()} }")
+
+    user_id = user_ids[0]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        print(f"\n2. endpoints (db latency {args.latency * 1000:.1f}ms)")
+        print(f"   {'request':<40} | {'status':>6} | {'db trips':>8} | {'time':>8}")
+        endpoints = [
+            ("GET", "/api/reminders", None),
+            ("GET", "/api/reminders/deadlines", None),
+            ("GET", "/api/reflections", None),
+            ("GET", "/api/events/", None),
+            ("GET", "/api/tasks/", None),
+            ("GET", "/api/export/events", None),
+            ("POST", "/api/tasks/", {"title": "memory", "user_id": user_id}),
+        ]
+        for method, path, body in endpoints:
+            before = memory.round_trips
+            started = time.perf_counter()
+            response = await client.request(method, path, params={"user_id": user_id}, json=body)
+            elapsed = time.perf_counter() - started
+            print(f"   {method + ' ' + path:<40} | {response.status_code:>6} | "
+                  f"{memory.round_trips - before:>8} | {elapsed * 1000:>6.1f}ms")
+
+    print("\n3. count=")
+    failures = 0
+    for name, expected_count, count, rows, expected_rows in await check_counts(memory, memory.tables, user_ids[1]):
+        ok = expected_count == count and rows == expected_rows
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {name:<34} count={count} (expected {expected_count}), "
+              f"rows={rows} (expected {expected_rows})")
+
+    await shutdown_event()
+    os.unlink(_seed_file.name)
+    print("\n❌ count mismatches: %d" % failures if failures else "\n✅ counts match")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
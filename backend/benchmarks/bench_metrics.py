@@ -0,0 +1,121 @@
+"""
+メトリクス（app/metrics.py）の出力確認とミドルウェアのオーバーヘッド計測
+
+- アプリに計測用ラッパーで包んだ MemoryClient をつなぎ、いくつかのAPIを呼んだあと
+  GET /metrics からルートごとのリクエスト数・平均レイテンシ・1リクエストあたりのDB往復回数を読み出す
+- MetricsMiddleware あり/なしで同じリクエストを繰り返し、1リクエストあたりの時間を比べる
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import asyncio
+import re
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.main import app
+from app.memory_db import MemoryClient
+from app.metrics import instrument_client
+from app.routers import reminders
+from app.services.reminder_cache import reminder_cache
+from .bench_reminder_queries import build_tables
+
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def parse_metrics(text: str):
+    """
+    テキスト形式を (名前, ラベルの dict, 値) の一覧にする
+    """
+    samples = []
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples.append((name, dict(re.findall(r'(\w+)="([^"]*)"', labels)), float(value)))
+    return samples
+
+
+async def exercise(client: httpx.AsyncClient, user_ids, requests: int) -> None:
+    for i in range(requests):
+        user_id = user_ids[i % len(user_ids)]
+        await reminder_cache.clear()
+        await client.get("/api/reminders", params={"user_id": user_id})
+        await client.get("/api/reminders/deadlines", params={"user_id": user_id})
+        await client.get("/api/export/events", params={"user_id": user_id})
+    await client.get("/no-such-route")
+
+
+async def time_requests(target: FastAPI, user_id: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            await reminder_cache.clear()
+            await client.get("/api/reminders", params={"user_id": user_id})
+        return (time.perf_counter() - started) / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--companies", type=int, default=40)
+    args = parser.parse_args()
+
+    user_ids = [str(uuid4()) for _ in range(3)]
+    tables = {"companies": [], "usercompanyselections": [], "events": []}
+    for user_id in user_ids:
+        for name, rows in build_tables(user_id, args.companies).items():
+            tables[name] += rows
+    db = instrument_client(MemoryClient(tables, latency=0.002))
+
+    app.dependency_overrides[get_db] = lambda: db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await exercise(client, user_ids, args.requests)
+        response = await client.get("/metrics")
+    print(f"GET /metrics -> {response.status_code} {response.headers['content-type']}, {len(response.text.splitlines())} lines\n")
+
+    per_route = defaultdict(dict)
+    for name, labels, value in parse_metrics(response.text):
+        route = (labels.get("method"), labels.get("route"))
+        if name in ("http_request_duration_seconds_sum", "http_request_duration_seconds_count",
+                    "http_request_db_round_trips_sum"):
+            per_route[route][name] = value
+
+    print(f"{'route':<36} | {'requests':>8} | {'avg latency':>11} | {'db trips/req':>12}")
+    for (method, route), values in sorted(per_route.items(), key=lambda item: str(item[0])):
+        count = values.get("http_request_duration_seconds_count", 0)
+        if not count or route == "/metrics":
+            continue
+        latency = values["http_request_duration_seconds_sum"] / count
+        trips = values.get("http_request_db_round_trips_sum", 0) / count
+        print(f"{method + ' ' + route:<36} | {count:>8.0f} | {latency * 1000:>9.2f}ms | {trips:>12.1f}")
+
+    db_lines = [line for line in response.text.splitlines() if line.startswith("db_requests_total")]
+    print("\n" + "\n".join(db_lines))
+
+    # ミドルウェアのオーバーヘッド（DB待ちなしで比べる）
+    fast_db = MemoryClient(tables, latency=0)
+    bare = FastAPI()
+    bare.include_router(reminders.router)
+    bare.dependency_overrides[get_db] = lambda: fast_db
+    app.dependency_overrides[get_db] = lambda: instrument_client(fast_db)
+    bare_time = await time_requests(bare, user_ids[0], args.requests * 10)
+    instrumented_time = await time_requests(app, user_ids[0], args.requests * 10)
+    app.dependency_overrides.clear()
+    print(
+        f"\nper request: without metrics {bare_time * 1000:.3f}ms, "
+        f"with middleware + db wrapper {instrumented_time * 1000:.3f}ms "
+        f"(+{(instrumented_time - bare_time) * 1e6:.0f}us)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+一覧APIのキーセットページネーションの確認とベンチマーク
+
+1ユーザーに大量のイベント・タスク（開始日時の重複や期限なしを含む）を用意し、
+next_cursor をたどって全ページを取得したときに
+- 取りこぼし・重複がなく、全件を1回で並べた結果と一致すること
+- 1ページあたりのレスポンスサイズが全件返却より小さいこと
+を確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_pagination
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import events, tasks, reflections
+
+USER_ID = str(uuid4())
+
+
+def build_tables(size: int):
+    random.seed(0)
+    base = datetime(2025, 4, 1, tzinfo=timezone.utc)
+    companies = [{"id": str(uuid4()), "name": f"企業{i}", "user_id": USER_ID} for i in range(50)]
+    event_rows, task_rows, userevents, reflection_rows = [], [], [], []
+    for i in range(size):
+        # 同じ開始日時を複数持たせて id による順序付けを確認する
+        start = base + timedelta(hours=random.randrange(size // 4 or 1))
+        event = {
+            "id": str(uuid4()),
+            "user_id": USER_ID,
+            "company_id": random.choice(companies)["id"],
+            "title": f"イベント{i}",
+            "type": "Interview",
+            "start_time": start.isoformat(),
+        }
+        event_rows.append(event)
+        userevents.append({"event_id": event["id"], "user_id": USER_ID, "status": "Joined"})
+        reflection_rows.append({
+            "id": str(uuid4()),
+            "event_id": event["id"],
+            "content": "振り返り",
+            "created_at": (start + timedelta(hours=2)).isoformat(),
+        })
+        due = None if i % 5 == 0 else (base + timedelta(days=random.randrange(60))).isoformat()
+        now = base.isoformat()
+        task_rows.append({
+            "id": str(uuid4()),
+            "user_id": USER_ID,
+            "title": f"タスク{i}",
+            "due_date": due,
+            "is_completed": False,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return {
+        "companies": companies,
+        "events": event_rows,
+        "tasks": task_rows,
+        "userevents": userevents,
+        "reflections": reflection_rows,
+    }
+
+
+def expected_order(rows, column, desc=False):
+    values = sorted((r for r in rows if r[column] is not None), key=lambda r: (r[column], r["id"]), reverse=desc)
+    nulls = sorted((r for r in rows if r[column] is None), key=lambda r: r["id"], reverse=desc)
+    return [r["id"] for r in values + nulls]
+
+
+async def walk(client, path, params, items_key):
+    ids, pages, max_bytes, cursor = [], 0, 0, None
+    while True:
+        response = await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        body = response.json()
+        max_bytes = max(max_bytes, len(response.content))
+        ids += [item["id"] for item in body[items_key]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids, pages, max_bytes
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=3000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    tables = build_tables(args.size)
+    db = MemoryClient(tables, latency=0)
+    app = FastAPI()
+    for module in (events, tasks, reflections):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = lambda: db
+
+    # (パス, パラメータ, 一覧のキー, 期待する並び)
+    cases = [
+        ("/api/events/", {"user_id": USER_ID, "limit": args.limit}, "items",
+         expected_order(tables["events"], "start_time")),
+        ("/api/tasks/", {"user_id": USER_ID, "limit": args.limit}, "items",
+         expected_order(tables["tasks"], "due_date")),
+        ("/api/reflections", {"user_id": USER_ID, "limit": args.limit}, "reflections",
+         expected_order(tables["reflections"], "created_at", desc=True)),
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"rows per list: {args.size}, page size: {args.limit}")
+        for path, params, key, expected in cases:
+            started = time.perf_counter()
+            ids, pages, max_bytes = await walk(client, path, params, key)
+            elapsed = (time.perf_counter() - started) * 1000
+            status = "OK" if ids == expected else "MISMATCH"
+            print(f"{path:<18} {status:<8} {pages:>3} pages, max page {max_bytes / 1024:>6.1f}KB, {elapsed:>7.1f}ms")
+
+        response = await client.get("/api/events/", params={"user_id": USER_ID, "limit": 10 ** 6})
+        print(f"limit=1000000 -> {len(response.json()['items'])} items (server max)")
+        response = await client.get("/api/events/", params={"user_id": USER_ID, "cursor": "broken"})
+        print(f"invalid cursor -> {response.status_code}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
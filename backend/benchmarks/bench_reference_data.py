@@ -0,0 +1,109 @@
+"""
+参照データ（/api/reference/industries・/api/reference/companies）の ETag / 304 の確認
+
+旧: フロントエンドの /api/industries・/api/companies/list と同じく、毎回 DB から全件取得して全件返す
+新: スナップショットを返し、If-None-Match が一致すれば 304（本文なし・DB往復なし）
+
+1. 初回・2回目（ETag なし）・再検証（If-None-Match あり）ごとに DB往復回数・転送量・時間を出力する
+2. 企業の書き込み（notify_change）で ETag が変わり、新しい内容が返ること
+3. 業界を読み込み直しても内容が同じなら ETag が変わらないこと
+を確かめる。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_reference_data
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import reference
+from app.services.company_index import company_index
+from app.services.reference_data import companies_reference, industries_reference
+from app.services.change_feed import notify_change
+from .bench_company_search import INDUSTRIES, make_companies
+
+
+async def legacy(db: MemoryClient, table: str, columns: str, order: str):
+    """
+    フロントエンドの route.ts と同じ全件取得（JSON のバイト数を返す）
+    """
+    rows = (await db.table(table).select(columns).order(order).execute()).data
+    return len(json.dumps({table: rows}, ensure_ascii=False).encode())
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    db = MemoryClient({"companies": make_companies(args.companies), "industries": INDUSTRIES}, latency=args.latency)
+    app = FastAPI()
+    app.include_router(reference.router)
+    app.dependency_overrides[get_db] = lambda: db
+    for dataset in (company_index, industries_reference, companies_reference):
+        await dataset.clear()
+    failures = 0
+
+    print(f"{'request':<44} | {'status':>6} | {'db trips':>8} | {'body':>9} | {'time':>8}")
+
+    def report(label, status, trips, size, elapsed):
+        print(f"{label:<44} | {status:>6} | {trips:>8} | {size / 1024:>7.1f}KB | {elapsed * 1000:>6.1f}ms")
+
+    for table, columns, order in (("industries", "id, industries", "industries"),
+                                  ("companies", "id, name, url, address, industry", "name")):
+        db.round_trips = 0
+        started = time.perf_counter()
+        size = await legacy(db, table, columns, order)
+        report(f"legacy /api/{table} (every request)", 200, db.round_trips, size, time.perf_counter() - started)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def get(path, etag=None):
+            headers = {"If-None-Match": etag} if etag else {}
+            db.round_trips = 0
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            report(f"{path}{' (If-None-Match)' if etag else ''}", response.status_code,
+                   db.round_trips, len(response.content), time.perf_counter() - started)
+            return response
+
+        etags = {}
+        for path in ("/api/reference/industries", "/api/reference/companies"):
+            first = await get(path)
+            second = await get(path)
+            revalidated = await get(path, first.headers["etag"])
+            etags[path] = first.headers["etag"]
+            ok = (first.status_code == 200 and second.headers["etag"] == first.headers["etag"]
+                  and revalidated.status_code == 304 and revalidated.content == b"" and db.round_trips == 0
+                  and "max-age" in revalidated.headers["cache-control"])
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {path}: repeat loads are 304 with no db round trip")
+
+        # 企業の書き込みで ETag が変わり、古い ETag では 304 にならない
+        new_id = str(uuid.uuid4())
+        await notify_change(db, "companies", "INSERT", {"id": new_id, "name": "参照データ確認株式会社", "industry": 1})
+        changed = await get("/api/reference/companies", etags["/api/reference/companies"])
+        ok = (changed.status_code == 200 and changed.headers["etag"] != etags["/api/reference/companies"]
+              and new_id in {row["id"] for row in changed.json()["companies"]})
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} company write changes the ETag and the new company is returned")
+
+        # 業界を読み込み直しても内容が同じなら ETag は変わらない（クライアントは 304 のまま）
+        await industries_reference.clear()
+        reloaded = await get("/api/reference/industries", etags["/api/reference/industries"])
+        ok = reloaded.status_code == 304
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} reloading unchanged industries keeps the ETag")
+
+    print("\n❌ some checks failed" if failures else "\n✅ reference data checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
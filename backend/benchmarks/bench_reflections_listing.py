@@ -0,0 +1,144 @@
+"""
+ユーザー指定の振り返り一覧（GET /api/reflections?user_id=）の確認とベンチマーク
+
+数千件のイベントを持つユーザーについて、
+- 旧実装（userevents からイベントIDを取得 -> in_("event_id", ids) で振り返りを取得）
+- 現行実装（events!inner(userevents!inner()) の内部結合1回）
+の往復回数・PostgREST へのリクエストURL長・結果を比較する。
+現行実装で next_cursor をたどった全件が旧実装の全件と同じ並びになることも確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_reflections_listing
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+from postgrest import AsyncPostgrestClient
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.routers import reflections
+
+REFLECTION_SELECT = "*, events(id, title, type, start_time, end_time, company_id, companies(name))"
+
+# PostgREST（と前段のプロキシ）が受け付ける URL 長の目安
+URL_LIMIT = 8 * 1024
+
+
+def build_tables(events_per_user: int, other_users: int):
+    base = datetime(2025, 4, 1, tzinfo=timezone.utc)
+    user_ids = [str(uuid4()) for _ in range(other_users + 1)]
+    company = {"id": str(uuid4()), "name": "株式会社サンプル"}
+    events, userevents, reflection_rows = [], [], []
+    for user_id in user_ids:
+        for i in range(events_per_user):
+            event = {
+                "id": str(uuid4()),
+                "company_id": company["id"],
+                "title": f"面接{i}",
+                "type": "Interview",
+                "start_time": (base + timedelta(hours=i)).isoformat(),
+                "end_time": None,
+            }
+            events.append(event)
+            userevents.append({"event_id": event["id"], "user_id": user_id, "status": "Joined"})
+            if i % 2 == 0:
+                reflection_rows.append({
+                    "id": str(uuid4()),
+                    "event_id": event["id"],
+                    "content": "振り返り",
+                    "created_at": (base + timedelta(hours=i, minutes=90)).isoformat(),
+                })
+    tables = {
+        "companies": [company],
+        "events": events,
+        "userevents": userevents,
+        "reflections": reflection_rows,
+    }
+    return tables, user_ids[0]
+
+
+def request_url_length(query) -> int:
+    request = query.request
+    return len(str(request.path)) + 1 + len(str(request.params))
+
+
+async def legacy_listing(db, user_id: str, limit: int):
+    """
+    旧実装: イベントIDを取得してから in_ で振り返りを取得する（2往復）
+    """
+    user_events = await db.table("userevents").select("event_id").eq("user_id", user_id).execute()
+    event_ids = [ue["event_id"] for ue in user_events.data]
+    response = await db.table("reflections").select(REFLECTION_SELECT).in_(
+        "event_id", event_ids
+    ).order("created_at", desc=True).limit(limit).execute()
+
+    # 旧実装と同じクエリを実際の postgrest クライアントで組み立てたときの URL 長
+    postgrest = AsyncPostgrestClient("https://project.supabase.co/rest/v1")
+    url_length = request_url_length(
+        postgrest.from_("reflections").select(REFLECTION_SELECT).in_("event_id", event_ids)
+    )
+    await postgrest.aclose()
+    return response.data, url_length
+
+
+def joined_url_length(user_id: str) -> int:
+    postgrest = AsyncPostgrestClient("https://project.supabase.co/rest/v1")
+    query = postgrest.from_("reflections").select(
+        "*, events!inner(id, title, type, start_time, end_time, company_id, companies(name), userevents!inner())"
+    ).eq("events.userevents.user_id", user_id)
+    return request_url_length(query)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=4000, help="ユーザーあたりのイベント数")
+    parser.add_argument("--other-users", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    tables, user_id = build_tables(args.events, args.other_users)
+    db = MemoryClient(tables, latency=0)
+
+    legacy_rows, legacy_url = await legacy_listing(db, user_id, len(tables["reflections"]))
+    legacy_trips = db.round_trips
+
+    app = FastAPI()
+    app.include_router(reflections.router)
+    app.dependency_overrides[get_db] = lambda: db
+    transport = httpx.ASGITransport(app=app)
+
+    db.round_trips = 0
+    ids, pages, cursor, first_page = [], 0, None, None
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        while True:
+            params = {"user_id": user_id, "limit": args.limit, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/reflections", params=params)
+            response.raise_for_status()
+            body = response.json()
+            first_page = first_page or body
+            ids += [r["id"] for r in body["reflections"]]
+            pages += 1
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+    print(f"events for user: {args.events}, reflections for user: {len(legacy_rows)}")
+    print(f"{'':>8} | {'round trips / page':>18} | {'request URL':>12}")
+    legacy_status = "over limit" if legacy_url > URL_LIMIT else "ok"
+    print(f"{'legacy':>8} | {legacy_trips:>18} | {legacy_url:>7} chars ({legacy_status})")
+    print(f"{'joined':>8} | {db.round_trips / pages:>18.0f} | {joined_url_length(user_id):>7} chars")
+
+    same_order = ids == [r["id"] for r in legacy_rows]
+    reflection = first_page["reflections"][0]
+    print(f"all pages match legacy order: {same_order} ({pages} pages)")
+    print(f"response keys unchanged: {sorted(first_page) == ['next_cursor', 'reflections', 'total_count']}, "
+          f"events embed keys: {sorted(reflection['events'])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
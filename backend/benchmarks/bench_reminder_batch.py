@@ -0,0 +1,75 @@
+"""
+全ユーザー向けリマインドバッチのベンチマーク
+
+1万ユーザー分のデータで ReminderBatchJob を実行し、所要時間とDB往復回数を計測する。
+続けて同じ日付で再実行し、通知・メールが重複しないこと（冪等性）を確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_reminder_batch --users 10000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.memory_db import MemoryClient
+from app.services.reminder_batch import ReminderBatchJob
+
+
+def build_tables(user_count: int, companies_per_user: int = 3):
+    now = datetime.now(timezone.utc)
+    tables = {"users": [], "companies": [], "usercompanyselections": [], "events": [], "notifications": []}
+    for u in range(user_count):
+        user = {"id": str(uuid4()), "email": f"user{u}@example.com", "name": f"ユーザー{u}"}
+        tables["users"].append(user)
+        for i in range(companies_per_user):
+            company = {"id": str(uuid4()), "name": f"企業{u}-{i}"}
+            tables["companies"].append(company)
+            tables["usercompanyselections"].append({
+                "id": str(uuid4()),
+                "user_id": user["id"],
+                "company_id": company["id"],
+                "status": ["Interested", "ES_Submit", "Interview"][i % 3],
+                "updated_at": (now - timedelta(days=10)).isoformat(),
+            })
+            if i == 0:
+                tables["events"].append({
+                    "id": str(uuid4()),
+                    "company_id": company["id"],
+                    "title": "ES締切",
+                    "type": "Deadline",
+                    "start_time": (now + timedelta(days=2)).isoformat(),
+                })
+    return tables
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.01, help="DB往復1回あたりの秒数")
+    parser.add_argument("--mail-latency", type=float, default=0.05, help="メール送信1通あたりの秒数")
+    parser.add_argument("--mail-concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    db = MemoryClient(build_tables(args.users), latency=args.latency)
+    sent_keys = []
+
+    async def fake_send(http, to, subject, text, idempotency_key=None):
+        await asyncio.sleep(args.mail_latency)
+        sent_keys.append(idempotency_key)
+        return True
+
+    now = datetime.now(timezone.utc)
+    for attempt in ("first run", "retry"):
+        db.round_trips = 0
+        started = time.perf_counter()
+        stats = await ReminderBatchJob(db, mail_concurrency=args.mail_concurrency, send=fake_send).run(now)
+        elapsed = time.perf_counter() - started
+        print(f"{attempt}: {elapsed:.2f}s, {db.round_trips} round trips, {stats}")
+
+    assert len(sent_keys) == len(set(sent_keys)), "duplicate emails were sent"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
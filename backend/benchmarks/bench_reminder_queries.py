@@ -0,0 +1,57 @@
+"""
+リマインド生成のDB往復回数を計測する
+
+追跡企業数を増やしても往復回数が一定であること（N+1になっていないこと）を確認する。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_reminder_queries
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.memory_db import MemoryClient
+from app.services.reminder_service import ReminderService
+
+
+def build_tables(user_id: str, company_count: int):
+    """
+    企業ごとに「結果待ちで10日放置」の選考状況と「2日後の締切」イベントを作る
+    """
+    now = datetime.now(timezone.utc)
+    companies, selections, events = [], [], []
+    for i in range(company_count):
+        company = {"id": str(uuid4()), "name": f"企業{i}"}
+        companies.append(company)
+        selections.append({
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "company_id": company["id"],
+            "status": "ES_Submit" if i % 2 else "Interested",
+            "updated_at": (now - timedelta(days=10)).isoformat(),
+        })
+        events.append({
+            "id": str(uuid4()),
+            "company_id": company["id"],
+            "title": "ES締切",
+            "type": "Deadline",
+            "start_time": (now + timedelta(days=2)).isoformat(),
+        })
+    return {"companies": companies, "usercompanyselections": selections, "events": events}
+
+
+async def main():
+    user_id = str(uuid4())
+    print(f"{'companies':>9} | {'round trips':>11} | {'reminders':>9} | {'elapsed':>8}")
+    for company_count in (1, 10, 80, 500):
+        db = MemoryClient(build_tables(user_id, company_count), latency=0.005)
+        service = ReminderService(db)
+        started = time.perf_counter()
+        result = await service.get_all_reminders(user_id)
+        elapsed = time.perf_counter() - started
+        print(f"{company_count:>9} | {db.round_trips:>11} | {result['total_count']:>9} | {elapsed * 1000:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,279 @@
+"""
+ベンチマーク・負荷試験のスイート（コミット間で比較できるよう結果を JSON でも出力する）
+
+1. micro: ReminderService の生成関数・並び替えと、レスポンスのシリアライズを1回ずつ計測する
+   （DB は latency 0 の MemoryClient。アプリ側の CPU コストだけを見る）
+2. load: /api/reminders・/api/reflections・/api/events・/api/tasks を重み付きで混ぜ、
+   指定の並列数で一定時間リクエストを送り続ける
+   - 既定はプロセス内（httpx.ASGITransport + 往復ごとに --latency 秒かかる MemoryClient）
+   - --base-url を指定すると起動中のサーバー（ローカルの Postgres / PostgREST につないだ uvicorn など）に送る。
+     この場合データは作らないので、対象ユーザーを --user-ids で渡す
+
+データは benchmarks/datasets.py で --sizes の行数（events / tasks それぞれ）ごとに作る。
+どちらも p50 / p95 / p99 と RPS（micro は1秒あたりの実行回数）を出す。
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --sizes 1000,10000,100000 --duration 10 --output bench.json
+    python -m benchmarks.bench_suite --base-url http://localhost:8000 --user-ids <uuid>,<uuid>
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.database import get_db
+from app.memory_db import MemoryClient
+from app.models.models import Event, Task
+from app.pagination import Page
+from app.routers import events, reflections, reminders, tasks
+from app.services.reminder_cache import reminder_cache
+from app.services.reminder_service import ReminderService
+from .datasets import SIZES, generate_dataset, row_counts
+
+# (名前, 重み, パス, ユーザーIDを渡すパラメータ以外のクエリ)
+SCENARIO = [
+    ("reminders", 4, "/api/reminders", {}),
+    ("reflections", 2, "/api/reflections", {}),
+    ("events", 2, "/api/events/", {}),
+    ("tasks", 2, "/api/tasks/", {"is_completed": "false"}),
+]
+
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict[str, Any]:
+    """
+    所要時間（秒）の一覧から p50 / p95 / p99 と RPS を出す（nearest-rank）
+    elapsed を渡さなければ1回ずつ直列に実行したものとして合計時間で割る
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(-(-p * len(ordered) // 100)) - 1))
+        return ordered[index] * 1000
+
+    total = elapsed if elapsed is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "rps": round(len(ordered) / total, 1) if total else None,
+    }
+
+
+# --- micro ---
+async def _time_calls(call: Callable[[int], Awaitable[Any]], iterations: int) -> List[float]:
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run_micro(tables, user_ids: List[str], iterations: int) -> Dict[str, Dict[str, Any]]:
+    db = MemoryClient(tables, latency=0)
+    service = ReminderService(db, engine="python")
+    now = datetime.now(timezone.utc)
+
+    def user(i: int) -> str:
+        return user_ids[i % len(user_ids)]
+
+    # シリアライズ用の入力（ユーザーごとに1回だけ作る）
+    all_reminders = [await service.get_all_reminders(u, now) for u in user_ids]
+    event_pages, task_pages = [], []
+    for u in user_ids:
+        event_pages.append({
+            "items": (await db.table("events").select("*, companies(name)").eq("user_id", u)
+                      .order("start_time").limit(50).execute()).data,
+            "next_cursor": None,
+        })
+        task_pages.append({
+            "items": (await db.table("tasks").select("*, companies(name)").eq("user_id", u)
+                      .order("due_date").limit(50).execute()).data,
+            "next_cursor": None,
+        })
+    reminder_lists = [result["reminders"] for result in all_reminders]
+
+    async def sort_reminders(i: int):
+        ReminderService._sort_by_priority(list(reminder_lists[i % len(user_ids)]))
+
+    async def serialize_reminders(i: int):
+        JSONResponse(jsonable_encoder(all_reminders[i % len(user_ids)]))
+
+    async def serialize_events(i: int):
+        # response_model=Page[Event] と同じ検証 + JSON 化
+        Page[Event].model_validate(event_pages[i % len(user_ids)]).model_dump_json()
+
+    async def serialize_tasks(i: int):
+        Page[Task].model_validate(task_pages[i % len(user_ids)]).model_dump_json()
+
+    cases = {
+        "reminders.email_check": lambda i: service._generate_email_check_reminders(user(i), now),
+        "reminders.deadline": lambda i: service._generate_deadline_reminders(user(i), now),
+        "reminders.get_all": lambda i: service.get_all_reminders(user(i), now),
+        "reminders.sort_by_priority": sort_reminders,
+        "serialize.reminders_json": serialize_reminders,
+        "serialize.events_page": serialize_events,
+        "serialize.tasks_page": serialize_tasks,
+    }
+    results = {}
+    for name, call in cases.items():
+        await _time_calls(call, min(iterations, 20))  # ウォームアップ
+        results[name] = summarize(await _time_calls(call, iterations))
+    return results
+
+
+# --- load ---
+def build_app(db) -> FastAPI:
+    """
+    負荷試験の対象ルーターだけを載せたアプリ（events / tasks は main.py では未登録のため）
+    """
+    target = FastAPI()
+    for module in (reminders, reflections, events, tasks):
+        target.include_router(module.router)
+    target.dependency_overrides[get_db] = lambda: db
+    return target
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    user_ids: List[str],
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    weights = [weight for _, weight, _, _ in SCENARIO]
+    samples: Dict[str, List[float]] = {name: [] for name, _, _, _ in SCENARIO}
+    errors: Dict[str, int] = {name: 0 for name, _, _, _ in SCENARIO}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name, _, path, params = rng.choices(SCENARIO, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params={"user_id": rng.choice(user_ids), **params})
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if ok:
+                samples[name].append(elapsed)
+            else:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    results = {name: {**summarize(values, wall), "errors": errors[name]} for name, values in samples.items()}
+    everything = [value for values in samples.values() for value in values]
+    results["all"] = {**summarize(everything, wall), "errors": sum(errors.values())}
+    return results
+
+
+# --- 出力 ---
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(title: str, results: Dict[str, Dict[str, Any]], rate: str) -> None:
+    print(f"\n{title}")
+    print(f"  {'name':<28} | {'count':>7} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {rate:>9} | {'errors':>6}")
+    for name, r in results.items():
+        if not r.get("count"):
+            print(f"  {name:<28} | {0:>7} | {'-':>9} | {'-':>9} | {'-':>9} | {'-':>9} | {r.get('errors', 0):>6}")
+            continue
+        print(
+            f"  {name:<28} | {r['count']:>7} | {r['p50_ms']:>7.2f}ms | {r['p95_ms']:>7.2f}ms | "
+            f"{r['p99_ms']:>7.2f}ms | {r['rps']:>9.1f} | {r.get('errors', 0):>6}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES[:2]),
+                        help="events / tasks の行数（カンマ区切り。例: 1000,10000,100000）")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=200, help="micro の各項目の実行回数")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0, help="load の秒数")
+    parser.add_argument("--latency", type=float, default=0.002, help="プロセス内の fake DB の往復ごとの秒数")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="fake DB の返却1行あたりの秒数")
+    parser.add_argument("--warm-cache", action="store_true", help="リマインドキャッシュを効かせたまま計測する")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--base-url", help="起動中のサーバーに負荷をかける（データは作らない）")
+    parser.add_argument("--user-ids", default="", help="--base-url のときの対象ユーザーID（カンマ区切り）")
+    parser.add_argument("--output", help="結果を JSON で保存するパス")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "args": vars(args),
+        "runs": [],
+    }
+
+    if args.base_url:
+        user_ids = [u for u in args.user_ids.split(",") if u]
+        if not user_ids:
+            parser.error("--base-url requires --user-ids")
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+            load = await run_load(client, user_ids, args.concurrency, args.duration, args.seed)
+        print_table(f"load against {args.base_url} ({args.concurrency} concurrent, {args.duration}s)", load, "rps")
+        report["runs"].append({"target": args.base_url, "load": load})
+    else:
+        if not args.warm_cache:
+            # 毎回計算させる（キャッシュのヒットで生成関数のコストが見えなくならないように）
+            reminder_cache.ttl = 1e-9
+        for size in (int(value) for value in args.sizes.split(",") if value):
+            started = time.perf_counter()
+            tables, user_ids = generate_dataset(size, users=args.users, seed=args.seed)
+            counts = row_counts(tables)
+            print(f"\n=== size {size} ({time.perf_counter() - started:.1f}s to generate) rows: {counts}")
+            run: Dict[str, Any] = {"size": size, "rows": counts}
+
+            if not args.skip_micro:
+                run["micro"] = await run_micro(tables, user_ids, args.iterations)
+                print_table("micro (fake db, no latency)", run["micro"], "ops/s")
+
+            db = MemoryClient(tables, latency=args.latency, row_latency=args.row_latency)
+            transport = httpx.ASGITransport(app=build_app(db))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                run["load"] = await run_load(client, user_ids, args.concurrency, args.duration, args.seed)
+            run["load_db_round_trips"] = db.round_trips
+            print_table(
+                f"load (in-process, {args.concurrency} concurrent, {args.duration}s, "
+                f"db latency {args.latency * 1000:.1f}ms)",
+                run["load"], "rps"
+            )
+            report["runs"].append(run)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nsaved results to {args.output} (commit {report['commit']})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+DB呼び出しのトレース（app/tracing.py）の出力確認とオーバーヘッド計測
+
+- TRACING_ENABLED=true でアプリを読み込み、計測用ラッパーで包んだ MemoryClient に対して
+  いくつかのAPIを呼び、Server-Timing ヘッダーと slow_query のログを表示する
+- postgrest の実際の builder（送信はしない）からフィルタの要約を作り、値が入らないことを確認する
+- トレースあり/なしで同じリクエストを繰り返し、1リクエストあたりの時間を比べる
+
+実行方法（backend ディレクトリで）:
+    python -m benchmarks.bench_tracing
+"""
+import os
+
+os.environ.setdefault("TRACING_ENABLED", "true")
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "15")
+
+import argparse
+import asyncio
+import io
+import logging
+import time
+from uuid import uuid4
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from app import tracing
+from app.database import get_db
+from app.main import app
+from app.memory_db import MemoryClient
+from app.metrics import instrument_client
+from app.services.reminder_cache import reminder_cache
+from .bench_reminder_queries import build_tables
+
+
+class SlowTables(MemoryClient):
+    """
+    指定したテーブルだけ往復に時間がかかる MemoryClient（slow_query を出すため）
+    """
+
+    def __init__(self, tables, latency: float, slow_tables, slow_latency: float):
+        super().__init__(tables, latency=latency)
+        self.slow_tables = set(slow_tables)
+        self.slow_latency = slow_latency
+
+    def table(self, name: str):
+        query = super().table(name)
+        if name in self.slow_tables:
+            original = query.execute
+
+            async def execute():
+                await asyncio.sleep(self.slow_latency)
+                return await original()
+            query.execute = execute
+        return query
+
+
+def show_filter_summaries() -> None:
+    client = AsyncPostgrestClient("http://localhost")
+    builders = [
+        client.table("usercompanyselections").select("*, companies(name)")
+        .eq("user_id", "secret-user").in_("status", ["Interested", "Entry", "ES_Submit"]),
+        client.table("events").select("*").or_("company_id.in.(a,b),title.ilike.*面接*")
+        .gte("start_time", "2026-01-01").order("start_time").limit(50),
+        client.table("tasks").update({"done": True}).eq("id", "secret-task"),
+    ]
+    for builder in builders:
+        summary = tracing.summarize_filters(builder)
+        leaked = [value for value in ("secret", "面接", "2026") if value in summary]
+        print(f"  {summary!r}{'  ❌ contains values: ' + str(leaked) if leaked else ''}")
+
+
+async def time_requests(client: httpx.AsyncClient, user_id: str, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await reminder_cache.clear()
+        await client.get("/api/reminders", params={"user_id": user_id})
+    return (time.perf_counter() - started) / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--companies", type=int, default=40)
+    args = parser.parse_args()
+
+    user_id = str(uuid4())
+    tables = build_tables(user_id, args.companies)
+    db = instrument_client(SlowTables(tables, latency=0.002, slow_tables=["events"], slow_latency=0.02))
+    app.dependency_overrides[get_db] = lambda: db
+
+    print(f"TRACING_ENABLED={tracing.TRACING_ENABLED}, SLOW_QUERY_THRESHOLD_MS={tracing.SLOW_QUERY_THRESHOLD_MS}\n")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # slow_query は app.tracing のロガーに WARNING で出る。ここでは集めてからまとめて表示する
+        log = io.StringIO()
+        handler = logging.StreamHandler(log)
+        tracing.logger.addHandler(handler)
+        tracing.logger.propagate = False
+        try:
+            for path in ("/api/reminders", "/api/reminders/deadlines", "/api/export/events"):
+                await reminder_cache.clear()
+                response = await client.get(path, params={"user_id": user_id})
+                print(f"GET {path} -> {response.status_code}\n  Server-Timing: {response.headers.get('server-timing')}")
+        finally:
+            tracing.logger.removeHandler(handler)
+            tracing.logger.propagate = True
+        print("\nslow query log:")
+        for line in log.getvalue().splitlines():
+            print(f"  {line}")
+
+        print("\nfilter summaries from postgrest builders:")
+        show_filter_summaries()
+
+        # オーバーヘッド（DB待ちなしで比べる。遅いクエリのログは出さない）
+        fast_db = instrument_client(MemoryClient(tables, latency=0))
+        app.dependency_overrides[get_db] = lambda: fast_db
+        tracing.SLOW_QUERY_THRESHOLD_MS = 0
+        tracing.TRACING_ENABLED = False
+        without = await time_requests(client, user_id, args.requests)
+        tracing.TRACING_ENABLED = True
+        with_tracing = await time_requests(client, user_id, args.requests)
+    app.dependency_overrides.clear()
+    print(
+        f"\nper request (fake db, no latency): spans off {without * 1000:.3f}ms, "
+        f"spans on {with_tracing * 1000:.3f}ms (+{(with_tracing - without) * 1e6:.0f}us)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
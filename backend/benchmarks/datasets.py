@@ -0,0 +1,164 @@
+"""
+ベンチマーク・負荷試験用の合成データ
+
+size を events / tasks の行数として、ユーザー・企業・選考状況・イベント（userevents 付き）・
+振り返り・タスク・ESを seed 固定の乱数で作る（同じ引数なら毎回同じデータになる）。
+イベントの日時は now の前後30日に散らすので、リマインド（締切・メール確認）も一定数出る。
+
+    tables, user_ids = generate_dataset(10_000)
+
+DATABASE_BACKEND=memory の初期データ（MEMORY_DB_SEED）として JSON に書き出すこともできる（backend ディレクトリで）:
+    python -m benchmarks.datasets --size 10000 --output seed.json
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# 行数のプリセット（--sizes の既定値）
+SIZES = (1_000, 10_000, 100_000)
+
+STATUSES = ["Interested", "Entry", "ES_Submit", "Interview", "Offer", "Rejected"]
+EVENT_TYPES = ["Interview", "Deadline", "Seminar", "Other"]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_dataset(
+    size: int,
+    users: int = 50,
+    companies_per_user: int = 30,
+    seed: int = 0,
+    now: Optional[datetime] = None
+) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+    """
+    合成データを作る
+
+    Returns:
+        (テーブル名 -> 行のリスト, ユーザーIDのリスト)
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+
+    def at(seconds: int) -> str:
+        return (now + timedelta(seconds=seconds)).isoformat()
+
+    user_ids = [_uuid(rng) for _ in range(users)]
+    companies = [
+        {"id": _uuid(rng), "name": f"企業{i:05d}", "created_at": at(-90 * 86400)}
+        for i in range(max(companies_per_user, size // 50))
+    ]
+
+    selections = []
+    companies_by_user: Dict[str, List[str]] = {}
+    for user_id in user_ids:
+        chosen = rng.sample(companies, min(companies_per_user, len(companies)))
+        companies_by_user[user_id] = [company["id"] for company in chosen]
+        for company in chosen:
+            selections.append({
+                "id": _uuid(rng),
+                "user_id": user_id,
+                "company_id": company["id"],
+                "status": rng.choice(STATUSES),
+                "created_at": at(-rng.randint(0, 60 * 86400)),
+                "updated_at": at(-rng.randint(0, 30 * 86400)),
+            })
+
+    events, userevents, reflections = [], [], []
+    for i in range(size):
+        user_id = rng.choice(user_ids)
+        offset = rng.randint(-30 * 86400, 30 * 86400)
+        event = {
+            "id": _uuid(rng),
+            # events の一覧APIは user_id で絞るので、イベントにも持たせておく
+            "user_id": user_id,
+            "company_id": rng.choice(companies_by_user[user_id]),
+            "title": f"イベント{i}",
+            "type": rng.choice(EVENT_TYPES),
+            "start_time": at(offset),
+            "end_time": at(offset + 3600),
+            "location": None,
+            "description": None,
+        }
+        events.append(event)
+        userevents.append({"event_id": event["id"], "user_id": user_id, "status": "Joined"})
+        # 終わったイベントの半分に振り返りを付ける
+        if offset < 0 and rng.random() < 0.5:
+            reflections.append({
+                "id": _uuid(rng),
+                "event_id": event["id"],
+                "content": "振り返り",
+                "good_points": None,
+                "bad_points": None,
+                "self_score": rng.randint(1, 5),
+                "created_at": at(offset + 7200),
+            })
+
+    tasks = []
+    for i in range(size):
+        user_id = rng.choice(user_ids)
+        due = rng.randint(-10 * 86400, 30 * 86400)
+        tasks.append({
+            "id": _uuid(rng),
+            "user_id": user_id,
+            "company_id": rng.choice(companies_by_user[user_id]) if rng.random() < 0.7 else None,
+            "title": f"タスク{i}",
+            "description": None,
+            "due_date": at(due) if rng.random() < 0.8 else None,
+            "is_completed": rng.random() < 0.3,
+            "created_at": at(-40 * 86400),
+            "updated_at": at(-40 * 86400),
+        })
+
+    # ES提出以降のステータスの企業には、直近30日のどこかで提出したESを1件付ける
+    es_entries = [
+        {
+            "id": _uuid(rng),
+            "company_id": selection["company_id"],
+            "user_id": selection["user_id"],
+            "content": "ES",
+            "status": "Completed",
+            "submitted_at": (now - timedelta(days=rng.randint(0, 29))).date().isoformat(),
+            "created_at": selection["created_at"],
+        }
+        for selection in selections
+        if selection["status"] in ("ES_Submit", "Interview", "Offer", "Rejected")
+    ]
+
+    tables = {
+        "companies": companies,
+        "usercompanyselections": selections,
+        "events": events,
+        "userevents": userevents,
+        "reflections": reflections,
+        "tasks": tasks,
+        "es_entries": es_entries,
+    }
+    return tables, user_ids
+
+
+def row_counts(tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    return {name: len(rows) for name, rows in tables.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=SIZES[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    tables, user_ids = generate_dataset(args.size, users=args.users, seed=args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(tables, f, ensure_ascii=False)
+    print(f"wrote {args.output}: {row_counts(tables)}")
+    print(f"user ids: {','.join(user_ids[:5])},...")
+
+
+if __name__ == "__main__":
+    main()
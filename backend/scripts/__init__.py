@@ -0,0 +1 @@
+# Operational scripts package
@@ -0,0 +1,169 @@
+"""
+分析の集計の Python 版と SQL 版（get_user_analytics）の一致確認
+
+check_reminder_parity と同じくローカルの Postgres に使い捨てのスキーマを作り、
+docs/schema.sql と docs/migrations を適用してデータを投入する。
+同じデータ・同じ日付で
+- Python 版: テーブルの内容を読み込んだ MemoryClient に対して AnalyticsService（engine="python"）
+- SQL 版: Postgres の get_user_analytics を AnalyticsService（engine="sql"）経由で呼ぶ
+を全ユーザー分実行し、返す集計が一致するかを比べる。
+日の境界（UTC 0時ちょうど・その1秒前）と7日・30日の範囲の端にもデータを置いている。
+
+実行方法（backend ディレクトリで）:
+    PLAN_CHECK_DATABASE_URL=postgresql://postgres@localhost/postgres python -m scripts.check_analytics_parity
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import date
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import psycopg2
+
+from app.memory_db import MemoryClient
+from app.services import analytics
+from app.services.analytics import AnalyticsService
+from .check_query_plans import SCHEMA_SQL, seed
+from .check_reminder_parity import load_tables
+from .migrate import MIGRATIONS_DIR, apply_migrations
+
+# Python 版が読むテーブル
+TABLES = ["usercompanyselections", "events", "userevents", "es_entries"]
+
+# 境界のイベント・企業追加の日時（今日の0時からの位置）
+EDGE_OFFSETS = [
+    "-7 days -1 second", "-6 days", "-1 second", "0", "1 day -1 second", "1 day",
+    "-29 days", "-29 days -1 second",
+]
+
+
+class PostgresRPC:
+    """
+    rpc() を psycopg2 で Postgres の関数に流すアダプタ
+    （PostgREST と同じく、スカラーを返す関数はその値をそのまま data にする）
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def rpc(self, name: str, params: Dict[str, Any]):
+        client = self
+
+        class Call:
+            async def execute(self):
+                args = ", ".join(f"{key} => %({key})s" for key in params)
+                with client.conn.cursor() as cur:
+                    cur.execute(f"SELECT {name}({args})", params)
+                    return SimpleNamespace(data=cur.fetchone()[0])
+
+        return Call()
+
+
+def seed_edge_cases(cur, today: date) -> None:
+    """
+    境界の前後にイベント・ES・企業追加を置いたユーザーを1人作る
+    """
+    cur.execute(
+        "INSERT INTO users (id, email, name, university) "
+        "VALUES (gen_random_uuid(), 'edge-analytics@example.com', 'edge', 'university') RETURNING id"
+    )
+    user_id = cur.fetchone()[0]
+    for offset in EDGE_OFFSETS:
+        params = {"user_id": user_id, "today": today, "offset": offset, "name": f"edge analytics {offset}"}
+        cur.execute("INSERT INTO companies (id, name) VALUES (gen_random_uuid(), %(name)s) RETURNING id", params)
+        params["company_id"] = cur.fetchone()[0]
+        at = "(%(today)s::date::timestamp AT TIME ZONE 'UTC') + %(offset)s::interval"
+        cur.execute(
+            "INSERT INTO usercompanyselections (company_id, user_id, status, created_at, updated_at) "
+            f"VALUES (%(company_id)s, %(user_id)s, 'ES_Submit', {at}, {at})",
+            params
+        )
+        cur.execute(
+            "INSERT INTO events (id, company_id, title, type, start_time) "
+            f"VALUES (gen_random_uuid(), %(company_id)s, 'edge', 'Interview', {at}) RETURNING id",
+            params
+        )
+        params["event_id"] = cur.fetchone()[0]
+        cur.execute(
+            "INSERT INTO userevents (event_id, user_id, status) VALUES (%(event_id)s, %(user_id)s, 'Joined')",
+            params
+        )
+        cur.execute(
+            "INSERT INTO es_entries (company_id, user_id, content, status, submitted_at) "
+            f"VALUES (%(company_id)s, %(user_id)s, 'es', 'Completed', ({at})::date)",
+            params
+        )
+
+
+async def compare(conn, user_ids: List[str], today: date) -> List[str]:
+    with conn.cursor() as cur:
+        memory = MemoryClient(load_tables(cur, TABLES), latency=0)
+    python_service = AnalyticsService(memory, engine="python")
+    sql_service = AnalyticsService(PostgresRPC(conn), engine="sql")
+
+    failures = []
+    events = 0
+    for user_id in user_ids:
+        # キャッシュに入った Python 版の結果を SQL 版が読まないよう、毎回空にする
+        await analytics.analytics_cache.clear()
+        expected = await python_service.get_summary(user_id, today)
+        await analytics.analytics_cache.clear()
+        actual = await sql_service.get_summary(user_id, today)
+        events += sum(day["events"] for day in expected["activity"])
+        if expected != actual:
+            failures.append(f"{user_id}: python={expected} sql={actual}")
+    print(f"users: {len(user_ids)}, events in the last 7 days: {events}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("PLAN_CHECK_DATABASE_URL"))
+    parser.add_argument("--scale", type=int, default=1, help="データ量の倍率（1 = 200ユーザー）")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("PLAN_CHECK_DATABASE_URL is not set (use a local Postgres, not production).")
+        sys.exit(2)
+
+    schema = f"analytics_parity_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(args.database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET TIME ZONE 'UTC'")
+            cur.execute(f"CREATE SCHEMA {schema}")
+            cur.execute(f"SET search_path TO {schema}, public")
+            cur.execute(SCHEMA_SQL.read_text(encoding="utf-8"))
+        conn.commit()
+        apply_migrations(conn, MIGRATIONS_DIR)
+
+        with conn.cursor() as cur:
+            seed(cur, args.scale)
+            cur.execute("SELECT (now() AT TIME ZONE 'UTC')::date")
+            today = cur.fetchone()[0]
+            seed_edge_cases(cur, today)
+            cur.execute("SELECT id::text FROM users ORDER BY email")
+            user_ids = [row[0] for row in cur.fetchall()]
+        conn.commit()
+
+        failures = asyncio.run(compare(conn, user_ids, today))
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+    if failures:
+        for failure in failures[:5]:
+            print(failure)
+        print(f"❌ {len(failures)} users differ between the python and sql analytics engines")
+        sys.exit(1)
+    print("✅ python and sql analytics engines agree")
+
+
+if __name__ == "__main__":
+    main()
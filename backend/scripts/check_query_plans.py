@@ -0,0 +1,320 @@
+"""
+主要クエリの実行計画チェック（インデックスの回帰確認）
+
+ローカルの Postgres に使い捨てのスキーマを作り、docs/schema.sql と docs/migrations を適用して
+ユーザー数・企業数の多いデータを投入したうえで、アプリの主要クエリを EXPLAIN する。
+大きいテーブルに Seq Scan が出たクエリがあれば一覧を出して終了コード 1 で終わる。
+
+本番の DATABASE_URL では実行しないこと（スキーマの作成・削除を行う）。
+
+実行方法（backend ディレクトリで）:
+    PLAN_CHECK_DATABASE_URL=postgresql://postgres@localhost/postgres python -m scripts.check_query_plans
+"""
+import argparse
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import psycopg2
+
+from .migrate import MIGRATIONS_DIR, apply_migrations
+
+SCHEMA_SQL = Path(__file__).resolve().parents[2] / "docs" / "schema.sql"
+
+# 件数が多く、Seq Scan になってはいけないテーブル
+GUARDED_TABLES = {
+    "usercompanyselections",
+    "events",
+    "userevents",
+    "reflections",
+    "tasks",
+    "es_entries",
+    "notifications",
+}
+
+SEED_SQL = """
+INSERT INTO users (id, email, name, university)
+SELECT gen_random_uuid(), 'user' || g || '@example.com', 'user' || g, 'university'
+FROM generate_series(1, %(users)s) g;
+
+INSERT INTO companies (id, name)
+SELECT gen_random_uuid(), 'company' || g
+FROM generate_series(1, %(companies)s) g;
+
+-- ユーザーごとに %(selections)s 社を選考中にする
+INSERT INTO usercompanyselections (company_id, user_id, status, motivation_level, created_at, updated_at)
+SELECT c.id, u.id,
+       (ARRAY['Interested', 'Entry', 'ES_Submit', 'Interview', 'Offer', 'Rejected'])[1 + (u.n + s) %% 6],
+       1 + s %% 5,
+       now() - (s || ' days')::interval,
+       now() - ((u.n + s) %% 30 || ' days')::interval
+FROM (SELECT id, row_number() OVER () AS n FROM users) u
+CROSS JOIN generate_series(1, %(selections)s) s
+JOIN (SELECT id, row_number() OVER () AS n FROM companies) c
+  ON c.n = 1 + (u.n * 7 + s) %% %(companies)s;
+
+-- 企業ごとに %(events_per_company)s 件のイベント（±180日に分散）
+INSERT INTO events (id, company_id, title, type, start_time)
+SELECT gen_random_uuid(), c.id, 'event' || e,
+       (ARRAY['Interview', 'Deadline', 'Seminar', 'Other'])[1 + e %% 4],
+       now() + ((random() * 360 - 180) || ' days')::interval
+FROM companies c
+CROSS JOIN generate_series(1, %(events_per_company)s) e;
+
+-- 各イベントに参加者を1人割り当てる
+INSERT INTO userevents (event_id, user_id, status)
+SELECT e.id, u.id, 'Joined'
+FROM (SELECT id, row_number() OVER () AS n FROM events) e
+JOIN (SELECT id, row_number() OVER () AS n FROM users) u
+  ON u.n = 1 + e.n %% %(users)s;
+
+-- 過去のイベントの振り返り
+INSERT INTO reflections (event_id, content, self_score, created_at)
+SELECT id, 'reflection', 3, start_time + interval '2 hours'
+FROM events
+WHERE start_time < now();
+
+INSERT INTO tasks (user_id, title, due_date, is_completed, created_at)
+SELECT u.id, 'task' || t,
+       CASE WHEN t %% 5 = 0 THEN NULL ELSE now() + ((t %% 60) || ' days')::interval END,
+       t %% 3 = 0,
+       now() - (t || ' hours')::interval
+FROM users u
+CROSS JOIN generate_series(1, %(tasks)s) t;
+
+-- ES提出以降のステータスの企業は、追加の翌日に提出したことにする
+INSERT INTO es_entries (company_id, user_id, content, status, submitted_at, created_at)
+SELECT s.company_id, s.user_id, 'es', 'Draft',
+       CASE WHEN s.status IN ('ES_Submit', 'Interview', 'Offer', 'Rejected')
+            THEN (s.created_at + interval '1 day')::date END,
+       s.created_at
+FROM usercompanyselections s;
+
+INSERT INTO notifications (user_id, title, idempotency_key, emailed_at, created_at)
+SELECT u.id, 'notice', (current_date - d)::text || ':deadline:' || u.id || ':' || d,
+       CASE WHEN d = 0 THEN NULL ELSE now() END,
+       now() - (d || ' days')::interval
+FROM users u
+CROSS JOIN generate_series(0, %(notification_days)s) d;
+
+ANALYZE;
+"""
+
+# (名前, SQL, 使っている箇所)
+# PostgREST が生成するクエリと同じ条件・並び順にしている
+HOT_QUERIES: List[Tuple[str, str, str]] = [
+    (
+        "email_check_selections",
+        """
+        SELECT s.*, c.* FROM usercompanyselections s JOIN companies c ON c.id = s.company_id
+        WHERE s.user_id = %(user_id)s AND s.status IN ('ES_Submit', 'Interview')
+          AND s.updated_at < now() - interval '7 days'
+        """,
+        "ReminderService._generate_email_check_reminders",
+    ),
+    (
+        "email_check_busy_events",
+        """
+        SELECT company_id FROM events
+        WHERE company_id = ANY(%(company_ids)s::uuid[])
+          AND start_time BETWEEN now() AND now() + interval '7 days'
+        """,
+        "ReminderService._generate_email_check_reminders",
+    ),
+    (
+        "deadline_reminders",
+        """
+        SELECT s.company_id, s.status, e.* FROM usercompanyselections s
+        JOIN companies c ON c.id = s.company_id
+        JOIN events e ON e.company_id = c.id
+        WHERE s.user_id = %(user_id)s AND e.type = 'Deadline'
+          AND e.start_time BETWEEN now() + interval '1 day' AND now() + interval '3 days'
+        """,
+        "ReminderService._generate_deadline_reminders",
+    ),
+    (
+        "get_user_reminders",
+        """
+        SELECT * FROM get_user_reminders(%(user_id)s)
+        """,
+        "ReminderService._fetch_reminders_sql (REMINDER_ENGINE=sql)",
+    ),
+    (
+        "reflections_by_user",
+        """
+        SELECT r.* FROM reflections r
+        JOIN events e ON e.id = r.event_id
+        WHERE EXISTS (SELECT 1 FROM userevents ue WHERE ue.event_id = e.id AND ue.user_id = %(user_id)s)
+        ORDER BY r.created_at DESC, r.id DESC
+        LIMIT 51
+        """,
+        "GET /api/reflections?user_id=",
+    ),
+    (
+        "tasks_page",
+        """
+        SELECT * FROM tasks WHERE user_id = %(user_id)s
+        ORDER BY due_date ASC NULLS LAST, id ASC
+        LIMIT 51
+        """,
+        "GET /api/tasks",
+    ),
+    (
+        "open_tasks_page",
+        """
+        SELECT * FROM tasks WHERE user_id = %(user_id)s AND is_completed = FALSE
+        ORDER BY due_date ASC NULLS LAST, id ASC
+        LIMIT 51
+        """,
+        "GET /api/tasks?is_completed=false",
+    ),
+    (
+        "es_entries_page",
+        """
+        SELECT * FROM es_entries WHERE company_id = %(company_id)s
+        ORDER BY created_at ASC, id ASC
+        LIMIT 51
+        """,
+        "GET /api/es-entries/company/{id}",
+    ),
+    (
+        "analytics_events_by_day",
+        """
+        SELECT (e.start_time AT TIME ZONE 'UTC')::date, count(*)
+        FROM userevents ue JOIN events e ON e.id = ue.event_id
+        WHERE ue.user_id = %(user_id)s
+          AND e.start_time >= current_date - 6 AND e.start_time < current_date + 1
+        GROUP BY 1
+        """,
+        "get_user_analytics / AnalyticsService._fetch_counts_python",
+    ),
+    (
+        "analytics_es_by_day",
+        """
+        SELECT submitted_at, count(*) FROM es_entries
+        WHERE user_id = %(user_id)s AND submitted_at >= current_date - 6 AND submitted_at <= current_date
+        GROUP BY 1
+        """,
+        "get_user_analytics / AnalyticsService._fetch_counts_python",
+    ),
+    (
+        "analytics_selections_by_day",
+        """
+        SELECT (created_at AT TIME ZONE 'UTC')::date, count(*) FROM usercompanyselections
+        WHERE user_id = %(user_id)s AND created_at >= current_date - 29 AND created_at < current_date + 1
+        GROUP BY 1
+        """,
+        "get_user_analytics / AnalyticsService._fetch_counts_python",
+    ),
+    (
+        "export_companies_chunk",
+        """
+        SELECT s.*, c.* FROM usercompanyselections s JOIN companies c ON c.id = s.company_id
+        WHERE s.user_id = %(user_id)s
+        ORDER BY s.created_at DESC, s.id DESC
+        LIMIT 501
+        """,
+        "GET /api/export/companies",
+    ),
+    (
+        "pending_notifications",
+        """
+        SELECT id, user_id FROM notifications
+        WHERE user_id = ANY(%(user_ids)s::uuid[])
+          AND idempotency_key LIKE %(run_date_prefix)s
+          AND emailed_at IS NULL
+        """,
+        "ReminderBatchJob._process_chunk",
+    ),
+]
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """
+    実行計画の木から Seq Scan しているテーブル名を集める
+    """
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+def seed(cur, scale: int) -> Dict[str, Any]:
+    cur.execute(SEED_SQL, {
+        "users": 200 * scale,
+        "companies": 500 * scale,
+        "selections": 20,
+        "events_per_company": 10,
+        "tasks": 30,
+        "notification_days": 14,
+    })
+    cur.execute("SELECT user_id FROM usercompanyselections LIMIT 1")
+    user_id = cur.fetchone()[0]
+    cur.execute("SELECT array_agg(company_id::text) FROM usercompanyselections WHERE user_id = %s", (user_id,))
+    company_ids = cur.fetchone()[0]
+    cur.execute("SELECT array_agg(id::text) FROM (SELECT id FROM users LIMIT 200) u")
+    user_ids = cur.fetchone()[0]
+    cur.execute("SELECT current_date::text")
+    return {
+        "user_id": user_id,
+        "company_id": company_ids[0],
+        "company_ids": company_ids,
+        "user_ids": user_ids,
+        "run_date_prefix": cur.fetchone()[0] + ":%",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("PLAN_CHECK_DATABASE_URL"))
+    parser.add_argument("--scale", type=int, default=5, help="データ量の倍率（1 = 200ユーザー）")
+    parser.add_argument("--keep", action="store_true", help="確認用スキーマを削除せずに残す")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("PLAN_CHECK_DATABASE_URL is not set (use a local Postgres, not production).")
+        sys.exit(2)
+
+    schema = f"plan_check_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(args.database_url)
+    failures = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA {schema}")
+            cur.execute(f"SET search_path TO {schema}, public")
+            cur.execute(SCHEMA_SQL.read_text(encoding="utf-8"))
+        conn.commit()
+        applied = apply_migrations(conn, MIGRATIONS_DIR)
+        print(f"schema {schema}: applied {', '.join(applied) or 'no migrations'}")
+
+        with conn.cursor() as cur:
+            params = seed(cur, args.scale)
+            conn.commit()
+            for name, sql, source in HOT_QUERIES:
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                plan = cur.fetchone()[0][0]["Plan"]
+                bad = sorted(set(seq_scans(plan)) & GUARDED_TABLES)
+                status = "ok" if not bad else f"SEQ SCAN on {', '.join(bad)}"
+                print(f"{name:<26} {plan['Total Cost']:>10.1f}  {status:<32} ({source})")
+                if bad:
+                    failures.append(name)
+    finally:
+        conn.rollback()
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            conn.commit()
+        conn.close()
+
+    if failures:
+        print(f"❌ {len(failures)} queries fall back to a sequential scan: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ all hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+リマインド計算の Python 版と SQL 版（get_user_reminders）の一致確認
+
+check_query_plans と同じくローカルの Postgres に使い捨てのスキーマを作り、
+docs/schema.sql と docs/migrations を適用してデータを投入する。
+同じデータ・同じ基準時刻で
+- Python 版: テーブルの内容を読み込んだ MemoryClient に対して ReminderService.get_all_reminders
+- SQL 版: Postgres の get_user_reminders を ReminderService._fetch_reminders_sql 経由で呼ぶ
+を全ユーザー分実行し、リマインダーID以外が一致するかを比べる。
+
+締切のちょうど1日前・3日前や7日前の更新など、境界の前後1秒のデータも入れている。
+優先度と残り日数が同じもの同士の並びは Python 版では取得順で決まらないため、
+並び順は (優先度, 残り日数) の列だけを比べ、中身は順序を無視して比べる。
+
+実行方法（backend ディレクトリで）:
+    PLAN_CHECK_DATABASE_URL=postgresql://postgres@localhost/postgres python -m scripts.check_reminder_parity
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+
+from app.memory_db import MemoryClient
+from app.services.reminder_service import ReminderService, ReminderPriority
+from .check_query_plans import SCHEMA_SQL, seed
+from .migrate import MIGRATIONS_DIR, apply_migrations
+
+# Python 版が読むテーブル
+TABLES = ["usercompanyselections", "companies", "events"]
+
+# 締切イベントの基準時刻からの位置（1-3日後が対象）
+DEADLINE_OFFSETS = [
+    "1 day -1 second", "1 day", "1 day 1 second", "1 day 5 hours",
+    "2 days", "2 days 23:59:59", "3 days", "3 days 1 second",
+]
+
+# メール確認: (最終更新の基準時刻からの経過, 面接イベントの基準時刻からの位置)
+STALE_CASES = [
+    ("7 days", None), ("7 days 1 second", None), ("30 days", None),
+    ("10 days", "0"), ("10 days", "-1 second"),
+    ("10 days", "6 days 23:59:59"), ("10 days", "7 days"),
+]
+
+PRIORITY_ORDER = {
+    ReminderPriority.HIGH: 0,
+    ReminderPriority.MEDIUM: 1,
+    ReminderPriority.LOW: 2,
+}
+
+
+class PostgresRPC:
+    """
+    ReminderService の rpc() 呼び出しを psycopg2 で Postgres の関数に流すアダプタ
+    （PostgREST と同じく1行を1つの JSON オブジェクトにして返す）
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.round_trips = 0
+        self.rows_returned = 0
+
+    def rpc(self, name: str, params: Dict[str, Any]):
+        client = self
+
+        class Call:
+            async def execute(self):
+                args = ", ".join(f"{key} => %({key})s" for key in params)
+                with client.conn.cursor() as cur:
+                    cur.execute(
+                        f"SELECT coalesce(jsonb_agg(to_jsonb(r) - 'ordinality' ORDER BY r.ordinality), '[]') "
+                        f"FROM {name}({args}) WITH ORDINALITY r",
+                        params
+                    )
+                    rows = cur.fetchone()[0]
+                client.round_trips += 1
+                client.rows_returned += len(rows)
+                return SimpleNamespace(data=rows)
+
+        return Call()
+
+
+def seed_edge_cases(cur, now: datetime) -> None:
+    """
+    境界の前後に締切・更新日時・イベントを置いたユーザーを未応募/応募済みで1人ずつ作る
+    """
+    def insert(sql: str, params: Dict[str, Any]) -> Any:
+        cur.execute(sql, {**params, "now": now})
+        return cur.fetchone()[0] if cur.description else None
+
+    for status in ("Interested", "ES_Submit", "Interview"):
+        user_id = insert(
+            "INSERT INTO users (id, email, name, university) "
+            "VALUES (gen_random_uuid(), %(email)s, 'edge', 'university') RETURNING id",
+            {"email": f"edge-{status.lower()}@example.com"}
+        )
+        cases = [(offset, "0", offset) for offset in DEADLINE_OFFSETS]
+        cases += [(f"stale {stale} / event {event}", stale, event) for stale, event in STALE_CASES]
+        for name, stale, event in cases:
+            company_id = insert(
+                "INSERT INTO companies (id, name) VALUES (gen_random_uuid(), %(name)s) RETURNING id",
+                {"name": f"edge {status} {name}"}
+            )
+            insert(
+                "INSERT INTO usercompanyselections (company_id, user_id, status, created_at, updated_at) "
+                "VALUES (%(company_id)s, %(user_id)s, %(status)s, %(now)s, %(now)s - %(stale)s::interval)",
+                {"company_id": company_id, "user_id": user_id, "status": status, "stale": stale}
+            )
+            if event is not None:
+                insert(
+                    "INSERT INTO events (company_id, title, type, start_time) "
+                    "VALUES (%(company_id)s, 'edge', %(type)s, %(now)s + %(offset)s::interval)",
+                    {"company_id": company_id, "type": "Deadline" if stale == "0" else "Interview", "offset": event}
+                )
+
+
+def load_tables(cur, names: List[str] = TABLES) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    テーブルの内容を PostgREST と同じ JSON の形で読み込む
+    """
+    tables = {}
+    for table in names:
+        cur.execute(f"SELECT coalesce(jsonb_agg(to_jsonb(t)), '[]') FROM {table} t")
+        tables[table] = cur.fetchone()[0]
+    return tables
+
+
+def _sort_key(reminder: Dict[str, Any]):
+    return (PRIORITY_ORDER[reminder["priority"]], reminder.get("days_remaining", 999))
+
+
+def _comparable(reminders: List[Dict[str, Any]]) -> List[str]:
+    # リマインダーIDは毎回 uuid4 なので比べない
+    return [
+        json.dumps({k: v for k, v in reminder.items() if k != "id"}, sort_keys=True, default=str, ensure_ascii=False)
+        for reminder in reminders
+    ]
+
+
+def diff(python_reminders: List[Dict[str, Any]], sql_reminders: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    一致しなければ違いの説明を返す
+    """
+    python_keys = [_sort_key(r) for r in python_reminders]
+    sql_keys = [_sort_key(r) for r in sql_reminders]
+    if python_keys != sql_keys:
+        return f"order differs: python={python_keys} sql={sql_keys}"
+
+    # 50件の上限で同順位が切られた場合、どの行が残るかは実装ごとに異なるので末尾の同順位は比べない
+    if len(python_reminders) == 50:
+        last = python_keys[-1]
+        python_reminders = [r for r, key in zip(python_reminders, python_keys) if key != last]
+        sql_reminders = [r for r, key in zip(sql_reminders, sql_keys) if key != last]
+
+    python_rows = sorted(_comparable(python_reminders))
+    sql_rows = sorted(_comparable(sql_reminders))
+    if python_rows != sql_rows:
+        only_python = set(python_rows) - set(sql_rows)
+        only_sql = set(sql_rows) - set(python_rows)
+        return f"content differs: python only={sorted(only_python)} sql only={sorted(only_sql)}"
+    return None
+
+
+async def compare(conn, user_ids: List[str], now: datetime) -> List[str]:
+    with conn.cursor() as cur:
+        fake = MemoryClient(load_tables(cur), latency=0)
+    rpc = PostgresRPC(conn)
+    python_service = ReminderService(fake, engine="python")
+    sql_service = ReminderService(rpc, engine="sql")
+
+    failures = []
+    total = 0
+    for user_id in user_ids:
+        python_result = await python_service.get_all_reminders(user_id, now)
+        # フォールバックで Python 版になると比較にならないので SQL 版を直接呼ぶ
+        sql_reminders = await sql_service._fetch_reminders_sql(user_id, now)
+        total += len(sql_reminders)
+        problem = diff(python_result["reminders"], sql_reminders)
+        if problem:
+            failures.append(f"{user_id}: {problem}")
+
+    print(f"users: {len(user_ids)}, reminders: {total}")
+    print(f"python: {fake.round_trips} round trips, {fake.rows_returned} rows fetched")
+    print(f"sql:    {rpc.round_trips} round trips, {rpc.rows_returned} rows fetched")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("PLAN_CHECK_DATABASE_URL"))
+    parser.add_argument("--scale", type=int, default=1, help="データ量の倍率（1 = 200ユーザー）")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("PLAN_CHECK_DATABASE_URL is not set (use a local Postgres, not production).")
+        sys.exit(2)
+
+    schema = f"reminder_parity_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(args.database_url)
+    try:
+        with conn.cursor() as cur:
+            # to_jsonb の日時を PostgREST（Supabase）と同じ +00:00 表記にする
+            cur.execute("SET TIME ZONE 'UTC'")
+            cur.execute(f"CREATE SCHEMA {schema}")
+            cur.execute(f"SET search_path TO {schema}, public")
+            cur.execute(SCHEMA_SQL.read_text(encoding="utf-8"))
+        conn.commit()
+        apply_migrations(conn, MIGRATIONS_DIR)
+
+        with conn.cursor() as cur:
+            seed(cur, args.scale)
+            # MemoryClient は日時を文字列で比べるので、小数秒の桁数がそろうよう秒単位に丸める
+            cur.execute("UPDATE usercompanyselections SET updated_at = date_trunc('second', updated_at)")
+            cur.execute("UPDATE events SET start_time = date_trunc('second', start_time)")
+            cur.execute("SELECT date_trunc('second', now())")
+            now = cur.fetchone()[0]
+            seed_edge_cases(cur, now)
+            cur.execute("SELECT id::text FROM users ORDER BY email")
+            user_ids = [row[0] for row in cur.fetchall()]
+        conn.commit()
+
+        failures = asyncio.run(compare(conn, user_ids, now))
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+    if failures:
+        for failure in failures[:10]:
+            print(failure)
+        print(f"❌ {len(failures)} users differ between the python and sql reminder engines")
+        sys.exit(1)
+    print("✅ python and sql reminder engines agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+docs/migrations の SQL を番号順に適用する
+
+適用済みのバージョンは schema_migrations テーブルに記録し、未適用のものだけを
+1ファイル1トランザクションで実行する。
+
+実行方法（backend ディレクトリで）:
+    python -m scripts.migrate            # DATABASE_URL に適用
+    python -m scripts.migrate --list     # 適用状況の確認のみ
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import psycopg2
+
+from app.config import DATABASE_URL
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "docs" / "migrations"
+
+
+def list_migrations(directory: Path = MIGRATIONS_DIR) -> List[Tuple[str, Path]]:
+    """
+    "001_xxx.sql" 形式のファイルを (バージョン, パス) の番号順で返す
+    """
+    return sorted((path.name.split("_", 1)[0], path) for path in directory.glob("[0-9]*_*.sql"))
+
+
+def applied_versions(conn) -> set:
+    with conn.cursor() as cur:
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version TEXT PRIMARY KEY,"
+            " applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP)"
+        )
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migrations(conn, directory: Path = MIGRATIONS_DIR) -> List[str]:
+    """
+    未適用のマイグレーションを適用し、適用したファイル名の一覧を返す
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, path in list_migrations(directory):
+        if version in done:
+            continue
+        with conn.cursor() as cur:
+            cur.execute(path.read_text(encoding="utf-8"))
+            cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        conn.commit()
+        applied.append(path.name)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR)
+    parser.add_argument("--list", action="store_true", help="適用せずに状況だけ表示する")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("DATABASE_URL is not set.")
+        sys.exit(1)
+
+    conn = psycopg2.connect(args.database_url)
+    try:
+        if args.list:
+            done = applied_versions(conn)
+            for version, path in list_migrations(args.dir):
+                print(f"{'applied' if version in done else 'pending':>8}  {path.name}")
+            return
+        applied = apply_migrations(conn, args.dir)
+        for name in applied:
+            print(f"✅ applied {name}")
+        if not applied:
+            print("No pending migrations.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+-- =================================
+-- 001: 実際のクエリに合わせたインデックス
+--
+-- 各インデックスの上に、使っているクエリ（ファイル / 関数）を書いている。
+-- クエリの条件を変えたときはここも見直し、backend/scripts/check_query_plans.py で
+-- シーケンシャルスキャンに戻っていないか確認すること。
+--
+-- 既存の主キー・UNIQUE 制約で足りているもの（追加しない）:
+--   reflections(event_id)                 ... UNIQUE。イベントごとの振り返り取得・結合はこれで引ける
+--   usercompanyselections(company_id, ..) ... UNIQUE (company_id, user_id)
+--   notifications(idempotency_key)        ... UNIQUE。バッチの upsert の競合判定
+-- =================================
+
+-- ---------------------------------
+-- usercompanyselections
+-- ---------------------------------
+-- ReminderService._generate_email_check_reminders / generate_for_users
+--   user_id = ? AND status IN ('ES_Submit', 'Interview') AND updated_at < ?
+CREATE INDEX IF NOT EXISTS idx_ucs_user_status_updated
+    ON usercompanyselections (user_id, status, updated_at);
+
+-- エクスポート（companies）: user_id = ? ORDER BY created_at DESC, id DESC のキーセット
+CREATE INDEX IF NOT EXISTS idx_ucs_user_created
+    ON usercompanyselections (user_id, created_at DESC, id DESC);
+
+-- ---------------------------------
+-- events
+-- ---------------------------------
+-- ReminderService._generate_email_check_reminders（直近の予定がある企業）
+--   company_id IN (...) AND start_time BETWEEN ? AND ?
+CREATE INDEX IF NOT EXISTS idx_events_company_start
+    ON events (company_id, start_time);
+
+-- ReminderService._generate_deadline_reminders（企業 -> 締切イベントの結合）
+--   company_id = ? AND type = 'Deadline' AND start_time BETWEEN ? AND ?
+-- 締切は全イベントの一部なので部分インデックスにする
+CREATE INDEX IF NOT EXISTS idx_events_deadline_company_start
+    ON events (company_id, start_time)
+    WHERE type = 'Deadline';
+
+-- 全ユーザー分の締切を期間で拾うクエリ（frontend の /api/cron/reminders）
+--   type = 'Deadline' AND start_time BETWEEN ? AND ?
+CREATE INDEX IF NOT EXISTS idx_events_type_start
+    ON events (type, start_time);
+
+-- 前日のイベント（振り返りの促し）を期間だけで拾うクエリ（frontend の /api/cron/reminders）
+--   start_time BETWEEN ? AND ?
+CREATE INDEX IF NOT EXISTS idx_events_start
+    ON events (start_time);
+
+-- ---------------------------------
+-- userevents
+-- ---------------------------------
+-- 振り返り一覧・イベントのエクスポート（events!inner(userevents!inner()) で user_id = ?）
+-- 主キーは (event_id, user_id) なので user_id 先頭のものが別に必要
+CREATE INDEX IF NOT EXISTS idx_userevents_user_event
+    ON userevents (user_id, event_id);
+
+-- ---------------------------------
+-- reflections
+-- ---------------------------------
+-- 振り返り一覧のキーセット: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_reflections_created
+    ON reflections (created_at DESC, id DESC);
+
+-- ---------------------------------
+-- tasks
+-- ---------------------------------
+-- GET /api/tasks のキーセット: user_id = ? ORDER BY due_date NULLS LAST, id
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due
+    ON tasks (user_id, due_date, id);
+
+-- GET /api/tasks?is_completed=false（未完了タスクの期限順）
+CREATE INDEX IF NOT EXISTS idx_tasks_user_open_due
+    ON tasks (user_id, due_date, id)
+    WHERE is_completed = FALSE;
+
+-- ---------------------------------
+-- es_entries
+-- ---------------------------------
+-- GET /api/es-entries/company/{id} のキーセット: company_id = ? ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS idx_es_entries_company_created
+    ON es_entries (company_id, created_at, id);
+
+-- 更新・削除（id = ? AND user_id = ?）は主キーで引ける。エクスポートは user_id 順
+CREATE INDEX IF NOT EXISTS idx_es_entries_user_created
+    ON es_entries (user_id, created_at, id);
+
+-- ---------------------------------
+-- notifications
+-- ---------------------------------
+-- ReminderBatchJob._process_chunk（未送信の今日の通知）
+--   user_id IN (...) AND idempotency_key LIKE '2025-01-01:%' AND emailed_at IS NULL
+-- 送信済みになった行はインデックスから外れる
+CREATE INDEX IF NOT EXISTS idx_notifications_pending
+    ON notifications (user_id, idempotency_key text_pattern_ops)
+    WHERE emailed_at IS NULL;
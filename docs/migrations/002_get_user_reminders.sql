@@ -0,0 +1,114 @@
+-- =================================
+-- 002: リマインドをDB側で1回で計算する関数 get_user_reminders
+--
+-- ReminderService（REMINDER_ENGINE=sql）から rpc で呼ぶ。
+-- Python 版（_generate_email_check_reminders / _generate_deadline_reminders + _sort_by_priority）と
+-- 同じ条件・同じメッセージ・同じ優先度で、優先度順に最大50件を返す。
+-- 選考状況・イベントの生の行をアプリに送らず、返すのはリマインド本体だけになる。
+--
+-- id（リマインダーID）と created_at はアプリ側で付ける。
+-- どちらかの条件を変えたときはもう一方も直し、
+-- backend/scripts/check_reminder_parity.py で結果が一致するか確認すること。
+-- =================================
+
+CREATE OR REPLACE FUNCTION get_user_reminders(
+    p_user_id UUID,
+    p_now TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+)
+RETURNS TABLE (
+    type TEXT,
+    company_id UUID,
+    company_name TEXT,
+    message TEXT,
+    priority TEXT,
+    days_passed INTEGER,    -- メール確認のみ: 最終更新からの経過日数
+    days_remaining INTEGER, -- 締切のみ: 締切までの残り日数
+    event_id UUID,          -- 締切のみ
+    deadline TIMESTAMP WITH TIME ZONE -- 締切のみ
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH email_check AS (
+        -- 結果待ち（ES提出済み/面接中）で7日以上更新がなく、今後7日以内にイベントがない企業
+        SELECT s.company_id,
+               c.name AS company_name,
+               -- Python の timedelta.days と同じく切り捨て
+               floor(extract(epoch FROM p_now - s.updated_at) / 86400)::INTEGER AS days_passed
+        FROM usercompanyselections s
+        JOIN companies c ON c.id = s.company_id
+        WHERE s.user_id = p_user_id
+          AND s.status IN ('ES_Submit', 'Interview')
+          AND s.updated_at < p_now - INTERVAL '7 days'
+          AND NOT EXISTS (
+              SELECT 1 FROM events e
+              WHERE e.company_id = s.company_id
+                AND e.start_time >= p_now
+                AND e.start_time < p_now + INTERVAL '7 days'
+          )
+    ),
+    deadline AS (
+        -- 選考中の企業の 1-3日後の締切イベント
+        SELECT s.company_id,
+               c.name AS company_name,
+               s.status,
+               e.id AS event_id,
+               e.start_time,
+               d.days_remaining,
+               floor((r.seconds - d.days_remaining * 86400) / 3600)::INTEGER AS hours_remaining
+        FROM usercompanyselections s
+        JOIN companies c ON c.id = s.company_id
+        JOIN events e ON e.company_id = s.company_id
+        CROSS JOIN LATERAL (SELECT extract(epoch FROM e.start_time - p_now) AS seconds) r
+        CROSS JOIN LATERAL (SELECT floor(r.seconds / 86400)::INTEGER AS days_remaining) d
+        WHERE s.user_id = p_user_id
+          AND e.type = 'Deadline'
+          AND e.start_time >= p_now + INTERVAL '1 day'
+          AND e.start_time <= p_now + INTERVAL '3 days'
+    ),
+    deadline_labeled AS (
+        SELECT deadline.*,
+               -- 残り時間の表現: 0日なら「○時間」、1日と端数があれば「1日と○時間」、それ以外は「○日」
+               CASE
+                   WHEN days_remaining = 0 THEN hours_remaining || '時間'
+                   WHEN days_remaining = 1 AND hours_remaining > 0 THEN '1日と' || hours_remaining || '時間'
+                   ELSE days_remaining || '日'
+               END AS time_str
+        FROM deadline
+    ),
+    reminders AS (
+        SELECT 'email_check' AS type,
+               company_id,
+               company_name,
+               company_name || 'からメールが届いていませんか？最終更新から' || days_passed || '日経過しています' AS message,
+               'low' AS priority,
+               days_passed,
+               NULL::INTEGER AS days_remaining,
+               NULL::UUID AS event_id,
+               NULL::TIMESTAMP WITH TIME ZONE AS deadline
+        FROM email_check
+        UNION ALL
+        SELECT CASE WHEN status = 'Interested' THEN 'deadline_not_applied' ELSE 'deadline_applied' END,
+               company_id,
+               company_name,
+               CASE
+                   WHEN status = 'Interested' THEN company_name || 'の締切まであと' || time_str || 'です。応募しましたか？'
+                   ELSE company_name || 'の締切まであと' || time_str || 'です'
+               END,
+               CASE WHEN status = 'Interested' AND days_remaining <= 1 THEN 'high' ELSE 'medium' END,
+               NULL::INTEGER,
+               days_remaining,
+               event_id,
+               start_time
+        FROM deadline_labeled
+    )
+    SELECT reminders.*
+    FROM reminders
+    -- HIGH > MEDIUM > LOW、同じ優先度なら締切が近い順（メール確認は 999 日扱い）
+    -- 同順位は Python 版では取得順になるので、ここでは企業名・イベントIDで決めておく
+    ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END,
+             coalesce(days_remaining, 999),
+             company_name,
+             event_id
+    LIMIT 50;
+$$;
@@ -0,0 +1,33 @@
+-- =================================
+-- 003: リマインド状態の差分更新（REMINDER_ENGINE=incremental）用の Realtime 設定
+--
+-- backend/app/services/reminder_state.py が Supabase Realtime で
+-- usercompanyselections / events / companies の変更を購読する。
+-- 選考状況はフロントエンドから直接書き込まれるため、バックエンドには Realtime でしか届かない。
+--
+-- REPLICA IDENTITY FULL: DELETE / UPDATE の通知に変更前の行（user_id, company_id など）を含めるため。
+-- 既定では主キーしか届かず、どのユーザー・企業の状態から消すかが分からない。
+--
+-- supabase_realtime パブリケーションがない環境（ローカルの Postgres など）では何もしない。
+-- =================================
+
+ALTER TABLE usercompanyselections REPLICA IDENTITY FULL;
+ALTER TABLE events REPLICA IDENTITY FULL;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        RETURN;
+    END IF;
+    FOREACH t IN ARRAY ARRAY['usercompanyselections', 'events', 'companies'] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND tablename = t
+        ) THEN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE %I', t);
+        END IF;
+    END LOOP;
+END
+$$;
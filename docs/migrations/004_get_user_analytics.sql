@@ -0,0 +1,73 @@
+-- =================================
+-- 004: 分析ページの集計をDB側で行う関数 get_user_analytics
+--
+-- AnalyticsService（ANALYTICS_ENGINE=sql）から rpc で呼ぶ。
+-- 選考状況・イベント・ESの行をアプリに送らず、ステータス別・日別（UTC）の件数だけを返す。
+--   status_counts:     ステータスごとの選考中の企業数
+--   events_by_day:     直近7日（p_today を含む）に開始したイベント数（userevents で参加しているもの）
+--   es_by_day:         直近7日に提出したES数
+--   selections_by_day: 直近30日に追加した企業数
+-- 件数のない日は含まないので、0埋めはアプリ側で行う。
+-- 日別の件数は下の索引と 001 の idx_ucs_user_created / idx_userevents_user_event で
+-- ユーザー・期間の範囲だけを読む（集計用のロールアップ表は持たない）。
+-- Python 版（AnalyticsService._fetch_counts_python）と条件を変えたときは両方直すこと。
+-- =================================
+
+-- 提出日の範囲（user_id = ? AND submitted_at >= ?）
+CREATE INDEX IF NOT EXISTS idx_es_entries_user_submitted
+    ON es_entries (user_id, submitted_at);
+
+CREATE OR REPLACE FUNCTION get_user_analytics(
+    p_user_id UUID,
+    p_today DATE DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'UTC')::DATE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'status_counts', (
+            SELECT coalesce(jsonb_object_agg(status, n), '{}'::jsonb)
+            FROM (
+                SELECT status, count(*) AS n
+                FROM usercompanyselections
+                WHERE user_id = p_user_id
+                GROUP BY status
+            ) s
+        ),
+        'events_by_day', (
+            SELECT coalesce(jsonb_object_agg(day, n), '{}'::jsonb)
+            FROM (
+                SELECT (e.start_time AT TIME ZONE 'UTC')::DATE::TEXT AS day, count(*) AS n
+                FROM userevents ue
+                JOIN events e ON e.id = ue.event_id
+                WHERE ue.user_id = p_user_id
+                  AND e.start_time >= (p_today - 6)::TIMESTAMP AT TIME ZONE 'UTC'
+                  AND e.start_time < (p_today + 1)::TIMESTAMP AT TIME ZONE 'UTC'
+                GROUP BY 1
+            ) d
+        ),
+        'es_by_day', (
+            SELECT coalesce(jsonb_object_agg(day, n), '{}'::jsonb)
+            FROM (
+                SELECT submitted_at::TEXT AS day, count(*) AS n
+                FROM es_entries
+                WHERE user_id = p_user_id
+                  AND submitted_at >= p_today - 6
+                  AND submitted_at <= p_today
+                GROUP BY 1
+            ) d
+        ),
+        'selections_by_day', (
+            SELECT coalesce(jsonb_object_agg(day, n), '{}'::jsonb)
+            FROM (
+                SELECT (created_at AT TIME ZONE 'UTC')::DATE::TEXT AS day, count(*) AS n
+                FROM usercompanyselections
+                WHERE user_id = p_user_id
+                  AND created_at >= (p_today - 29)::TIMESTAMP AT TIME ZONE 'UTC'
+                  AND created_at < (p_today + 1)::TIMESTAMP AT TIME ZONE 'UTC'
+                GROUP BY 1
+            ) d
+        )
+    )
+$$;
@@ -0,0 +1,69 @@
+-- =================================
+-- 005: ICS フィードの差分同期（sync_token / updated_since）用の変更ログ event_changes
+--
+-- backend/app/services/event_feed.py が、前回の同期以降に変わった・消えたイベントだけを返すために使う。
+-- events / userevents への書き込みをトリガーで (ユーザー, イベント) ごとに1行ずつ記録する。
+-- フロントエンドから直接書き込まれた変更も残るよう、アプリ側ではなくDB側で記録する。
+--
+-- deleted = TRUE は墓石（イベントの削除、またはユーザーの参加登録の削除）。
+-- イベント本体は残さないので、墓石には UID（イベントID）しか載らない。
+-- seq は同期トークンの位置。changed_at はコミット時刻ではないので、
+-- アプリは直近 ICS_SYNC_SETTLE_SECONDS 秒の変更を次回も返し直す（遅れてコミットされた変更の取りこぼし防止）。
+--
+-- 古い行は python -m app.services.event_feed --prune で消す（ICS_CHANGE_RETENTION_DAYS 日より前）。
+-- それより前に発行した同期トークンは 410 になり、クライアントは全件を取り直す。
+-- =================================
+
+CREATE TABLE IF NOT EXISTS event_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL,
+    event_id UUID NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT clock_timestamp()
+);
+
+-- sync_token: user_id = ? AND seq > ? ORDER BY seq
+CREATE INDEX IF NOT EXISTS idx_event_changes_user_seq ON event_changes (user_id, seq);
+-- updated_since: user_id = ? AND changed_at >= ?
+CREATE INDEX IF NOT EXISTS idx_event_changes_user_changed_at ON event_changes (user_id, changed_at);
+-- 最新の確定した位置（changed_at < ? ORDER BY seq DESC）と --prune
+CREATE INDEX IF NOT EXISTS idx_event_changes_changed_at ON event_changes (changed_at);
+
+CREATE OR REPLACE FUNCTION record_event_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'userevents' THEN
+        -- 参加登録の追加・更新はそのユーザーのイベントの変更、削除はそのユーザーにとっての削除
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO event_changes (user_id, event_id, deleted) VALUES (OLD.user_id, OLD.event_id, TRUE);
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'UPDATE' THEN
+            IF OLD.user_id <> NEW.user_id OR OLD.event_id <> NEW.event_id THEN
+                INSERT INTO event_changes (user_id, event_id, deleted) VALUES (OLD.user_id, OLD.event_id, TRUE);
+            END IF;
+        END IF;
+        INSERT INTO event_changes (user_id, event_id) VALUES (NEW.user_id, NEW.event_id);
+    ELSIF TG_OP = 'DELETE' THEN
+        -- 参加登録が先に消されていれば、userevents の DELETE で記録済み
+        INSERT INTO event_changes (user_id, event_id, deleted)
+        SELECT user_id, OLD.id, TRUE FROM userevents WHERE event_id = OLD.id;
+    ELSE
+        INSERT INTO event_changes (user_id, event_id)
+        SELECT user_id, NEW.id FROM userevents WHERE event_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS events_record_change ON events;
+CREATE TRIGGER events_record_change
+    AFTER INSERT OR UPDATE OR DELETE ON events
+    FOR EACH ROW EXECUTE FUNCTION record_event_change();
+
+DROP TRIGGER IF EXISTS userevents_record_change ON userevents;
+CREATE TRIGGER userevents_record_change
+    AFTER INSERT OR UPDATE OR DELETE ON userevents
+    FOR EACH ROW EXECUTE FUNCTION record_event_change();
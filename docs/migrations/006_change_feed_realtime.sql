@@ -0,0 +1,26 @@
+-- =================================
+-- 006: キャッシュの変更通知（backend/app/services/change_feed.py）用の Realtime 設定
+--
+-- カレンダーのキャッシュ（backend/app/services/calendar.py）は、参加登録（userevents）の変更でも
+-- そのイベントの月を作り直す。参加登録はフロントエンドから直接書き込まれるため、Realtime でしか届かない。
+--
+-- REPLICA IDENTITY FULL: DELETE の通知に変更前の行（event_id, user_id）を含めるため。
+--
+-- supabase_realtime パブリケーションがない環境（ローカルの Postgres など）では何もしない。
+-- =================================
+
+ALTER TABLE userevents REPLICA IDENTITY FULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        RETURN;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND tablename = 'userevents'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE userevents;
+    END IF;
+END
+$$;
@@ -105,4 +105,51 @@ CREATE TABLE es_entries (
     submitted_at DATE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE
-);
\ No newline at end of file
+);
+
+-- ---------------------------------
+-- 8. notifications テーブル (アプリ内通知)
+-- ---------------------------------
+CREATE TABLE notifications (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES Users(id),
+    title VARCHAR(255) NOT NULL,
+    content TEXT,
+    link VARCHAR(255),
+    is_read BOOLEAN NOT NULL DEFAULT FALSE,
+    -- バッチ送信の重複防止キー（"実行日:種類:ユーザー:対象"）。画面からの通知はNULL
+    idempotency_key VARCHAR(255) UNIQUE,
+    emailed_at TIMESTAMP WITH TIME ZONE, -- メール送信済み日時
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ---------------------------------
+-- 9. tasks テーブル (Todo)
+-- ---------------------------------
+CREATE TABLE tasks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES Users(id),
+    company_id UUID REFERENCES Companies(id), -- 外部キー (NULL可)
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    due_date TIMESTAMP WITH TIME ZONE,
+    is_completed BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ---------------------------------
+-- 関数: toggle_task_completion (タスクの完了状態を切り替え)
+-- 読み取ってから書き込むと同時実行で切り替えが打ち消し合わないため、1文の UPDATE で反転する
+-- 対象がない（別ユーザーのタスクを含む）場合は0行を返す
+-- ---------------------------------
+CREATE OR REPLACE FUNCTION toggle_task_completion(p_task_id UUID, p_user_id UUID)
+RETURNS SETOF tasks
+LANGUAGE sql
+AS $$
+    UPDATE tasks
+    SET is_completed = NOT is_completed,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = p_task_id AND user_id = p_user_id
+    RETURNING *;
+$$;
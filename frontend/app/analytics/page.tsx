@@ -7,6 +7,33 @@ import { BarChart3, TrendingUp, Target, Calendar as CalendarIcon } from 'lucide-
 
 const GOAL_COMPANIES = 30
 
+type AnalyticsSummary = {
+  total_companies: number
+  status_counts: Record<string, number>
+  activity: { date: string; events: number; es: number }[]
+  progress: { date: string; count: number }[]
+}
+
+async function fetchAnalytics(userId: string): Promise<AnalyticsSummary | null> {
+  const backendUrl = process.env.BACKEND_URL || 'http://127.0.0.1:8000'
+
+  try {
+    const res = await fetch(`${backendUrl}/api/analytics?user_id=${userId}`, {
+      cache: 'no-store'
+    })
+
+    if (!res.ok) {
+      console.error('Backend analytics failed:', res.status, await res.text())
+      return null
+    }
+
+    return await res.json()
+  } catch (error) {
+    console.error('Analytics error:', error)
+    return null
+  }
+}
+
 export default async function AnalyticsPage() {
   const supabase = await createClient()
 
@@ -18,13 +45,10 @@ export default async function AnalyticsPage() {
     redirect('/login')
   }
 
-  // 企業ステータスの集計
-  const { data: selections } = await supabase
-    .from('usercompanyselections')
-    .select('status, created_at')
-    .eq('user_id', user.id)
+  // 集計はバックエンド（/api/analytics）で行い、件数だけを受け取る
+  const analytics = await fetchAnalytics(user.id)
 
-  const totalCompanies = selections?.length || 0
+  const totalCompanies = analytics?.total_companies || 0
 
   const statusCounts: Record<string, number> = {
     Interested: 0,
@@ -33,64 +57,21 @@ export default async function AnalyticsPage() {
     Interview: 0,
     Offer: 0,
     Rejected: 0,
+    ...analytics?.status_counts,
   }
 
-  selections?.forEach((s) => {
-    if (s.status in statusCounts) {
-      statusCounts[s.status]++
-    }
-  })
-
   // Activity Chart Data (Last 7 days)
-  const last7Days = [...Array(7)].map((_, i) => {
-    const d = new Date()
-    d.setDate(d.getDate() - (6 - i))
-    return d.toISOString().split('T')[0]
-  })
-
-  const startDate = last7Days[0]
-  const { data: weekEvents } = await supabase
-    .from('events')
-    .select('start_time, userevents!inner(user_id)')
-    .eq('userevents.user_id', user.id)
-    .gte('start_time', startDate)
-
-  const { data: weekEs } = await supabase
-    .from('es_entries')
-    .select('submitted_at')
-    .eq('user_id', user.id)
-    .gte('submitted_at', startDate)
-
-  const activityData = last7Days.map(date => {
-    const eventCount = weekEvents?.filter(e => e.start_time.startsWith(date)).length || 0
-    const esCount = weekEs?.filter(e => e.submitted_at?.startsWith(date)).length || 0
-    return {
-      date: date.slice(5).replace('-', '/'), // MM/DD
-      events: eventCount,
-      es: esCount
-    }
-  })
+  const activityData = (analytics?.activity || []).map(day => ({
+    date: day.date.slice(5).replace('-', '/'), // MM/DD
+    events: day.events,
+    es: day.es
+  }))
 
   // Progress Chart Data (Last 30 days)
-  const last30Days = [...Array(30)].map((_, i) => {
-    const d = new Date()
-    d.setDate(d.getDate() - (29 - i))
-    return d.toISOString().split('T')[0]
-  })
-
-  const { data: allSelections } = await supabase
-    .from('usercompanyselections')
-    .select('created_at')
-    .eq('user_id', user.id)
-    .gte('created_at', last30Days[0])
-
-  const progressData = last30Days.map(date => {
-    const count = allSelections?.filter(s => s.created_at.startsWith(date)).length || 0
-    return {
-      date: date.slice(5).replace('-', '/'), // MM/DD
-      count
-    }
-  })
+  const progressData = (analytics?.progress || []).map(day => ({
+    date: day.date.slice(5).replace('-', '/'), // MM/DD
+    count: day.count
+  }))
 
   // Status Chart Data
   const statusChartData = [
@@ -13,23 +13,11 @@ export default async function CalendarPage() {
     redirect('/login')
   }
 
-  // 今月のイベントを取得
-  const now = new Date()
-  const startOfMonth = new Date(now.getFullYear(), now.getMonth(), 1)
-  const endOfMonth = new Date(now.getFullYear(), now.getMonth() + 1, 0, 23, 59, 59)
-
-  const { data: events } = await supabase
-    .from('events')
-    .select('*, companies(name), userevents!inner(user_id)')
-    .eq('userevents.user_id', user.id)
-    .gte('start_time', startOfMonth.toISOString())
-    .lte('start_time', endOfMonth.toISOString())
-    .order('start_time', { ascending: true })
-
   return (
     <div className="container mx-auto p-4 md:p-8 max-w-7xl">
       <h1 className="text-3xl font-bold mb-8 dark:text-white">カレンダー</h1>
-      <MonthlyCalendar events={events || []} />
+      {/* イベントは /api/calendar/month から月ごと（前後の月を含めて）取得する */}
+      <MonthlyCalendar userId={user.id} />
     </div>
   )
 }
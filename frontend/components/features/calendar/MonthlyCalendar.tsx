@@ -1,26 +1,79 @@
 'use client'
 
-import { useState } from 'react'
+import { useCallback, useEffect, useState } from 'react'
 import { ChevronLeft, ChevronRight, Calendar as CalendarIcon } from 'lucide-react'
 import Link from 'next/link'
 
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'
+
 interface Event {
   id: string
   title: string
   start_time: string
+  end_time: string | null
   type: string
-  companies: { name: string } | null
+  company: string | null
 }
 
-interface MonthlyCalendarProps {
+// GET /api/calendar/month/{YYYY-MM} の1か月分（days は 日付 -> events の添字）
+interface MonthData {
+  key: string
   events: Event[]
+  days: Record<string, number[]>
+}
+
+interface MonthResponse extends MonthData {
+  adjacent: Record<string, MonthData>
+}
+
+interface MonthlyCalendarProps {
+  userId: string
 }
 
-export function MonthlyCalendar({ events }: MonthlyCalendarProps) {
+const toMonthKey = (year: number, month: number) => {
+  const date = new Date(year, month, 1)
+  return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`
+}
+
+const toDateKey = (date: Date) =>
+  `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`
+
+export function MonthlyCalendar({ userId }: MonthlyCalendarProps) {
   const [currentDate, setCurrentDate] = useState(new Date())
+  // 受け取った月（前後の月を含む）を覚えておき、移動したときは待たずに表示する
+  const [months, setMonths] = useState<Record<string, MonthData>>({})
 
   const year = currentDate.getFullYear()
   const month = currentDate.getMonth()
+  const monthKey = toMonthKey(year, month)
+  const monthData = months[monthKey]
+
+  const fetchMonth = useCallback(async (key: string, prefetch: number) => {
+    const params = new URLSearchParams({ user_id: userId, prefetch: String(prefetch) })
+    try {
+      const response = await fetch(`${BACKEND_URL}/api/calendar/month/${key}?${params.toString()}`)
+      if (!response.ok) {
+        throw new Error(`カレンダーの取得に失敗しました: ${response.status}`)
+      }
+      const { adjacent, ...data }: MonthResponse = await response.json()
+      setMonths((prev) => ({ ...prev, ...adjacent, [data.key]: data }))
+    } catch (error) {
+      console.error('Error fetching calendar:', error)
+    }
+  }, [userId])
+
+  useEffect(() => {
+    // 表示する月がなければ前後の月ごと取得し、あれば足りない隣の月だけ先に取っておく
+    if (!monthData) {
+      fetchMonth(monthKey, 1)
+      return
+    }
+    for (const neighbor of [toMonthKey(year, month - 1), toMonthKey(year, month + 1)]) {
+      if (!months[neighbor]) {
+        fetchMonth(neighbor, 0)
+      }
+    }
+  }, [monthKey, monthData, months, year, month, fetchMonth])
 
   const firstDay = new Date(year, month, 1)
   const lastDay = new Date(year, month + 1, 0)
@@ -30,9 +83,9 @@ export function MonthlyCalendar({ events }: MonthlyCalendarProps) {
   const monthNames = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
   const dayNames = ['日', '月', '火', '水', '木', '金', '土']
 
-  const getEventsForDate = (date: Date) => {
-    const dateStr = date.toISOString().split('T')[0]
-    return events.filter(event => event.start_time.startsWith(dateStr))
+  const getEventsForDate = (date: Date): Event[] => {
+    if (!monthData) return []
+    return (monthData.days[toDateKey(date)] || []).map((index) => monthData.events[index])
   }
 
   const isToday = (date: Date) => {
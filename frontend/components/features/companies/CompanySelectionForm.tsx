@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect, useMemo } from 'react'
+import { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import Link from 'next/link'
 import { Search, ExternalLink, ChevronLeft, ChevronRight, Filter, X } from 'lucide-react'
@@ -24,16 +24,20 @@ interface CompanySelectionFormProps {
 }
 
 const ITEMS_PER_PAGE = 10
+// 入力が止まってから検索するまでの時間（ミリ秒）
+const SEARCH_DEBOUNCE_MS = 150
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'
 
 export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionFormProps) {
   const [searchQuery, setSearchQuery] = useState('')
-  const [selectedCompanyId, setSelectedCompanyId] = useState<string>('')
+  const [selectedCompany, setSelectedCompany] = useState<Company | null>(null)
   const [status, setStatus] = useState('Interested')
   const [motivationLevel, setMotivationLevel] = useState(3)
   const [errors, setErrors] = useState<{ company?: string; motivation_level?: string }>({})
   const [isSubmitting, setIsSubmitting] = useState(false)
   const [currentPage, setCurrentPage] = useState(1)
   const [companies, setCompanies] = useState<Company[]>([])
+  const [hasMore, setHasMore] = useState(false)
   const [industries, setIndustries] = useState<Industry[]>([])
   const [isLoading, setIsLoading] = useState(true)
 
@@ -43,23 +47,15 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
   const router = useRouter()
   const { showSuccess, showError } = useToast()
 
-  // 企業一覧と業界一覧を取得
+  // 業界一覧を取得（バックエンドの参照データ。2回目以降はブラウザが ETag で確かめ、変わっていなければ 304）
   useEffect(() => {
-    const fetchData = async () => {
-      setIsLoading(true)
+    const fetchIndustries = async () => {
       try {
-        // 企業一覧を取得
-        const companiesResponse = await fetch('/api/companies/list')
-        if (!companiesResponse.ok) throw new Error('企業一覧の取得に失敗しました')
-        const companiesData = await companiesResponse.json()
-        setCompanies(companiesData.companies || [])
-
-        // 業界一覧を取得
-        const industriesResponse = await fetch('/api/industries')
+        const industriesResponse = await fetch(`${BACKEND_URL}/api/reference/industries`)
         if (!industriesResponse.ok) {
           const errorData = await industriesResponse.json().catch(() => ({}))
           console.error('業界一覧の取得に失敗しました:', errorData)
-          showError(`業界データの取得に失敗しました: ${errorData.error || '不明なエラー'}`)
+          showError(`業界データの取得に失敗しました: ${errorData.detail || '不明なエラー'}`)
         } else {
           const industriesData = await industriesResponse.json()
           console.log('業界データ取得成功:', industriesData.industries?.length || 0, '件')
@@ -67,58 +63,61 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
         }
       } catch (error: any) {
         showError(error.message || 'データの取得に失敗しました')
-      } finally {
-        setIsLoading(false)
       }
     }
-    fetchData()
+    fetchIndustries()
   }, [])
 
-  // フィルタリング（名前順でソート）
-  const filteredAndSortedCompanies = useMemo(() => {
-    let filtered = companies.filter(company =>
-      !registeredCompanyIds.includes(company.id)
-    )
-
-    // 検索フィルタ
-    if (searchQuery) {
-      filtered = filtered.filter(company =>
-        company.name.toLowerCase().includes(searchQuery.toLowerCase())
-      )
-    }
-
-    // 業界フィルタ
-    if (selectedIndustry !== 'all') {
-      filtered = filtered.filter(company => company.industry === selectedIndustry)
-    }
-
-    // 名前順でソート
-    filtered.sort((a, b) => {
-      return a.name.localeCompare(b.name, 'ja')
-    })
-
-    return filtered
-  }, [companies, registeredCompanyIds, searchQuery, selectedIndustry])
-
-  // ページネーション
-  const totalPages = Math.ceil(filteredAndSortedCompanies.length / ITEMS_PER_PAGE)
-  const startIndex = (currentPage - 1) * ITEMS_PER_PAGE
-  const endIndex = startIndex + ITEMS_PER_PAGE
-  const paginatedCompanies = filteredAndSortedCompanies.slice(startIndex, endIndex)
-
   // 検索やフィルタが変更されたら1ページ目に戻る
   useEffect(() => {
     setCurrentPage(1)
   }, [searchQuery, selectedIndustry])
 
-  const selectedCompany = companies.find(c => c.id === selectedCompanyId)
+  // 企業を検索（バックエンドの検索インデックスから表示する1ページ分だけ取得。登録済みの企業は除く）
+  const registeredKey = registeredCompanyIds.join(',')
+  useEffect(() => {
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      setIsLoading(true)
+      try {
+        const params = new URLSearchParams({
+          q: searchQuery,
+          limit: ITEMS_PER_PAGE.toString(),
+          offset: ((currentPage - 1) * ITEMS_PER_PAGE).toString(),
+        })
+        if (selectedIndustry !== 'all') {
+          params.set('industry', selectedIndustry.toString())
+        }
+        registeredCompanyIds.forEach((id) => params.append('exclude', id))
+
+        const response = await fetch(`${BACKEND_URL}/api/companies/search?${params.toString()}`, {
+          signal: controller.signal,
+        })
+        if (!response.ok) throw new Error('企業一覧の取得に失敗しました')
+        const data = await response.json()
+        setCompanies(data.items || [])
+        setHasMore(Boolean(data.has_more))
+        setIsLoading(false)
+      } catch (error: any) {
+        // 次の入力で取り消した検索は無視する
+        if (error.name === 'AbortError') return
+        showError(error.message || 'データの取得に失敗しました')
+        setIsLoading(false)
+      }
+    }, searchQuery ? SEARCH_DEBOUNCE_MS : 0)
+
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [searchQuery, selectedIndustry, currentPage, registeredKey])
 
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault()
 
     const newErrors: { company?: string; motivation_level?: string } = {}
 
-    if (!selectedCompanyId) {
+    if (!selectedCompany) {
       newErrors.company = '企業を選択してください'
     }
 
@@ -137,7 +136,7 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
 
     try {
       const formData = new FormData()
-      formData.append('company_id', selectedCompanyId)
+      formData.append('company_id', selectedCompany!.id)
       formData.append('status', status)
       formData.append('motivation_level', motivationLevel.toString())
 
@@ -224,7 +223,7 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
       <div className="bg-white dark:bg-slate-800 rounded-xl border dark:border-gray-700 shadow-sm">
         <div className="p-4 border-b dark:border-gray-700 flex justify-between items-center">
           <h2 className="text-lg font-bold text-gray-900 dark:text-white">
-            企業一覧 ({filteredAndSortedCompanies.length}件)
+            企業一覧
           </h2>
           {isLoading && (
             <div className="text-sm text-gray-500 dark:text-gray-400">読み込み中...</div>
@@ -235,24 +234,24 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
             <div className="p-8 text-center text-gray-500 dark:text-gray-400">
               読み込み中...
             </div>
-          ) : paginatedCompanies.length > 0 ? (
+          ) : companies.length > 0 ? (
             <div className="divide-y dark:divide-gray-700">
-              {paginatedCompanies.map((company) => (
+              {companies.map((company) => (
                 <button
                   key={company.id}
                   type="button"
                   onClick={() => {
-                    setSelectedCompanyId(company.id)
+                    setSelectedCompany(company)
                     setErrors((prev) => ({ ...prev, company: undefined }))
                   }}
-                  className={`w-full p-4 text-left hover:bg-gray-50 dark:hover:bg-gray-700 transition ${selectedCompanyId === company.id
+                  className={`w-full p-4 text-left hover:bg-gray-50 dark:hover:bg-gray-700 transition ${selectedCompany?.id === company.id
                     ? 'bg-indigo-50 dark:bg-indigo-900/20 border-l-4 border-indigo-500 dark:border-indigo-400'
                     : ''
                     }`}
                 >
                   <div className="flex items-center justify-between">
                     <div className="flex items-center gap-3 flex-1">
-                      <div className={`w-10 h-10 text-[12px] p-2 rounded-lg flex items-center justify-center text-lg font-bold ${selectedCompanyId === company.id
+                      <div className={`w-10 h-10 text-[12px] p-2 rounded-lg flex items-center justify-center text-lg font-bold ${selectedCompany?.id === company.id
                         ? 'bg-indigo-100 dark:bg-indigo-900/40 text-indigo-600 dark:text-indigo-400'
                         : 'bg-gray-100 dark:bg-gray-700 text-gray-400 dark:text-gray-500'
                         }`}>
@@ -276,7 +275,7 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
                         )}
                       </div>
                     </div>
-                    {selectedCompanyId === company.id && (
+                    {selectedCompany?.id === company.id && (
                       <div className="text-indigo-600 dark:text-indigo-400 font-medium">✓ 選択中</div>
                     )}
                   </div>
@@ -290,11 +289,11 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
           )}
         </div>
 
-        {/* ページネーション */}
-        {totalPages > 1 && (
+        {/* ページネーション（件数は数えず、続きがあるかだけを受け取る） */}
+        {(currentPage > 1 || hasMore) && (
           <div className="p-4 border-t dark:border-gray-700 flex items-center justify-between">
             <div className="text-sm text-gray-600 dark:text-gray-400">
-              {startIndex + 1} - {Math.min(endIndex, filteredAndSortedCompanies.length)} / {filteredAndSortedCompanies.length}件
+              {currentPage}ページ目
             </div>
             <div className="flex gap-2">
               <button
@@ -304,35 +303,9 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
               >
                 <ChevronLeft className="w-5 h-5" />
               </button>
-              <div className="flex items-center gap-1">
-                {Array.from({ length: Math.min(5, totalPages) }, (_, i) => {
-                  let pageNum: number
-                  if (totalPages <= 5) {
-                    pageNum = i + 1
-                  } else if (currentPage <= 3) {
-                    pageNum = i + 1
-                  } else if (currentPage >= totalPages - 2) {
-                    pageNum = totalPages - 4 + i
-                  } else {
-                    pageNum = currentPage - 2 + i
-                  }
-                  return (
-                    <button
-                      key={pageNum}
-                      onClick={() => setCurrentPage(pageNum)}
-                      className={`px-3 py-1 rounded-lg text-sm font-medium transition ${currentPage === pageNum
-                        ? 'bg-indigo-600 text-white'
-                        : 'text-gray-600 dark:text-gray-400 hover:bg-gray-50 dark:hover:bg-gray-700'
-                        }`}
-                    >
-                      {pageNum}
-                    </button>
-                  )
-                })}
-              </div>
               <button
-                onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
-                disabled={currentPage === totalPages}
+                onClick={() => setCurrentPage(prev => prev + 1)}
+                disabled={!hasMore}
                 className="p-2 border dark:border-gray-700 rounded-lg hover:bg-gray-50 dark:hover:bg-gray-700 transition disabled:opacity-50 disabled:cursor-not-allowed text-gray-600 dark:text-gray-400"
               >
                 <ChevronRight className="w-5 h-5" />
@@ -412,7 +385,7 @@ export function CompanySelectionForm({ registeredCompanyIds }: CompanySelectionF
         </form>
       )}
 
-      {!selectedCompany && !isLoading && filteredAndSortedCompanies.length > 0 && (
+      {!selectedCompany && !isLoading && companies.length > 0 && (
         <div className="bg-blue-50 dark:bg-blue-900/20 border border-blue-200 dark:border-blue-800 rounded-lg p-4 text-sm text-blue-800 dark:text-blue-200">
           企業を選択すると、ステータスと志望度を設定して登録できます。
         </div>